@@ -24,6 +24,8 @@ def apply_lg_plus(
     chooseholes,
     affine2d,
     run_bpfix,
+    psf_offset_step=0.0,
+    maximum_cores="1",
 ):
     """
     Apply the image plane algorithm (LG-PLUS) to an AMI exposure.
@@ -55,6 +57,11 @@ def apply_lg_plus(
         None or user-defined Affine2d object
     run_bpfix : bool
         Run Fourier bad pixel fix on cropped data
+    psf_offset_step : float, optional
+        Step, in detector pixels, to which the measured PSF offsets are rounded
+        to share fringe models between integrations; 0 uses the measured offsets
+    maximum_cores : str, optional
+        Number of processes to use to fit the integrations in parallel
 
     Returns
     -------
@@ -182,7 +189,13 @@ def apply_lg_plus(
         run_bpfix=run_bpfix,
     )
 
-    ff_t = nrm_core.FringeFitter(niriss, psf_offset_ff=psf_offset_ff, oversample=oversample)
+    ff_t = nrm_core.FringeFitter(
+        niriss,
+        psf_offset_ff=psf_offset_ff,
+        oversample=oversample,
+        psf_offset_step=psf_offset_step,
+        maximum_cores=maximum_cores,
+    )
 
     oifitsmodel, oifitsmodel_multi, amilgmodel = ff_t.fit_fringes_all(input_cube)
 
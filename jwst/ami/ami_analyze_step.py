@@ -40,6 +40,8 @@ class AmiAnalyzeStep(Step):
         chooseholes = string(default=None) # If not None, fit only certain fringes e.g. ['B4','B5','B6','C2']
         affine2d = string(default='commissioning') # ASDF file containing user-defined affine parameters OR 'commssioning'
         run_bpfix = boolean(default=True) # Run Fourier bad pixel fix on cropped data
+        psf_offset_step = float(default=0.0, min=0.0) # Round measured PSF offsets to this step [pixels] to share fringe models
+        maximum_cores = string(default='1') # Cores for fitting integrations in parallel. Can be an integer, 'half', 'quarter', or 'all'
     """  # noqa: E501
 
     reference_file_types = ["throughput", "nrm"]
@@ -195,6 +197,8 @@ class AmiAnalyzeStep(Step):
         chooseholes = self.chooseholes
         affine2d = self.affine2d
         run_bpfix = self.run_bpfix
+        psf_offset_step = self.psf_offset_step
+        maximum_cores = self.maximum_cores
 
         # pull out parameters that are strings and change to floats
         psf_offset = [float(a) for a in self.psf_offset.split()]
@@ -263,6 +267,8 @@ class AmiAnalyzeStep(Step):
                 chooseholes,
                 affine2d,
                 run_bpfix,
+                psf_offset_step=psf_offset_step,
+                maximum_cores=maximum_cores,
             )
 
         amilgmodel.meta.cal_step.ami_analyze = "COMPLETE"
@@ -220,10 +220,12 @@ class LgModel:
             # this routine multiplies the envelope by each fringe "image"
             model_over = leastsqnrm.multiplyenv(pb, ff)
 
-            model_binned = np.zeros((self.fov, self.fov, model_over.shape[2]))
-            # loop over slices "sl" in the model
-            for sl in range(model_over.shape[2]):
-                model_binned[:, :, sl] = utils.rebin(model_over[:, :, sl], (self.over, self.over))
+            # bin all slices "sl" in the model at once, as utils.rebin does for each slice
+            model_binned = (
+                model_over.reshape(self.fov, self.over, self.fov, self.over, model_over.shape[2])
+                .sum(3)
+                .sum(1)
+            )
 
             self.model += w * model_binned
 
@@ -1,6 +1,10 @@
 import logging
+import multiprocessing as mp
+import os
+from collections import OrderedDict
 
 import numpy as np
+from stcal.multiprocessing import compute_num_cores
 from stdatamodels.jwst import datamodels
 
 from jwst.ami import lg_model, oifits, utils
@@ -9,6 +13,9 @@ log = logging.getLogger(__name__)
 
 __all__ = ["FringeFitter"]
 
+# Number of fringe models kept for reuse by later integrations
+MODEL_CACHE_SIZE = 16
+
 
 class FringeFitter:
     """
@@ -36,6 +43,15 @@ class FringeFitter:
     weighted : bool, optional
         If True, use Poisson variance for weighting, otherwise do not apply
         any weighting. Default is False.
+
+    psf_offset_step : float, optional
+        Step, in detector pixels, to which the measured PSF offsets are rounded,
+        so that integrations with nearby offsets share the same fringe model.
+        Default is 0, which uses the measured offsets.
+
+    maximum_cores : str, optional
+        Number of processes to use to fit the integrations: an integer, 'quarter',
+        'half', or 'all'. Default is '1', which does not use multiprocessing.
     """
 
     def __init__(
@@ -45,6 +61,8 @@ class FringeFitter:
         psf_offset_ff=None,
         npix="default",
         weighted=False,
+        psf_offset_step=0.0,
+        maximum_cores="1",
     ):
         self.instrument_data = instrument_data
 
@@ -52,6 +70,11 @@ class FringeFitter:
         self.psf_offset_ff = psf_offset_ff
         self.npix = npix
         self.weighted = weighted
+        self.psf_offset_step = psf_offset_step
+        self.maximum_cores = maximum_cores
+
+        # Fringe models of recent integrations, most recently used last
+        self._models = OrderedDict()
 
         if self.weighted:
             log.info("leastsqnrm.weighted_operations() - weighted by Poisson variance")
@@ -81,7 +104,9 @@ class FringeFitter:
 
         Notes
         -----
-        May allow parallelization by integration (later)
+        The integrations are fitted in parallel if ``maximum_cores`` allows more
+        than one process. Each process fits a contiguous block of integrations,
+        so that fringe models are reused between neighboring integrations.
         """
         # scidata, dqmask are already centered around peak
         self.scidata, self.dqmask = self.instrument_data.read_data_model(input_model)
@@ -105,10 +130,17 @@ class FringeFitter:
         # Model parameters
         solns_arr = np.zeros((nslices, 44))
 
-        for slc in range(nslices):
-            log.info(f"Fitting fringes for iteration {slc} of {nslices}")
-            nrmslc = self.fit_fringes_single_integration(slc)
+        nprocs = compute_num_cores(str(self.maximum_cores), nslices, os.cpu_count() or 1)
+        if nprocs > 1:
+            log.info(f"Fitting fringes of {nslices} integrations using {nprocs} processes")
+            blocks = np.array_split(np.arange(nslices), nprocs)
+            with mp.get_context("spawn").Pool(nprocs) as pool:
+                results = pool.starmap(_fit_integrations, [(self, block) for block in blocks])
+            nrmslcs = [nrmslc for result in results for nrmslc in result]
+        else:
+            nrmslcs = map(self.fit_fringes_single_integration, range(nslices))
 
+        for slc, nrmslc in enumerate(nrmslcs):
             # populate the solutions of the lgfit model
             datapeak = nrmslc.reference.max()
             ctrd_arr[slc, :, :] = nrmslc.reference
@@ -170,6 +202,7 @@ class FringeFitter:
         * ``cond``: matrix condition for inversion
         * ``fringepistons``: zero-mean piston opd in radians on each hole (eigenphases)
         """
+        log.info(f"Fitting fringes for iteration {slc} of {self.instrument_data.nslices}")
         nrm = lg_model.LgModel(
             self.instrument_data.nrm_model,
             bandpass=self.instrument_data.wls[0],
@@ -199,16 +232,17 @@ class FringeFitter:
             # pixel coordinates: - note the flip of [0] and [1] to match DS9 view
             nrm.xpos = centroid[1]  # flip 0 and 1 to convert
             nrm.ypos = centroid[0]  # flip 0 and 1
+            if self.psf_offset_step:
+                # round the offsets so that the model may be shared with other integrations
+                nrm.xpos = np.round(nrm.xpos / self.psf_offset_step) * self.psf_offset_step
+                nrm.ypos = np.round(nrm.ypos / self.psf_offset_step) * self.psf_offset_step
             nrm.psf_offset = nrm.xpos, nrm.ypos  # renamed .bestcenter to .psf_offset
         else:
             nrm.psf_offset = (
                 self.psf_offset_ff
             )  # user-provided psf_offsetoffsets from array center are here.
 
-        model = nrm.make_model(
-            fov=ctrd.shape[0],
-            psf_offset=nrm.psf_offset,
-        )
+        model = self.make_model(nrm, fov=ctrd.shape[0])
 
         nrm.fit_image(
             ctrd,
@@ -219,3 +253,71 @@ class FringeFitter:
 
         nrm.create_modelpsf()
         return nrm  # to fit_fringes_all, where output model is created from list of nrm objects
+
+    def make_model(self, nrm, fov):
+        """
+        Generate the fringe model of an integration, or reuse an identical one.
+
+        Models are cached by field of view, PSF offset, affine distortion and
+        bandpass, so that integrations with the same offset, or the same
+        rounded offset if ``psf_offset_step`` is set, share their model.
+
+        Parameters
+        ----------
+        nrm : LgModel object
+            Model of the integration, with the PSF offset set.
+        fov : int
+            Number of detector pixels on a side.
+
+        Returns
+        -------
+        ndarray[float]
+            Read-only fringe model in the shape of ``(fov, fov, N * (N - 1) + 2)``,
+            also stored as ``nrm.model``.
+        """
+        affine2d = nrm.affine2d
+        key = (
+            fov,
+            tuple(float(offset) for offset in nrm.psf_offset),
+            (affine2d.mx, affine2d.my, affine2d.sx, affine2d.sy, affine2d.xo, affine2d.yo),
+            np.asarray(nrm.bandpass).tobytes(),
+        )
+        model = self._models.get(key)
+        if model is None:
+            model = nrm.make_model(fov=fov, psf_offset=nrm.psf_offset)
+            model.flags.writeable = False
+            self._models[key] = model
+            if len(self._models) > MODEL_CACHE_SIZE:
+                self._models.popitem(last=False)
+        else:
+            log.debug(f"Reusing the fringe model for psf_offset: {nrm.psf_offset}")
+            self._models.move_to_end(key)
+            nrm.fov = fov
+            nrm.model = model
+        return model
+
+
+def _fit_integrations(fitter, slices):
+    """
+    Fit the fringes of a block of integrations in a worker process.
+
+    Parameters
+    ----------
+    fitter : FringeFitter
+        Fitter holding the data of all integrations.
+    slices : ndarray[int]
+        Indices of the integrations to fit.
+
+    Returns
+    -------
+    list of LgModel
+        Models with the best fit results for the integrations, without
+        the fringe models, which are not needed for the output products.
+    """
+    nrmslcs = []
+    for slc in slices:
+        nrm = fitter.fit_fringes_single_integration(int(slc))
+        nrm.model = nrm.fittingmodel = None
+        nrm.model_beam = nrm.fringes = None
+        nrmslcs.append(nrm)
+    return nrmslcs
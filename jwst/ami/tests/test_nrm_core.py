@@ -5,11 +5,15 @@ Since nrm_core makes oifits objects, we also test oifits here.
 """
 
 import numpy as np
+import pytest
 import stdatamodels.jwst.datamodels as dm
+from numpy.testing import assert_allclose, assert_equal
 from scipy.signal import convolve
 
+from jwst.ami import nrm_core
 from jwst.ami.bp_fix import filtwl_d
 from jwst.ami.instrument_data import NIRISS
+from jwst.ami.lg_model import LgModel
 from jwst.ami.nrm_core import FringeFitter
 
 
@@ -104,3 +108,49 @@ def test_fringe_fitter(example_model, nrm_model, bandpass, nrm_psf):
     # Why is the shape hard-coded to 44?
     assert coeffs.shape == (example_model.data.shape[0], 44)
     assert np.allclose(coeffs[0], coeffs[1])
+
+
+def fit_fringes(example_model, nrm_model, bandpass, **kwargs):
+    niriss = NIRISS(example_model.meta.instrument.filter, nrm_model, bandpass)
+    fitter = FringeFitter(niriss, **kwargs)
+    return fitter.fit_fringes_all(example_model.copy())
+
+
+def test_fringe_fitter_parallel(monkeypatch, example_model, nrm_model, bandpass):
+    """Test that fitting integrations in parallel gives the serial result."""
+    expected = fit_fringes(example_model, nrm_model, bandpass)
+
+    # Parallel fitting is limited to the available cores
+    monkeypatch.setattr(nrm_core.os, "cpu_count", lambda: 4)
+    result = fit_fringes(example_model, nrm_model, bandpass, maximum_cores="2")
+
+    for oimodel, expected_oimodel in zip(result[:2], expected[:2], strict=True):
+        assert_equal(oimodel.vis["VISAMP"], expected_oimodel.vis["VISAMP"])
+        assert_equal(oimodel.t3["T3PHI"], expected_oimodel.t3["T3PHI"])
+    assert_equal(result[2].fit_image, expected[2].fit_image)
+    assert_equal(result[2].resid_image, expected[2].resid_image)
+    assert_equal(result[2].solns_table["coeffs"], expected[2].solns_table["coeffs"])
+
+
+@pytest.mark.parametrize("psf_offset_ff", [None, (0.1, -0.2)])
+def test_fringe_fitter_model_cache(monkeypatch, example_model, nrm_model, bandpass, psf_offset_ff):
+    """Test that integrations with the same PSF offset share their fringe model."""
+    offsets = []
+    make_model = LgModel.make_model
+
+    def count_models(self, fov, psf_offset=(0, 0)):
+        offsets.append(tuple(psf_offset))
+        return make_model(self, fov, psf_offset=psf_offset)
+
+    monkeypatch.setattr(LgModel, "make_model", count_models)
+    step = 0.5
+    fit_fringes(
+        example_model, nrm_model, bandpass, psf_offset_ff=psf_offset_ff, psf_offset_step=step
+    )
+    nints = example_model.data.shape[0]
+    assert len(offsets) == len(set(offsets)) < nints
+    if psf_offset_ff is None:
+        # measured offsets are rounded to the step
+        assert_allclose(np.round(np.array(offsets) / step) * step, offsets)
+    else:
+        assert offsets == [psf_offset_ff]
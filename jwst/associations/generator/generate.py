@@ -1,7 +1,10 @@
 import logging
+from collections import Counter
 from timeit import default_timer as timer
 
 from jwst.associations.association import make_timestamp
+from jwst.associations.lib.asn_index import AssociationIndex
+from jwst.associations.lib.pool_mask import rule_masks
 from jwst.associations.lib.process_list import (
     ListCategory,
     ProcessList,
@@ -17,7 +20,9 @@ logger = logging.getLogger(__name__)
 __all__ = ["generate"]
 
 
-def generate(pool, rules, version_id=None, finalize=True):
+def generate(
+    pool, rules, version_id=None, finalize=True, use_index=True, use_masks=True, history=None
+):
     """
     Generate associations in the pool according to the rules.
 
@@ -38,6 +43,26 @@ def generate(pool, rules, version_id=None, finalize=True):
     finalize : bool
         Run all rule methods marked as 'finalized'.
 
+    use_index : bool
+        Use an `~jwst.associations.lib.asn_index.AssociationIndex` to only
+        check items against existing associations whose fixed constraints,
+        such as program or instrument, agree with the item. The resulting
+        associations are identical either way.
+
+    use_masks : bool
+        Evaluate the fixed constraints of each rule, such as exposure type,
+        over the whole pool at once using `~jwst.associations.lib.pool_mask.rule_masks`.
+        Pool items are then only checked against the rules they could
+        create new associations for. The resulting associations are
+        identical either way.
+
+    history : list or None
+        If a list, a ``(index, item)`` tuple is appended for every
+        association created and for every item matched to an existing
+        association, in the order these occur. ``index`` is the position
+        of the association in the list of associations before finalization.
+        Replaying these events reproduces the associations exactly.
+
     Returns
     -------
     associations : [Association[,...]]
@@ -49,31 +74,68 @@ def generate(pool, rules, version_id=None, finalize=True):
     documentation for a full description.
     """
     associations = []
+    asn_index = AssociationIndex() if use_index else None
+    asn_serials = {}
     if isinstance(version_id, bool):
         version_id = make_timestamp()
-    process_queue = ProcessQueueSorted(
-        [ProcessList(items=pool, rules=[rule for _, rule in rules.items()])]
-    )
+    pool_list = ProcessList(items=pool, rules=[rule for _, rule in rules.items()])
+    process_queue = ProcessQueueSorted([pool_list])
+
+    masks = {}
+    if use_masks:
+        time_start = timer()
+        masks = rule_masks(pool, rules)
+        logger.debug(
+            "Seconds to mask pool for %d of %d rules: %.2f",
+            len(masks),
+            len(rules),
+            timer() - time_start,
+        )
 
     logger.debug("Initial process queue: %s", process_queue)
     for process_list in process_queue:
         logger.debug("** Working process list: %s", process_list)
         time_start = timer()
+        timings = Counter()
         total_mod_existing = 0
         total_new = 0
         total_reprocess = 0
+        if asn_index is not None:
+            n_checked, n_skipped = asn_index.n_checked, asn_index.n_skipped
         with Bar(
             "Processing items", log_level=logger.getEffectiveLevel(), max=len(process_list.items)
         ) as bar:
-            for item in process_list.items:
+            for idx, item in enumerate(process_list.items):
                 item = PoolRow(item)
 
+                # Items of the pool itself are not offered to rules they cannot create.
+                excluded_rules = None
+                if masks and process_list is pool_list:
+                    excluded_rules = {rule for rule, mask in masks.items() if not mask[idx]}
+
                 existing_asns, new_asns, to_process = generate_from_item(
-                    item, version_id, associations, rules, process_list
+                    item,
+                    version_id,
+                    associations,
+                    rules,
+                    process_list,
+                    asn_index=asn_index,
+                    timings=timings,
+                    excluded_rules=excluded_rules,
                 )
                 total_mod_existing += len(existing_asns)
                 total_new += len(new_asns)
                 associations.extend(new_asns)
+                if history is not None:
+                    for asn in existing_asns:
+                        history.append((asn_serials[id(asn)], item))
+                    for asn in new_asns:
+                        asn_serials[id(asn)] = len(asn_serials)
+                        history.append((asn_serials[id(asn)], item))
+                if asn_index is not None:
+                    for asn in existing_asns:
+                        asn_index.update(asn, item)
+                    asn_index.extend(new_asns)
 
                 # If working on a process list EXISTING
                 # remove any new `to_process` that is
@@ -88,6 +150,17 @@ def generate(pool, rules, version_id=None, finalize=True):
                 bar.next()
 
         logger.info("Seconds to process: %.2f", timer() - time_start)
+        logger.debug(
+            "Seconds matching existing associations: %.2f creating new associations: %.2f",
+            timings["existing"],
+            timings["new"],
+        )
+        if asn_index is not None:
+            logger.debug(
+                "Existing association checks: %d skipped by index: %d",
+                asn_index.n_checked - n_checked,
+                asn_index.n_skipped - n_skipped,
+            )
         logger.debug(
             "Existing associations modified: %d New associations created: %d",
             total_mod_existing,
@@ -112,7 +185,16 @@ def generate(pool, rules, version_id=None, finalize=True):
     return finalized_asns
 
 
-def generate_from_item(item, version_id, associations, rules, process_list):
+def generate_from_item(
+    item,
+    version_id,
+    associations,
+    rules,
+    process_list,
+    asn_index=None,
+    timings=None,
+    excluded_rules=None,
+):
     """
     Either match or generate a new association.
 
@@ -137,6 +219,19 @@ def generate_from_item(item, version_id, associations, rules, process_list):
     process_list : ProcessList
         The `ProcessList` from which the current item belongs to.
 
+    asn_index : AssociationIndex or None
+        Index of ``associations``. If given, only the associations
+        the index returns as candidates are checked.
+
+    timings : collections.Counter or None
+        If given, seconds spent matching existing associations
+        and creating new ones are accumulated under the keys
+        "existing" and "new".
+
+    excluded_rules : set or None
+        Rules which are known not to create a new association from the item,
+        and are therefore not checked.
+
     Returns
     -------
     tuple
@@ -163,8 +258,13 @@ def generate_from_item(item, version_id, associations, rules, process_list):
         ListCategory.EXISTING,
         ListCategory.NONSCIENCE,
     ):
+        time_start = timer()
+        if asn_index is not None:
+            associations = asn_index.candidates(item)
         associations = [asn for asn in associations if type(asn) in allowed_rules]
         existing_asns, reprocess_list = match_item(item, associations)
+        if timings is not None:
+            timings["existing"] += timer() - time_start
 
     # Now see if this item will create new associations.
     # By default, a item will not be allowed to create
@@ -179,13 +279,18 @@ def generate_from_item(item, version_id, associations, rules, process_list):
         )
         and rules is not None
     ):
+        time_start = timer()
         ignore_asns = {type(asn) for asn in existing_asns}
+        if excluded_rules:
+            ignore_asns.update(excluded_rules)
         new_asns, reprocess = rules.match(
             item,
             version_id=version_id,
             allow=allowed_rules,
             ignore=ignore_asns,
         )
+        if timings is not None:
+            timings["new"] += timer() - time_start
     reprocess_list.extend(reprocess)
 
     return existing_asns, new_asns, reprocess_list
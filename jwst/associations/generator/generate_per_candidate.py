@@ -1,9 +1,12 @@
 import collections
 import logging
+import multiprocessing as mp
 from timeit import default_timer as timer
 
 import numpy as np
+from stcal.multiprocessing import compute_num_cores
 
+from jwst.associations.association import make_timestamp
 from jwst.associations.generator.generate import generate
 from jwst.associations.generator.generate_per_pool import (
     CANDIDATE_RULESET,
@@ -30,6 +33,7 @@ def generate_per_candidate(
     merge=False,
     ignore_default=False,
     dms_enabled=False,
+    max_cores="none",
 ):
     """
     Generate associations in the pool according to the rules.
@@ -69,6 +73,14 @@ def generate_per_candidate(
     dms_enabled : bool
         Flag for DMS processing, true if command-line argument '--DMS' was used.
 
+    max_cores : str or int
+        Number of processes to use to generate candidates concurrently.
+        If 'none' (the default), candidates are generated one after another.
+        The other allowable string values are 'quarter', 'half', and 'all',
+        which indicate the fraction of cores to use. If an integer is provided,
+        it is the exact number of processes used. The resulting associations
+        are identical regardless of the number of processes.
+
     Returns
     -------
     associations : [Association[,...]]
@@ -108,22 +120,33 @@ def generate_per_candidate(
             else:
                 logger.warning("Candidate id %s not found in pool", cid)
 
-    associations = []
-    for cid_ctype in cids_ctypes:
-        time_start = timer()
-        # Generate the association for the given candidate
-        associations_cid = generate_on_candidate(
-            cid_ctype,
+    ncpus = compute_num_cores(str(max_cores), len(cids_ctypes), mp.cpu_count())
+    if ncpus > 1:
+        associations = _generate_on_candidates_parallel(
+            cids_ctypes,
             pool,
             rule_defs,
+            ncpus,
             version_id=version_id,
             ignore_default=ignore_default,
         )
-
-        # Add to the list
-        associations.extend(associations_cid)
-
-        logger.info("Time to process candidate %s: %.2f", cid_ctype[0], timer() - time_start)
+    else:
+        associations = []
+        for cid_ctype in cids_ctypes:
+            time_start = timer()
+            # Generate the association for the given candidate
+            associations_cid = generate_on_candidate(
+                cid_ctype,
+                pool,
+                rule_defs,
+                version_id=version_id,
+                ignore_default=ignore_default,
+            )
+
+            # Add to the list
+            associations.extend(associations_cid)
+
+            logger.info("Time to process candidate %s: %.2f", cid_ctype[0], timer() - time_start)
 
     # The ruleset has been generated on a per-candidate case.
     # Here, need to do a final rebuild of the ruleset to get the finalization
@@ -176,7 +199,9 @@ def generate_per_candidate(
     return finalized_asns
 
 
-def generate_on_candidate(cid_ctype, pool, rule_defs, version_id=None, ignore_default=False):
+def generate_on_candidate(
+    cid_ctype, pool, rule_defs, version_id=None, ignore_default=False, history=None
+):
     """
     Generate associations based on a candidate ID.
 
@@ -200,31 +225,23 @@ def generate_on_candidate(cid_ctype, pool, rule_defs, version_id=None, ignore_de
     ignore_default : bool
         Ignore the default rules. Use only the user-specified ones.
 
+    history : list or None
+        If a list, the association creation and match events are
+        appended to it. See `~jwst.associations.generate`.
+
     Returns
     -------
     associations : [Association[,...]]
         List of associations
     """
-    cid, ctype = cid_ctype
     logger.info(f"Generating associations on candidate {cid_ctype}")
 
     # Get the pool
-    pool_cid = pool_from_candidate(pool, cid)
-
-    pool_cid["asn_candidate"] = [f"[('{cid}', '{ctype}')]"] * len(pool_cid)
-    logger.info(f"Length of pool for {cid}: {len(pool_cid)}")
-
-    # Create the rules with the simplified asn_candidate constraint
-    asn_constraint = constrain_on_candidates([cid])
-    rules = AssociationRegistry(
-        rule_defs,
-        include_default=not ignore_default,
-        global_constraints=asn_constraint,
-        name=CANDIDATE_RULESET,
-    )
+    pool_cid = _candidate_pool(cid_ctype, pool)
 
     # Get the associations
-    associations = generate(pool_cid, rules, version_id=version_id, finalize=False)
+    rules = _candidate_rules(cid_ctype[0], rule_defs, ignore_default=ignore_default)
+    associations = generate(pool_cid, rules, version_id=version_id, finalize=False, history=history)
 
     return associations
 
@@ -281,3 +298,186 @@ def pool_from_candidate(pool, candidate):
     """
     candidate_pool = pool[[candidate in row["asn_candidate"] for row in pool]]
     return candidate_pool
+
+
+def _candidate_pool(cid_ctype, pool):
+    """
+    Create the pool of a candidate, with the candidate as its only asn_candidate.
+
+    Parameters
+    ----------
+    cid_ctype : (str, str)
+        2-tuple of candidate ID and the candidate type.
+
+    pool : AssociationPool
+        The pool to filter from.
+
+    Returns
+    -------
+    candidate_pool : AssociationPool
+        Pool containing only the candidate
+    """
+    cid, ctype = cid_ctype
+    pool_cid = pool_from_candidate(pool, cid)
+    pool_cid["asn_candidate"] = [f"[('{cid}', '{ctype}')]"] * len(pool_cid)
+    logger.info(f"Length of pool for {cid}: {len(pool_cid)}")
+    return pool_cid
+
+
+def _candidate_rules(cid, rule_defs, ignore_default=False):
+    """
+    Create the rules with the simplified asn_candidate constraint.
+
+    Parameters
+    ----------
+    cid : str
+        The candidate ID.
+
+    rule_defs : [File-like[,...]] or None
+        The rule definitions to use. None to use the defaults if `ignore_default` is False.
+
+    ignore_default : bool
+        Ignore the default rules. Use only the user-specified ones.
+
+    Returns
+    -------
+    rules : AssociationRegistry
+        The rules constrained to the candidate.
+    """
+    asn_constraint = constrain_on_candidates([cid])
+    rules = AssociationRegistry(
+        rule_defs,
+        include_default=not ignore_default,
+        global_constraints=asn_constraint,
+        name=CANDIDATE_RULESET,
+    )
+    return rules
+
+
+def _generate_on_candidates_parallel(
+    cids_ctypes, pool, rule_defs, ncpus, version_id=None, ignore_default=False
+):
+    """
+    Generate associations for a list of candidates using multiple processes.
+
+    Associations cannot be pickled, since the rules are created from the rule
+    files at run time. Instead, each process returns the events which created
+    the associations of its candidate. The associations are then rebuilt from
+    these events, one candidate after another in the order given, reproducing
+    the results of generating the candidates sequentially.
+
+    Parameters
+    ----------
+    cids_ctypes : [(str, str)[,...]]
+        List of 2-tuples of candidate ID and the candidate type.
+
+    pool : AssociationPool
+        The pool to generate from.
+
+    rule_defs : [File-like[,...]] or None
+        The rule definitions to use. None to use the defaults if `ignore_default` is False.
+
+    ncpus : int
+        Number of processes to use.
+
+    version_id : None, True, or str
+        The string to use to tag associations and products.
+        If None, no tagging occurs.
+        If True, use a timestamp
+        If a string, the string.
+
+    ignore_default : bool
+        Ignore the default rules. Use only the user-specified ones.
+
+    Returns
+    -------
+    associations : [Association[,...]]
+        List of associations
+    """
+    logger.info(f"Using {ncpus} processes to generate {len(cids_ctypes)} candidates.")
+    time_start = timer()
+    # only send each process the pool of its candidate
+    args = [
+        (cid_ctype, _candidate_pool(cid_ctype, pool), rule_defs, version_id, ignore_default)
+        for cid_ctype in cids_ctypes
+    ]
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(ncpus) as process_pool:
+        results = process_pool.starmap(_history_on_candidate, args)
+    logger.info("Time to process candidates: %.2f", timer() - time_start)
+
+    associations = []
+    for cid_ctype, (version_id_cid, rule_names, history) in zip(cids_ctypes, results, strict=True):
+        rules = _candidate_rules(cid_ctype[0], rule_defs, ignore_default=ignore_default)
+        associations.extend(_replay_history(rules, version_id_cid, rule_names, history))
+    return associations
+
+
+def _history_on_candidate(cid_ctype, pool_cid, rule_defs, version_id, ignore_default):
+    """
+    Generate associations for a candidate and return how they were created.
+
+    Parameters
+    ----------
+    cid_ctype : (str, str)
+        2-tuple of candidate ID and the candidate type.
+
+    pool_cid : AssociationPool
+        The pool of the candidate, from `_candidate_pool`.
+
+    rule_defs : [File-like[,...]] or None
+        The rule definitions to use.
+
+    version_id : None, True, or str
+        The version tag. If True, the timestamp is created here.
+
+    ignore_default : bool
+        Ignore the default rules.
+
+    Returns
+    -------
+    version_id, rule_names, history : str or None, [str[,...]], [(int, dict)[,...]]
+        The version tag used, the rule name of each association,
+        and the creation and match events of the associations.
+    """
+    if isinstance(version_id, bool):
+        version_id = make_timestamp()
+    logger.info(f"Generating associations on candidate {cid_ctype}")
+    history = []
+    rules = _candidate_rules(cid_ctype[0], rule_defs, ignore_default=ignore_default)
+    associations = generate(pool_cid, rules, version_id=version_id, finalize=False, history=history)
+    rule_names = [asn.rule_name() for asn in associations]
+    return version_id, rule_names, history
+
+
+def _replay_history(rules, version_id, rule_names, history):
+    """
+    Rebuild associations from their creation and match events.
+
+    Parameters
+    ----------
+    rules : AssociationRegistry
+        The rules the associations were created from.
+
+    version_id : str or None
+        The version tag the associations were created with.
+
+    rule_names : [str[,...]]
+        The rule name of each association.
+
+    history : [(int, dict)[,...]]
+        The creation and match events, as recorded by `~jwst.associations.generate`.
+
+    Returns
+    -------
+    associations : [Association[,...]]
+        List of associations
+    """
+    associations = []
+    for index, item in history:
+        if index < len(associations):
+            associations[index].add(item)
+        else:
+            asn, _ = rules[rule_names[index]].create(item, version_id)
+            associations.append(asn)
+    return associations
@@ -0,0 +1,334 @@
+"""
+Index associations by their fixed equality constraints.
+
+During generation, every item of a pool is checked against every
+association already created. Most of those checks fail on a simple
+equality, such as a different program, instrument, or candidate.
+`AssociationIndex` keeps track of the constraints of each association
+that, once set, are literal equality tests that must be satisfied for
+the association to accept an item. Only associations whose literal values
+agree with the item, or which already contain the item, are returned as
+candidates for the full constraint check.
+
+The index is a pure pre-filter: an association is never excluded unless
+the full constraint check is guaranteed to fail without side effects or
+reprocessing.
+"""
+
+from collections import defaultdict
+from itertools import product
+
+from numpy.ma import masked
+
+from jwst.associations.lib.constraint import (
+    AttrConstraint,
+    Constraint,
+    _always_true,
+    required_constraints,
+)
+from jwst.associations.lib.utilities import evaluate, is_iterable
+
+__all__ = ["AssociationIndex"]
+
+# Characters that make a regular expression more than a literal string.
+_REGEX_SPECIAL = frozenset(".^$*+?{}[]|()")
+
+
+class AssociationIndex:
+    """
+    Index of associations keyed on fixed constraint values.
+
+    Associations are returned in the order they were added to the index,
+    which is the order the generator created them in.
+
+    Attributes
+    ----------
+    n_checked : int
+        Number of association checks requested through `candidates`.
+
+    n_skipped : int
+        Number of association checks avoided by the index.
+    """
+
+    def __init__(self):
+        self._asns = []
+        self._serials = {}
+        self._entries = {}
+        self._shapes = {}
+        self._unindexed = set()
+        self._members = defaultdict(set)
+        self.n_checked = 0
+        self.n_skipped = 0
+
+    def __len__(self):
+        return len(self._asns)
+
+    def add(self, asn):
+        """
+        Add a new association to the index.
+
+        Parameters
+        ----------
+        asn : Association
+            The association to add.
+        """
+        serial = len(self._asns)
+        self._asns.append(asn)
+        self._serials[id(asn)] = serial
+        for filename in getattr(asn, "item_ids", ()):
+            self._members[filename].add(serial)
+        self._refresh(serial, asn)
+
+    def extend(self, asns):
+        """
+        Add a list of new associations to the index.
+
+        Parameters
+        ----------
+        asns : [Association[, ...]]
+            The associations to add.
+        """
+        for asn in asns:
+            self.add(asn)
+
+    def update(self, asn, item):
+        """
+        Update the index for an association that has accepted an item.
+
+        Parameters
+        ----------
+        asn : Association
+            The association that has been modified.
+
+        item : dict
+            The item that has been added to the association.
+        """
+        serial = self._serials[id(asn)]
+        try:
+            self._members[item["filename"]].add(serial)
+        except KeyError:
+            pass
+        self._refresh(serial, asn)
+
+    def candidates(self, item):
+        """
+        Return the associations that may accept the given item.
+
+        Parameters
+        ----------
+        item : dict
+            The item to be matched.
+
+        Returns
+        -------
+        associations : [Association[, ...]]
+            The associations, in creation order, which could match the item.
+        """
+        n_asns = len(self._asns)
+        self.n_checked += n_asns
+        if "filename" not in item:
+            return list(self._asns)
+
+        serials = set(self._unindexed)
+        serials.update(self._members.get(item["filename"], ()))
+        item_values = {}
+        for shape, buckets in self._shapes.items():
+            values = []
+            for source in shape:
+                try:
+                    source_values = item_values[source]
+                except KeyError:
+                    source_values = item_values[source] = _item_values(item, *source)
+                if source_values is None:
+                    # Value cannot be compared literally. Check everything.
+                    return list(self._asns)
+                if not source_values:
+                    break
+                values.append(source_values)
+            else:
+                for key in product(*values):
+                    serials.update(buckets.get(key, ()))
+
+        self.n_skipped += n_asns - len(serials)
+        return [self._asns[serial] for serial in sorted(serials)]
+
+    def _refresh(self, serial, asn):
+        """Recompute the index entry of an association."""
+        entry = self._entries.pop(serial, None)
+        if entry is not None:
+            shape, key = entry
+            self._shapes[shape][key].discard(serial)
+        self._unindexed.discard(serial)
+
+        entry = _index_entry(asn)
+        if entry is None:
+            self._unindexed.add(serial)
+            return
+        shape, key = entry
+        self._shapes.setdefault(shape, {}).setdefault(key, set()).add(serial)
+        self._entries[serial] = entry
+
+
+def _index_entry(asn):
+    """
+    Determine the index shape and key of an association.
+
+    Parameters
+    ----------
+    asn : Association
+        The association to index.
+
+    Returns
+    -------
+    (shape, key) or None
+        The shape is a tuple of ``(source, evaluate)`` pairs and the key
+        the tuple of literal values, in lower case, each source must have.
+        None if the association cannot be indexed.
+    """
+    from jwst.associations.lib.dms_base import DMSBaseMixin
+
+    # Membership shortcuts the constraints. Only DMS membership, by filename,
+    # is tracked.
+    if type(asn).is_item_member is not DMSBaseMixin.is_item_member:
+        return None
+
+    constraints = getattr(asn, "constraints", None)
+    if not isinstance(constraints, Constraint):
+        return None
+
+    # A forced match overrides the constraints entirely.
+    try:
+        constraints["force_match"]
+    except KeyError:
+        pass
+    else:
+        return None
+
+    fixed = sorted(_fixed_constraints(constraints))
+    if not fixed:
+        return None
+    shape = tuple((source, do_evaluate) for source, do_evaluate, _ in fixed)
+    key = tuple(literal for _, _, literal in fixed)
+    return shape, key
+
+
+def _fixed_constraints(constraint):
+    """
+    Find the literal constraints that must match for a constraint to succeed.
+
+    Parameters
+    ----------
+    constraint : Constraint
+        The constraint tree to search.
+
+    Yields
+    ------
+    (source, evaluate, literal) : (str, bool, str)
+        The item attribute, whether it is evaluated, and the lower-case
+        literal value it must have.
+    """
+    for sub_constraint in required_constraints(constraint):
+        literal = _fixed_literal(sub_constraint)
+        if literal is not None:
+            yield sub_constraint.sources[0], bool(sub_constraint.evaluate), literal
+
+
+def _fixed_literal(constraint):
+    """
+    Return the literal value an attribute constraint is fixed to.
+
+    Parameters
+    ----------
+    constraint : SimpleConstraintABC
+        The constraint to examine.
+
+    Returns
+    -------
+    literal : str or None
+        The lower-case literal value, or None if the constraint is not
+        an unconditional, required, fixed literal equality.
+    """
+    if type(constraint).check_and_set is not AttrConstraint.check_and_set:
+        return None
+    if (
+        constraint.force_unique
+        or constraint.force_undefined
+        or not constraint.required
+        or constraint.onlyif is not _always_true
+        or not isinstance(constraint.value, str)
+        or len(constraint.sources) != 1
+    ):
+        return None
+    literal = _regex_to_literal(constraint.value)
+    if literal is None or not literal.isascii() or "\n" in literal:
+        return None
+    return literal.lower()
+
+
+def _regex_to_literal(pattern):
+    """
+    Convert a regular expression that only matches a literal string to that string.
+
+    Parameters
+    ----------
+    pattern : str
+        The regular expression.
+
+    Returns
+    -------
+    literal : str or None
+        The literal string, or None if the pattern is not a literal.
+    """
+    literal = []
+    chars = iter(pattern)
+    for char in chars:
+        if char == "\\":
+            char = next(chars, None)
+            if char is None or char.isalnum():
+                return None
+        elif char in _REGEX_SPECIAL:
+            return None
+        literal.append(char)
+    return "".join(literal)
+
+
+def _item_values(item, source, do_evaluate):
+    """
+    Get the lower-case values an item could match on for an attribute.
+
+    Parameters
+    ----------
+    item : dict
+        The item.
+
+    source : str
+        The attribute to retrieve.
+
+    do_evaluate : bool
+        Evaluate the attribute value, as `AttrConstraint` would.
+
+    Returns
+    -------
+    values : frozenset(str) or None
+        The possible values. Empty if the attribute is undefined. None if
+        a value cannot be compared as a literal.
+    """
+    try:
+        value = item[source]
+    except KeyError:
+        return frozenset()
+    if value is masked:
+        return frozenset()
+
+    if do_evaluate:
+        value = evaluate(value)
+    if not is_iterable(value):
+        value = [value]
+
+    values = set()
+    for element in value:
+        element = str(element)
+        if not element.isascii() or "\n" in element:
+            return None
+        values.add(element.lower())
+    return frozenset(values)
@@ -487,7 +487,7 @@ class AttrConstraint(SimpleConstraintABC):
         if invalid_values is None:
             self.invalid_values = []
         if onlyif is None:
-            self.onlyif = lambda _item: True
+            self.onlyif = _always_true
 
         # Haven't actually matched anything yet.
         self.found_values = set()
@@ -1046,6 +1046,45 @@ class Constraint:
 
 
 # Utilities
+def _always_true(_item):
+    """Default ``onlyif`` condition, always check the constraint."""
+    return True
+
+
+def required_constraints(constraint):
+    """
+    Find the simple constraints that must be satisfied for a constraint to succeed.
+
+    Only constraints reached through a chain of `Constraint.all` reductions
+    are considered, and only if no constraint on the chain requests
+    reprocessing on failure. A failure of any of the returned constraints,
+    without reprocessing, therefore results in a failed match with
+    nothing to reprocess.
+
+    Parameters
+    ----------
+    constraint : Constraint
+        The constraint tree to search.
+
+    Yields
+    ------
+    constraint : SimpleConstraintABC
+        A required simple constraint.
+    """
+    if (
+        type(constraint).check_and_set is not Constraint.check_and_set
+        or constraint.reduce is not Constraint.all
+        or constraint.reprocess_on_fail
+    ):
+        return
+
+    for sub_constraint in constraint.constraints:
+        if isinstance(sub_constraint, Constraint):
+            yield from required_constraints(sub_constraint)
+        else:
+            yield sub_constraint
+
+
 def meets_conditions(value, conditions):
     """
     Check whether value meets any of the provided conditions.
@@ -0,0 +1,283 @@
+"""
+Evaluate rule constraints over a whole pool at once.
+
+During generation, every item of a pool is offered to every rule to
+create a new association. For most items and rules, creation fails on
+one of the rule's fixed conditions, such as the exposure type or
+instrument, and the same regular expressions are evaluated over the
+same column values again and again.
+
+`rule_masks` evaluates those fixed conditions once for each distinct
+value of the relevant pool columns, producing for each rule a boolean
+mask over the pool. An item excluded by the mask of a rule cannot create
+an association of that rule, so the rule need not be tried.
+
+The masks are a pure pre-filter: a rule is only excluded for an item if
+creating the association would fail with no side effects or reprocessing.
+"""
+
+import logging
+
+import numpy as np
+
+from jwst.associations.association import Association
+from jwst.associations.lib.constraint import (
+    AttrConstraint,
+    Constraint,
+    _always_true,
+    meets_conditions,
+    required_constraints,
+)
+from jwst.associations.lib.utilities import evaluate, getattr_from_list, is_iterable
+
+__all__ = ["rule_masks"]
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def rule_masks(pool, rules):
+    """
+    Determine which pool items could create new associations for each rule.
+
+    Parameters
+    ----------
+    pool : AssociationPool
+        The pool of items.
+
+    rules : AssociationRegistry
+        The rules to evaluate.
+
+    Returns
+    -------
+    masks : {rule: numpy.ndarray}
+        For each rule that could be evaluated, a boolean array the length
+        of the pool, False for items which cannot create an association
+        of that rule. Rules that could not be evaluated are not included.
+    """
+    colnames = getattr(pool, "colnames", None)
+    if colnames is None or len(pool) == 0:
+        return {}
+
+    columns = _PoolColumns(pool)
+    masks = {}
+    for rule in rules.values():
+        constraints = _creation_constraints(rule)
+        if constraints is None:
+            continue
+        mask = None
+        for constraint in required_constraints(constraints):
+            if not _is_maskable(constraint):
+                continue
+            constraint_mask = columns.evaluate(constraint)
+            if constraint_mask is None:
+                continue
+            mask = constraint_mask if mask is None else mask & constraint_mask
+        if mask is not None:
+            masks[rule] = mask
+    return masks
+
+
+class _PoolColumns:
+    """
+    Columnar representation of a pool.
+
+    Each column is reduced to its distinct values and, for each row,
+    the index into those values.
+
+    Parameters
+    ----------
+    pool : AssociationPool
+        The pool of items.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._columns = {}
+
+    def column(self, name):
+        """
+        Get the distinct values of a column and the row indices into them.
+
+        Parameters
+        ----------
+        name : str
+            The column name.
+
+        Returns
+        -------
+        (values, indices) : (numpy.ndarray, numpy.ndarray) or None
+            The distinct values and, for each row, the index of its value.
+            None if the column does not exist, has masked values,
+            or holds arbitrary objects.
+        """
+        try:
+            return self._columns[name]
+        except KeyError:
+            pass
+
+        result = None
+        if name in self.pool.colnames and not np.ma.is_masked(self.pool[name]):
+            column = np.asarray(self.pool[name])
+            if column.dtype.kind != "O":
+                values, indices = np.unique(column, return_inverse=True)
+                result = values, indices.reshape(-1)
+        self._columns[name] = result
+        return result
+
+    def evaluate(self, constraint):
+        """
+        Evaluate an attribute constraint for all rows of the pool.
+
+        Parameters
+        ----------
+        constraint : AttrConstraint
+            The constraint to evaluate.
+
+        Returns
+        -------
+        mask : numpy.ndarray or None
+            True for rows which satisfy the constraint.
+            None if the constraint cannot be evaluated over the pool.
+        """
+        sources = []
+        columns = []
+        for source in constraint.sources:
+            if source in self.pool.colnames:
+                column = self.column(source)
+                if column is None:
+                    return None
+                sources.append(source)
+                columns.append(column)
+
+        if not columns:
+            return np.full(len(self.pool), _attr_satisfied(constraint, {}))
+
+        # Evaluate once for each distinct combination of values.
+        if len(columns) == 1:
+            values, indices = columns[0]
+            combinations = np.arange(len(values)).reshape(-1, 1)
+        else:
+            keys = np.stack([column_indices for _, column_indices in columns], axis=1)
+            combinations, indices = np.unique(keys, axis=0, return_inverse=True)
+            indices = indices.reshape(-1)
+
+        satisfied = np.array(
+            [
+                _attr_satisfied(
+                    constraint,
+                    {
+                        source: values[value_index]
+                        for source, (values, _), value_index in zip(
+                            sources, columns, combination, strict=True
+                        )
+                    },
+                )
+                for combination in combinations
+            ],
+            dtype=bool,
+        )
+        return satisfied[indices]
+
+
+def _creation_constraints(rule):
+    """
+    Get the constraints a new association of a rule is created with.
+
+    Parameters
+    ----------
+    rule : class
+        The association rule.
+
+    Returns
+    -------
+    constraints : Constraint or None
+        The constraints, or None if creation of the rule does not
+        follow the standard creation path.
+    """
+    from jwst.associations.lib.dms_base import DMSBaseMixin
+
+    create = getattr(rule.create, "__func__", None)
+    if (
+        create not in (Association.create.__func__, DMSBaseMixin.create.__func__)
+        or rule.add is not Association.add
+        or rule.check_and_set_constraints is not Association.check_and_set_constraints
+        or rule.is_item_member is not DMSBaseMixin.is_item_member
+    ):
+        return None
+
+    try:
+        constraints = rule().constraints
+    except Exception:
+        logger.debug("Cannot instantiate rule %s for masking", rule, exc_info=True)
+        return None
+    if not isinstance(constraints, Constraint):
+        return None
+
+    # A forced match overrides the constraints entirely.
+    try:
+        constraints["force_match"]
+    except KeyError:
+        pass
+    else:
+        return None
+
+    return constraints
+
+
+def _is_maskable(constraint):
+    """
+    Check whether an attribute constraint can be evaluated independently of state.
+
+    Parameters
+    ----------
+    constraint : SimpleConstraintABC
+        The constraint to check.
+
+    Returns
+    -------
+    bool
+        True if the constraint has a fixed condition which does not
+        depend on anything other than the item attributes.
+    """
+    return (
+        type(constraint).check_and_set is AttrConstraint.check_and_set
+        and constraint.value is not None
+        and not callable(constraint.value)
+        and not constraint.force_undefined
+        and constraint.onlyif is _always_true
+    )
+
+
+def _attr_satisfied(constraint, item):
+    """
+    Check whether an item satisfies a fixed attribute constraint.
+
+    This follows `AttrConstraint.check_and_set` for constraints that
+    already have a value, without modifying the constraint.
+
+    Parameters
+    ----------
+    constraint : AttrConstraint
+        The constraint to check.
+
+    item : dict
+        The item attributes used by the constraint.
+
+    Returns
+    -------
+    bool
+        True if the constraint would be satisfied.
+    """
+    try:
+        _, value = getattr_from_list(
+            item, constraint.sources, invalid_values=constraint.invalid_values
+        )
+    except KeyError:
+        return not constraint.required
+
+    if constraint.evaluate:
+        value = evaluate(value)
+    if not is_iterable(value):
+        value = [value]
+    return any(meets_conditions(str(element), constraint.value) for element in value)
@@ -190,6 +190,7 @@ class Main:
                 merge=parsed.merge,
                 ignore_default=parsed.ignore_default,
                 dms_enabled=parsed.DMS_enabled,
+                max_cores=parsed.max_cores,
             )
 
         logger.debug(self.__str__())
@@ -346,6 +347,18 @@ class Main:
             help="Use the original, per-pool, algorithm that does not "
             "segment pools based on candidates",
         )
+        parser.add_argument(
+            "--max-cores",
+            type=str,
+            dest="max_cores",
+            default="none",
+            help=(
+                "Number of processes to use to generate candidates concurrently."
+                " One of 'none', 'quarter', 'half', 'all', or an integer."
+                " Not used by the per-pool algorithm."
+                ' Default: "%(default)s"'
+            ),
+        )
 
         self.parsed = parser.parse_args(args=args)
 
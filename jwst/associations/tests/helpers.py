@@ -221,6 +221,27 @@ def fmt_fname(expnum):
     return f"jw_{expnum:0>5d}_uncal.fits"
 
 
+def serialize(asn):
+    """
+    Serialize an association for comparison.
+
+    Object addresses, which appear in the listing of the constraints,
+    are removed since they differ between runs.
+
+    Parameters
+    ----------
+    asn : Association
+        The association to serialize.
+
+    Returns
+    -------
+    serialized : str
+        The serialized association.
+    """
+    _, serialized = asn.dump()
+    return re.sub(r" at 0x[0-9a-f]+", "", serialized)
+
+
 def get_rule_names(rules):
     """
     Return rule names found in a registry.
@@ -0,0 +1,67 @@
+"""Test the association index used by generate"""
+
+import pytest
+from astropy.utils.data import get_pkg_data_filename
+
+from jwst.associations import AssociationPool, AssociationRegistry, generate
+from jwst.associations.lib.asn_index import AssociationIndex, _regex_to_literal
+from jwst.associations.pool import PoolRow
+from jwst.associations.tests.helpers import combine_pools, serialize
+
+
+@pytest.mark.parametrize(
+    "pool_file",
+    [
+        "data/pool_002_image_miri.csv",
+        "data/pool_006_spec_nirspec.csv",
+        "data/pool_013_coron_nircam.csv",
+        "data/pool_018_all_exptypes.csv",
+        "data/pool_019_niriss_wfss.csv",
+        "data/pool_023_nirspec_msa_3nod.csv",
+    ],
+)
+def test_index_identical(pool_file):
+    """Ensure indexed generation creates the same associations"""
+    rules = AssociationRegistry()
+    pool = combine_pools(get_pkg_data_filename(pool_file, package="jwst.associations.tests"))
+
+    asns = generate(pool, rules, use_index=False)
+    asns_indexed = generate(pool, rules, use_index=True)
+
+    assert len(asns)
+    assert len(asns_indexed) == len(asns)
+    for asn, asn_indexed in zip(asns, asns_indexed, strict=True):
+        assert type(asn_indexed) is type(asn)
+        assert serialize(asn_indexed) == serialize(asn)
+
+
+def test_index_skips():
+    """Ensure the index excludes associations that cannot match"""
+    rules = AssociationRegistry()
+    pool = AssociationPool.read(
+        get_pkg_data_filename("data/pool_018_all_exptypes.csv", package="jwst.associations.tests")
+    )
+    asns = generate(pool, rules, finalize=False)
+    asn_index = AssociationIndex()
+    asn_index.extend(asns)
+
+    assert len(asn_index) == len(asns)
+    candidates = asn_index.candidates(PoolRow(pool[0]))
+    assert len(candidates) < len(asns)
+    assert asn_index.n_skipped == len(asns) - len(candidates)
+
+
+@pytest.mark.parametrize(
+    "pattern, expected",
+    [
+        ("nircam", "nircam"),
+        ("o001", "o001"),
+        ("nrc\\_image", "nrc_image"),
+        ("nrc_image|nrc_tacq", None),
+        ("f.*", None),
+        ("\\d", None),
+    ],
+)
+def test_regex_to_literal(pattern, expected):
+    """Test conversion of literal regular expressions"""
+    assert _regex_to_literal(pattern) == expected
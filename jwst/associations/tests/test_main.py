@@ -8,7 +8,7 @@ from astropy.utils.data import get_pkg_data_filename
 
 from jwst.associations import AssociationPool
 from jwst.associations.main import Main
-from jwst.associations.tests.helpers import combine_pools
+from jwst.associations.tests.helpers import combine_pools, serialize
 
 # Basic pool
 POOL_PATH = get_pkg_data_filename(
@@ -72,6 +72,15 @@ def test_generate_version_id(version_id, expected, pool):
         assert regex.search(asn.asn_name)
 
 
+def test_max_cores(pool, all_candidates):
+    """Ensure parallel candidate generation gives the same associations"""
+    generated = Main.cli(["--dry-run", "--all-candidates", "--max-cores", "2"], pool=pool)
+
+    assert len(generated.associations) == len(all_candidates.associations)
+    for asn, expected in zip(generated.associations, all_candidates.associations, strict=True):
+        assert serialize(asn) == serialize(expected)
+
+
 @pytest.mark.parametrize(
     "args",
     [
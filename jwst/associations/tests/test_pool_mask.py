@@ -0,0 +1,45 @@
+"""Test evaluation of rule constraints over a pool"""
+
+import pytest
+from astropy.utils.data import get_pkg_data_filename
+
+from jwst.associations import AssociationRegistry, generate
+from jwst.associations.lib.pool_mask import rule_masks
+from jwst.associations.pool import PoolRow
+from jwst.associations.tests.helpers import combine_pools, serialize
+
+
+@pytest.fixture(scope="module")
+def pool():
+    """Retrieve a pool with all exposure types"""
+    return combine_pools(
+        get_pkg_data_filename("data/pool_018_all_exptypes.csv", package="jwst.associations.tests")
+    )
+
+
+def test_masks_identical(pool):
+    """Ensure masked generation creates the same associations"""
+    rules = AssociationRegistry()
+
+    asns = generate(pool, rules, use_masks=False)
+    asns_masked = generate(pool, rules, use_masks=True)
+
+    assert len(asns)
+    assert len(asns_masked) == len(asns)
+    for asn, asn_masked in zip(asns, asns_masked, strict=True):
+        assert type(asn_masked) is type(asn)
+        assert serialize(asn_masked) == serialize(asn)
+
+
+def test_masks_consistent(pool):
+    """Ensure no pool item masked out for a rule creates that rule"""
+    rules = AssociationRegistry()
+    masks = rule_masks(pool, rules)
+
+    assert len(masks)
+    for rule, mask in masks.items():
+        assert mask.shape == (len(pool),)
+        for row in pool[~mask]:
+            asn, reprocess = rule.create(PoolRow(row))
+            assert asn is None
+            assert not reprocess
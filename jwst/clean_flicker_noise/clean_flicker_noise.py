@@ -1,8 +1,12 @@
 import logging
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
 
 import gwcs
 import numpy as np
 from gwcs.utils import to_index
+from stcal.multiprocessing import compute_num_cores
 from stdatamodels.jwst.datamodels import dqflags
 
 from jwst import datamodels
@@ -1255,6 +1259,235 @@ def _mask_unusable(mask, dq):
     mask[jump] = False
 
 
+def _image_to_clean(i, j, ndim, input_data, groupdq, background_mask, median_image):
+    """
+    Get an image to clean and its scene mask.
+
+    Parameters
+    ----------
+    i, j : int
+        The integration and group of the image.
+    ndim : int
+        The number of dimensions of the input data.
+    input_data : ndarray of float
+        The input data.
+    groupdq : ndarray of int or None
+        The group DQ array, for ramp data cleaned by group differences.
+        Otherwise, None.
+    background_mask : ndarray of bool
+        The scene mask, 2D or with one plane per integration.
+    median_image : ndarray of float or None
+        The median image to subtract, matching the input data, if any.
+
+    Returns
+    -------
+    image : ndarray of float
+        The image to clean.
+    mask : ndarray of bool
+        A copy of the scene mask for the image, with unusable pixels
+        marked as `False`.
+    """
+    # Copy the scene mask, for further flagging
+    if background_mask.ndim == 3:
+        mask = background_mask[i].copy()
+    else:
+        mask = background_mask.copy()
+
+    # Get the relevant image data
+    if ndim == 2:
+        image = input_data
+    elif ndim == 3:
+        if median_image is not None:
+            image = input_data[i] - median_image[i]
+        else:
+            image = input_data[i]
+    else:
+        # Ramp data input
+        if median_image is not None:
+            # subtract the median ramp
+            image = input_data[i, j] - median_image[i, j]
+        else:
+            # subtract the current group from the next one
+            image = input_data[i, j + 1] - input_data[i, j]
+            dq = groupdq[i, j + 1]
+
+            # Mask any DNU and JUMP pixels
+            _mask_unusable(mask, dq)
+
+    return image, mask
+
+
+def _clean_images_parallel(
+    frames,
+    nprocs,
+    ndim,
+    input_data,
+    groupdq,
+    background_mask,
+    median_image,
+    flat,
+    clean_args,
+    save_background,
+):
+    """
+    Clean images in a pool of worker processes.
+
+    The read-only inputs are copied once to shared memory, which the
+    workers attach to when they start.  The workers write the cleaned
+    images and backgrounds into preallocated cubes in the same block of
+    shared memory, indexed by integration and group.
+
+    Parameters
+    ----------
+    frames : list of tuple of int
+        The integration and group of each image to clean.
+    nprocs : int
+        The number of worker processes.
+    ndim, input_data, groupdq, background_mask, median_image
+        The inputs of `_image_to_clean`.
+    flat : ndarray of float or None
+        The flat to divide the images by before cleaning, if any.
+    clean_args : tuple
+        The other positional arguments of `_clean_one_image`,
+        after the image and the mask.
+    save_background : bool
+        If set, the fit backgrounds are returned.
+
+    Yields
+    ------
+    cleaned_image : ndarray of float or None
+        The cleaned image, or None if it could not be cleaned.
+    background : ndarray of float or None
+        The background removed before cleaning, if ``save_background``
+        is set and the image was cleaned.  Otherwise, None.
+    success : bool
+        `False` if cleaning failed and the step should be skipped.
+    """
+    nints = max(i for i, _ in frames) + 1
+    ngroups = max(j for _, j in frames) + 1
+    cube_shape = (nints, ngroups, *background_mask.shape[-2:])
+    arrays = {
+        "input_data": input_data,
+        "groupdq": groupdq,
+        "background_mask": background_mask,
+        "median_image": median_image,
+        "flat": flat,
+    }
+    arrays = {
+        name: np.ascontiguousarray(array) for name, array in arrays.items() if array is not None
+    }
+    specs = []
+    offset = 0
+    for name, array in arrays.items():
+        specs.append((name, array.dtype.str, array.shape, offset))
+        offset += -(-array.nbytes // 64) * 64
+
+    # Cleaned images are stored in double precision, so that they are
+    # combined with the data exactly as in serial processing.
+    outputs = {"cleaned": np.float64}
+    if save_background:
+        outputs["background"] = np.float32
+    for name, dtype in outputs.items():
+        specs.append((name, np.dtype(dtype).str, cube_shape, offset))
+        offset += -(-np.prod(cube_shape, dtype=int) * np.dtype(dtype).itemsize // 64) * 64
+
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    views = {
+        name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=array_offset)
+        for name, dtype, shape, array_offset in specs
+    }
+    try:
+        for name, array in arrays.items():
+            views[name][...] = array
+        del arrays
+
+        ctx = mp.get_context("spawn")
+        with ctx.Pool(
+            nprocs, initializer=_init_clean_worker, initargs=(shm.name, specs, ndim, clean_args)
+        ) as pool:
+            for i, j, success, cleaned in pool.imap(_clean_image_in_worker, frames):
+                if not cleaned:
+                    yield None, None, success
+                    continue
+                # Copy the results out of shared memory, which is released
+                # when done.
+                background = np.array(views["background"][i, j]) if save_background else None
+                yield np.array(views["cleaned"][i, j]), background, success
+    finally:
+        views.clear()
+        shm.close()
+        shm.unlink()
+
+
+# Inputs of a worker process cleaning images, set by _init_clean_worker
+_worker_inputs = {}
+
+
+def _init_clean_worker(shm_name, specs, ndim, clean_args):
+    """
+    Attach a worker process to the inputs and outputs in shared memory.
+
+    Parameters
+    ----------
+    shm_name : str
+        The name of the block of shared memory.
+    specs : list of tuple
+        The name, data type, shape, and offset of each array in the block.
+    ndim : int
+        The number of dimensions of the input data.
+    clean_args : tuple
+        The other positional arguments of `_clean_one_image`.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_inputs.update(shm=shm, ndim=ndim, clean_args=clean_args)
+    for name, dtype, shape, offset in specs:
+        array = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+        if name not in ("cleaned", "background"):
+            array.flags.writeable = False
+        _worker_inputs[name] = array
+
+
+def _clean_image_in_worker(frame):
+    """
+    Clean an image in a worker process, and store the result in shared memory.
+
+    Parameters
+    ----------
+    frame : tuple of int
+        The integration and group of the image.
+
+    Returns
+    -------
+    i, j : int
+        The integration and group of the image.
+    success : bool
+        `False` if cleaning failed and the step should be skipped.
+    cleaned : bool
+        `True` if a cleaned image was stored.
+    """
+    i, j = frame
+    inputs = _worker_inputs
+    image, mask = _image_to_clean(
+        i,
+        j,
+        inputs["ndim"],
+        inputs["input_data"],
+        inputs.get("groupdq"),
+        inputs["background_mask"],
+        inputs.get("median_image"),
+    )
+    cleaned_image, background, success = _clean_one_image(
+        image, mask, *inputs["clean_args"], inputs.get("flat")
+    )
+    if cleaned_image is None:
+        return i, j, success, False
+
+    inputs["cleaned"][i, j] = cleaned_image
+    if "background" in inputs:
+        inputs["background"][i, j] = background
+    return i, j, success, True
+
+
 def do_correction(
     input_model,
     input_dir=None,
@@ -1272,6 +1505,7 @@ def do_correction(
     save_mask=False,
     save_background=False,
     save_noise=False,
+    maximum_cores="1",
 ):
     """
     Apply the 1/f noise correction.
@@ -1331,6 +1565,9 @@ def do_correction(
         Switch to indicate whether the fit background should be saved.
     save_noise : bool, optional
         Switch to indicate whether the fit noise should be saved.
+    maximum_cores : str, optional
+        The number of processes to use to clean images in parallel.
+        Can be an integer, 'none', 'quarter', 'half', or 'all'.
 
     Returns
     -------
@@ -1450,52 +1687,51 @@ def do_correction(
     # Keep a copy of the original input data
     input_data = input_model.data.copy()
 
-    # Loop over integrations and groups (even if there's only 1)
+    # Clean each integration and group (even if there's only 1).
+    # The images are independent, so they may be cleaned in parallel;
+    # the results are stored in order.
+    frames = [(i, j) for i in range(nints) for j in range(ngroups)]
+    groupdq = input_model.groupdq if ndim > 3 and median_image is None else None
+    clean_args = (
+        background_method,
+        background_box_size,
+        n_sigma,
+        fit_method,
+        detector,
+        fc,
+        axis_to_correct,
+        fit_by_channel,
+    )
+    nprocs = compute_num_cores(str(maximum_cores), len(frames), os.cpu_count() or 1)
     log.info(f"Cleaning image {input_model.meta.filename}")
-    for i in range(nints):
-        log.debug(f"Working on integration {i + 1} with ngroups {ngroups}")
-        for j in range(ngroups):
-            # Copy the scene mask, for further flagging
-            if background_mask.ndim == 3:
-                mask = background_mask[i].copy()
-            else:
-                mask = background_mask.copy()
-
-            # Get the relevant image data
-            if ndim == 2:
-                image = input_data
-            elif ndim == 3:
-                if median_image is not None:
-                    image = input_data[i] - median_image[i]
-                else:
-                    image = input_data[i]
-            else:
-                # Ramp data input
-                if median_image is not None:
-                    # subtract the median ramp
-                    image = input_data[i, j] - median_image[i, j]
-                else:
-                    # subtract the current group from the next one
-                    image = input_data[i, j + 1] - input_data[i, j]
-                    dq = input_model.groupdq[i, j + 1]
-
-                    # Mask any DNU and JUMP pixels
-                    _mask_unusable(mask, dq)
-
-            # Clean the image
-            cleaned_image, background, success = _clean_one_image(
-                image,
-                mask,
-                background_method,
-                background_box_size,
-                n_sigma,
-                fit_method,
-                detector,
-                fc,
-                axis_to_correct,
-                fit_by_channel,
+    if nprocs > 1:
+        log.info(f"Using {nprocs} processes")
+        results = _clean_images_parallel(
+            frames,
+            nprocs,
+            ndim,
+            input_data,
+            groupdq,
+            background_mask,
+            median_image,
+            flat,
+            clean_args,
+            save_background,
+        )
+    else:
+        results = (
+            _clean_one_image(
+                *_image_to_clean(i, j, ndim, input_data, groupdq, background_mask, median_image),
+                *clean_args,
                 flat,
             )
+            for i, j in frames
+        )
+
+    try:
+        for (i, j), (cleaned_image, background, success) in zip(frames, results, strict=True):
+            if j == 0:
+                log.debug(f"Working on integration {i + 1} with ngroups {ngroups}")
 
             if not success:
                 # Cleaning failed for internal reasons - probably the
@@ -1543,6 +1779,9 @@ def do_correction(
                     input_model.data[i, j + 1] = input_model.data[i, j] + cleaned_image
                     if save_background:
                         background_to_save[i, j + 1] = background
+    finally:
+        # Stop any remaining work
+        results.close()
 
     # Store the background image in a model, if requested
     if save_background:
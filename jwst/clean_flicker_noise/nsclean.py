@@ -151,71 +151,53 @@ class NSClean:
         -----
         Fitting is done line by line because the matrices get very big if one
         tries to project out Fourier vectors from the entire 2K x 2K image area.
+        The lines are independent, so their least-squares problems are set
+        up and solved together, as a stack.
         """
         model = np.zeros((self.ny, self.nx), dtype=np.float32)  # Build the model here
-        for y in np.arange(self.ny)[4:-4]:
-            # Get data and weights for this line
-            d = data[y][self.mask[y]]  # unmasked (usable) data
-            # The line below uses a vector to represent a diagonal weight matrix.
-            # Multiplications by this vector later on may be viewed as
-            # equivalent formulations to multiplication by diag(p).
-            p = self.p_matrix[y][self.mask[y]]  # Weights
-
-            # If none of the pixels in this line is usable (all masked out),
-            # skip and move on to the next line.
-            if len(d) == 0:
-                continue
-
-            # Fill statistical outliers with line median. We know that the rolling
-            # median cleaning technique worked reasonably well, so this is a fast
-            # justifiable approximation.
-            _mu = np.median(d)  # Robust estimate of mean
-            _sigma = 1.4826 * np.median(np.abs(d - _mu))  # Robust estimate of standard deviation
-
-            # Fill outliers
-            d = np.where(
-                np.logical_and(_mu - self.sigrej * _sigma <= d, d <= _mu + self.sigrej * _sigma),
-                d,
-                _mu,
-            )
-
-            # Build the Fourier basis matrix for this line
-            # Must be a column vector to broadcast
-            m = np.arange(self.nx)[self.mask[y]].reshape((-1, 1))
-            # Must be a row vector to broadcast. We can optimize
-            # the code later by putting this into object instantiation
-            # since it is the same for every line. For now, leave it
-            # here since the cost is negligible and it may aid
-            # comprehension.
-            k = np.arange(self.nvec).reshape((1, -1))
-
-            # Build the basis matrix
-            basis = np.array(
-                np.exp(2 * np.pi * 1j * m * k / self.nx) / m.shape[0], dtype=np.complex64
-            )
 
-            # Compute the Moore-Penrose inverse of A = P*B.
-            #     $A^+ = (A^H A)^{-1} A^H$
-            _a = basis * p[:, np.newaxis]
-            _a_h = np.conjugate(_a.transpose())  # Hermitian transpose of A
-            pinv_pb = np.matmul(np.linalg.inv(np.matmul(_a_h, _a)), _a_h)
+        # Skip the reference rows, and any line in which none of the pixels
+        # is usable (all masked out).
+        rows = np.arange(self.ny)[4:-4]
+        rows = rows[np.any(self.mask[rows], axis=1)]
+        if len(rows) == 0:
+            return model
+        mask = self.mask[rows]
+
+        # Get data and weights for all lines at once. The weights are zero
+        # for pixels that are not usable, so these do not contribute to the fit.
+        d = np.where(mask, data[rows], np.nan)
+        p = self.p_matrix[rows]  # Weights
+
+        # Fill statistical outliers with line median. We know that the rolling
+        # median cleaning technique worked reasonably well, so this is a fast
+        # justifiable approximation.
+        _mu = np.nanmedian(d, axis=1, keepdims=True)  # Robust estimate of mean
+        # Robust estimate of standard deviation
+        _sigma = 1.4826 * np.nanmedian(np.abs(d - _mu), axis=1, keepdims=True)
+
+        # Fill outliers
+        d = np.where(
+            np.logical_and(_mu - self.sigrej * _sigma <= d, d <= _mu + self.sigrej * _sigma),
+            d,
+            _mu,
+        )
 
-            # Solve for the Fourier transform of this line's background samples.
-            # The way that we have done it, this multiplies the input data by the
-            # number of samples used for the fit.
-            rfft = np.zeros(self.nx // 2 + 1, dtype=np.complex64)
-            rfft[: k.shape[1]] = np.matmul(pinv_pb, p * d)
+        # Solve for the Fourier transform of each line's background samples,
+        # weighting the fit by P, for all lines at once.
+        rfft = np.zeros((len(rows), self.nx // 2 + 1), dtype=np.complex128)
+        rfft[:, : self.nvec] = _fit_fourier_coefficients(p**2, d, np.arange(self.nvec))
 
-            # Numpy requires that the forward transform multiply
-            # the data by n. Correct normalization.
-            rfft *= self.nx / m.shape[0]
+        # Numpy requires that the forward transform multiply
+        # the data by n. Correct normalization.
+        rfft *= self.nx
 
-            # Apodize if necessary
-            if self.kill_width > 0:
-                rfft[: self.nvec] *= self.apodizer[: self.nvec]
+        # Apodize if necessary
+        if self.kill_width > 0:
+            rfft[:, : self.nvec] *= self.apodizer[: self.nvec]
 
-            # Invert the FFT to build the background model for this line
-            model[y] = np.fft.irfft(rfft, self.nx)
+        # Invert the FFT to build the background model for each line
+        model[rows] = np.fft.irfft(rfft, self.nx, axis=1)
 
         # Done!
         return model
@@ -349,6 +331,47 @@ def med_abs_deviation(d, median=True):
         return mad
 
 
+def _fit_fourier_coefficients(weights, data, k):
+    """
+    Fit Fourier vectors to regularly sampled data by weighted least squares.
+
+    The data are modeled as ``sum_k c_k exp(2 pi i x k / n)`` at samples
+    ``x = 0 ... n - 1``. The normal equations for a Fourier basis have a simple
+    form: the matrix elements depend only on the difference between the two
+    frequencies, and are given by the discrete Fourier transform of the weights.
+    They are therefore built with FFTs, without forming the basis matrix.
+
+    Parameters
+    ----------
+    weights : ndarray of float
+        Weight of each sample, with shape (..., n). Samples with zero weight
+        are ignored. All leading dimensions are fit independently.
+    data : ndarray of float
+        Data samples, with the same shape as ``weights``. Values of samples
+        with zero weight must be finite, but are otherwise ignored.
+    k : ndarray of int
+        Indices of the Fourier vectors to fit, with ``0 <= k <= n // 2``.
+
+    Returns
+    -------
+    coeffs : ndarray of complex
+        Fitted coefficients, with shape (..., len(k)).
+    """
+    n = weights.shape[-1]
+
+    # Normal matrix, B^H W B. For real weights, the transform at negative
+    # frequency differences is the complex conjugate of that at positive ones.
+    dk = k.reshape((-1, 1)) - k.reshape((1, -1))
+    weights_fft = np.fft.rfft(weights, n, axis=-1)
+    normal = weights_fft[..., np.abs(dk)]
+    normal = np.where(dk < 0, np.conjugate(normal), normal)
+
+    # Right-hand side, B^H W d
+    rhs = np.fft.rfft(weights * data, n, axis=-1)[..., k]
+
+    return np.linalg.solve(normal, rhs[..., np.newaxis])[..., 0]
+
+
 class NSCleanSubarray:
     """
     Background modeling and subtraction for generic JWST near-IR subarrays.
@@ -505,18 +528,16 @@ class NSCleanSubarray:
         rfft : ndarray
             The computed Fourier transform.
         """
-        # To build the incomplete Fourier matrix, we require the index of each
-        # clock tick of each valid pixel in the background samples. For consistency with
-        # numpy's notation, we call this 'm' and require it to be a column vector.
-        _x = np.arange(self.nx).reshape((1, -1))
-        _y = np.arange(self.ny).reshape((-1, 1))
-        m = (_y * (self.nx + self.nloh) + _x)[self.mask].reshape((-1, 1))
+        # Lay out the background samples along the clocking pattern, with the
+        # new line overhead appended to each line.
+        _m = np.hstack(
+            (self.mask, np.zeros((self.ny, self.nloh), dtype=np.bool_))
+        ).flatten()  # Add new line overhead to mask
+        data = np.hstack((self.data, np.zeros((self.ny, self.nloh), dtype=np.float32))).flatten()
+        data = np.where(_m, data, 0.0)
 
         # Define which Fourier vectors to fit. For consistency with numpy, call this k.
-        k = np.arange(len(self.rfftfreq))[self.apodizer > 0.0].reshape((1, -1))
-
-        # Build the incomplete Fourier matrix
-        basis = np.array(np.exp(2 * np.pi * 1j * m * k / self.n) / m.shape[0], dtype=np.complex64)
+        k = np.arange(len(self.rfftfreq))[self.apodizer > 0.0]
 
         # Weighted NSClean fitting
         if weight_fit:
@@ -530,44 +551,32 @@ class NSCleanSubarray:
                 np.exp(-((_x - _mu) ** 2) / _sigma**2 / 2) / _sigma / np.sqrt(2 * np.pi)
             )  # Build centered Gaussian
             _weight_fft = np.fft.rfft(np.fft.ifftshift(_weight))  # Forward FFT
-            _m = np.hstack(
-                (self.mask, np.zeros((self.ny, self.nloh), dtype=np.bool_))
-            ).flatten()  # Add new line overhead to mask
             with np.errstate(divide="ignore"):
                 p_matrix = 1 / np.fft.irfft(
                     np.fft.rfft(np.array(_m, dtype=np.float32)) * _weight_fft, self.n
                 )  # Compute weights
 
             # Keep only background samples
-            p_matrix = p_matrix[_m]
+            p_matrix = np.where(_m, p_matrix, 0.0)
 
             # Set bad weights to zero
             p_matrix[~np.isfinite(p_matrix)] = 0.0
 
-            # NSClean's weighting requires the Moore-Penrose inverse of A = P*B.
-            #     $A^+ = (A^H A)^{-1} A^H$
-            # P is diagonal. Hadamard product is most RAM efficient
-            _a = p_matrix.reshape((-1, 1)) * basis
-            # Hermitian transpose of A
-            _a_h = np.conjugate(_a.transpose())
-            pinv_pb = np.matmul(np.linalg.inv(np.matmul(_a_h, _a)), _a_h)
+            # NSClean's weighting solves the least-squares problem for A = P*B,
+            # i.e. weights each squared residual by P^2.
+            weights = p_matrix**2
 
         else:
             # Unweighted fit
-            pinv_b = np.linalg.pinv(basis)
+            weights = np.array(_m, dtype=np.float64)
 
         # Solve for the (approximate) Fourier transform of the background samples.
         rfft = np.zeros(len(self.rfftfreq), dtype=np.complex64)
-        if weight_fit is True:
-            rfft[self.apodizer > 0.0] = np.matmul(
-                pinv_pb * p_matrix.reshape((1, -1)), self.data[self.mask]
-            )
-        else:
-            rfft[self.apodizer > 0.0] = np.matmul(pinv_b, self.data[self.mask])
+        rfft[k] = _fit_fourier_coefficients(weights, data, k)
 
         # Numpy requires that the forward transform multiply
         # the data by n. Correct normalization.
-        rfft *= self.n / m.shape[0]
+        rfft *= self.n
 
         # Invert the apodized Fourier transform to build the background model for this integration
         self.model = np.fft.irfft(rfft * self.apodizer, self.n).reshape((self.ny, -1))[:, : self.nx]
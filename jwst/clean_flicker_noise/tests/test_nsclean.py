@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose
+
+from jwst.clean_flicker_noise.nsclean import NSClean, NSCleanSubarray, _fit_fourier_coefficients
+
+
+def test_fit_fourier_coefficients():
+    """Compare the batched fit with a least-squares fit to an explicit basis."""
+    rng = np.random.default_rng(seed=42)
+    n = 200
+    k = np.array([0, 1, 2, 3, 60, 99, 100])
+    weights = rng.uniform(0.5, 2.0, size=(3, n))
+    weights[rng.random((3, n)) < 0.3] = 0.0
+    data = rng.normal(size=(3, n))
+
+    coeffs = _fit_fourier_coefficients(weights, data, k)
+    assert coeffs.shape == (3, len(k))
+
+    basis = np.exp(2j * np.pi * np.arange(n).reshape((-1, 1)) * k / n)
+    for w, d, c in zip(weights, data, coeffs, strict=True):
+        sqrt_w = np.sqrt(w)
+        expected = np.linalg.lstsq(basis * sqrt_w[:, np.newaxis], d * sqrt_w, rcond=None)[0]
+        assert_allclose(c, expected, rtol=1e-10, atol=1e-12)
+
+
+@pytest.mark.parametrize("detector", ["NRS1", "NRS2"])
+def test_nsclean_fit(detector):
+    """Test that the background is fit line by line."""
+    rng = np.random.default_rng(seed=42)
+    shape = (256, 64)
+    mask = np.full(shape, True)
+    cleaner = NSClean(detector, mask, fc=1 / 32, kill_width=1 / 128)
+
+    # Model a different low frequency background in each detector line,
+    # at frequencies passed by the low pass filter with full gain.
+    ny, nx = cleaner.mask.shape
+    x = np.arange(nx)
+    nfull = np.sum(cleaner.apodizer == 1)
+    freq = rng.integers(0, nfull, ny).reshape((-1, 1))
+    background = rng.normal(size=(ny, 1)) * np.cos(2 * np.pi * freq * x / nx)
+    data = np.array(background, dtype=np.float32)
+
+    # A fully masked line is not fit
+    cleaner.mask[10] = False
+
+    model = cleaner.fit(data)
+
+    # Reference lines are not fit
+    assert np.all(model[:4] == 0)
+    assert np.all(model[-4:] == 0)
+    assert np.all(model[10] == 0)
+    fit_rows = np.r_[4:10, 11 : ny - 4]
+    assert_allclose(model[fit_rows], background[fit_rows], atol=1e-5)
+
+
+@pytest.mark.parametrize("weight_fit", [True, False])
+def test_nsclean_subarray_fit(weight_fit):
+    """Test that a background at the fit frequencies is recovered."""
+    shape = (16, 128)
+    cleaner = NSCleanSubarray(np.zeros(shape), np.full(shape, True), exclude_outliers=False)
+
+    # Constant background, plus alternating column noise at the Nyquist
+    # frequency of the clocking pattern
+    ticks = np.arange(cleaner.n).reshape((cleaner.ny, -1))[:, : cleaner.nx]
+    cleaner.data = np.array(2.0 + 0.5 * np.cos(np.pi * ticks), dtype=np.float32)
+
+    rfft = cleaner.fit(return_fit=True, weight_fit=weight_fit)
+    assert rfft.shape == cleaner.rfftfreq.shape
+    assert_allclose(cleaner.model, cleaner.data, atol=1e-5)
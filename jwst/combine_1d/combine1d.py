@@ -278,25 +278,31 @@ class OutputSpectrumModel:
             # k is the corresponding pixel number in the output spectrum.
             nan_flag = np.isnan(out_pixel)
             n_nan += nan_flag.sum()
-            for i in range(len(out_pixel)):
-                # Need to check on dq and nan flux because dq is not set for some x1d
-                if (in_spec.dq[i] & datamodels.dqflags.pixel["DO_NOT_USE"] > 0) | np.isnan(
-                    in_spec.flux[i]
-                ):
-                    continue
-                # Round to the nearest pixel.
-                if nan_flag[i]:  # skip if the pixel number is NaN
-                    continue
-                k = round(float(out_pixel[i]))
-                if k < 0 or k >= nelem:
-                    continue
-                dq[k] |= in_spec.dq[i]
-                flux[s, k] = in_spec.flux[i]
-                flux_error[s, k] = in_spec.flux_error[i]
-                surf_bright[s, k] = in_spec.surf_bright[i]
-                sb_error[s, k] = in_spec.sb_error[i]
-                weight[s, k] = in_spec.weight[i]
-                count[s, k] = 1.0
+
+            # Need to check on dq and nan flux because dq is not set for some x1d.
+            # Also skip pixels whose pixel number is NaN.
+            use = (in_spec.dq & datamodels.dqflags.pixel["DO_NOT_USE"] == 0) & ~(
+                np.isnan(in_spec.flux) | nan_flag
+            )
+            # Round to the nearest pixel.
+            pixel = np.rint(out_pixel)
+            use &= (pixel >= 0) & (pixel < nelem)
+            i = np.flatnonzero(use)
+            k = pixel[i].astype(np.int64)
+
+            np.bitwise_or.at(dq, k, in_spec.dq[i].astype(dq_dtype, copy=False))
+
+            # Where several input pixels fall on the same output pixel,
+            # the last one is kept.
+            _, last = np.unique(k[::-1], return_index=True)
+            i = i[::-1][last]
+            k = k[::-1][last]
+            flux[s, k] = in_spec.flux[i]
+            flux_error[s, k] = in_spec.flux_error[i]
+            surf_bright[s, k] = in_spec.surf_bright[i]
+            sb_error[s, k] = in_spec.sb_error[i]
+            weight[s, k] = in_spec.weight[i]
+            count[s, k] = 1.0
 
         (flux, flux_error, surf_bright, sb_error, weight, count) = self.combine_spectra(
             flux, flux_error, surf_bright, sb_error, weight, count, sigma_clip=sigma_clip
@@ -497,21 +503,17 @@ def count_input(input_spectra):
     """
     # Create an array with all the input wavelengths (i.e. the union
     # of the input wavelengths).
-    wl = None
-    for in_spec in input_spectra:
-        input_wl = in_spec.wavelength
-        # only include spectra that have more than 1 data point
-        if len(input_wl) > 1:
-            if wl is None:
-                wl = input_wl.copy()
-            else:
-                wl = np.hstack((input_wl, wl))
+    # only include spectra that have more than 1 data point
+    wl = np.concatenate(
+        [in_spec.wavelength for in_spec in input_spectra if len(in_spec.wavelength) > 1]
+    )
     wl.sort()
     nwl = len(wl)
 
-    # n_input_spectra will be the number of input spectra that cover the
-    # corresponding wavelength in wl.
-    n_input_spectra = np.zeros(nwl, dtype=np.int64)
+    # For each input spectrum, the range of indices in wl between
+    # the edges of the spectrum.
+    starts = []
+    ends = []
     for in_spec in input_spectra:
         input_wl = in_spec.wavelength
 
@@ -533,10 +535,20 @@ def count_input(input_spectra):
             log.warning(f"Spectrum {in_spec} has a monotonic wavelength solution.")
             log.warning("Skipping...")
             continue
-        temp = np.where(wl >= wl0, 1, 0)
-        temp = np.where(wl >= wl1, 0, temp)
-        n_input_spectra += temp
-        del temp
+        # wl is sorted, with NaNs at the end, so the covered wavelengths
+        # with wl0 <= wl < wl1 are a contiguous range.
+        starts.append(np.searchsorted(wl, wl0))
+        ends.append(np.searchsorted(wl, wl1))
+
+    # n_input_spectra will be the number of input spectra that cover the
+    # corresponding wavelength in wl.
+    starts = np.array(starts, dtype=np.int64)
+    ends = np.array(ends, dtype=np.int64)
+    covered = starts < ends
+    n_input_spectra = np.cumsum(
+        np.bincount(starts[covered], minlength=nwl + 1)
+        - np.bincount(ends[covered], minlength=nwl + 1)
+    )[:nwl]
 
     # This shouldn't happen.
     if np.any(n_input_spectra <= 0.0):
@@ -605,34 +617,35 @@ def compute_output_wl(wl, n_input_spectra):
     # elements will be copied to the array of output wavelengths.
     temp_wl = np.zeros(nwl, dtype=np.float64) - 99.0
 
-    for k in range(nwl):
-        n = n_input_spectra[k]
+    # The slice of wl for each element k has n = n_input_spectra[k] elements,
+    # starting at k0 = k + n // 2 + 1 - n.  Elements with the same number
+    # of input spectra are handled together.
+    for n in np.unique(n_input_spectra):
+        k = np.flatnonzero(n_input_spectra == n)
         if n == 1:
             sigma[k] = 0.0
             mean_wl[k] = wl[k]
             temp_wl[k] = mean_wl[k]
         else:
-            k1 = k + n // 2 + 1
-            k0 = k1 - n
-            if k0 >= 0 and k1 <= nwl:
-                sigma[k] = wl[k0:k1].std()
-                mean_wl[k] = wl[k0:k1].mean()
-                if sigma[k] == 0.0:
-                    temp_wl[k] = mean_wl[k]
+            k0 = k + n // 2 + 1 - n
+            inside = (k0 >= 0) & (k0 + n <= nwl)
+            k = k[inside]
+            sigma[k], mean_wl[k] = _window_stats(wl, k0[inside], n)
+            clump = k[sigma[k] == 0.0]
+            temp_wl[clump] = mean_wl[clump]
 
     cutoff = 0.8
-    for k in range(nwl):
+    if nwl > 1:
+        # Compare with the average sigma of the neighbors, or the only
+        # neighbor at the ends.
+        threshold = np.empty(nwl, dtype=np.float64)
+        threshold[0] = cutoff * sigma[1]
+        threshold[-1] = cutoff * sigma[nwl - 2]
+        threshold[1:-1] = cutoff * (sigma[:-2] + sigma[2:]) / 2.0
+
         # If sigma[k] equals 0, temp_wl has already been assigned.
-        if sigma[k] > 0.0:
-            if k == 0:
-                if sigma[k] < cutoff * sigma[1]:
-                    temp_wl[k] = mean_wl[k]
-            elif k == nwl - 1:
-                if sigma[k] < cutoff * sigma[nwl - 2]:
-                    temp_wl[k] = mean_wl[k]
-            else:
-                if sigma[k] < cutoff * (sigma[k - 1] + sigma[k + 1]) / 2.0:
-                    temp_wl[k] = mean_wl[k]
+        clump = (sigma > 0.0) & (sigma < threshold)
+        temp_wl[clump] = mean_wl[clump]
 
     # Fill gaps in the output wavelengths by taking averages of the
     # input wavelengths.  If there are n overlapping input spectra,
@@ -660,6 +673,42 @@ def compute_output_wl(wl, n_input_spectra):
     return temp_wl[np.where(temp_wl > 0.0)].copy()
 
 
+def _window_stats(wl, k0, n, max_elements=2**20):
+    """
+    Compute the standard deviation and mean of slices of wavelengths.
+
+    Parameters
+    ----------
+    wl : ndarray, 1-D
+        The wavelengths.
+    k0 : ndarray of int, 1-D
+        The start index of each slice.
+    n : int
+        The number of elements in each slice.
+    max_elements : int, optional
+        The maximum number of elements to gather at once.
+
+    Returns
+    -------
+    sigma : ndarray, 1-D
+        The standard deviation of ``wl[k0:k0 + n]`` for each ``k0``.
+    mean_wl : ndarray, 1-D
+        The mean of ``wl[k0:k0 + n]`` for each ``k0``.
+    """
+    sigma = np.empty(len(k0), dtype=np.float64)
+    mean_wl = np.empty(len(k0), dtype=np.float64)
+    offsets = np.arange(n)
+    step = max(1, max_elements // n)
+    for start in range(0, len(k0), step):
+        # Each slice is a contiguous row, so it is summed in the same
+        # order as the slice on its own.
+        rows = slice(start, start + step)
+        windows = wl[k0[rows, np.newaxis] + offsets]
+        sigma[rows] = windows.std(axis=1)
+        mean_wl[rows] = windows.mean(axis=1)
+    return sigma, mean_wl
+
+
 def check_exptime(exptime_key):
     """
     Check exptime_key for validity.
@@ -7,8 +7,14 @@ import pytest
 
 from jwst import datamodels
 from jwst.combine_1d import Combine1dStep
-from jwst.combine_1d.combine1d import InputSpectrumModel, check_exptime, check_monotonic
+from jwst.combine_1d.combine1d import (
+    InputSpectrumModel,
+    OutputSpectrumModel,
+    check_exptime,
+    check_monotonic,
+)
 from jwst.datamodels.utils.tests.wfss_helpers import N_SOURCES, wfss_multi
+from jwst.extract_1d.spec_wcs import create_spectral_wcs
 from jwst.tests.helpers import LogWatcher
 
 
@@ -115,6 +121,38 @@ def test_sigmaclip(three_spectra):
     result_sc.close()
 
 
+def test_accumulate_shared_output_pixel(two_spectra):
+    """Test input pixels that fall on the same output pixel."""
+    grid = np.arange(11.0, 13.0, 0.2)
+    in_spec = InputSpectrumModel(two_spectra, two_spectra.spec[0], "exposure_time")
+
+    # Two input pixels for each output pixel
+    in_spec.wavelength = np.repeat(grid, 2) + np.tile([-0.05, 0.0], len(grid))
+    in_spec.right_ascension = np.zeros(in_spec.wavelength.shape)
+    in_spec.declination = np.zeros(in_spec.wavelength.shape)
+    in_spec.flux = np.arange(1.0, 1.0 + in_spec.wavelength.size)
+    in_spec.dq = np.zeros(in_spec.wavelength.shape, dtype=np.uint32)
+    in_spec.dq[6] = datamodels.dqflags.pixel["SATURATED"]
+    in_spec.dq[11] = datamodels.dqflags.pixel["DO_NOT_USE"]
+    in_spec.flux[15] = np.nan
+    for name in ["flux_error", "surf_bright", "sb_error", "weight"]:
+        setattr(in_spec, name, np.ones(in_spec.wavelength.shape))
+
+    out_spec = OutputSpectrumModel()
+    out_spec.wavelength = grid.copy()
+    out_spec.wcs = create_spectral_wcs(0.0, 0.0, grid)
+    out_spec.accumulate_sums([in_spec])
+
+    # The last good input pixel is used, and DQ flags are combined
+    expected = in_spec.flux[1::2].copy()
+    expected[5] = in_spec.flux[10]
+    expected[7] = in_spec.flux[14]
+    np.testing.assert_equal(out_spec.flux, expected)
+    assert out_spec.dq[3] == datamodels.dqflags.pixel["SATURATED"]
+    assert np.all(np.delete(out_spec.dq, 3) == 0)
+    np.testing.assert_equal(out_spec.count, 1.0)
+
+
 @pytest.mark.parametrize("casing", ["upper", "lower"])
 @pytest.mark.parametrize(
     "exptime",
@@ -45,6 +45,17 @@ def test_1c():
     assert np.allclose(output_wl, truth_1c, rtol=1.0e-10)
 
 
+def test_window_stats():
+    """Test that sliding statistics match those of each slice."""
+    rng = np.random.default_rng(seed=42)
+    wl = np.sort(rng.uniform(1.0, 2.0, 500))
+    for n in (2, 7, 20):
+        k0 = np.arange(len(wl) - n + 1)
+        sigma, mean_wl = combine1d._window_stats(wl, k0, n, max_elements=100)
+        np.testing.assert_array_equal(sigma, [wl[k : k + n].std() for k in k0])
+        np.testing.assert_array_equal(mean_wl, [wl[k : k + n].mean() for k in k0])
+
+
 def create_input_spectra_1():
     input_spectra = []
 
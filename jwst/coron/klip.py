@@ -3,16 +3,20 @@
 import logging
 
 import numpy as np
+from scipy import linalg
 
 log = logging.getLogger(__name__)
 
 __all__ = ["klip", "karhunen_loeve_transform"]
 
 
-def klip(target_model, refs_model, truncate, return_psf=True):
+def klip(target_model, refs_model, truncate, return_psf=True, dtype=np.float64):
     """
     Apply KLIP algorithm to science data.
 
+    The Karhunen-Loeve basis is computed once from the reference images
+    and the PSF is fit to all target integrations at once.
+
     Parameters
     ----------
     target_model : `~stdatamodels.jwst.datamodels.CubeModel`
@@ -28,6 +32,11 @@ def klip(target_model, refs_model, truncate, return_psf=True):
     return_psf : bool, optional
         If `True`, the PSF fit to the target image will be returned as a
         separate datamodel.
+    dtype : data-type, optional
+        The data type used to fit and subtract the PSF. Using `numpy.float32`
+        halves the memory used for large numbers of integrations, at the cost
+        of precision. The Karhunen-Loeve transform is always computed in
+        double precision.
 
     Returns
     -------
@@ -41,55 +50,48 @@ def klip(target_model, refs_model, truncate, return_psf=True):
     if return_psf:
         output_psf = target_model.copy()
 
-    # Loop over the target integrations
-    for i in range(target_model.data.shape[0]):
-        # Load the target data array and flatten it from 2-D to 1-D
-        target = target_model.data[i].astype(np.float64)
-        tshape = target.shape
-        target = target.reshape(-1)
-
-        # Load the reference psf arrays and flatten them from 3-D to 2-D
-        refs = refs_model.data.astype(np.float64)
-        rshape = refs.shape
-        nrefs = rshape[0]
-        refs = refs.reshape(nrefs, rshape[1] * rshape[2])
-
-        # Make each ref image have zero mean
-        for k in range(nrefs):
-            refs[k] -= np.mean(refs[k], dtype=np.float64)
-
-        # Compute Karhunen-Loeve transform of ref images and normalize vectors
-        klvect, eigval, eigvect = karhunen_loeve_transform(refs, normalize=True)
-
-        # Truncate the Karhunen-Loeve vectors
-        klvect = klvect[:truncate]
-
-        # Compute the PSF fit to the target image
-        psfimg = np.dot(klvect.T, np.dot(target, klvect.T))
-
-        # Subtract the PSF fit from the target image
-        outimg = target - target.mean()
-        outimg -= psfimg
-
-        # Unflatten the PSF and subtracted target images from 1-D to 2-D
-        # and copy them to the output models
-        outimg = outimg.reshape(tshape)
-        target_model.data[i] = outimg
-        if return_psf:
-            psfimg = psfimg.reshape(tshape)
-            output_psf.data[i] = psfimg
-
-        # Compute the ERR for the fitted target image:
-        # the ERR is taken as the std-dev of the KLIP results for all of the
-        # PSF reference images.
-        #
-        # First, apply the PSF fit to each PSF reference image
-        refs_fit = refs * 0.0
-        for k in range(nrefs):
-            refs_fit[k] = refs[k] - np.dot(klvect.T, np.dot(refs[k], klvect.T))
-
-        # Now take the standard deviation of the results
-        target_model.err[i] = np.std(refs_fit, 0).reshape(tshape)
+    # Load the reference psf arrays and flatten them from 3-D to 2-D
+    refs = refs_model.data.astype(np.float64)
+    nrefs = refs.shape[0]
+    refs = refs.reshape(nrefs, -1)
+
+    # Make each ref image have zero mean
+    refs -= np.mean(refs, axis=1, keepdims=True)
+
+    # Compute Karhunen-Loeve transform of ref images and normalize vectors,
+    # keeping only the truncated rows
+    klvect, _, _ = karhunen_loeve_transform(refs, normalize=True, nvect=truncate)
+    klvect = klvect[:truncate].astype(dtype, copy=False)
+
+    # Load the target data arrays and flatten them from 3-D to 2-D
+    tshape = target_model.data.shape
+    targets = target_model.data.reshape(tshape[0], -1).astype(dtype)
+
+    # Compute the PSF fit to all target images
+    psfimg = np.dot(np.dot(targets, klvect.T), klvect)
+
+    # Subtract the PSF fit from the target images
+    targets -= np.mean(targets, axis=1, keepdims=True, dtype=np.float64).astype(dtype)
+    targets -= psfimg
+
+    # Unflatten the PSF and subtracted target images from 2-D to 3-D
+    # and copy them to the output models
+    target_model.data[:] = targets.reshape(tshape)
+    del targets
+    if return_psf:
+        output_psf.data[:] = psfimg.reshape(tshape)
+    del psfimg
+
+    # Compute the ERR for the fitted target images:
+    # the ERR is taken as the std-dev of the KLIP results for all of the
+    # PSF reference images, which is the same for all integrations.
+    #
+    # First, apply the PSF fit to each PSF reference image
+    refs = refs.astype(dtype, copy=False)
+    refs_fit = refs - np.dot(np.dot(refs, klvect.T), klvect)
+
+    # Now take the standard deviation of the results
+    target_model.err[:] = np.std(refs_fit, 0).reshape(tshape[1:])
 
     if return_psf:
         return target_model, output_psf
@@ -97,7 +99,7 @@ def klip(target_model, refs_model, truncate, return_psf=True):
         return target_model
 
 
-def karhunen_loeve_transform(m, normalize=False):
+def karhunen_loeve_transform(m, normalize=False, nvect=None):
     """
     Calculate Karhunen-Loeve Transform of the input.
 
@@ -107,6 +109,10 @@ def karhunen_loeve_transform(m, normalize=False):
         The array of flattened, background subtracted reference arrays
     normalize : bool
         If `True`, normalize the returned transform
+    nvect : int or None, optional
+        If provided, and smaller than the number of input arrays, only the
+        first ``nvect`` rows of the transform, with the largest eigenvalues,
+        are computed.
 
     Returns
     -------
@@ -117,7 +123,12 @@ def karhunen_loeve_transform(m, normalize=False):
     eigvect : ndarray
         Matrix of eigenvectors
     """
-    eigval, eigvect = np.linalg.eigh(np.cov(m))
+    cov = np.cov(m)
+    if nvect is not None and 0 < nvect < len(cov):
+        # Only compute the eigenvectors that are kept
+        eigval, eigvect = linalg.eigh(cov, subset_by_index=[len(cov) - nvect, len(cov) - 1])
+    else:
+        eigval, eigvect = np.linalg.eigh(cov)
 
     # Sort eigenvalues (replicate Mathematica's behaviour):
     idx = eigval.argsort()[::-1]
@@ -128,7 +139,6 @@ def karhunen_loeve_transform(m, normalize=False):
     klvect = np.dot(eigvect.T, m)
 
     if normalize:
-        for k in range(len(klvect)):
-            klvect[k] /= np.linalg.norm(klvect[k])
+        klvect /= np.linalg.norm(klvect, axis=1, keepdims=True)
 
     return klvect, eigval, eigvect
@@ -1,5 +1,7 @@
 import logging
 
+import numpy as np
+
 from jwst.coron import klip
 from jwst.stpipe import Step
 
@@ -21,6 +23,7 @@ class KlipStep(Step):
 
     spec = """
         truncate = integer(default=50,min=0) # The number of KL transform rows to keep
+        dtype = option('float64', 'float32', default='float64') # Data type of the PSF fit
     """  # noqa: E501
 
     def process(self, target, psfrefs):
@@ -47,7 +50,9 @@ class KlipStep(Step):
         log.info("KL transform truncation = %d", truncate)
 
         # Call the KLIP routine
-        target_model = klip.klip(target_model, refs_model, truncate, return_psf=False)
+        target_model = klip.klip(
+            target_model, refs_model, truncate, return_psf=False, dtype=np.dtype(self.dtype)
+        )
 
         # Update the step completion status
         target_model.meta.cal_step.klip = "COMPLETE"
@@ -1,5 +1,6 @@
 import numpy as np
 import numpy.testing as npt
+import pytest
 from stdatamodels.jwst import datamodels
 
 from jwst.coron import imageregistration, klip
@@ -342,3 +343,37 @@ def test_klip():
 
     # psf_fit is currently not used in the code, co not compared here
     npt.assert_allclose(psf_sub.data, truth_psf_sub_data, atol=1e-6)
+
+
+def _klip_per_integration(target, refs, truncate):
+    """Fit and subtract the PSF from each integration separately."""
+    refs = refs.reshape(refs.shape[0], -1).astype(np.float64)
+    refs -= refs.mean(axis=1, keepdims=True)
+    klvect = klip.karhunen_loeve_transform(refs, normalize=True)[0][:truncate]
+    refs_fit = refs - refs @ klvect.T @ klvect
+    psf_sub = np.empty(target.shape)
+    for i, image in enumerate(target.reshape(target.shape[0], -1).astype(np.float64)):
+        psf_sub[i] = (image - image.mean() - image @ klvect.T @ klvect).reshape(target.shape[1:])
+    return psf_sub, np.std(refs_fit, 0).reshape(target.shape[1:])
+
+
+@pytest.mark.parametrize("truncate", [3, 12, 50])
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_klip_batched(truncate, dtype):
+    """Test that all integrations are fit as if they were fit separately."""
+    rng = np.random.default_rng(42)
+    psf = rng.normal(size=(20, 25))
+    target = (psf + 0.1 * rng.normal(size=(6, 20, 25))).astype(np.float32)
+    refs = (psf + 0.1 * rng.normal(size=(12, 20, 25))).astype(np.float32)
+    expected_data, expected_err = _klip_per_integration(target, refs, truncate)
+
+    target_model = datamodels.CubeModel(data=target.copy(), err=np.zeros_like(target))
+    refs_model = datamodels.CubeModel(data=refs)
+    psf_sub, psf_fit = klip.klip(target_model, refs_model, truncate, dtype=dtype)
+
+    npt.assert_allclose(psf_sub.data, expected_data, atol=1e-5)
+    npt.assert_allclose(
+        psf_sub.data + psf_fit.data, target - target.mean(axis=(1, 2), keepdims=True), atol=1e-5
+    )
+    for i in range(target.shape[0]):
+        npt.assert_allclose(psf_sub.err[i], expected_err, atol=1e-5)
@@ -1,3 +1,5 @@
+import numpy as np
+from numpy.testing import assert_allclose
 from stdatamodels.jwst import datamodels
 
 from jwst.coron.klip_step import KlipStep
@@ -13,3 +15,11 @@ def test_klip_step(target_model, psf_model):
     assert result is not psf_model
     assert target_model.meta.cal_step.klip is None
     assert psf_model.meta.cal_step.klip is None
+
+
+def test_klip_step_float32(target_model, psf_model):
+    """Test that the PSF can be fit in single precision."""
+    expected = KlipStep.call(target_model, psf_model)
+    result = KlipStep.call(target_model, psf_model, dtype="float32")
+    assert result.data.dtype == expected.data.dtype
+    assert_allclose(result.data, expected.data, rtol=1e-4, atol=1e-4 * np.abs(expected.data).max())
@@ -7,6 +7,7 @@ from jwst.assign_wcs import nirspec
 from jwst.assign_wcs.util import in_ifu_slice
 from jwst.cube_build import instrument_defaults
 from jwst.cube_build.blot_median import blot_wrapper  # c extension
+from jwst.cube_build.pixel_map_cache import model_digest
 from jwst.datamodels import ModelContainer
 
 log = logging.getLogger(__name__)
@@ -32,11 +33,17 @@ class CubeBlot:
        sky.
     input_models : `~jwst.datamodels.container.ModelContainer`
        The input models used to create the median sky cube.
+    pixel_cache : `~jwst.cube_build.pixel_map_cache.PixelMapCache` or None, optional
+       Cache for the sky coordinates of detector pixels, which may be shared
+       with `~jwst.cube_build.CubeBuildStep`.  For NIRSpec, the sky limits
+       of each slice of an input model are cached, so that they are
+       computed only once for all the median cubes blotted to the model.
     """
 
-    def __init__(self, median_model, input_models):
+    def __init__(self, median_model, input_models, pixel_cache=None):
         # Pull out the needed information from the Median IFUCube
         self.median_skycube = median_model
+        self.pixel_cache = pixel_cache
         self.instrument = median_model.meta.instrument.name
 
         # basic information about the type of data
@@ -237,6 +244,52 @@ class CubeBlot:
 
     # ************************************************************************
 
+    def nirspec_slice_limits(self, model, nslices):
+        """
+        Find the sky and wavelength limits of each slice of a NIRSpec model.
+
+        Parameters
+        ----------
+        model : `~stdatamodels.jwst.datamodels.IFUImageModel`
+            The NIRSpec model.
+        nslices : int
+            The number of slices.
+
+        Returns
+        -------
+        limits : ndarray
+            The minimum and maximum RA, Dec, and wavelength of the pixels of
+            each slice, with shape (nslices, 6).
+        """
+        key = None
+        if self.pixel_cache is not None:
+            key = self.pixel_cache.make_key(
+                "blot_slice_limits", model.meta.filename, model_digest(model), nslices
+            )
+            entry = self.pixel_cache.get(key)
+            if entry is not None:
+                return entry["limits"]
+
+        limits = np.zeros((nslices, 6))
+        for ii in range(nslices):
+            slice_wcs = nirspec.nrs_wcs_set_input(model, ii)
+            x, y = wcstools.grid_from_bounding_box(slice_wcs.bounding_box)
+            ra, dec, lam = slice_wcs(x, y)
+            limits[ii] = [
+                np.nanmin(ra),
+                np.nanmax(ra),
+                np.nanmin(dec),
+                np.nanmax(dec),
+                np.nanmin(lam),
+                np.nanmax(lam),
+            ]
+
+        if key is not None:
+            self.pixel_cache.put(key, {"limits": limits})
+        return limits
+
+    # ************************************************************************
+
     def blot_images_nirspec(self):
         """
         Core blotting routine for NIRSPEC.
@@ -285,6 +338,7 @@ class CubeBlot:
             nslices = 30
             log.info("Blotting 30 slices on NIRSPEC detector")
             roi_det = 1.0  # Just large enough that we don't get holes
+            slice_limits = self.nirspec_slice_limits(model, nslices)
 
             for ii in range(nslices):
                 # for each slice pull out the blotted values that actually fall on the slice region
@@ -294,20 +348,15 @@ class CubeBlot:
                 detector2slicer = slice_wcs.get_transform("detector", "slicer")
 
                 # find some rough limits on ra,dec, lambda using the x,y -> ra,dec,lambda
-                x, y = wcstools.grid_from_bounding_box(slice_wcs.bounding_box)
-                ra, dec, lam = slice_wcs(x, y)
-
                 # Add a padding to make slice a little bigger on sky.
                 # The slice is very small and the median cube is coarse grid on the sky in ra,dec
                 # So we need to expand the slice min and max or we will find not values
                 # falling in min and max limits.
-
-                ramin = np.nanmin(ra) - self.median_skycube.meta.wcsinfo.cdelt1 * 4
-                ramax = np.nanmax(ra) + self.median_skycube.meta.wcsinfo.cdelt1 * 4
-                decmin = np.nanmin(dec) - self.median_skycube.meta.wcsinfo.cdelt2 * 4
-                decmax = np.nanmax(dec) + self.median_skycube.meta.wcsinfo.cdelt2 * 4
-                lam_min = np.nanmin(lam)
-                lam_max = np.nanmax(lam)
+                ramin, ramax, decmin, decmax, lam_min, lam_max = slice_limits[ii]
+                ramin = ramin - self.median_skycube.meta.wcsinfo.cdelt1 * 4
+                ramax = ramax + self.median_skycube.meta.wcsinfo.cdelt1 * 4
+                decmin = decmin - self.median_skycube.meta.wcsinfo.cdelt2 * 4
+                decmax = decmax + self.median_skycube.meta.wcsinfo.cdelt2 * 4
                 if ramin < 0:
                     ramin = 0
                 if ramax > 360:
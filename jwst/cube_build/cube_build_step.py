@@ -1,4 +1,5 @@
 import logging
+import tempfile
 import time
 from pathlib import Path
 
@@ -7,6 +8,7 @@ from astropy import units
 
 from jwst.assign_wcs.util import update_s_region_keyword
 from jwst.cube_build import cube_build, data_types, ifu_cube
+from jwst.cube_build.pixel_map_cache import PixelMapCache
 from jwst.datamodels import ModelContainer
 from jwst.lib.pipe_utils import match_nans_and_flags
 from jwst.stpipe import Step, record_step_status
@@ -48,6 +50,10 @@ class CubeBuildStep(Step):
          suffix = string(default='s3d')
          offset_file = string(default=None) # Filename containing a list of Ra and Dec offsets to apply to files.
          debug_spaxel = string(default='-1 -1 -1') # Default not used
+         pixel_cache = option('none','memory','disk',default='none') # Cache the sky coordinates of detector pixels
+         pixel_cache_size = integer(default=8) # Maximum number of exposure bands in the pixel cache
+         pixel_cache_dir = string(default=None) # Directory of the disk pixel cache. Default is in the temporary directory.
+         maximum_cores = string(default='1') # Cores for matching input files to the cube in parallel. Can be an integer, 'half', 'quarter', or 'all'
        """  # noqa: E501
 
     reference_file_types = ["cubepar"]
@@ -265,6 +271,8 @@ class CubeBuildStep(Step):
             "skip_dqflagging": self.skip_dqflagging,
             "suffix": self.suffix,
             "debug_spaxel": self.debug_spaxel,
+            "pixel_cache": self.get_pixel_cache(),
+            "maximum_cores": self.maximum_cores,
         }
 
         # ________________________________________________________________________________
@@ -383,6 +391,41 @@ class CubeBuildStep(Step):
 
     # ******************************************************************************
 
+    def get_pixel_cache(self):
+        """
+        Get the cache of detector pixels mapped to the sky.
+
+        The cache is shared by all the cubes built by this step, and kept
+        for later runs of the step.  A disk cache is also shared with
+        other steps and processes using the same directory.
+
+        Returns
+        -------
+        cache : `~jwst.cube_build.pixel_map_cache.PixelMapCache` or None
+            The cache, or `None` if ``pixel_cache`` is 'none'.
+        """
+        if self.pixel_cache == "none":
+            return None
+
+        cache_dir = None
+        if self.pixel_cache == "disk":
+            cache_dir = self.pixel_cache_dir
+            if cache_dir is None:
+                cache_dir = Path(tempfile.gettempdir()) / "jwst_cube_build_pixels"
+            cache_dir = Path(cache_dir)
+
+        cache = getattr(self, "_pixel_map_cache", None)
+        if (
+            cache is None
+            or cache.cache_dir != cache_dir
+            or cache.max_entries != self.pixel_cache_size
+        ):
+            cache = PixelMapCache(self.pixel_cache_size, cache_dir=cache_dir)
+            self._pixel_map_cache = cache
+        return cache
+
+    # ******************************************************************************
+
     def read_user_input(self):
         """
         Read user input options for channel, subchannel, filter, or grating.
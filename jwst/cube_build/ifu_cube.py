@@ -1,7 +1,10 @@
 """Work horse routines used for building ifu spectra cubes."""
 
+import copy
 import logging
 import math
+import multiprocessing as mp
+import os
 import warnings
 
 import numpy as np
@@ -10,6 +13,7 @@ from astropy.coordinates import SkyCoord
 from astropy.stats import circmean
 from gwcs import wcstools
 from gwcs.utils import to_index
+from stcal.multiprocessing import compute_num_cores
 from stdatamodels.jwst import datamodels
 from stdatamodels.jwst.datamodels import dqflags
 
@@ -18,6 +22,7 @@ from jwst.assign_wcs.util import wrap_ra
 from jwst.cube_build import coord, cube_build_wcs_util, cube_internal_cal
 from jwst.cube_build.cube_match_sky_driz import cube_wrapper_driz  # c extension
 from jwst.cube_build.cube_match_sky_pointcloud import cube_wrapper  # c extension
+from jwst.cube_build.pixel_map_cache import model_digest
 from jwst.model_blender import blendmeta
 
 log = logging.getLogger(__name__)
@@ -119,6 +124,8 @@ class IFUCubeData:
         self.nspax_x = pars_cube.get("nspax_x")
         self.nspax_y = pars_cube.get("nspax_y")
         self.offsets = pars_cube.get("offsets")
+        self.pixel_cache = pars_cube.get("pixel_cache")
+        self.maximum_cores = pars_cube.get("maximum_cores", "1")
         self.rois = pars_cube.get("rois")
         self.roiw = pars_cube.get("roiw")
         self.debug_spaxel = pars_cube.get("debug_spaxel")
@@ -680,6 +687,7 @@ class IFUCubeData:
         # and map the detector pixels to the cube spaxel
 
         number_bands = len(self.list_par1)
+        files_to_match = []
         k = 0
         for ib in range(number_bands):
             this_par1 = self.list_par1[ib]
@@ -696,153 +704,7 @@ class IFUCubeData:
                 log.debug(f"Working on Band defined by: {this_par1} {this_par2}")
                 input_frame = input_model.meta.wcs.available_frames[0]
                 if self.interpolation in ["pointcloud", "drizzle"]:
-                    pixelresult = self.map_detector_to_outputframe(this_par1, input_model)
-
-                    (
-                        coord1,
-                        coord2,
-                        corner_coord,
-                        wave,
-                        dwave,
-                        flux,
-                        err,
-                        slice_no,
-                        rois_pixel,
-                        roiw_pixel,
-                        weight_pixel,
-                        softrad_pixel,
-                        scalerad_pixel,
-                        x_det,
-                        y_det,
-                    ) = pixelresult
-
-                    # by default flag the dq plane based on the FOV of the detector projected to sky
-                    flag_dq_plane = 1
-                    if self.skip_dqflagging:
-                        flag_dq_plane = 0
-
-                    # check that there is valid data returned
-                    # If all the data is flagged as DO_NOT_USE - not common- then log warning
-                    build_cube = True
-                    if wave is None:
-                        log.warning(f"No valid data found on file {input_model.meta.filename}")
-                        flag_dq_plane = 0
-                        build_cube = False
-
-                    # C extension setup
-                    start_region = 0
-                    end_region = 0
-
-                    if self.instrument == "MIRI":
-                        instrument = 0
-                        start_region = self.instrument_info.get_start_slice(this_par1)
-                        end_region = self.instrument_info.get_end_slice(this_par1)
-
-                    else:  # NIRSPEC
-                        instrument = 1
-
-                    result = None
-                    weight_type = 0  # default to emsm instead of msm
-                    if self.weighting == "msm":
-                        weight_type = 1
-
-                    if self.interpolation == "pointcloud" and build_cube:
-                        roiw_ave = np.mean(roiw_pixel)
-                        result = cube_wrapper(
-                            instrument,
-                            flag_dq_plane,
-                            weight_type,
-                            start_region,
-                            end_region,
-                            self.overlap_partial,
-                            self.overlap_full,
-                            self.xcoord,
-                            self.ycoord,
-                            self.zcoord,
-                            coord1,
-                            coord2,
-                            wave,
-                            flux,
-                            err,
-                            slice_no,
-                            rois_pixel,
-                            roiw_pixel,
-                            scalerad_pixel,
-                            weight_pixel,
-                            softrad_pixel,
-                            self.cdelt3_normal,
-                            roiw_ave,
-                            self.cdelt1,
-                            self.cdelt2,
-                        )
-
-                        spaxel_flux, spaxel_weight, spaxel_var, spaxel_iflux, spaxel_dq = result
-                        self.spaxel_flux = self.spaxel_flux + np.asarray(spaxel_flux, np.float64)
-                        self.spaxel_weight = self.spaxel_weight + np.asarray(
-                            spaxel_weight, np.float64
-                        )
-                        self.spaxel_var = self.spaxel_var + np.asarray(spaxel_var, np.float64)
-                        self.spaxel_iflux = self.spaxel_iflux + np.asarray(spaxel_iflux, np.float64)
-                        spaxel_dq.astype(np.uint)
-                        self.spaxel_dq = np.bitwise_or(self.spaxel_dq, spaxel_dq)
-                        result = None
-                        del result
-                        del spaxel_flux, spaxel_weight, spaxel_var, spaxel_iflux, spaxel_dq
-                    if self.weighting == "drizzle" and build_cube:
-                        cdelt3_mean = np.nanmean(self.cdelt3_normal)
-                        xi1, eta1, xi2, eta2, xi3, eta3, xi4, eta4 = corner_coord
-                        linear = 0
-                        if self.linear_wave:
-                            linear = 1
-                        if debug_cube_index >= 0:
-                            log.info(f"Input filename: {input_model.meta.filename}")
-                        result = cube_wrapper_driz(
-                            instrument,
-                            flag_dq_plane,
-                            start_region,
-                            end_region,
-                            self.overlap_partial,
-                            self.overlap_full,
-                            self.xcoord,
-                            self.ycoord,
-                            self.zcoord,
-                            coord1,
-                            coord2,
-                            wave,
-                            flux,
-                            err,
-                            slice_no,
-                            xi1,
-                            eta1,
-                            xi2,
-                            eta2,
-                            xi3,
-                            eta3,
-                            xi4,
-                            eta4,
-                            dwave,
-                            self.cdelt3_normal,
-                            self.cdelt1,
-                            self.cdelt2,
-                            cdelt3_mean,
-                            linear,
-                            x_det,
-                            y_det,
-                            debug_cube_index,
-                        )
-
-                        spaxel_flux, spaxel_weight, spaxel_var, spaxel_iflux, spaxel_dq = result
-                        self.spaxel_flux = self.spaxel_flux + np.asarray(spaxel_flux, np.float64)
-                        self.spaxel_weight = self.spaxel_weight + np.asarray(
-                            spaxel_weight, np.float64
-                        )
-                        self.spaxel_var = self.spaxel_var + np.asarray(spaxel_var, np.float64)
-                        self.spaxel_iflux = self.spaxel_iflux + np.asarray(spaxel_iflux, np.float64)
-                        spaxel_dq.astype(np.uint)
-                        self.spaxel_dq = np.bitwise_or(self.spaxel_dq, spaxel_dq)
-                        result = None
-                        del result
-                        del spaxel_flux, spaxel_weight, spaxel_var, spaxel_iflux, spaxel_dq
+                    files_to_match.append((this_par1, input_model))
 
                 #  AREA - 2d method only works for single files local slicer plane (internal_cal)
                 elif self.interpolation == "area":
@@ -947,6 +809,9 @@ class IFUCubeData:
                 k = k + 1
             # done looping over files
 
+        if files_to_match:
+            self.match_files(files_to_match, debug_cube_index)
+
         self.find_spaxel_flux()
         self.set_final_dq_flags()
 
@@ -954,6 +819,214 @@ class IFUCubeData:
         result = self.setup_final_ifucube_model(input_model_ref)
         return result
 
+    # ________________________________________________________________________________
+    def match_files(self, files, debug_cube_index=-1):
+        """
+        Map the detector pixels of files to the cube and add them to the spaxel sums.
+
+        With more than one core, the files are split into contiguous groups,
+        which are mapped and matched to the cube in a pool of worker
+        processes.  Each worker sums its group of files into its own spaxel
+        arrays, and the partial sums are added in the order of the groups,
+        so the result does not depend on the scheduling of the workers.
+
+        Parameters
+        ----------
+        files : list of tuple
+            The band parameter (``this_par1``) and the
+            `~stdatamodels.jwst.datamodels.IFUImageModel` of each file.
+        debug_cube_index : int, optional
+            Index of the spaxel to print debugging information for, or -1.
+            Files are matched serially when debugging.
+        """
+        nprocs = compute_num_cores(str(self.maximum_cores), len(files), os.cpu_count() or 1)
+        if nprocs <= 1 or debug_cube_index >= 0:
+            for this_par1, input_model in files:
+                self.add_spaxel_sums(self.match_file(this_par1, input_model, debug_cube_index))
+            return
+
+        log.info(f"Matching {len(files)} files to the cube with {nprocs} processes")
+        groups = [
+            [files[i] for i in indices] for indices in np.array_split(np.arange(len(files)), nprocs)
+        ]
+
+        # The workers do not need the input data of other files, or the
+        # spaxel sums of this process.  Only a cache on disk can be shared.
+        worker_cube = copy.copy(self)
+        worker_cube.input_models = None
+        worker_cube.master_table = None
+        worker_cube.input_models_this_cube = []
+        worker_cube.spaxel_flux = worker_cube.spaxel_weight = worker_cube.spaxel_var = None
+        worker_cube.spaxel_iflux = worker_cube.spaxel_dq = None
+        if self.pixel_cache is not None and self.pixel_cache.cache_dir is None:
+            worker_cube.pixel_cache = None
+
+        ctx = mp.get_context("spawn")
+        with ctx.Pool(nprocs, initializer=_init_match_worker, initargs=(worker_cube,)) as pool:
+            for spaxel_sums in pool.imap(_match_files_in_worker, groups):
+                self.add_spaxel_sums(spaxel_sums)
+
+    def match_file(self, this_par1, input_model, debug_cube_index=-1):
+        """
+        Map the detector pixels of a file to the cube and match them to spaxels.
+
+        Parameters
+        ----------
+        this_par1 : str
+            For MIRI, this is the channel number.
+            For NIRSpec, this is the grating name.
+        input_model : `~stdatamodels.jwst.datamodels.IFUImageModel`
+            Input IFU image model to combine.
+        debug_cube_index : int, optional
+            Index of the spaxel to print debugging information for, or -1.
+
+        Returns
+        -------
+        spaxel_sums : tuple of ndarray or None
+            The flux, weight, variance, number of pixels and DQ of the
+            spaxels from this file, or `None` if it has no valid data.
+        """
+        pixelresult = self.map_detector_to_outputframe(this_par1, input_model)
+
+        (
+            coord1,
+            coord2,
+            corner_coord,
+            wave,
+            dwave,
+            flux,
+            err,
+            slice_no,
+            rois_pixel,
+            roiw_pixel,
+            weight_pixel,
+            softrad_pixel,
+            scalerad_pixel,
+            x_det,
+            y_det,
+        ) = pixelresult
+
+        # by default flag the dq plane based on the FOV of the detector projected to sky
+        flag_dq_plane = 1
+        if self.skip_dqflagging:
+            flag_dq_plane = 0
+
+        # check that there is valid data returned
+        # If all the data is flagged as DO_NOT_USE - not common- then log warning
+        if wave is None:
+            log.warning(f"No valid data found on file {input_model.meta.filename}")
+            return None
+
+        # C extension setup
+        start_region = 0
+        end_region = 0
+
+        if self.instrument == "MIRI":
+            instrument = 0
+            start_region = self.instrument_info.get_start_slice(this_par1)
+            end_region = self.instrument_info.get_end_slice(this_par1)
+
+        else:  # NIRSPEC
+            instrument = 1
+
+        result = None
+        weight_type = 0  # default to emsm instead of msm
+        if self.weighting == "msm":
+            weight_type = 1
+
+        if self.interpolation == "pointcloud":
+            roiw_ave = np.mean(roiw_pixel)
+            result = cube_wrapper(
+                instrument,
+                flag_dq_plane,
+                weight_type,
+                start_region,
+                end_region,
+                self.overlap_partial,
+                self.overlap_full,
+                self.xcoord,
+                self.ycoord,
+                self.zcoord,
+                coord1,
+                coord2,
+                wave,
+                flux,
+                err,
+                slice_no,
+                rois_pixel,
+                roiw_pixel,
+                scalerad_pixel,
+                weight_pixel,
+                softrad_pixel,
+                self.cdelt3_normal,
+                roiw_ave,
+                self.cdelt1,
+                self.cdelt2,
+            )
+        if self.weighting == "drizzle":
+            cdelt3_mean = np.nanmean(self.cdelt3_normal)
+            xi1, eta1, xi2, eta2, xi3, eta3, xi4, eta4 = corner_coord
+            linear = 0
+            if self.linear_wave:
+                linear = 1
+            if debug_cube_index >= 0:
+                log.info(f"Input filename: {input_model.meta.filename}")
+            result = cube_wrapper_driz(
+                instrument,
+                flag_dq_plane,
+                start_region,
+                end_region,
+                self.overlap_partial,
+                self.overlap_full,
+                self.xcoord,
+                self.ycoord,
+                self.zcoord,
+                coord1,
+                coord2,
+                wave,
+                flux,
+                err,
+                slice_no,
+                xi1,
+                eta1,
+                xi2,
+                eta2,
+                xi3,
+                eta3,
+                xi4,
+                eta4,
+                dwave,
+                self.cdelt3_normal,
+                self.cdelt1,
+                self.cdelt2,
+                cdelt3_mean,
+                linear,
+                x_det,
+                y_det,
+                debug_cube_index,
+            )
+        return result
+
+    def add_spaxel_sums(self, spaxel_sums):
+        """
+        Add the spaxel sums of one or more files to the cube.
+
+        Parameters
+        ----------
+        spaxel_sums : tuple of ndarray or None
+            The flux, weight, variance, number of pixels and DQ of the
+            spaxels, as returned by :meth:`match_file`.  Nothing is added
+            if `None`.
+        """
+        if spaxel_sums is None:
+            return
+        spaxel_flux, spaxel_weight, spaxel_var, spaxel_iflux, spaxel_dq = spaxel_sums
+        self.spaxel_flux = self.spaxel_flux + np.asarray(spaxel_flux, np.float64)
+        self.spaxel_weight = self.spaxel_weight + np.asarray(spaxel_weight, np.float64)
+        self.spaxel_var = self.spaxel_var + np.asarray(spaxel_var, np.float64)
+        self.spaxel_iflux = self.spaxel_iflux + np.asarray(spaxel_iflux, np.float64)
+        self.spaxel_dq = np.bitwise_or(self.spaxel_dq, spaxel_dq)
+
     # ________________________________________________________________________________
     def determine_cube_parameters_internal(self):
         """Determine the spatial and spectral IFU size for ``coord_system=internal_cal``."""
@@ -1570,13 +1643,8 @@ class IFUCubeData:
         y_det = None
         offsets = self.offsets
 
-        if self.instrument == "MIRI":
-            sky_result = self.map_miri_pixel_to_sky(input_model, this_par1, offsets)
-            (x, y, ra, dec, wave_all, slice_no_all, dwave_all, corner_coord_all) = sky_result
-
-        elif self.instrument == "NIRSPEC":
-            sky_result = self.map_nirspec_pixel_to_sky(input_model, offsets)
-            (x, y, ra, dec, wave_all, slice_no_all, dwave_all, corner_coord_all) = sky_result
+        sky_result = self.map_pixel_to_sky(input_model, this_par1, offsets)
+        (x, y, ra, dec, wave_all, slice_no_all, dwave_all, corner_coord_all) = sky_result
 
         # ______________________________________________________________________________
         # The following is for both MIRI and NIRSPEC
@@ -1762,6 +1830,68 @@ class IFUCubeData:
             y_det,
         )
 
+    # ______________________________________________________________________
+    def map_pixel_to_sky(self, input_model, this_par1, offsets):
+        """
+        Map the detector pixels of a model to the sky, using the pixel cache if set.
+
+        The mapped pixels are cached by file name, WCS state, band and
+        offsets, so that an exposure is mapped only once for all the cubes
+        sharing the cache.
+
+        Parameters
+        ----------
+        input_model : `~stdatamodels.jwst.datamodels.IFUImageModel`
+           Input IFU image model to combine
+        this_par1 : str
+           For MIRI, this is the channel number.
+           For NIRSpec, this is the grating name.
+        offsets : dict
+           Optional dictionary of RA and Dec offsets to apply
+
+        Returns
+        -------
+        sky_result : tuple
+            The pixel coordinates, RA, Dec, wavelength, slice number, delta
+            wavelength and corners, as returned by :meth:`map_miri_pixel_to_sky`
+            or :meth:`map_nirspec_pixel_to_sky`.
+        """
+        if self.pixel_cache is None:
+            return self._map_pixel_to_sky(input_model, this_par1, offsets)
+
+        file_offsets = None
+        if offsets is not None:
+            raoffset, decoffset = self.find_ra_dec_offset(input_model.meta.filename)
+            file_offsets = (raoffset.to_value("arcsec"), decoffset.to_value("arcsec"))
+        key = self.pixel_cache.make_key(
+            self.instrument,
+            input_model.meta.filename,
+            model_digest(input_model),
+            this_par1 if self.instrument == "MIRI" else None,
+            self.interpolation == "drizzle",
+            file_offsets,
+        )
+        names = ("x", "y", "ra", "dec", "wave", "slice_no", "dwave", "corner_coord")
+        entry = self.pixel_cache.get(key)
+        if entry is not None:
+            log.info(f"Using cached sky coordinates of pixels in {input_model.meta.filename}")
+            return tuple(entry.get(name) for name in names)
+
+        sky_result = self._map_pixel_to_sky(input_model, this_par1, offsets)
+        entry = dict(zip(names, sky_result, strict=True))
+        if self.interpolation != "drizzle":
+            # Only used for drizzling
+            entry["dwave"] = entry["corner_coord"] = None
+        elif entry["corner_coord"] is not None:
+            entry["corner_coord"] = np.stack(entry["corner_coord"])
+        self.pixel_cache.put(key, entry)
+        return sky_result
+
+    def _map_pixel_to_sky(self, input_model, this_par1, offsets):
+        if self.instrument == "MIRI":
+            return self.map_miri_pixel_to_sky(input_model, this_par1, offsets)
+        return self.map_nirspec_pixel_to_sky(input_model, offsets)
+
     # ______________________________________________________________________
     def map_miri_pixel_to_sky(self, input_model, this_par1, offsets):
         """
@@ -2655,3 +2785,52 @@ class IncorrectParameterError(Exception):
     """Cube building parameter is NaN."""
 
     pass
+
+
+# The cube matched by a worker process, set by _init_match_worker
+_worker_cube = {}
+
+
+def _init_match_worker(cube):
+    """
+    Set the cube that a worker process matches files to.
+
+    Parameters
+    ----------
+    cube : IFUCubeData
+        The cube, with its geometry and matching parameters set.
+    """
+    _worker_cube["cube"] = cube
+
+
+def _match_files_in_worker(files):
+    """
+    Sum the spaxels matched from a group of files in a worker process.
+
+    Parameters
+    ----------
+    files : list of tuple
+        The band parameter and the input model of each file, in order.
+
+    Returns
+    -------
+    spaxel_sums : tuple of ndarray
+        The flux, weight, variance, number of pixels and DQ of the
+        spaxels, summed over the files.
+    """
+    cube = _worker_cube["cube"]
+    total_num = cube.naxis1 * cube.naxis2 * cube.naxis3
+    cube.spaxel_flux = np.zeros(total_num, dtype=np.float64)
+    cube.spaxel_weight = np.zeros(total_num, dtype=np.float64)
+    cube.spaxel_var = np.zeros(total_num, dtype=np.float64)
+    cube.spaxel_iflux = np.zeros(total_num, dtype=np.float64)
+    cube.spaxel_dq = np.zeros(total_num, dtype=np.uint32)
+    for this_par1, input_model in files:
+        cube.add_spaxel_sums(cube.match_file(this_par1, input_model))
+    return (
+        cube.spaxel_flux,
+        cube.spaxel_weight,
+        cube.spaxel_var,
+        cube.spaxel_iflux,
+        cube.spaxel_dq,
+    )
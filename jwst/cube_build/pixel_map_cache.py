@@ -0,0 +1,196 @@
+"""Cache the sky coordinates of IFU detector pixels."""
+
+import contextlib
+import hashlib
+import io
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+
+import asdf
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+__all__ = ["PixelMapCache", "model_digest"]
+
+# Prefix of the files of the cache, so that other files in a shared
+# directory are never evicted.
+_FILE_PREFIX = "jwst_pixel_map_"
+_FILE_PATTERN = f"{_FILE_PREFIX}*.npz"
+
+
+def model_digest(model):
+    """
+    Compute a digest of the state of the WCS of a model.
+
+    The digest changes if the WCS of the model, or its slice map for
+    oversampled MIRI data, changes.
+
+    Parameters
+    ----------
+    model : `~stdatamodels.jwst.datamodels.IFUImageModel`
+        The model.
+
+    Returns
+    -------
+    str
+        Hexadecimal SHA-256 digest.
+    """
+    buffer = io.BytesIO()
+    with asdf.AsdfFile({"wcs": model.meta.wcs}) as af:
+        af.write_to(buffer)
+    digest = hashlib.sha256(buffer.getvalue())
+    if model.hasattr("regions"):
+        digest.update(np.ascontiguousarray(model.regions).tobytes())
+    return digest.hexdigest()
+
+
+def _mtime(path):
+    # Entries may be removed concurrently by another process.
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+class PixelMapCache:
+    """
+    Least recently used cache of detector pixels mapped to the sky.
+
+    Each entry is a dictionary of arrays, such as the detector coordinates
+    of the valid pixels of an exposure and their RA, Dec, and wavelength.
+    Entries are held in memory or, if a cache directory is given, in files
+    in that directory, so that they can be shared between runs.  Only the
+    files written by the cache are evicted or cleared; other files in the
+    directory are left alone.
+    """
+
+    def __init__(self, max_entries=8, cache_dir=None):
+        """
+        Initialize the cache.
+
+        Parameters
+        ----------
+        max_entries : int, optional
+            The maximum number of entries.  The least recently used
+            entries are evicted beyond this number.
+        cache_dir : str, `~pathlib.Path`, or None, optional
+            The directory in which to store entries.  If `None`, entries
+            are held in memory.
+        """
+        self.max_entries = max_entries
+        self.cache_dir = None if cache_dir is None else Path(cache_dir)
+        self._entries = OrderedDict()
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(*parts):
+        """
+        Make a cache key.
+
+        Parameters
+        ----------
+        *parts : tuple
+            Values identifying an entry.  Their ``repr`` must be unique.
+
+        Returns
+        -------
+        str
+            The key.
+        """
+        return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+    def _path(self, key):
+        return self.cache_dir / f"{_FILE_PREFIX}{key}.npz"
+
+    def get(self, key):
+        """
+        Get an entry.
+
+        Parameters
+        ----------
+        key : str
+            The entry key, from `make_key`.
+
+        Returns
+        -------
+        dict or None
+            The read-only arrays of the entry, or `None` if it is not cached.
+        """
+        if self.cache_dir is None:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return dict(entry)
+
+        path = self._path(key)
+        try:
+            with np.load(path) as npz:
+                entry = {name: npz[name] for name in npz.files}
+        except (OSError, ValueError):
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        for array in entry.values():
+            array.flags.writeable = False
+        return entry
+
+    def put(self, key, entry):
+        """
+        Add an entry, evicting the least recently used entries.
+
+        Parameters
+        ----------
+        key : str
+            The entry key, from `make_key`.
+        entry : dict
+            The arrays to cache.  Values of `None` are not stored.
+        """
+        arrays = {name: np.asarray(value) for name, value in entry.items() if value is not None}
+        if self.max_entries <= 0:
+            return
+
+        if self.cache_dir is None:
+            # Store read-only copies, so that neither the caller nor
+            # later readers can change the cached arrays.
+            arrays = {name: np.array(value, copy=True) for name, value in arrays.items()}
+            for array in arrays.values():
+                array.flags.writeable = False
+            self._entries[key] = arrays
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return
+
+        # Write to a temporary file first, so that readers never see
+        # a partial entry.
+        fd, temp_name = tempfile.mkstemp(dir=self.cache_dir, prefix=_FILE_PREFIX, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                np.savez(fh, **arrays)
+            Path(temp_name).replace(self._path(key))
+        except OSError as err:
+            log.warning(f"Could not write to the pixel cache in {self.cache_dir}: {err}")
+            Path(temp_name).unlink(missing_ok=True)
+            return
+
+        paths = sorted(self.cache_dir.glob(_FILE_PATTERN), key=_mtime)
+        for path in paths[: max(0, len(paths) - self.max_entries)]:
+            path.unlink(missing_ok=True)
+
+    def clear(self):
+        """Remove all entries."""
+        self._entries.clear()
+        if self.cache_dir is not None:
+            for path in self.cache_dir.glob(_FILE_PATTERN):
+                path.unlink(missing_ok=True)
+
+    def __len__(self):
+        if self.cache_dir is None:
+            return len(self._entries)
+        return len(list(self.cache_dir.glob(_FILE_PATTERN)))
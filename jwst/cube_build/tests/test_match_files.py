@@ -0,0 +1,128 @@
+"""Test matching input files to the cube spaxels in parallel."""
+
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose, assert_array_equal
+from stdatamodels.jwst import datamodels
+
+from jwst.cube_build import ifu_cube
+from jwst.cube_build.ifu_cube import IFUCubeData
+
+RA0, DEC0 = 45.0, -30.0
+PIXEL_SCALE = 0.1 / 3600
+
+
+class SyntheticCube(IFUCubeData):
+    """Cube of NIRSpec files mapped to the sky by a simple linear transform."""
+
+    def map_nirspec_pixel_to_sky(self, input_model, offsets):
+        ny, nx = input_model.data.shape
+        y, x = np.mgrid[:ny, :nx]
+        x, y = x.ravel(), y.ravel()
+        ra = input_model.meta.wcsinfo.ra_ref + (x - nx / 2) * PIXEL_SCALE
+        dec = input_model.meta.wcsinfo.dec_ref + (y % 10 - 5) * PIXEL_SCALE
+        wave = 1.0 + 0.02 * (y // 10) + 0.0005 * (x % 3)
+        slice_no = y // 10 + 1
+        dwave = np.full(x.shape, 0.001)
+        half = PIXEL_SCALE / 2
+        corners = [ra - half, dec - half, ra + half, dec - half]
+        corners += [ra + half, dec + half, ra - half, dec + half]
+        return x, y, ra, dec, wave, slice_no, dwave, corners
+
+
+def make_models(nfiles):
+    rng = np.random.default_rng(seed=42)
+    models = []
+    for i in range(nfiles):
+        model = datamodels.IFUImageModel((40, 30))
+        model.meta.filename = f"test{i}.fits"
+        model.meta.wcsinfo.ra_ref = RA0 + 0.3 * i * PIXEL_SCALE
+        model.meta.wcsinfo.dec_ref = DEC0 - 0.2 * i * PIXEL_SCALE
+        model.data = rng.normal(10.0, 1.0, size=model.shape).astype(np.float32)
+        model.err = np.full(model.shape, 0.1, dtype=np.float32)
+        models.append(model)
+    models[1].dq[:5] = datamodels.dqflags.pixel["DO_NOT_USE"]
+    return models
+
+
+def make_cube(weighting, maximum_cores="1"):
+    cube = SyntheticCube(
+        input_models=[],
+        output_name_base="test",
+        output_type="band",
+        linear_wave=True,
+        instrument="NIRSPEC",
+        list_par1=["g140h"],
+        list_par2=["f100lp"],
+        instrument_info={},
+        master_table={},
+        debug_spaxel="-1 -1 -1",
+        interpolation="drizzle" if weighting == "drizzle" else "pointcloud",
+        weighting=weighting,
+        skip_dqflagging=False,
+        maximum_cores=maximum_cores,
+    )
+    cube.rois = 0.15
+    cube.roiw = 0.001
+    cube.weight_power = 2.0
+    cube.soft_rad = 0.01
+    cube.scalerad = 0.1
+    cube.rot_angle = 0.0
+    cube.cdelt1 = cube.cdelt2 = 0.1
+    cube.cdelt3 = 0.002
+    half = 20 * PIXEL_SCALE
+    corner_a = np.array([RA0 - half, RA0 + half])
+    corner_b = np.array([DEC0 - half, DEC0 + half])
+    cube.set_geometry(corner_a, corner_b, 0.99, 1.09)
+
+    total_num = cube.naxis1 * cube.naxis2 * cube.naxis3
+    cube.spaxel_flux = np.zeros(total_num, dtype=np.float64)
+    cube.spaxel_weight = np.zeros(total_num, dtype=np.float64)
+    cube.spaxel_var = np.zeros(total_num, dtype=np.float64)
+    cube.spaxel_iflux = np.zeros(total_num, dtype=np.float64)
+    cube.spaxel_dq = np.zeros(total_num, dtype=np.uint32)
+    return cube
+
+
+def spaxel_sums(cube):
+    return (
+        cube.spaxel_flux,
+        cube.spaxel_weight,
+        cube.spaxel_var,
+        cube.spaxel_iflux,
+        cube.spaxel_dq,
+    )
+
+
+@pytest.mark.parametrize("weighting", ["drizzle", "emsm"])
+def test_match_files_parallel(monkeypatch, weighting):
+    """Test that matching files in parallel gives the serial result."""
+    files = [("g140h", model) for model in make_models(5)]
+
+    cube = make_cube(weighting)
+    cube.match_files(files)
+    expected = spaxel_sums(cube)
+    assert np.count_nonzero(expected[3]) > 0
+
+    # Parallel matching is limited to the available cores
+    monkeypatch.setattr(ifu_cube.os, "cpu_count", lambda: 4)
+    cube = make_cube(weighting, maximum_cores="2")
+    cube.match_files(files)
+    result = spaxel_sums(cube)
+
+    for array, expected_array in zip(result[:4], expected[:4], strict=True):
+        assert_allclose(array, expected_array, rtol=1e-12, atol=1e-12)
+    assert_array_equal(result[4], expected[4])
+
+
+def test_match_files_in_worker():
+    """Test that a worker sums a group of files in order."""
+    files = [("g140h", model) for model in make_models(3)]
+    cube = make_cube("drizzle")
+    for this_par1, model in files:
+        cube.add_spaxel_sums(cube.match_file(this_par1, model))
+
+    ifu_cube._init_match_worker(make_cube("drizzle"))
+    result = ifu_cube._match_files_in_worker(files)
+    for array, expected_array in zip(result, spaxel_sums(cube), strict=True):
+        assert_array_equal(array, expected_array)
@@ -0,0 +1,190 @@
+"""Test the cache of detector pixels mapped to the sky."""
+
+import os
+
+import numpy as np
+import pytest
+from astropy import units as u
+from astropy.modeling import models
+from gwcs import WCS
+from numpy.testing import assert_array_equal
+from stdatamodels.jwst import datamodels
+
+from jwst.cube_build import CubeBuildStep
+from jwst.cube_build.ifu_cube import IFUCubeData
+from jwst.cube_build.pixel_map_cache import PixelMapCache, model_digest
+
+
+def make_model(filename="test1.fits", shift=0.0):
+    model = datamodels.IFUImageModel((10, 12))
+    model.meta.filename = filename
+    transform = models.Shift(shift) & models.Identity(1)
+    model.meta.wcs = WCS([("detector", transform), ("world", None)])
+    return model
+
+
+def make_entry(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return {"ra": rng.random(n), "slice_no": np.arange(n), "dwave": None}
+
+
+@pytest.mark.parametrize("on_disk", [False, True])
+def test_cache_lru(tmp_path, on_disk):
+    cache_dir = tmp_path / "cache" if on_disk else None
+    cache = PixelMapCache(max_entries=2, cache_dir=cache_dir)
+    keys = [cache.make_key("file", i) for i in range(3)]
+    assert len(set(keys)) == 3
+
+    entries = [make_entry(5, seed=i) for i in range(3)]
+    cache.put(keys[0], entries[0])
+    cache.put(keys[1], entries[1])
+
+    # The arrays of the caller are not frozen, nor shared with the cache
+    assert entries[0]["ra"].flags.writeable
+    expected = entries[0]["ra"].copy()
+    entries[0]["ra"][0] = -1.0
+    entries[0]["ra"] = expected
+
+    entry = cache.get(keys[0])
+    assert set(entry) == {"ra", "slice_no"}
+    assert_array_equal(entry["ra"], entries[0]["ra"])
+    assert_array_equal(entry["slice_no"], entries[0]["slice_no"])
+    with pytest.raises(ValueError, match="read-only"):
+        entry["ra"][0] = 1.0
+
+    if on_disk:
+        # File times may not resolve the accesses above
+        os.utime(cache._path(keys[1]), (1, 1))
+
+    # The least recently used entry is evicted
+    cache.put(keys[2], entries[2])
+    assert len(cache) == 2
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+
+    if on_disk:
+        # Entries are shared with other caches using the same directory
+        other = PixelMapCache(max_entries=2, cache_dir=cache_dir)
+        assert_array_equal(other.get(keys[2])["ra"], entries[2]["ra"])
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.get(keys[0]) is None
+
+
+def test_cache_keeps_other_files(tmp_path):
+    """Test that files not written by the cache are never removed."""
+    other = tmp_path / "other.npz"
+    np.savez(other, data=np.arange(3))
+    os.utime(other, (1, 1))
+
+    cache = PixelMapCache(max_entries=1, cache_dir=tmp_path)
+    keys = [cache.make_key("file", i) for i in range(2)]
+    cache.put(keys[0], make_entry(3))
+    cache.put(keys[1], make_entry(3))
+    assert len(cache) == 1
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[1]) is not None
+    assert other.exists()
+
+    cache.clear()
+    assert len(cache) == 0
+    assert other.exists()
+    with np.load(other) as npz:
+        assert_array_equal(npz["data"], np.arange(3))
+
+
+def test_cache_disabled():
+    cache = PixelMapCache(max_entries=0)
+    key = cache.make_key("file")
+    cache.put(key, make_entry(3))
+    assert cache.get(key) is None
+    assert len(cache) == 0
+
+
+def test_model_digest():
+    digest = model_digest(make_model())
+    assert model_digest(make_model()) == digest
+    assert model_digest(make_model(shift=0.5)) != digest
+
+
+@pytest.fixture
+def cube():
+    return IFUCubeData(
+        input_models=[],
+        output_name_base="test_base",
+        output_type="band",
+        linear_wave=True,
+        instrument="NIRSPEC",
+        list_par1=[],
+        list_par2=[],
+        instrument_info={},
+        master_table={},
+        debug_spaxel="0 0 0",
+        interpolation="drizzle",
+        pixel_cache=PixelMapCache(),
+    )
+
+
+@pytest.mark.parametrize("interpolation", ["drizzle", "pointcloud"])
+def test_map_pixel_to_sky_cached(monkeypatch, cube, interpolation):
+    """Test that each exposure is mapped once for all cubes sharing the cache."""
+    cube.interpolation = interpolation
+    calls = []
+
+    def map_nirspec_pixel_to_sky(input_model, offsets):
+        calls.append(input_model.meta.filename)
+        n = 4
+        x, y = np.arange(n), np.arange(n) + 1
+        ra, dec, wave = np.full(n, 10.0), np.full(n, 20.0), np.linspace(1, 2, n)
+        corners = [np.full(n, float(i)) for i in range(8)]
+        return x, y, ra, dec, wave, np.ones(n, dtype=int), np.full(n, 0.1), corners
+
+    monkeypatch.setattr(cube, "map_nirspec_pixel_to_sky", map_nirspec_pixel_to_sky)
+    model1 = make_model("test1.fits")
+    model2 = make_model("test2.fits")
+
+    expected = cube.map_pixel_to_sky(model1, "g140h", None)
+    result = cube.map_pixel_to_sky(model1, "g140h", None)
+    cube.map_pixel_to_sky(model2, "g140h", None)
+    assert calls == ["test1.fits", "test2.fits"]
+
+    for array, expected_array in zip(result[:6], expected[:6], strict=True):
+        assert_array_equal(array, expected_array)
+    if interpolation == "drizzle":
+        assert_array_equal(result[6], expected[6])
+        for corner, expected_corner in zip(result[7], expected[7], strict=True):
+            assert_array_equal(corner, expected_corner)
+    else:
+        assert result[6] is None
+        assert result[7] is None
+
+    # A change in the WCS or the offsets is mapped again
+    cube.map_pixel_to_sky(make_model("test1.fits", shift=1.0), "g140h", None)
+    assert len(calls) == 3
+    offsets = {
+        "filename": ["test1.fits"],
+        "raoffset": [0.1 * u.arcsec],
+        "decoffset": [0.0 * u.arcsec],
+    }
+    cube.offsets = offsets
+    cube.map_pixel_to_sky(model1, "g140h", offsets)
+    cube.map_pixel_to_sky(model1, "g140h", offsets)
+    assert len(calls) == 4
+
+
+def test_step_pixel_cache(tmp_path):
+    step = CubeBuildStep()
+    assert step.get_pixel_cache() is None
+
+    step.pixel_cache = "memory"
+    cache = step.get_pixel_cache()
+    assert cache.cache_dir is None
+    assert cache.max_entries == step.pixel_cache_size
+    assert step.get_pixel_cache() is cache
+
+    step.pixel_cache = "disk"
+    step.pixel_cache_dir = str(tmp_path)
+    cache = step.get_pixel_cache()
+    assert cache.cache_dir == tmp_path
@@ -29,7 +29,7 @@ __all__ = [
 
 
 # Modules that are not part of stdatamodels
-_jwst_modules = ["container", "source_container", "library"]
+_jwst_modules = ["container", "source_container", "library", "metadata_index"]
 
 # Models that are not part of stdatamodels
 _jwst_models = ["ModelContainer", "SourceModelContainer", "ModelLibrary"]
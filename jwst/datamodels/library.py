@@ -1,4 +1,6 @@
 import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -10,6 +12,7 @@ from stdatamodels.jwst.datamodels.util import open as datamodels_open
 from stpipe.library import AbstractModelLibrary, BorrowError, NoGroupID
 
 from jwst.associations import AssociationNotValidError, load_asn
+from jwst.datamodels.metadata_index import open_metadata_index
 from jwst.datamodels.utils import attrs_to_group_id
 
 __all__ = ["ModelLibrary"]
@@ -25,8 +28,77 @@ class ModelLibrary(AbstractModelLibrary):
     efficient processing of datamodel instances created from an association.
     See the `stpipe library documentation <https://stpipe.readthedocs.io/en/latest/model_library.html>`_
     for more information.
+
+    An ``on_disk`` library can overlap its file I/O with the processing of
+    the models. When ``prefetch_bytes`` is set, borrowing a model starts
+    loading the following models in the library, up to that many bytes of
+    files, on background threads. When ``write_behind_bytes`` is set,
+    modified models are written to their temporary files on background
+    threads, and shelving only waits for earlier writes when more than that
+    many bytes of models are waiting to be written. Models must then not be
+    modified after they are shelved. All writes are complete when the
+    library is closed.
+
+    The metadata read from the member files, to find their group ids and
+    the CRDS parameters, is kept in a metadata index. For a library loaded
+    from an association file, the index is shared with the later libraries
+    of the same association, such as those of the steps of a pipeline, which
+    read a member file again only if it has changed. The index can also be
+    saved in a file, to share it between runs.
+
+    Parameters
+    ----------
+    init : str, Path, dict, or list
+        Association file name, association dictionary, or list of models.
+    *args : tuple
+        Positional arguments passed to `~stpipe.library.AbstractModelLibrary`.
+    prefetch_bytes : int, optional
+        For an ``on_disk`` library, the maximum size of the files of models
+        loaded ahead of being borrowed. Default is 0, which disables prefetching.
+    write_behind_bytes : int, optional
+        For an ``on_disk`` library, the maximum size of the arrays of shelved
+        models waiting to be written. Default is 0, which writes the models
+        when they are shelved.
+    io_threads : int, optional
+        Number of background threads for prefetching and writing models.
+    metadata_index : str, Path, bool, or None, optional
+        If None (default), index the metadata of the member files in
+        memory, shared with the other libraries of the same association
+        file. A file name also saves the index in that file, so that it is
+        shared with later runs using the same file. If False, the metadata
+        is read from the files every time it is needed.
+    **kwargs : dict
+        Keyword arguments passed to `~stpipe.library.AbstractModelLibrary`.
     """
 
+    def __init__(
+        self,
+        init,
+        *args,
+        prefetch_bytes=0,
+        write_behind_bytes=0,
+        io_threads=2,
+        metadata_index=None,
+        **kwargs,
+    ):
+        if metadata_index is False:
+            self._metadata_index = None
+        else:
+            self._metadata_index = open_metadata_index(
+                metadata_index if isinstance(metadata_index, str | Path) else None,
+                asn_path=init if isinstance(init, str | Path) else None,
+            )
+        self._prefetch_bytes = prefetch_bytes
+        self._write_behind_bytes = write_behind_bytes
+        self._io_threads = io_threads
+        self._executor = None
+        # Futures and sizes of models being loaded or written, by index
+        self._prefetched = {}
+        self._pending_writes = OrderedDict()
+        super().__init__(init, *args, **kwargs)
+        # save the group ids read from the member files
+        self._save_metadata_index()
+
     @property
     def crds_observatory(self):
         """
@@ -78,6 +150,193 @@ class ModelLibrary(AbstractModelLibrary):
         """
         return self._on_disk
 
+    @property
+    def _async_io(self):
+        return self._on_disk and (self._prefetch_bytes > 0 or self._write_behind_bytes > 0)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Close the library, waiting for the background writes to complete.
+
+        Parameters
+        ----------
+        exc_type : type or None
+            The type of the exception raised in the context, if any.
+        exc_value : Exception or None
+            The exception raised in the context, if any.
+        traceback : traceback or None
+            The traceback of the exception raised in the context, if any.
+
+        Returns
+        -------
+        bool or None
+            The result of closing the library.
+        """
+        write_error = self._stop_io()
+        self._save_metadata_index()
+        result = super().__exit__(exc_type, exc_value, traceback)
+        if write_error is not None and exc_value is None:
+            raise write_error
+        return result
+
+    def borrow(self, index):
+        """
+        Borrow a model from the library.
+
+        For an ``on_disk`` library with ``prefetch_bytes`` set, the model is
+        taken from the prefetched models if it was loaded ahead, and the
+        following models are then prefetched.
+
+        Parameters
+        ----------
+        index : int
+            The index of the model within the library.
+
+        Returns
+        -------
+        `~stdatamodels.jwst.datamodels.JwstDataModel`
+            The borrowed model.
+        """
+        if not self._async_io:
+            return super().borrow(index)
+
+        if self._open and index in self._prefetched and index not in self._ledger:
+            future, _ = self._prefetched.pop(index)
+            model = future.result()
+            self._ledger[index] = model
+        else:
+            self._wait_for_write(index)
+            model = super().borrow(index)
+
+        if self._prefetch_bytes > 0:
+            self._prefetch(index + 1)
+        return model
+
+    def shelve(self, model, index=None, modify=True):
+        """
+        Shelve a model, returning it to the library.
+
+        For an ``on_disk`` library with ``write_behind_bytes`` set, a modified
+        model is written to its temporary file on a background thread.
+
+        Parameters
+        ----------
+        model : `~stdatamodels.jwst.datamodels.JwstDataModel`
+            The model to return to the library.
+        index : int, optional
+            The index within the library where the model will be stored.
+            Defaults to the index the model was borrowed from.
+        modify : bool, optional
+            Whether to store the modifications of an ``on_disk`` model.
+        """
+        if not (self._async_io and self._write_behind_bytes > 0 and modify):
+            super().shelve(model, index=index, modify=modify)
+            return
+
+        if index is None and self._open:
+            index = self._ledger.get(model)
+        # check the model and return it without writing it
+        super().shelve(model, index=index, modify=False)
+
+        self._wait_for_write(index)
+        temp_filename = self._temp_path_for_model(model, index)
+        old_filename = self._temp_filenames.get(index)
+        future = self._get_executor().submit(_write_model, model, temp_filename, old_filename)
+        self._temp_filenames[index] = temp_filename
+        self._pending_writes[index] = (future, _model_nbytes(model))
+
+        # bound the models waiting to be written, oldest first
+        pending_bytes = sum(nbytes for _, nbytes in self._pending_writes.values())
+        while pending_bytes > self._write_behind_bytes:
+            oldest_index = next(iter(self._pending_writes))
+            pending_bytes -= self._pending_writes[oldest_index][1]
+            self._wait_for_write(oldest_index)
+
+    def _read_file_metadata(self, filename, flatten):
+        if self._metadata_index is None:
+            return read_metadata(filename, flatten=flatten)
+        return self._metadata_index.read_metadata(filename, flatten=flatten)
+
+    def _save_metadata_index(self):
+        if self._metadata_index is not None:
+            self._metadata_index.save()
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._io_threads, thread_name_prefix="ModelLibrary"
+            )
+        return self._executor
+
+    def _prefetch(self, start):
+        """
+        Start loading the models from ``start`` on, within the prefetch size.
+
+        Parameters
+        ----------
+        start : int
+            Index of the first model to prefetch.
+        """
+        budget = self._prefetch_bytes - sum(nbytes for _, nbytes in self._prefetched.values())
+        for index in range(start, len(self)):
+            if index in self._prefetched:
+                continue
+            if index in self._ledger or index in self._pending_writes:
+                break
+            temp_filename = self._temp_filenames.get(index)
+            filename = temp_filename or self._member_to_filename(self._members[index])
+            try:
+                nbytes = Path(filename).stat().st_size
+            except OSError:
+                break
+            if nbytes > budget:
+                break
+            if temp_filename is None:
+                future = self._get_executor().submit(self._load_member, index)
+            else:
+                future = self._get_executor().submit(
+                    self._datamodels_open, temp_filename, **self._datamodels_open_kwargs
+                )
+            self._prefetched[index] = (future, nbytes)
+            budget -= nbytes
+
+    def _wait_for_write(self, index):
+        """
+        Wait for the background write of a model to complete.
+
+        Parameters
+        ----------
+        index : int
+            Index of the model.
+        """
+        if index in self._pending_writes:
+            future, _ = self._pending_writes.pop(index)
+            future.result()
+
+    def _stop_io(self):
+        """
+        Wait for the background writes, discard prefetched models and stop the threads.
+
+        Returns
+        -------
+        Exception or None
+            The first error raised by a background write, if any.
+        """
+        write_error = None
+        while self._pending_writes:
+            try:
+                self._wait_for_write(next(iter(self._pending_writes)))
+            except Exception as error:
+                write_error = write_error or error
+        for future, _ in self._prefetched.values():
+            if not future.cancel() and future.exception() is None:
+                future.result().close()
+        self._prefetched.clear()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        return write_error
+
     def indices_for_exptype(self, exptype):
         """
         Determine the indices of models corresponding to ``exptype``.
@@ -138,7 +397,7 @@ class ModelLibrary(AbstractModelLibrary):
         """  # noqa: D205  # numpydoc ignore=SS06
         # use read_metadata to read header keywords
         # avoiding the DataModel overhead
-        meta = read_metadata(filename, flatten=False)["meta"]
+        meta = self._read_file_metadata(filename, flatten=False)["meta"]
         if "group_id" in meta.keys():
             return meta["group_id"]
         try:
@@ -250,9 +509,12 @@ class ModelLibrary(AbstractModelLibrary):
 
         # find model in _loaded_models, temp_filenames, or asn_dir
         if self._on_disk:
+            self._wait_for_write(idx)
             if idx in self._temp_filenames:
-                # if model has been modified, find its temp filename
-                filename = self._temp_filenames[idx]
+                # if model has been modified, find its temp filename,
+                # which is not indexed
+                meta = read_metadata(self._temp_filenames[idx], flatten=flatten)
+                return self._assign_member_to_meta(meta, self._members[idx], flatten)
             else:
                 # otherwise, find the filename in the asn_dir
                 member = self._members[idx]
@@ -267,7 +529,7 @@ class ModelLibrary(AbstractModelLibrary):
                 member = self._members[idx]
                 filename = Path(self._asn_dir) / member["expname"]
 
-        meta = read_metadata(filename, flatten=flatten)
+        meta = self._read_file_metadata(filename, flatten)
         meta = self._assign_member_to_meta(meta, self._members[idx], flatten)
         return meta
 
@@ -312,6 +574,51 @@ class ModelLibrary(AbstractModelLibrary):
         return meta
 
 
+def _write_model(model, filename, old_filename):
+    """
+    Write a shelved model to its temporary file.
+
+    Parameters
+    ----------
+    model : `~stdatamodels.jwst.datamodels.JwstDataModel`
+        The model to write.
+    filename : Path
+        The temporary file of the model.
+    old_filename : Path or None
+        The previous temporary file of the model, removed if it differs.
+    """
+    model.save(filename)
+    if old_filename is not None and old_filename != filename:
+        Path(old_filename).unlink()
+
+
+def _model_nbytes(model):
+    """
+    Estimate the memory held by the arrays of a model.
+
+    Parameters
+    ----------
+    model : `~stdatamodels.jwst.datamodels.JwstDataModel`
+        The model.
+
+    Returns
+    -------
+    int
+        The total size of the arrays in the model tree.
+    """
+    nbytes = 0
+    nodes = [model.instance]
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, dict):
+            nodes.extend(node.values())
+        elif isinstance(node, list | tuple):
+            nodes.extend(node)
+        elif isinstance(node, np.ndarray):
+            nbytes += node.nbytes
+    return nbytes
+
+
 def _read_meta_from_open_model(model, flatten):
     """
     Read metadata from an open model.
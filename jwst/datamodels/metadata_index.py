@@ -0,0 +1,262 @@
+"""Index the metadata of the files of an association."""
+
+import copy
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from stdatamodels.jwst.datamodels import read_metadata
+
+log = logging.getLogger(__name__)
+
+__all__ = ["MetadataIndex", "open_metadata_index"]
+
+# Version of the layout of the index files; files of other versions are ignored
+INDEX_VERSION = 2
+
+# Files modified less than this long ago (in ns) are not indexed, since
+# a change within the resolution of the file system timestamps could keep
+# their modification time and size
+RACY_MTIME_NS = 2 * 10**9
+
+# Number of indexes kept open by `open_metadata_index`.  Each holds the
+# metadata of every file it indexes, so this bounds the memory they use
+# in a process that works through many associations.
+MAX_OPEN_INDEXES = 8
+
+# Open indexes by path, least recently used first
+_open_indexes = OrderedDict()
+
+
+def open_metadata_index(path=None, asn_path=None):
+    """
+    Open a metadata index, sharing it with earlier callers.
+
+    Indexes are kept open, so that the steps of a pipeline, and the
+    libraries they create, read the member files of an association only
+    once.  An index is shared by association file if ``asn_path`` is
+    given, and otherwise by index file.  At most ``MAX_OPEN_INDEXES`` are
+    kept; beyond that, the least recently used are dropped, and read again
+    from their files when next opened.
+
+    Parameters
+    ----------
+    path : str, `~pathlib.Path`, or None, optional
+        The index file name.  If `None`, the index is held in memory.
+    asn_path : str, `~pathlib.Path`, or None, optional
+        The association file whose members are indexed.
+
+    Returns
+    -------
+    MetadataIndex
+        The index.
+    """
+    if path is not None:
+        path = Path(path).absolute()
+    if asn_path is not None:
+        key = ("asn", Path(asn_path).absolute())
+    elif path is not None:
+        key = ("file", path)
+    else:
+        return MetadataIndex()
+
+    index = _open_indexes.get(key)
+    if index is not None and path is not None and index.path != path:
+        if index.path is None:
+            # keep the metadata already read, and save it in the file
+            index.attach(path)
+        else:
+            index = None
+    if index is None:
+        index = MetadataIndex(path)
+        _open_indexes[key] = index
+        while len(_open_indexes) > MAX_OPEN_INDEXES:
+            _open_indexes.popitem(last=False)
+    _open_indexes.move_to_end(key)
+    return index
+
+
+def _flatten(tree):
+    # Flatten a metadata tree as `~stdatamodels.jwst.datamodels.read_metadata`
+    # does, so that both views of a file are indexed from a single read.
+    flat = {}
+
+    def recurse(subtree, path):
+        if isinstance(subtree, dict):
+            for key, value in subtree.items():
+                if key != "wcs":
+                    recurse(value, path + [key])
+        elif isinstance(subtree, list | tuple):
+            for i, item in enumerate(subtree):
+                indexed_key = f"{path[-1]}.{i}" if path else str(i)
+                recurse(item, path[:-1] + [indexed_key])
+        else:
+            flat[".".join(path)] = subtree
+
+    recurse(tree, [])
+    return flat
+
+
+def _is_json_exact(value):
+    # Only values that survive a round trip through JSON unchanged are
+    # indexed, so that the index never alters the metadata.
+    try:
+        return json.loads(json.dumps(value)) == value
+    except (TypeError, ValueError):
+        return False
+
+
+class MetadataIndex:
+    """
+    Index of the metadata read from model files.
+
+    The metadata tree of each file, as returned by
+    `~stdatamodels.jwst.datamodels.read_metadata`, is stored together
+    with the size and modification time of the file, and read again
+    if either of them changes.  The flat view of the metadata is made
+    from the same tree, so each file is read once for both views.
+    Recently modified files are not indexed.  The index can be saved to
+    a JSON file, so that it is shared between runs.
+    """
+
+    def __init__(self, path=None):
+        """
+        Initialize the index.
+
+        Parameters
+        ----------
+        path : str, `~pathlib.Path`, or None, optional
+            The file in which the index is saved.  It is read when the
+            index is first used.  If `None`, the index is held in memory.
+        """
+        self.path = None if path is None else Path(path)
+        self._entries = None
+        self._modified = False
+
+    def _read_entries(self):
+        try:
+            with self.path.open() as fh:
+                index = json.load(fh)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as err:
+            log.warning(f"Could not read the metadata index {self.path}: {err}")
+            return {}
+
+        if isinstance(index, dict) and index.get("version") == INDEX_VERSION:
+            entries = index.get("entries")
+            if isinstance(entries, dict):
+                return {key: entry for key, entry in entries.items() if isinstance(entry, dict)}
+        return {}
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = {} if self.path is None else self._read_entries()
+        return self._entries
+
+    def attach(self, path):
+        """
+        Save an index held in memory in a file from now on.
+
+        The entries of the file are added to those of the index, which
+        take precedence.
+
+        Parameters
+        ----------
+        path : str or `~pathlib.Path`
+            The file in which the index is saved.
+        """
+        entries = self._load()
+        self.path = Path(path)
+        self._entries = self._read_entries()
+        self._entries.update(entries)
+        self._modified = bool(entries)
+
+    def read_metadata(self, filename, flatten=True):
+        """
+        Read the metadata of a file, from the index if it is current.
+
+        Parameters
+        ----------
+        filename : str or `~pathlib.Path`
+            The file name.
+        flatten : bool, optional
+            If True, return the metadata as a flat dictionary with
+            dotted keys, otherwise as a nested dictionary.
+
+        Returns
+        -------
+        dict
+            The metadata, as returned by
+            `~stdatamodels.jwst.datamodels.read_metadata`.  The caller
+            may modify it.
+        """
+        key = str(Path(filename).resolve())
+        try:
+            stat = Path(key).stat()
+        except OSError:
+            # let read_metadata report the missing file
+            return read_metadata(filename, flatten=flatten)
+
+        if time.time_ns() - stat.st_mtime_ns < RACY_MTIME_NS:
+            return read_metadata(filename, flatten=flatten)
+
+        entries = self._load()
+        entry = entries.get(key)
+        if (
+            entry is None
+            or entry.get("size") != stat.st_size
+            or entry.get("mtime_ns") != stat.st_mtime_ns
+        ):
+            entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            entries[key] = entry
+            self._modified = True
+
+        tree = entry.get("tree")
+        if tree is None:
+            tree = read_metadata(filename, flatten=False)
+            if not _is_json_exact(tree):
+                return _flatten(tree) if flatten else tree
+            entry["tree"] = copy.deepcopy(tree)
+            self._modified = True
+        return _flatten(tree) if flatten else copy.deepcopy(tree)
+
+    def save(self):
+        """
+        Write the index to its file, if it has changed.
+
+        Entries written to the file by other indexes since it was read
+        are kept.
+        """
+        if self.path is None or not self._modified:
+            return
+
+        entries = self._read_entries()
+        entries.update(self._entries)
+        self._entries = entries
+
+        # Write to a temporary file first, so that readers never see
+        # a partial index.
+        index = {"version": INDEX_VERSION, "entries": entries}
+        temp_name = None
+        try:
+            fd, temp_name = tempfile.mkstemp(
+                dir=self.path.parent, prefix=f"{self.path.name}.", suffix=".tmp"
+            )
+            with os.fdopen(fd, "w") as fh:
+                json.dump(index, fh, separators=(",", ":"))
+            Path(temp_name).replace(self.path)
+        except OSError as err:
+            # the directory of the association may be read-only
+            log.debug(f"Could not write the metadata index {self.path}: {err}")
+            if temp_name is not None:
+                Path(temp_name).unlink(missing_ok=True)
+            return
+        self._modified = False
+
+    def __len__(self):
+        return len(self._load())
@@ -1,4 +1,7 @@
 import json
+import os
+import time
+from collections import OrderedDict
 from datetime import datetime
 
 import gwcs
@@ -8,14 +11,16 @@ import stdatamodels.jwst.datamodels
 from astropy.modeling.models import Identity
 from astropy.time import Time
 from gwcs import coordinate_frames as cf
-from stdatamodels.jwst.datamodels import ImageModel
+from stdatamodels.jwst.datamodels import ImageModel, read_metadata
 from stdatamodels.jwst.datamodels.util import _to_flat_dict
-from stpipe.library import BorrowError, NoGroupID
+from stpipe.library import BorrowError, ClosedLibraryError, NoGroupID
 
 import jwst.datamodels as dm
 from jwst.associations.asn_from_list import asn_from_list
 from jwst.associations.load_as_asn import load_asn
+from jwst.datamodels import metadata_index
 from jwst.datamodels.library import ModelLibrary, _read_meta_from_open_model
+from jwst.stpipe import Step
 
 # for the example association, set 2 different observation numbers
 # so the association will have 2 groups (since all other group_id
@@ -353,3 +358,139 @@ def test_model_to_group_id(example_library):
             example_library._model_to_group_id(model)
 
         example_library.shelve(model, 0, modify=False)
+
+
+@pytest.mark.parametrize("write_behind_bytes", [0, 1, 10**9])
+@pytest.mark.parametrize("prefetch_bytes", [0, 10**9])
+def test_async_io(example_asn_path, prefetch_bytes, write_behind_bytes):
+    """Test that prefetching and write-behind give the same models as synchronous I/O."""
+    library = ModelLibrary(
+        example_asn_path,
+        on_disk=True,
+        prefetch_bytes=prefetch_bytes,
+        write_behind_bytes=write_behind_bytes,
+    )
+    for n_pass in range(2):
+        with library:
+            for i, model in enumerate(library):
+                assert model.meta.asn.pool_name == _POOL_NAME
+                np.testing.assert_array_equal(model.data, n_pass * (i + 1))
+                model.data += i + 1
+                model.meta.filename = f"pass{n_pass}_{i}.fits"
+                library.shelve(model, i)
+
+            # shelved models can be read again before they are all written
+            model = library.borrow(0)
+            np.testing.assert_array_equal(model.data, (n_pass + 1))
+            library.shelve(model, 0, modify=False)
+            assert library.read_metadata(1)["meta.filename"] == f"pass{n_pass}_1.fits"
+
+    # all writes are complete when the library is closed, and old files removed
+    assert library._executor is None
+    assert not library._pending_writes
+    assert not library._prefetched
+    for i in range(_N_MODELS):
+        assert sorted(p.name for p in (library._temp_path / str(i)).iterdir()) == [
+            f"pass1_{i}.fits"
+        ]
+
+
+def test_prefetch_bytes(example_asn_path):
+    """Test that models are only prefetched within the prefetch size."""
+    file_size = (example_asn_path.parent / "0.fits").stat().st_size
+    library = ModelLibrary(example_asn_path, on_disk=True, prefetch_bytes=file_size)
+    with library:
+        model = library.borrow(0)
+        assert list(library._prefetched) == [1]
+        library.shelve(model, 0, modify=False)
+
+        # a borrowed model is not prefetched
+        model = library.borrow(2)
+        assert list(library._prefetched) == [1]
+        model1 = library.borrow(1)
+        assert not library._prefetched
+        library.shelve(model1, 1, modify=False)
+        library.shelve(model, 2, modify=False)
+
+    library = ModelLibrary(example_asn_path, on_disk=True, prefetch_bytes=file_size - 1)
+    with library:
+        model = library.borrow(0)
+        assert not library._prefetched
+        library.shelve(model, 0, modify=False)
+
+
+def test_async_io_borrow_errors(example_asn_path):
+    library = ModelLibrary(
+        example_asn_path, on_disk=True, prefetch_bytes=10**9, write_behind_bytes=10**9
+    )
+    with pytest.raises(ClosedLibraryError):
+        library.borrow(0)
+    with library:
+        model = library.borrow(0)
+        with pytest.raises(BorrowError, match="double-borrow"):
+            library.borrow(0)
+        with pytest.raises(BorrowError, match="unknown model"):
+            library.shelve(ImageModel((2, 2)))
+        library.shelve(model)
+
+
+def test_metadata_index(example_asn_path, tmp_path, monkeypatch):
+    """
+    Test that the metadata read from the member files is saved in an
+    index file, and used by later libraries using the same file.
+    """
+    mtime = time.time() - 10
+    for i in range(_N_MODELS):
+        os.utime(example_asn_path.parent / f"{i}.fits", (mtime, mtime))
+    monkeypatch.setattr(metadata_index, "_open_indexes", OrderedDict())
+
+    # by default, the index is only kept in memory
+    asn_dir_files = set(example_asn_path.parent.iterdir())
+    ModelLibrary(example_asn_path).get_crds_parameters()
+    assert set(example_asn_path.parent.iterdir()) == asn_dir_files
+
+    index_path = tmp_path / "index.json"
+    library = ModelLibrary(example_asn_path, metadata_index=index_path)
+    group_names = library.group_names
+    crds_parameters = library.get_crds_parameters()
+    assert index_path.exists()
+
+    # a new library only reads the index
+    def no_read(*args, **kwargs):
+        raise AssertionError("Member file was read")
+
+    monkeypatch.setattr(metadata_index, "_open_indexes", OrderedDict())
+    monkeypatch.setattr(metadata_index, "read_metadata", no_read)
+    library = ModelLibrary(
+        example_asn_path, asn_n_members=1, asn_exptypes=["science"], metadata_index=index_path
+    )
+    assert library.get_crds_parameters() == crds_parameters
+    assert ModelLibrary(example_asn_path, metadata_index=str(index_path)).group_names == group_names
+
+    index_path.unlink()
+    monkeypatch.setattr(metadata_index, "read_metadata", read_metadata)
+    ModelLibrary(example_asn_path, metadata_index=False).get_crds_parameters()
+    assert not index_path.exists()
+
+
+def test_metadata_index_shared(example_asn_path, monkeypatch):
+    """
+    Test that libraries of the same association share their metadata
+    index, including the one used for the CRDS parameters of a step.
+    """
+    mtime = time.time() - 10
+    for i in range(_N_MODELS):
+        os.utime(example_asn_path.parent / f"{i}.fits", (mtime, mtime))
+    monkeypatch.setattr(metadata_index, "_open_indexes", OrderedDict())
+
+    crds_parameters, _ = Step._get_crds_parameters(str(example_asn_path))
+    group_names = ModelLibrary(example_asn_path).group_names
+
+    def no_read(*args, **kwargs):
+        raise AssertionError("Member file was read")
+
+    monkeypatch.setattr(metadata_index, "read_metadata", no_read)
+    assert Step._get_crds_parameters(example_asn_path)[0] == crds_parameters
+    library = ModelLibrary(str(example_asn_path), asn_n_members=1, asn_exptypes=["science"])
+    assert library.get_crds_parameters() == crds_parameters
+    assert ModelLibrary(example_asn_path).group_names == group_names
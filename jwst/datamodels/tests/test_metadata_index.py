@@ -0,0 +1,170 @@
+import logging
+import os
+import time
+from collections import OrderedDict
+
+import pytest
+from stdatamodels.jwst.datamodels import ImageModel, read_metadata
+
+from jwst.datamodels import metadata_index
+from jwst.datamodels.metadata_index import MetadataIndex, open_metadata_index
+
+
+def make_file(path, instrument="NIRCAM", age=10):
+    model = ImageModel((10, 10))
+    model.meta.instrument.name = instrument
+    model.meta.observation.program_number = "0001"
+    model.save(path)
+    model.close()
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+@pytest.fixture
+def model_file(tmp_path):
+    return make_file(tmp_path / "model.fits")
+
+
+def no_read(*args, **kwargs):
+    raise AssertionError("File was read")
+
+
+@pytest.mark.parametrize("flatten", [True, False])
+def test_read_metadata(model_file, monkeypatch, flatten):
+    """Test that indexed metadata is read once, and returned as a copy."""
+    expected = read_metadata(model_file, flatten=flatten)
+    index = MetadataIndex()
+    assert index.read_metadata(model_file, flatten=flatten) == expected
+
+    monkeypatch.setattr(metadata_index, "read_metadata", no_read)
+    meta = index.read_metadata(model_file, flatten=flatten)
+    assert meta == expected
+    meta.clear()
+    assert index.read_metadata(model_file, flatten=flatten) == expected
+
+
+def test_read_metadata_views(model_file, monkeypatch):
+    """Test that the flat and tree views of a file are indexed from one read."""
+    expected_flat = read_metadata(model_file, flatten=True)
+    expected_tree = read_metadata(model_file, flatten=False)
+    reads = []
+
+    def counted_read(*args, **kwargs):
+        reads.append(args)
+        return read_metadata(*args, **kwargs)
+
+    monkeypatch.setattr(metadata_index, "read_metadata", counted_read)
+    index = MetadataIndex()
+    assert index.read_metadata(model_file, flatten=False) == expected_tree
+    assert index.read_metadata(model_file, flatten=True) == expected_flat
+    assert len(reads) == 1
+
+
+def test_save(tmp_path, model_file, monkeypatch):
+    """Test that a saved index is shared with later instances."""
+    index_path = tmp_path / "index.json"
+    index = MetadataIndex(index_path)
+    expected = index.read_metadata(model_file)
+    index.save()
+    assert index_path.exists()
+
+    monkeypatch.setattr(metadata_index, "read_metadata", no_read)
+    index = MetadataIndex(index_path)
+    assert len(index) == 1
+    assert index.read_metadata(model_file) == expected
+
+
+def test_modified_file(tmp_path, model_file):
+    """Test that the metadata of a file is read again when the file changes."""
+    index = MetadataIndex()
+    assert index.read_metadata(model_file)["meta.instrument.name"] == "NIRCAM"
+
+    make_file(model_file, instrument="MIRI", age=5)
+    assert index.read_metadata(model_file)["meta.instrument.name"] == "MIRI"
+    assert len(index) == 1
+
+
+def test_recent_file(tmp_path, monkeypatch):
+    """Test that files modified within the timestamp resolution are not indexed."""
+    model_file = make_file(tmp_path / "model.fits", age=0)
+    index = MetadataIndex()
+    index.read_metadata(model_file)
+    assert len(index) == 0
+
+    monkeypatch.setattr(metadata_index, "RACY_MTIME_NS", 0)
+    index.read_metadata(model_file)
+    assert len(index) == 1
+
+
+def test_not_json(model_file, monkeypatch):
+    """Test that metadata changed by a round trip through JSON is not indexed."""
+    monkeypatch.setattr(metadata_index, "read_metadata", lambda *args, **kwargs: {"a": (1, 2)})
+    index = MetadataIndex()
+    assert index.read_metadata(model_file, flatten=False) == {"a": (1, 2)}
+    assert index.read_metadata(model_file) == {"a.0": 1, "a.1": 2}
+    assert "tree" not in index._entries[str(model_file.resolve())]
+
+
+def test_invalid_index(tmp_path, model_file, caplog):
+    """Test that an unreadable index file is replaced."""
+    index_path = tmp_path / "index.json"
+    index_path.write_text("not json")
+    index = MetadataIndex(index_path)
+    with caplog.at_level(logging.WARNING):
+        assert index.read_metadata(model_file) == read_metadata(model_file)
+    assert "Could not read the metadata index" in caplog.text
+
+    index.save()
+    assert len(MetadataIndex(index_path)) == 1
+
+
+def test_open_metadata_index(tmp_path, monkeypatch):
+    """Test that open indexes are shared, up to a maximum number."""
+    monkeypatch.setattr(metadata_index, "_open_indexes", OrderedDict())
+    monkeypatch.setattr(metadata_index, "MAX_OPEN_INDEXES", 2)
+    index = open_metadata_index(tmp_path / "a.json")
+    assert open_metadata_index(str(tmp_path / "a.json")) is index
+
+    open_metadata_index(tmp_path / "b.json")
+    open_metadata_index(tmp_path / "c.json")
+    assert open_metadata_index(tmp_path / "a.json") is not index
+
+    # without a file or association, nothing is shared
+    assert open_metadata_index() is not open_metadata_index()
+
+
+def test_open_metadata_index_asn(tmp_path, model_file, monkeypatch):
+    """Test that an index is shared by association, and saved once given a file."""
+    monkeypatch.setattr(metadata_index, "_open_indexes", OrderedDict())
+    asn_path = tmp_path / "asn.json"
+    index = open_metadata_index(asn_path=asn_path)
+    assert index.path is None
+    expected = index.read_metadata(model_file)
+
+    monkeypatch.setattr(metadata_index, "read_metadata", no_read)
+    assert open_metadata_index(asn_path=str(asn_path)) is index
+
+    # the metadata already read is saved in the file
+    index_path = tmp_path / "index.json"
+    assert open_metadata_index(index_path, asn_path=asn_path) is index
+    index.save()
+    assert MetadataIndex(index_path).read_metadata(model_file) == expected
+
+    # a different file opens a new index
+    other = open_metadata_index(tmp_path / "other.json", asn_path=asn_path)
+    assert other is not index
+    assert open_metadata_index(asn_path=asn_path) is other
+
+
+def test_save_merge(tmp_path, model_file):
+    """Test that indexes saved in the same file keep each other's entries."""
+    other_file = make_file(tmp_path / "other.fits")
+    index_path = tmp_path / "index.json"
+    index1 = MetadataIndex(index_path)
+    index2 = MetadataIndex(index_path)
+    index1.read_metadata(model_file)
+    index2.read_metadata(other_file)
+    index1.save()
+    index2.save()
+    assert len(MetadataIndex(index_path)) == 2
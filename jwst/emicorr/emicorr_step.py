@@ -25,6 +25,7 @@ class EmiCorrStep(Step):
         onthefly_corr_freq = float_list(default=None)  # Frequencies to use for correction
         use_n_cycles = integer(default=3)  # Use N cycles to calculate the phase, to use all integrations set to None
         fit_ints_separately = boolean(default=False)  # If True and algorithm is 'joint', each integration is separately fit.
+        ints_per_block = integer(min=1, default=None)  # Number of integrations to process at a time, to limit memory use. If None, all integrations are processed at once.
         save_intermediate_results = boolean(default=False)  # If True and a reference file is created on the fly, save it to disk
         skip = boolean(default=True)  # Skip the step
     """  # noqa: E501
@@ -71,6 +72,7 @@ class EmiCorrStep(Step):
             "onthefly_corr_freq": self.onthefly_corr_freq,
             "use_n_cycles": self.use_n_cycles,
             "fit_ints_separately": self.fit_ints_separately,
+            "ints_per_block": self.ints_per_block,
         }
 
         # Get the reference file
@@ -4,6 +4,8 @@ import warnings
 
 import numpy as np
 import pytest
+from astropy.stats import sigma_clipped_stats
+from scipy import interpolate
 from stdatamodels.jwst.datamodels import EmiModel, Level1bModel, RampModel
 
 from jwst.emicorr import emicorr, emicorr_step
@@ -403,6 +405,23 @@ def test_apply_emicorr(data_without_emi, data_with_emi, model_with_emi, algorith
     assert np.allclose(outmdl.data, expected_model.data, rtol=accuracy)
 
 
+@pytest.mark.parametrize("algorithm", ["sequential", "joint"])
+@pytest.mark.parametrize("fit_ints_separately", [False, True])
+def test_apply_emicorr_ints_per_block(
+    data_with_emi_3int, model_with_emi, algorithm, fit_ints_separately
+):
+    input_model = mk_data_mdl(data_with_emi_3int, "FULL", "FAST", "MIRIMAGE")
+    pars = {"algorithm": algorithm, "fit_ints_separately": fit_ints_separately}
+    expected = emicorr.apply_emicorr(input_model.copy(), model_with_emi, **pars)
+
+    # Results do not depend on the number of integrations processed at a time
+    for ints_per_block in [1, 2]:
+        outmdl = emicorr.apply_emicorr(
+            input_model.copy(), model_with_emi, ints_per_block=ints_per_block, **pars
+        )
+        assert np.allclose(outmdl.data, expected.data, rtol=1e-6, atol=0)
+
+
 def test_apply_emicorr_separate_ints(data_without_emi_3int, data_with_emi_3int, model_with_emi):
     input_model = mk_data_mdl(data_with_emi_3int, "FULL", "FAST", "MIRIMAGE")
     expected_model = mk_data_mdl(data_without_emi_3int, "FULL", "FAST", "MIRIMAGE")
@@ -585,6 +604,100 @@ def test_minmed_ignore_nans():
     assert np.all(medimg.flat[3:] == 0.3)
 
 
+@pytest.mark.parametrize("colstop", [72, 258])
+def test_pixel_times(colstop):
+    nints, ngroups, ny, nx4 = 2, 3, 4, 5
+    nsamples, rowclocks, frameclocks = 9, 28, 8512
+    extra_rowclocks = (1024.0 - ny) * (4 + 3.0)
+    times = emicorr._pixel_times(
+        nints, ngroups, ny, nx4, nsamples, rowclocks, extra_rowclocks, frameclocks, colstop
+    )
+
+    # Count up the read times pixel by pixel
+    expected = np.zeros((nints, ngroups, ny, nx4))
+    start_time = 0
+    for i in range(nints):
+        for k in range(ngroups):
+            for j in range(ny):
+                expected[i, k, j] = np.arange(nx4) * nsamples + start_time
+                if colstop == 258:
+                    expected[i, k, j, -1] += 3 + 2**32
+                start_time += rowclocks
+            start_time += extra_rowclocks
+        start_time += frameclocks
+
+    assert np.array_equal(times, expected)
+
+
+def test_pixel_times_first_int():
+    nints, ngroups, ny, nx4 = 5, 3, 4, 5
+    pars = (9, 28, (1024.0 - ny) * (4 + 3.0), 8512, 72)
+    times = emicorr._pixel_times(nints, ngroups, ny, nx4, *pars)
+    block_times = emicorr._pixel_times(2, ngroups, ny, nx4, *pars, first_int=3)
+    assert np.array_equal(block_times, times[3:5])
+
+
+@pytest.mark.parametrize(
+    "ints_per_block,expected",
+    [(None, [(0, 5)]), (2, [(0, 2), (2, 4), (4, 5)]), (5, [(0, 5)]), (10, [(0, 5)])],
+)
+def test_int_blocks(ints_per_block, expected):
+    assert emicorr._int_blocks(5, ints_per_block) == expected
+
+
+def test_binned_phase_amplitudes():
+    rng = np.random.default_rng(42)
+    nbins = 20
+    phase = rng.random((3, 4, 10, 10))
+    # Include values on the bin edges, and at zero phase
+    phase.flat[:nbins] = np.arange(nbins) / nbins
+    data = rng.normal(0, 1, phase.shape).astype(np.float32)
+    data.flat[::97] = 100.0
+
+    # Bin the first integration, then the rest
+    binned_values = [[] for _ in range(nbins)]
+    for block in [slice(0, 1), slice(1, 3)]:
+        for nb, values in enumerate(emicorr._phase_bins(phase[block], data[block], nbins)):
+            binned_values[nb].append(values)
+    pa = emicorr._binned_phase_amplitudes(binned_values)
+
+    # Compare to sigma-clipped means of each bin, selected by mask
+    expected = np.zeros(nbins)
+    for nb in range(nbins):
+        in_bin = (phase > nb / nbins) & (phase <= (nb + 1) / nbins)
+        expected[nb], _, _ = sigma_clipped_stats(data[in_bin].astype(np.float64))
+    assert np.array_equal(pa, expected)
+
+
+def test_emifitter_add_integrations():
+    rng = np.random.default_rng(42)
+    nints, nphases, ngroups = 4, 20, 5
+    all_y = rng.normal(0, 1, (nints, nphases, ngroups))
+    all_n = rng.integers(1, 10, (nints, nphases)).astype(float)
+    refwave = np.sin(2 * np.pi * np.arange(nphases) / nphases)
+    phasefunc = interpolate.interp1d(
+        (np.arange(nphases + 2) - 0.5) / nphases,
+        np.concatenate([refwave[-1:], refwave, refwave[:1]]),
+        kind="cubic",
+    )
+    phases_template = ((np.arange(nphases) + 0.5)[:, None] / nphases + np.arange(ngroups) * 0.3) % 1
+    phaselist = np.arange(50) / 50
+    pars = (phasefunc, phases_template, phaselist, 0.25)
+
+    emifitter = emicorr.EMIfitter(all_y, all_n, *pars)
+    blocked = emicorr.EMIfitter(all_y[:1], all_n[:1], *pars)
+    blocked.add_integrations(all_y[1:], all_n[1:])
+    assert blocked.nints == nints
+    assert np.allclose(blocked.a_terms, emifitter.a_terms, rtol=1e-12, atol=0)
+    assert np.allclose(blocked.b_terms, emifitter.b_terms, rtol=1e-12, atol=0)
+
+    # Phases match as for a direct search, including phases on the phaselist
+    phases = np.concatenate([phaselist, rng.random(50)])
+    for phase_diff in [0.0, 0.25, 0.75, 1.5]:
+        expected = [np.argmin((phaselist - phase - phase_diff) % 1) for phase in phases]
+        assert np.array_equal(emifitter.phase_index(phases, phase_diff), expected)
+
+
 def test_rebin_shrink():
     data = np.ones(10)
     data[1] = 0.55
@@ -66,6 +66,13 @@ HORIZONTAL = 1
 VERTICAL = 2
 """Vertical dispersion axis."""
 
+BLOCK_PIXELS = 2**17
+"""Approximate number of pixels in a block of integrations extracted together.
+
+Larger blocks share more of the aperture fits between integrations, but
+the working arrays of a block should stay small enough to remain in cache.
+"""
+
 # These values are assigned in get_extract_parameters, using key "match".
 # If there was an aperture in the reference file for which the "id" key matched,
 # that's (at least) a partial match.
@@ -1308,12 +1315,14 @@ def extract_one_slit(data_model, integration, profile, bg_profile, nod_profile,
         `~stdatamodels.jwst.datamodels.ImageModel`,
         `~stdatamodels.jwst.datamodels.SlitModel`,
         or `~stdatamodels.jwst.datamodels.CubeModel`.
-    integration : int
+    integration : int or slice
         For the case that ``data_model`` is a
         `~stdatamodels.jwst.datamodels.SlitModel` or a
         `~stdatamodels.jwst.datamodels.CubeModel`,
         ``integration`` is the integration number.  If the integration number is
         not relevant (i.e., the data array is 2-D), ``integration`` should be -1.
+        If a slice, the selected integrations are extracted together, and
+        each return value has an additional leading integration axis.
     profile : ndarray of float
         Spatial profile indicating the aperture location. Must be a
         2D image matching the input, with floating point values between 0
@@ -1382,22 +1391,34 @@ def extract_one_slit(data_model, integration, profile, bg_profile, nod_profile,
     var_poisson = data_model.var_poisson
     var_flat = data_model.var_flat
 
-    if integration > -1:
+    select = isinstance(integration, slice) or integration > -1
+    if isinstance(integration, slice):
+        start, stop, _ = integration.indices(data.shape[0])
+        log.debug(f"Extracting integrations {start + 1} to {stop}")
+        data = data[integration]
+
+        # Use the same aperture for each integration, laid out in memory
+        # like the data, so that results match extracting them one at a time.
+        profile, bg_profile, nod_profile = (
+            None if array is None else np.ascontiguousarray(np.broadcast_to(array, data.shape))
+            for array in (profile, bg_profile, nod_profile)
+        )
+    elif integration > -1:
         log.debug(f"Extracting integration {integration + 1}")
         data = data[integration]
 
     # Make sure variances match data
-    if var_rnoise is None or var_rnoise.shape[-2:] != data.shape:
+    if var_rnoise is None or var_rnoise.shape[-2:] != data.shape[-2:]:
         var_rnoise = np.zeros_like(data)
-    elif integration > -1:
+    elif select:
         var_rnoise = var_rnoise[integration]
-    if var_poisson is None or var_poisson.shape[-2:] != data.shape:
+    if var_poisson is None or var_poisson.shape[-2:] != data.shape[-2:]:
         var_poisson = np.zeros_like(data)
-    elif integration > -1:
+    elif select:
         var_poisson = var_poisson[integration]
-    if var_flat is None or var_flat.shape[-2:] != data.shape:
+    if var_flat is None or var_flat.shape[-2:] != data.shape[-2:]:
         var_flat = np.zeros_like(data)
-    elif integration > -1:
+    elif select:
         var_flat = var_flat[integration]
 
     # Transpose data for extraction
@@ -1408,18 +1429,24 @@ def extract_one_slit(data_model, integration, profile, bg_profile, nod_profile,
         else:
             profiles = [profile]
     else:
-        data = data.T
-        var_rnoise = var_rnoise.T
-        var_poisson = var_poisson.T
-        var_flat = var_flat.T
+        # Copy the transposed arrays to C order, so that sums along the
+        # cross-dispersion direction are computed in the same order for
+        # a single integration and for a block of integrations.
+        data, var_rnoise, var_poisson, var_flat = (
+            np.ascontiguousarray(np.swapaxes(array, -1, -2))
+            for array in (data, var_rnoise, var_poisson, var_flat)
+        )
         if bg_profile is not None:
-            bg_profile_view = bg_profile.T
+            bg_profile_view = np.ascontiguousarray(np.swapaxes(bg_profile, -1, -2))
         else:
             bg_profile_view = None
         if nod_profile is not None:
-            profiles = [profile.T, nod_profile.T]
+            profiles = [
+                np.ascontiguousarray(np.swapaxes(profile, -1, -2)),
+                np.ascontiguousarray(np.swapaxes(nod_profile, -1, -2)),
+            ]
         else:
-            profiles = [profile.T]
+            profiles = [np.ascontiguousarray(np.swapaxes(profile, -1, -2))]
 
     # Extract spectra from the data
     result = extract1d.extract1d(
@@ -1451,11 +1478,54 @@ def extract_one_slit(data_model, integration, profile, bg_profile, nod_profile,
         first_result.append(scene_model)
         first_result.append(residual)
     else:
-        first_result.append(scene_model.T)
-        first_result.append(residual.T)
+        first_result.append(np.swapaxes(scene_model, -1, -2))
+        first_result.append(np.swapaxes(residual, -1, -2))
     return first_result
 
 
+def _extract_integrations(
+    data_model, integrations, profile, bg_profile, nod_profile, extract_params
+):
+    """
+    Extract integrations in blocks that share the aperture.
+
+    Parameters
+    ----------
+    data_model : `~stdatamodels.jwst.datamodels.JwstDataModel`
+        The input science model, as for `extract_one_slit`.
+    integrations : list of int or range
+        The integrations to extract, or ``[-1]`` for 2D data.
+    profile, bg_profile, nod_profile : ndarray or None
+        The spatial profiles, as for `extract_one_slit`.
+    extract_params : dict
+        The extraction parameters, as for `extract_one_slit`.
+
+    Yields
+    ------
+    integration : int
+        The integration number.
+    result : list of ndarray
+        The values returned by `extract_one_slit` for this integration.
+    """
+    if integrations[0] == -1:
+        yield -1, extract_one_slit(data_model, -1, profile, bg_profile, nod_profile, extract_params)
+        return
+
+    block_size = max(1, BLOCK_PIXELS // np.prod(data_model.data.shape[-2:]))
+    for start in range(0, len(integrations), block_size):
+        block = integrations[start : start + block_size]
+        result = extract_one_slit(
+            data_model,
+            slice(block[0], block[-1] + 1),
+            profile,
+            bg_profile,
+            nod_profile,
+            extract_params,
+        )
+        for i, integ in enumerate(block):
+            yield integ, [array[i] for array in result]
+
+
 def create_extraction(
     input_model,
     slit,
@@ -1494,7 +1564,8 @@ def create_extraction(
        the output spectrum.
     3. Set up an aperture correction to apply to each spectrum,
        if ``apcorr_ref_model`` is not None.
-    4. Loop over integrations to extract all spectra.
+    4. Loop over integrations to extract all spectra.  Integrations
+       are extracted in blocks that share the aperture.
 
     For each integration, the extraction process is:
 
@@ -1741,7 +1812,10 @@ def create_extraction(
 
     # Extract each integration
     spec_list = []
-    for integ in integrations:
+    extractions = _extract_integrations(
+        data_model, integrations, profile, bg_profile, nod_profile, extract_params
+    )
+    for integ, result in extractions:
         (
             sum_flux,
             f_var_rnoise,
@@ -1754,7 +1828,7 @@ def create_extraction(
             npixels,
             scene_model_2d,
             residual_2d,
-        ) = extract_one_slit(data_model, integ, profile, bg_profile, nod_profile, extract_params)
+        ) = result
 
         # Save the scene model and residual
         if save_scene_model:
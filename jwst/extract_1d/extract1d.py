@@ -6,7 +6,7 @@ from astropy import convolution
 __all__ = ["extract1d"]
 
 
-def build_coef_matrix(image, profiles_2d=None, profile_bg=None, weights=None, order=0):
+def build_coef_matrix(image, profiles_2d=None, profile_bg=None, weights=None, order=0, nints=None):
     """
     Build matrices and vectors to enable least-squares fits.
 
@@ -31,6 +31,10 @@ def build_coef_matrix(image, profiles_2d=None, profile_bg=None, weights=None, or
     order : int, optional
         Polynomial order for fitting to each column of background.
         Default 0 (uniform background).
+    nints : int or None, optional
+        If set, the image holds this many integrations side by side
+        (see `_stack_integrations`).  Matrices of columns matching the
+        same column in the first integration are computed once.
 
     Returns
     -------
@@ -84,12 +88,104 @@ def build_coef_matrix(image, profiles_2d=None, profile_bg=None, weights=None, or
     # Products of the coefficient matrices suitable for passing to
     # linalg.solve.  These are matrices of size (npixels, npar, npar)
     # and (npixels, npar).
-    matrix = np.einsum("lji,ljk->lik", coefmatrix_masked, coefmatrix_masked)  # codespell:ignore
+    index, inverse = _shared_columns(coefmatrix_masked, weights, nints)
+    shared = coefmatrix_masked[index]
+    matrix = np.einsum("lji,ljk->lik", shared, shared)[inverse]  # codespell:ignore
     vec = np.einsum("lji,lj->li", coefmatrix_masked, targetvector)
 
     return matrix, vec, coefmatrix, coefmatrix_masked
 
 
+def _shared_columns(coefmatrix_masked, weights, nints):
+    """
+    Find columns of stacked integrations with the same fit as the first integration.
+
+    The aperture is the same for all integrations, so a column usually has
+    the same masked coefficient matrix and weights in every integration,
+    unless the pixels used differ.  Columns are compared bit for bit, so
+    that sharing their fits does not change the results.
+
+    Parameters
+    ----------
+    coefmatrix_masked : ndarray
+        Masked coefficient matrix, shape (npixels, npixels_y, npar), as
+        returned by `build_coef_matrix`.
+    weights : ndarray or None
+        2D weights for the individual pixels, transposed with respect to
+        ``coefmatrix_masked``.
+    nints : int or None
+        The number of integrations stacked side by side.
+
+    Returns
+    -------
+    index : ndarray of int
+        The columns for which to compute fits.
+    inverse : ndarray of int
+        For each column, the position in ``index`` of the column with the
+        same fit.
+    """
+    width = coefmatrix_masked.shape[0]
+    if nints is None or nints == 1:
+        index = np.arange(width)
+        return index, index
+
+    ncols = width // nints
+    key = np.ascontiguousarray(coefmatrix_masked).view(np.uint64)
+    key = key.reshape(nints, ncols, -1)
+    same = np.all(key == key[0], axis=-1)
+    if weights is not None:
+        weights = _unstack_integrations(np.asarray(weights, dtype=np.float64), nints)
+        key = np.ascontiguousarray(weights.transpose(0, 2, 1)).view(np.uint64)
+        same &= np.all(key == key[0], axis=-1)
+    same = same.ravel()
+    same[:ncols] = False
+
+    index = np.flatnonzero(~same)
+    inverse = np.empty(width, dtype=np.intp)
+    inverse[index] = np.arange(len(index))
+    inverse[same] = np.flatnonzero(same) % ncols
+    return index, inverse
+
+
+def _fit_weights(matrix, coefmatrix_masked, weights, nints):
+    """
+    Compute the covariances and pixel weights of the column-by-column fits.
+
+    Parameters
+    ----------
+    matrix : ndarray
+        Design matrix for each column, shape (npixels, npar, npar).
+    coefmatrix_masked : ndarray
+        Masked coefficient matrix, shape (npixels, npixels_y, npar).
+    weights : ndarray
+        2D weights for the individual pixels, shape (npixels_y, npixels).
+    nints : int or None
+        The number of integrations stacked side by side.  Fits are computed
+        once for columns shared between integrations.
+
+    Returns
+    -------
+    covariances : ndarray
+        Inverse of the design matrix for each column, or zero for singular
+        matrices, shape (npixels, npar, npar).
+    pixwgt : ndarray
+        The pixel-dependent weights to compute the fit coefficients,
+        shape (npixels, npixels_y, npar).
+    """
+    index, inverse = _shared_columns(coefmatrix_masked, weights, nints)
+    matrix = matrix[index]
+
+    # Don't try to solve singular matrices.
+    ok = np.linalg.cond(matrix) < 1e10
+    covariances = np.zeros(matrix.shape)
+    covariances[ok] = np.linalg.inv(matrix[ok])
+
+    pixwgt = weights.T[index][:, :, np.newaxis] * np.einsum(
+        "ijk,ilj->ilk", covariances, coefmatrix_masked[index]
+    )
+    return covariances[inverse], pixwgt[inverse]
+
+
 def _fit_background_for_box_extraction(
     image,
     profiles_2d,
@@ -101,10 +197,15 @@ def _fit_background_for_box_extraction(
     bg_smooth_length,
     bkg_fit_type,
     bkg_order,
+    nints=None,
 ):
     """
     Fit a background level for box extraction.
 
+    If ``nints`` is set, the image holds that many integrations side by
+    side along the dispersion direction (see `_stack_integrations`), and
+    each integration is smoothed separately.
+
     Returns
     -------
     bkg_2d, var_bkg_rn, var_bkg_phnoise, var_bkg_flat : tuple of ndarray
@@ -120,7 +221,16 @@ def _fit_background_for_box_extraction(
         if not bg_smooth_length % 2 == 1:
             raise ValueError("bg_smooth_length should be an odd integer >= 1.")
         kernel = np.ones((1, bg_smooth_length)) / bg_smooth_length
-        input_background = convolution.convolve(input_background, kernel, boundary="extend")
+        if nints is None:
+            input_background = convolution.convolve(input_background, kernel, boundary="extend")
+        else:
+            input_background = _stack_integrations(
+                convolution.convolve(
+                    _unstack_integrations(input_background, nints),
+                    kernel[np.newaxis],
+                    boundary="extend",
+                )
+            )
 
     if bkg_fit_type == "median":
         input_background[profile_bg == 0] = np.nan
@@ -156,21 +266,15 @@ def _fit_background_for_box_extraction(
 
         # Build the matrices to fit a polynomial column-by-column.
         result = build_coef_matrix(
-            input_background, profile_bg=profile_bg, weights=weights, order=bkg_order
+            input_background, profile_bg=profile_bg, weights=weights, order=bkg_order, nints=nints
         )
         matrix, vec, coefmatrix, coefmatrix_masked = result
 
         # Don't try to solve singular matrices.  Background will be
         # zero in these cases.  Could make them NaN if you want.
-        ok = np.linalg.cond(matrix) < 1e10
-        cov_bg_coefs = np.zeros(matrix.shape)
-        cov_bg_coefs[ok] = np.linalg.inv(matrix[ok])
-
-        # These are the pixel-dependent weights to compute our coefficients.
+        # pixwgt holds the pixel-dependent weights to compute our coefficients.
         # We will use them to propagate errors.
-        pixwgt = weights.T[:, :, np.newaxis] * np.einsum(
-            "ijk,ilj->ilk", cov_bg_coefs, coefmatrix_masked
-        )
+        cov_bg_coefs, pixwgt = _fit_weights(matrix, coefmatrix_masked, weights, nints)
         bkg_mat = np.sum(np.swapaxes(coefmatrix, 0, 1) * profiles_2d[0][:, :, np.newaxis], axis=0)
 
         # Sum of all the contributions to the background at the pixels
@@ -195,6 +299,51 @@ def _fit_background_for_box_extraction(
     return bkg_2d, var_bkg_rn, var_bkg_phnoise, var_bkg_flat
 
 
+def _stack_integrations(array):
+    """
+    Place integrations side by side along the dispersion direction.
+
+    Every quantity in the extraction is computed column by column, so
+    stacking the integrations as extra columns extracts them all at
+    once, with the same results as extracting them one at a time.
+
+    Parameters
+    ----------
+    array : ndarray
+        3D array, with integrations along the first axis and the
+        dispersion direction along the last axis.
+
+    Returns
+    -------
+    ndarray
+        2D array, with the columns of integration ``i`` at
+        ``[:, i * ncols:(i + 1) * ncols]``.
+    """
+    nints, nrows, ncols = array.shape
+    return array.transpose(1, 0, 2).reshape(nrows, nints * ncols)
+
+
+def _unstack_integrations(array, nints):
+    """
+    Split a 2D array of stacked integrations into a 3D array.
+
+    Parameters
+    ----------
+    array : ndarray
+        2D array with stacked integrations, as returned by
+        `_stack_integrations`.
+    nints : int
+        The number of integrations.
+
+    Returns
+    -------
+    ndarray
+        3D array, with integrations along the first axis.
+    """
+    nrows, width = array.shape
+    return array.reshape(nrows, nints, width // nints).transpose(1, 0, 2)
+
+
 def _box_extract(
     image,
     profiles_2d,
@@ -286,6 +435,7 @@ def _optimal_extract(
     var_bkg_phnoise,
     var_bkg_flat,
     model,
+    nints=None,
 ):
     """
     Perform optimal extraction.
@@ -306,24 +456,24 @@ def _optimal_extract(
         order = -1
 
     result = build_coef_matrix(
-        image, profiles_2d=profiles_2d, weights=weights, profile_bg=profile_bg, order=order
+        image,
+        profiles_2d=profiles_2d,
+        weights=weights,
+        profile_bg=profile_bg,
+        order=order,
+        nints=nints,
     )
     matrix, vec, coefmatrix, coefmatrix_masked = result
 
     # Don't try to solve equations with singular matrices.
     # Fluxes will be zero in these cases.  We will make them NaN later.
-    ok = np.linalg.cond(matrix) < 1e10
-
-    # These are the covariance matrices for all parameters if inverse
+    # The covariances are the covariance matrices for all parameters if inverse
     # variance weights are passed to the build_coef_matrix above.  For
     # generality, variances are actually computed using the weights on
     # each pixel and the associated variance in the input image.
-    covariances = np.zeros(matrix.shape)
-    covariances[ok] = np.linalg.inv(matrix[ok])
-
-    # These are the pixel-dependent weights to compute our coefficients.
+    # pixwgt holds the pixel-dependent weights to compute our coefficients.
     # We will use them to propagate errors.
-    pixwgt = weights.T[:, :, np.newaxis] * np.einsum("ijk,ilj->ilk", covariances, coefmatrix_masked)
+    covariances, pixwgt = _fit_weights(matrix, coefmatrix_masked, weights, nints)
 
     # Don't use NaN pixels in the sum.  These will already be zero in
     # pixwgt.  coefs are the best-fit coefficients of the source and
@@ -435,7 +585,10 @@ def extract1d(
     ----------
     image : ndarray
         2D array, transposed if necessary so that the dispersion direction
-        is the second index.
+        is the second index.  A 3D array holds multiple integrations along
+        the first axis, which are extracted together, with the same results
+        as extracting each integration separately.  All other image arrays
+        must then be 3D as well.
     profiles_2d : list of ndarray
         These 2D arrays contain the weights for the extraction.  A box
         extraction will add up the flux multiplied by these weights; an
@@ -505,7 +658,25 @@ def extract1d(
     model : ndarray
         The model of the scene, the same shape as the input image (and
         hopefully also similar in value).
+
+    Notes
+    -----
+    For 3D input, the 1D outputs have an additional integration axis after
+    the source axis, with shape (nobjects, nints, ncols).
     """
+    nints = None
+    if image.ndim == 3:
+        nints = image.shape[0]
+        image, variance_rn, variance_phnoise, variance_flat = (
+            _stack_integrations(array)
+            for array in (image, variance_rn, variance_phnoise, variance_flat)
+        )
+        profiles_2d = [_stack_integrations(profile) for profile in profiles_2d]
+        if weights is not None:
+            weights = _stack_integrations(weights)
+        if profile_bg is not None:
+            profile_bg = _stack_integrations(profile_bg)
+
     nobjects = len(profiles_2d)  # hopefully at least one!
     model = np.zeros(image.shape)
 
@@ -531,6 +702,7 @@ def extract1d(
             bg_smooth_length,
             bkg_fit_type,
             bkg_order,
+            nints=nints,
         )
 
         model += bkg_2d
@@ -602,6 +774,7 @@ def extract1d(
             var_bkg_phnoise,
             var_bkg_flat,
             model,
+            nints=nints,
         )
 
     else:
@@ -612,6 +785,35 @@ def extract1d(
     no_data = np.isclose(npixels, 0)
     fluxes[no_data] = np.nan
 
+    if nints is not None:
+        # Split the columns of each spectrum into integrations
+        spectra = [
+            array.reshape(len(array), nints, -1)
+            for array in (
+                fluxes,
+                var_rn,
+                var_phnoise,
+                var_flat,
+                bkg,
+                var_bkg_rn,
+                var_bkg_phnoise,
+                var_bkg_flat,
+                npixels,
+            )
+        ]
+        (
+            fluxes,
+            var_rn,
+            var_phnoise,
+            var_flat,
+            bkg,
+            var_bkg_rn,
+            var_bkg_phnoise,
+            var_bkg_flat,
+            npixels,
+        ) = spectra
+        model = _unstack_integrations(model, nints)
+
     return (
         fluxes,
         var_rn,
@@ -1351,6 +1351,52 @@ def test_extract_one_slit_multi_int(
     assert result[-1].shape == model.data.shape[-2:]
 
 
+@pytest.mark.parametrize("dispaxis", [1, 2])
+@pytest.mark.parametrize("extraction_type", ["box", "optimal"])
+@pytest.mark.parametrize("bkg_fit", [None, "poly", "median"])
+def test_extract_one_slit_int_block(
+    mock_nirspec_bots,
+    extract_defaults,
+    simple_profile,
+    background_profile,
+    bkg_fit,
+    extraction_type,
+    dispaxis,
+):
+    model = mock_nirspec_bots
+    rng = np.random.default_rng(seed=42)
+    model.data += rng.normal(size=model.data.shape)
+    # Bad pixels change the fit for some columns of one integration
+    model.data[3, 22, 5:8] = np.nan
+
+    extract_defaults["dispaxis"] = dispaxis
+    extract_defaults["extraction_type"] = extraction_type
+    if bkg_fit is not None:
+        extract_defaults["subtract_background"] = True
+        extract_defaults["bkg_fit"] = bkg_fit
+        extract_defaults["bkg_order"] = 1
+    profile = simple_profile / np.sum(simple_profile, axis=0)
+    if dispaxis == 2:
+        # Transpose the data and apertures, to disperse along the y axis
+        for name in ["data", "var_rnoise", "var_poisson", "var_flat"]:
+            setattr(model, name, np.swapaxes(getattr(model, name), -1, -2).copy())
+        profile = profile.T
+        background_profile = background_profile.T
+
+    # Extracting a block of integrations gives the same result as
+    # extracting them one at a time
+    result = ex.extract_one_slit(
+        model, slice(2, 6), profile, background_profile, None, extract_defaults
+    )
+    for i, integ in enumerate(range(2, 6)):
+        expected = ex.extract_one_slit(
+            model, integ, profile, background_profile, None, extract_defaults
+        )
+        for array, expected_array in zip(result, expected, strict=True):
+            assert array.shape == (4, *expected_array.shape)
+            assert_equal(array[i], expected_array)
+
+
 def test_extract_one_slit_missing_var(mock_nirspec_fs_one_slit, extract_defaults, simple_profile):
     model = mock_nirspec_fs_one_slit
     extract_defaults["dispaxis"] = 1
@@ -0,0 +1,432 @@
+"""
+Gridded lookup tables of grism spectral traces.
+
+Evaluating the WCS of a grism exposure from the direct image frame to the
+dispersed frame means evaluating the trace polynomials (and, for some
+instruments, numerically inverting the dispersion relation) for every
+pixel at every wavelength. The trace varies slowly with the direct image
+position, so it can instead be evaluated once on a coarse grid of
+positions and wavelengths, and interpolated from there.
+
+`GrismTraceTable` holds such a grid for one spectral order. The table is
+checked against the exact transform when it is built, and refined until
+the interpolation error is within a given tolerance; if that cannot be
+achieved within a maximum table size, the exact transform is used instead.
+"""
+
+import logging
+import time
+import weakref
+
+import numpy as np
+from astropy.modeling.mappings import Mapping
+
+log = logging.getLogger(__name__)
+
+__all__ = [
+    "GrismTraceTable",
+    "detector_to_grism_transform",
+    "evaluate_trace",
+    "get_trace_table",
+]
+
+# Tables cached for each grism WCS, keyed by the table parameters.
+_trace_tables = weakref.WeakKeyDictionary()
+
+# Maximum number of points (positions times wavelengths) at which the exact
+# transform is evaluated at once when building a table, to bound the memory
+# used by its intermediate arrays.
+_CHUNK_SIZE = 2**18
+
+
+def detector_to_grism_transform(grism_wcs):
+    """
+    Get the transform from direct image to dispersed image pixel positions.
+
+    Parameters
+    ----------
+    grism_wcs : `~gwcs.wcs.WCS`
+        WCS of the grism image, with "detector" and "grism_detector" frames.
+
+    Returns
+    -------
+    transform : `~astropy.modeling.Model`
+        Transform with inputs (x, y, wavelength, order), the position in the
+        direct image frame, and outputs (x, y), the position in the grism image.
+    """
+    transform = grism_wcs.get_transform("detector", "grism_detector")
+
+    # We only need the x,y outputs of the transform.
+    # Making the number of outputs dynamic handles legacy WCS objects that did not pass
+    # the x0, y0, and order through the transform unmodified like the current version does.
+    n_outputs = len(transform.outputs)
+    return transform | Mapping((0, 1), n_inputs=n_outputs)
+
+
+def evaluate_trace(transform, x, y, wavelengths, order):
+    """
+    Evaluate a trace transform for all wavelengths at each position.
+
+    Parameters
+    ----------
+    transform : callable
+        Transform with inputs (x, y, wavelength, order) and outputs (x, y),
+        such as returned by `detector_to_grism_transform`.
+    x, y : ndarray
+        1-D arrays of positions in the direct image frame.
+    wavelengths : ndarray
+        1-D array of wavelengths.
+    order : int
+        Spectral order.
+
+    Returns
+    -------
+    x, y : ndarray
+        Positions in the grism image, of shape (n_wavelengths, n_positions).
+    """
+    # The grism transforms expect 2-D inputs with constant wavelength along each row.
+    nwave = len(wavelengths)
+    x = np.repeat(x[np.newaxis, :], nwave, axis=0)
+    y = np.repeat(y[np.newaxis, :], nwave, axis=0)
+    wavelengths = np.repeat(wavelengths[:, np.newaxis], x.shape[1], axis=1)
+    gx, gy = transform(x, y, wavelengths, order)
+    return gx, gy
+
+
+def get_trace_table(grism_wcs, order, wave_range, shape, tolerance=0.01):
+    """
+    Get the trace table for an order of a grism WCS, building it if needed.
+
+    Tables are cached for as long as the WCS object exists, so that
+    repeated calls for the same exposure reuse the same table.
+
+    Parameters
+    ----------
+    grism_wcs : `~gwcs.wcs.WCS`
+        WCS of the grism image, with "detector" and "grism_detector" frames.
+    order : int
+        Spectral order.
+    wave_range : tuple of float
+        Minimum and maximum wavelength, in microns, covered by the table.
+    shape : tuple of int
+        Size of the grism image (nx, ny), used to set the extent of the table.
+    tolerance : float, optional
+        Maximum interpolation error, in pixels.
+
+    Returns
+    -------
+    GrismTraceTable
+        The trace table.
+    """
+    key = (int(order), *map(float, wave_range), *map(int, shape), float(tolerance))
+    tables = _trace_tables.setdefault(grism_wcs, {})
+    if key not in tables:
+        nx, ny = shape[0], shape[1]
+        margin = GrismTraceTable.margin
+        tables[key] = GrismTraceTable(
+            detector_to_grism_transform(grism_wcs),
+            order,
+            (-margin, nx - 1 + margin),
+            (-margin, ny - 1 + margin),
+            wave_range,
+            tolerance=tolerance,
+        )
+    return tables[key]
+
+
+class GrismTraceTable:
+    """
+    Trace of one spectral order, tabulated on a regular grid.
+
+    The offsets from the direct image position to the dispersed position
+    are tabulated on a regular grid of direct image positions and
+    wavelengths. They are interpolated bilinearly in position and
+    linearly in wavelength.
+
+    Attributes
+    ----------
+    x_nodes, y_nodes : ndarray
+        The direct image positions of the grid nodes.
+    wavelengths : ndarray
+        The wavelengths of the grid nodes.
+    max_error : float
+        The largest interpolation error found when checking the table
+        against the exact transform, in pixels.
+    is_accurate : bool
+        Whether the table meets the requested tolerance. If not,
+        the exact transform is used for all positions.
+    """
+
+    margin = 256
+    """Extent beyond the detector edges, in pixels, of tables built by `get_trace_table`."""
+
+    def __init__(
+        self,
+        transform,
+        order,
+        x_range,
+        y_range,
+        wave_range,
+        spacing=64.0,
+        nwave=65,
+        tolerance=0.01,
+        max_refine=3,
+        max_nodes=2**21,
+    ):
+        """
+        Tabulate the trace and check it against the exact transform.
+
+        Parameters
+        ----------
+        transform : callable
+            Transform with inputs (x, y, wavelength, order) and outputs
+            (x, y), such as returned by `detector_to_grism_transform`.
+            It must accept 2-D inputs of shape (n_wavelengths, n_positions),
+            with constant wavelength along the second axis.
+        order : int
+            Spectral order.
+        x_range, y_range : tuple of float
+            Extent of the table in direct image positions.
+        wave_range : tuple of float
+            Extent of the table in wavelength.
+        spacing : float, optional
+            Initial spacing of the grid nodes, in pixels.
+        nwave : int, optional
+            Initial number of wavelength nodes.
+        tolerance : float, optional
+            Maximum interpolation error, in pixels.
+        max_refine : int, optional
+            Maximum number of times the grid spacing is halved, along
+            position and wavelength independently, to meet the tolerance.
+        max_nodes : int, optional
+            Maximum number of grid nodes (positions times wavelengths).
+            A table that would need more nodes to meet the tolerance is
+            not built, and the exact transform is used instead.
+        """
+        self.transform = transform
+        self.order = order
+        self.tolerance = tolerance
+        self.max_error = np.inf
+
+        start = time.perf_counter()
+        for _ in range(max_refine + 1):
+            shape = _grid_shape(x_range, y_range, spacing, nwave)
+            if np.prod(shape) > max_nodes:
+                log.debug(
+                    f"Trace table for order {order} would need {np.prod(shape)} nodes, "
+                    f"more than the maximum of {max_nodes}"
+                )
+                break
+            self._build(x_range, y_range, wave_range, shape)
+            xy_error, wave_error = self._check()
+            self.max_error = xy_error + wave_error
+            if self.max_error <= tolerance:
+                break
+            # Refine whichever axes contribute more than half the error budget.
+            if xy_error > tolerance / 2:
+                spacing /= 2
+            if wave_error > tolerance / 2:
+                nwave = 2 * nwave - 1
+
+        self.is_accurate = bool(self.max_error <= tolerance)
+        if not self.is_accurate:
+            # Only the exact transform is used; don't keep the table.
+            self._offsets = None
+            log.debug("Trace table does not meet tolerance; using exact transform")
+        else:
+            log.debug(
+                f"Trace table for order {order}: {len(self.x_nodes)} x {len(self.y_nodes)} "
+                f"positions, {len(self.wavelengths)} wavelengths, maximum error "
+                f"{self.max_error:.2g} pixels, built in {time.perf_counter() - start:.2f} s"
+            )
+
+    def _build(self, x_range, y_range, wave_range, shape):
+        """Evaluate the exact transform at the grid nodes."""  # numpydoc ignore=PR01
+        nwave, ny, nx = shape
+        self.x_nodes = np.linspace(x_range[0], x_range[1], nx)
+        self.y_nodes = np.linspace(y_range[0], y_range[1], ny)
+        self.wavelengths = np.linspace(wave_range[0], wave_range[1], nwave)
+
+        y, x = np.meshgrid(self.y_nodes, self.x_nodes, indexing="ij")
+        gx, gy = self._exact(x.ravel(), y.ravel(), self.wavelengths)
+        # Offsets, of shape (2, n_wavelengths, ny * nx)
+        self._offsets = np.stack([gx - x.ravel(), gy - y.ravel()])
+
+    def _check(self):
+        """
+        Measure the interpolation error at the midpoints of the grid.
+
+        Returns
+        -------
+        xy_error, wave_error : float
+            Maximum error at the centers of the grid cells at the node
+            wavelengths, and at the grid nodes between node wavelengths.
+        """  # numpydoc ignore=PR01
+        if not np.isfinite(self._offsets).all():
+            return np.inf, np.inf
+
+        xc = 0.5 * (self.x_nodes[:-1] + self.x_nodes[1:])
+        yc = 0.5 * (self.y_nodes[:-1] + self.y_nodes[1:])
+        y, x = (a.ravel() for a in np.meshgrid(yc, xc, indexing="ij"))
+        exact = self._exact(x, y, self.wavelengths)
+        xy_error = _max_difference(exact, self._interpolate(x, y))
+
+        wc = 0.5 * (self.wavelengths[:-1] + self.wavelengths[1:])
+        y, x = (a.ravel() for a in np.meshgrid(self.y_nodes, self.x_nodes, indexing="ij"))
+        exact = self._exact(x, y, wc)
+        wave_error = _max_difference(exact, self._interpolate(x, y, wc))
+        return xy_error, wave_error
+
+    def _exact(self, x, y, wavelengths):
+        """Evaluate the exact transform, in chunks of positions."""  # numpydoc ignore=PR01,RT01
+        step = max(_CHUNK_SIZE // len(wavelengths), 1)
+        if len(x) <= step:
+            return evaluate_trace(self.transform, x, y, wavelengths, self.order)
+
+        gx = np.empty((len(wavelengths), len(x)))
+        gy = np.empty_like(gx)
+        for i in range(0, len(x), step):
+            chunk = slice(i, i + step)
+            gx[:, chunk], gy[:, chunk] = evaluate_trace(
+                self.transform, x[chunk], y[chunk], wavelengths, self.order
+            )
+        return gx, gy
+
+    def _interpolate(self, x, y, wavelengths=None):
+        """Interpolate the table for positions within its extent."""  # numpydoc ignore=PR01,RT01
+        nx = len(self.x_nodes)
+        ix, fx = _locate(self.x_nodes, x)
+        iy, fy = _locate(self.y_nodes, y)
+        corner = iy * nx + ix
+
+        # Bilinear interpolation in position, at the node wavelengths
+        offsets = self._offsets
+        trace = (
+            offsets[..., corner] * ((1 - fx) * (1 - fy))
+            + offsets[..., corner + 1] * (fx * (1 - fy))
+            + offsets[..., corner + nx] * ((1 - fx) * fy)
+            + offsets[..., corner + nx + 1] * (fx * fy)
+        )
+        trace[0] += x
+        trace[1] += y
+
+        # then linear interpolation in wavelength, as a product with the
+        # (sparse) matrix of interpolation weights.
+        if wavelengths is not None:
+            iw, fw = _locate(self.wavelengths, wavelengths)
+            rows = np.arange(len(wavelengths))
+            weights = np.zeros((len(wavelengths), len(self.wavelengths)))
+            weights[rows, iw] = 1 - fw
+            weights[rows, iw + 1] = fw
+            trace = weights @ trace
+
+        return trace[0], trace[1]
+
+    def __call__(self, x, y, wavelengths):
+        """
+        Compute the dispersed positions for all wavelengths at each position.
+
+        Positions or wavelengths outside the extent of the table are
+        computed with the exact transform.
+
+        Parameters
+        ----------
+        x, y : ndarray
+            1-D arrays of positions in the direct image frame.
+        wavelengths : ndarray
+            1-D array of wavelengths.
+
+        Returns
+        -------
+        x, y : ndarray
+            Positions in the grism image, of shape (n_wavelengths, n_positions).
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        wavelengths = np.asarray(wavelengths, dtype=np.float64)
+
+        if (
+            not self.is_accurate
+            or wavelengths.min() < self.wavelengths[0]
+            or wavelengths.max() > self.wavelengths[-1]
+        ):
+            return self._exact(x, y, wavelengths)
+
+        inside = (
+            (x >= self.x_nodes[0])
+            & (x <= self.x_nodes[-1])
+            & (y >= self.y_nodes[0])
+            & (y <= self.y_nodes[-1])
+        )
+        if inside.all():
+            return self._interpolate(x, y, wavelengths)
+
+        gx = np.empty((len(wavelengths), len(x)))
+        gy = np.empty_like(gx)
+        gx[:, inside], gy[:, inside] = self._interpolate(x[inside], y[inside], wavelengths)
+        gx[:, ~inside], gy[:, ~inside] = self._exact(x[~inside], y[~inside], wavelengths)
+        return gx, gy
+
+
+def _grid_shape(x_range, y_range, spacing, nwave):
+    """
+    Compute the number of grid nodes along each axis of a table.
+
+    Parameters
+    ----------
+    x_range, y_range : tuple of float
+        Extent of the table in direct image positions.
+    spacing : float
+        Spacing of the grid nodes, in pixels.
+    nwave : int
+        Number of wavelength nodes.
+
+    Returns
+    -------
+    tuple of int
+        The number of wavelengths, y positions and x positions.
+    """
+    nx = max(int(np.ceil((x_range[1] - x_range[0]) / spacing)), 1) + 1
+    ny = max(int(np.ceil((y_range[1] - y_range[0]) / spacing)), 1) + 1
+    return max(nwave, 2), ny, nx
+
+
+def _locate(nodes, values):
+    """
+    Find the cells of a regular grid containing some values.
+
+    Parameters
+    ----------
+    nodes : ndarray
+        The grid nodes, evenly spaced and increasing.
+    values : ndarray
+        Values within the extent of the grid.
+
+    Returns
+    -------
+    index : ndarray of int
+        Index of the first node of the cell containing each value.
+    fraction : ndarray
+        Fractional position of each value within its cell.
+    """
+    position = (values - nodes[0]) / (nodes[1] - nodes[0])
+    index = np.clip(np.floor(position).astype(np.intp), 0, len(nodes) - 2)
+    return index, position - index
+
+
+def _max_difference(exact, interpolated):
+    """
+    Find the largest difference between exact and interpolated positions.
+
+    Parameters
+    ----------
+    exact, interpolated : tuple of ndarray
+        The x and y positions.
+
+    Returns
+    -------
+    float
+        The largest absolute difference, or infinity if any are undefined.
+    """
+    diff = max(np.max(np.abs(a - b)) for a, b in zip(exact, interpolated, strict=True))
+    return float(np.nan_to_num(diff, nan=np.inf))
@@ -0,0 +1,176 @@
+import numpy as np
+import pytest
+from astropy.modeling.models import Identity, Polynomial1D, Polynomial2D, Shift
+from gwcs import wcs
+from numpy.testing import assert_allclose, assert_array_equal
+from stdatamodels.jwst.transforms.models import (
+    NIRCAMBackwardGrismDispersion,
+    NIRCAMForwardRowGrismDispersion,
+)
+
+from jwst.lib import grism_trace
+from jwst.lib.grism_trace import (
+    GrismTraceTable,
+    detector_to_grism_transform,
+    evaluate_trace,
+    get_trace_table,
+)
+
+WAVE_RANGE = (3.9, 5.05)
+SHAPE = (2048, 2048)
+
+
+def _coeff(c0, cx=0.0, cy=0.0, cxx=0.0, cxy=0.0, cyy=0.0):
+    return Polynomial2D(2, c0_0=c0, c1_0=cx, c0_1=cy, c2_0=cxx, c1_1=cxy, c0_2=cyy)
+
+
+@pytest.fixture(scope="module")
+def grism_wcs():
+    """Make a grism WCS with a field-dependent, curved trace."""
+    xmodels = [
+        [
+            _coeff(-50.0, 0.01, -0.005, 1e-6, 2e-7, -1e-6),
+            _coeff(1300.0, 0.02, 0.01, 3e-6, 0.0, 1e-6),
+            _coeff(-20.0, 1e-3, 0.0, 1e-7),
+        ]
+    ]
+    ymodels = [
+        [
+            _coeff(3.0, 0.001, 0.002, 1e-7),
+            _coeff(-8.0, 0.003, 0.001, 0.0, 1e-7),
+            _coeff(2.0, 0.0, 1e-4),
+        ]
+    ]
+    lmodels = [Polynomial1D(1, c0=WAVE_RANGE[0], c1=WAVE_RANGE[1] - WAVE_RANGE[0])]
+    inv_lmodels = [
+        Polynomial1D(
+            1,
+            c0=-WAVE_RANGE[0] / (WAVE_RANGE[1] - WAVE_RANGE[0]),
+            c1=1 / (WAVE_RANGE[1] - WAVE_RANGE[0]),
+        )
+    ]
+    det2det = NIRCAMForwardRowGrismDispersion(
+        [1], lmodels=lmodels, xmodels=xmodels, ymodels=ymodels, inv_lmodels=inv_lmodels
+    )
+    det2det.inverse = NIRCAMBackwardGrismDispersion(
+        [1], lmodels=lmodels, xmodels=xmodels, ymodels=ymodels, inv_lmodels=inv_lmodels
+    )
+    det2world = Shift(10) & Shift(20) & Identity(2)
+    return wcs.WCS([("grism_detector", det2det), ("detector", det2world), ("world", None)])
+
+
+@pytest.fixture
+def positions():
+    rng = np.random.default_rng(42)
+    x = rng.uniform(0, SHAPE[0] - 1, 500)
+    y = rng.uniform(0, SHAPE[1] - 1, 500)
+    wavelengths = np.linspace(*WAVE_RANGE, 300)
+    return x, y, wavelengths
+
+
+def test_trace_table_accuracy(grism_wcs, positions):
+    transform = detector_to_grism_transform(grism_wcs)
+    table = GrismTraceTable(transform, 1, (0, SHAPE[0] - 1), (0, SHAPE[1] - 1), WAVE_RANGE)
+    assert table.is_accurate
+    assert table.max_error <= table.tolerance
+
+    x, y, wavelengths = positions
+    gx, gy = table(x, y, wavelengths)
+    exact_x, exact_y = evaluate_trace(transform, x, y, wavelengths, 1)
+    assert gx.shape == gy.shape == (len(wavelengths), len(x))
+    assert_allclose(gx, exact_x, rtol=0, atol=table.tolerance)
+    assert_allclose(gy, exact_y, rtol=0, atol=table.tolerance)
+
+
+def test_trace_table_refine(grism_wcs, positions):
+    """Test that a tighter tolerance refines the grid."""
+    transform = detector_to_grism_transform(grism_wcs)
+    coarse = GrismTraceTable(transform, 1, (0, SHAPE[0] - 1), (0, SHAPE[1] - 1), WAVE_RANGE)
+    fine = GrismTraceTable(
+        transform,
+        1,
+        (0, SHAPE[0] - 1),
+        (0, SHAPE[1] - 1),
+        WAVE_RANGE,
+        tolerance=1e-3,
+        max_nodes=2**22,
+    )
+    assert fine.is_accurate
+    assert fine.max_error < coarse.max_error
+    assert fine._offsets.size > coarse._offsets.size
+
+    x, y, wavelengths = positions
+    gx, gy = fine(x, y, wavelengths)
+    exact_x, exact_y = evaluate_trace(transform, x, y, wavelengths, 1)
+    assert_allclose(gx, exact_x, rtol=0, atol=1e-3)
+    assert_allclose(gy, exact_y, rtol=0, atol=1e-3)
+
+
+def test_trace_table_exact_fallback(grism_wcs, positions):
+    """Test that the exact transform is used where the table does not apply."""
+    transform = detector_to_grism_transform(grism_wcs)
+    x, y, wavelengths = positions
+    exact_x, exact_y = evaluate_trace(transform, x, y, wavelengths, 1)
+
+    # Table too coarse to meet the tolerance
+    table = GrismTraceTable(
+        transform,
+        1,
+        (0, SHAPE[0] - 1),
+        (0, SHAPE[1] - 1),
+        WAVE_RANGE,
+        spacing=1024,
+        tolerance=1e-6,
+        max_refine=0,
+    )
+    assert not table.is_accurate
+    gx, gy = table(x, y, wavelengths)
+    assert_array_equal(gx, exact_x)
+    assert_array_equal(gy, exact_y)
+
+    # Table that would need too many nodes to meet the tolerance
+    table = GrismTraceTable(
+        transform, 1, (0, SHAPE[0] - 1), (0, SHAPE[1] - 1), WAVE_RANGE, max_nodes=1000
+    )
+    assert not table.is_accurate
+    gx, gy = table(x, y, wavelengths)
+    assert_array_equal(gx, exact_x)
+    assert_array_equal(gy, exact_y)
+
+    # Positions outside the table
+    table = GrismTraceTable(transform, 1, (0, 1000), (0, 1000), WAVE_RANGE)
+    outside = (x > 1000) | (y > 1000)
+    assert outside.any() and not outside.all()
+    gx, gy = table(x, y, wavelengths)
+    assert_array_equal(gx[:, outside], exact_x[:, outside])
+    assert_array_equal(gy[:, outside], exact_y[:, outside])
+    assert_allclose(gx[:, ~outside], exact_x[:, ~outside], rtol=0, atol=table.tolerance)
+
+    # Wavelengths outside the table
+    table = GrismTraceTable(transform, 1, (0, SHAPE[0] - 1), (0, SHAPE[1] - 1), (4.0, 5.0))
+    gx, gy = table(x, y, wavelengths)
+    assert_array_equal(gx, exact_x)
+    assert_array_equal(gy, exact_y)
+
+
+def test_trace_table_exact_chunks(grism_wcs, positions, monkeypatch):
+    """Test that evaluating the exact transform in chunks does not change it."""
+    transform = detector_to_grism_transform(grism_wcs)
+    table = GrismTraceTable(transform, 1, (0, SHAPE[0] - 1), (0, SHAPE[1] - 1), WAVE_RANGE)
+    monkeypatch.setattr(grism_trace, "_CHUNK_SIZE", 1000)
+    x, y, wavelengths = positions
+    gx, gy = table._exact(x, y, wavelengths)
+    exact_x, exact_y = evaluate_trace(transform, x, y, wavelengths, 1)
+    assert_array_equal(gx, exact_x)
+    assert_array_equal(gy, exact_y)
+
+
+def test_get_trace_table_cached(grism_wcs):
+    table = get_trace_table(grism_wcs, 1, WAVE_RANGE, SHAPE)
+    assert get_trace_table(grism_wcs, 1, WAVE_RANGE, SHAPE) is table
+    assert get_trace_table(grism_wcs, 1, WAVE_RANGE, SHAPE, tolerance=0.1) is not table
+
+    margin = GrismTraceTable.margin
+    assert table.x_nodes[0] == table.y_nodes[0] == -margin
+    assert table.x_nodes[-1] == SHAPE[0] - 1 + margin
+    assert table.y_nodes[-1] == SHAPE[1] - 1 + margin
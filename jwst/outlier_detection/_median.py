@@ -0,0 +1,179 @@
+"""Compute medians over a stack of images, in tiles, using multiple threads."""
+
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from stcal.multiprocessing import compute_num_cores
+from stcal.outlier_detection.median import nanmedian3D
+
+log = logging.getLogger(__name__)
+
+_ONE_MB = 1 << 20
+
+__all__ = ["TiledMedianComputer"]
+
+
+class TiledMedianComputer:
+    """
+    Compute medians over a stack of images, one row tile at a time.
+
+    The images are stored in a single scratch array, either in memory or
+    memory-mapped to a temporary file. The scratch array is tile-major:
+    all images, for all layers, of a given tile of rows are stored
+    contiguously, such that each tile is read with a single contiguous
+    read. Several layers, such as science and error arrays, are stored
+    side by side so that the medians of all layers are computed in the
+    same pass over the data.
+
+    Tiles are processed concurrently by a pool of threads. For on-disk
+    storage, the tile size is chosen such that the tiles being processed
+    at any one time fit in the requested buffer size.
+    """
+
+    def __init__(
+        self,
+        full_shape,
+        nlayers=1,
+        in_memory=True,
+        buffer_size=None,
+        dtype="float32",
+        max_cores="1",
+        tempdir="",
+    ):
+        """
+        Initialize the computer and allocate the scratch array.
+
+        Parameters
+        ----------
+        full_shape : tuple
+            The shape of each layer of the stack, (n_images, n_rows, n_cols).
+        nlayers : int, optional
+            The number of layers, such as data and error, to compute medians for.
+        in_memory : bool, optional
+            If `True`, the scratch array is held in memory. Otherwise it
+            is memory-mapped to a temporary file.
+        buffer_size : int or None, optional
+            The total size, in bytes, of the tiles read into memory at
+            any one time. Has no effect if ``in_memory`` is `True`.
+            If `None`, the size of one input image is used.
+        dtype : str or `~numpy.dtype`, optional
+            The data type of the stored images.
+        max_cores : str, optional
+            The number of threads to use. Can be an integer, 'none', 'quarter',
+            'half', or 'all'.
+        tempdir : str, optional
+            The directory in which to create the temporary file.
+            Default is the current working directory.
+        """
+        if len(full_shape) != 3:
+            raise ValueError(
+                f"Invalid input shape {full_shape}; only three-dimensional data are supported."
+            )
+        self.full_shape = tuple(full_shape)
+        self.nlayers = nlayers
+        self.in_memory = in_memory
+        self.dtype = np.dtype(dtype)
+        ngroups, nrows, ncols = self.full_shape
+
+        max_available = os.cpu_count() or 1
+        nthreads = compute_num_cores(str(max_cores), nrows, max_available)
+        if in_memory:
+            self.tile_nrows = -(-nrows // nthreads)
+        else:
+            if buffer_size is None or buffer_size == 0:
+                buffer_size = nrows * ncols * self.dtype.itemsize
+            row_size = nlayers * ngroups * ncols * self.dtype.itemsize
+            self.tile_nrows = min(nrows, int(buffer_size // (row_size * nthreads)))
+            if self.tile_nrows <= 0:
+                log.warning(
+                    "Buffer size is too small to hold a single row. "
+                    f"Increasing buffer size to {row_size * nthreads / _ONE_MB} MB"
+                )
+                self.tile_nrows = 1
+        self.tile_rows = [
+            (row1, min(row1 + self.tile_nrows, nrows)) for row1 in range(0, nrows, self.tile_nrows)
+        ]
+        self.ntiles = len(self.tile_rows)
+        self.nthreads = min(nthreads, self.ntiles)
+
+        scratch_shape = (self.ntiles, nlayers, ngroups, self.tile_nrows, ncols)
+        self._tempfile = None
+        if in_memory:
+            self._scratch = np.empty(scratch_shape, dtype=self.dtype)
+        else:
+            self._tempfile = tempfile.NamedTemporaryFile(
+                dir=tempdir or None, prefix="median_", suffix=".bin"
+            )
+            self._scratch = np.memmap(
+                self._tempfile, dtype=self.dtype, mode="w+", shape=scratch_shape
+            )
+            log.info(
+                f"Computing median over {ngroups} groups in {self.ntiles} tiles "
+                f"using {self.nthreads} threads with total memory buffer "
+                f"{self.nthreads * self.tile_nrows * row_size / _ONE_MB} MB"
+            )
+
+    def append(self, data, idx, layer=0):
+        """
+        Store an image in the scratch array.
+
+        Parameters
+        ----------
+        data : ndarray
+            The image, of shape ``full_shape[1:]``.
+        idx : int
+            The index of the image in the stack.
+        layer : int, optional
+            The layer to which the image belongs.
+        """
+        if data.shape != self.full_shape[1:]:
+            raise ValueError(
+                f"Data shape {data.shape} does not match expected shape {self.full_shape[1:]}."
+            )
+        for tile, (row1, row2) in enumerate(self.tile_rows):
+            self._scratch[tile, layer, idx, : row2 - row1] = data[row1:row2]
+
+    def evaluate(self):
+        """
+        Compute the medians of all layers.
+
+        The scratch array is released afterwards; no more images may be added.
+
+        Returns
+        -------
+        list of ndarray
+            The median image for each layer.
+        """
+        medians = [np.empty(self.full_shape[1:], dtype=self.dtype) for _ in range(self.nlayers)]
+
+        def median_tile(tile):
+            row1, row2 = self.tile_rows[tile]
+            stack = self._scratch[tile, :, :, : row2 - row1]
+            if not self.in_memory:
+                # Read the whole tile from disk at once.
+                stack = np.array(stack)
+            # The scratch array is not needed afterwards: compute in place.
+            for layer in range(self.nlayers):
+                medians[layer][row1:row2] = nanmedian3D(stack[layer], overwrite_input=True)
+
+        try:
+            if self.nthreads > 1:
+                with ThreadPoolExecutor(max_workers=self.nthreads) as executor:
+                    # Consume the results to propagate any exceptions.
+                    list(executor.map(median_tile, range(self.ntiles)))
+            else:
+                for tile in range(self.ntiles):
+                    median_tile(tile)
+        finally:
+            self.cleanup()
+        return medians
+
+    def cleanup(self):
+        """Release the scratch array and remove any temporary file."""
+        self._scratch = None
+        if self._tempfile is not None:
+            self._tempfile.close()
+            self._tempfile = None
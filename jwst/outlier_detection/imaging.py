@@ -37,6 +37,11 @@ def detect_outliers(
     make_output_path,
     pixmap_stepsize=1,
     pixmap_order=1,
+    max_cores="1",
+    prefetch_bytes=0,
+    write_behind_bytes=0,
+    io_threads=2,
+    metadata_index=None,
 ):
     """
     Flag outliers in imaging data.
@@ -86,6 +91,18 @@ def detect_outliers(
         Interpolation is only performed if ``pixmap_stepsize > 1``. Default is 1.
     pixmap_order : int, optional
         Interpolating spline order for pixel map computation. Must be 1 or 3. Default is 1.
+    max_cores : str, optional
+        Number of processes used to resample groups and of threads used
+        to compute the median. Can be an integer, 'none', 'quarter',
+        'half', or 'all'. Default is '1'.
+    prefetch_bytes, write_behind_bytes, io_threads : int, optional
+        Options for reading and writing the models in the background,
+        passed to `~jwst.datamodels.library.ModelLibrary` when
+        ``input_models`` is not already a library and ``in_memory`` is `False`.
+    metadata_index : str or None, optional
+        File in which to save an index of the metadata of the input files,
+        passed to `~jwst.datamodels.library.ModelLibrary` when
+        ``input_models`` is not already a library.
 
     Returns
     -------
@@ -93,7 +110,14 @@ def detect_outliers(
         The input models with outliers flagged.
     """
     if not isinstance(input_models, ModelLibrary):
-        input_models = ModelLibrary(input_models, on_disk=not in_memory)
+        input_models = ModelLibrary(
+            input_models,
+            on_disk=not in_memory,
+            prefetch_bytes=prefetch_bytes,
+            write_behind_bytes=write_behind_bytes,
+            io_threads=io_threads,
+            metadata_index=metadata_index,
+        )
 
     if len(input_models) < 2:
         log.warning(f"Input only contains {len(input_models)} exposures")
@@ -122,6 +146,7 @@ def detect_outliers(
             maskpt,
             save_intermediate_results=save_intermediate_results,
             make_output_path=make_output_path,
+            max_cores=max_cores,
         )
     else:
         median_data, median_wcs = median_without_resampling(
@@ -131,6 +156,7 @@ def detect_outliers(
             good_bits,
             save_intermediate_results=save_intermediate_results,
             make_output_path=make_output_path,
+            max_cores=max_cores,
         )
 
     # Perform outlier detection using statistical comparisons between
@@ -53,8 +53,13 @@ class OutlierDetectionStep(Step):
         good_bits = string(default="~DO_NOT_USE")  # DQ flags to allow
         search_output_file = boolean(default=False)
         in_memory = boolean(default=True) # in_memory flag ignored if run within the pipeline; set at pipeline level instead
+        prefetch_bytes = integer(min=0, default=0) # Size of the files to read ahead if in_memory is False
+        write_behind_bytes = integer(min=0, default=0) # Size of the models to save in the background if in_memory is False
+        io_threads = integer(min=1, default=2) # Threads reading ahead and saving in the background
+        metadata_index = string(default=None) # File in which to save an index of the metadata of the input files, shared between runs
         pixmap_stepsize = float(default=1.0)  # Interpolation step size for pixel map; interpolation is used for stepsize > 1
         pixmap_order = integer(default=1)  # Spline order for pixel mapping, must be 1 or 3
+        maximum_cores = string(default='1')  # Cores for resampling and the median. Can be an integer, 'half', 'quarter', or 'all'
     """  # noqa: E501
 
     def process(self, input_data):
@@ -138,6 +143,11 @@ class OutlierDetectionStep(Step):
                 self.make_output_path,
                 self.pixmap_stepsize,
                 self.pixmap_order,
+                max_cores=self.maximum_cores,
+                prefetch_bytes=self.prefetch_bytes,
+                write_behind_bytes=self.write_behind_bytes,
+                io_threads=self.io_threads,
+                metadata_index=self.metadata_index,
             )
         elif mode == "spec":
             result_models = spec.detect_outliers(
@@ -156,6 +166,7 @@ class OutlierDetectionStep(Step):
                 self.kernel,
                 self.fillval,
                 self.make_output_path,
+                max_cores=self.maximum_cores,
             )
         elif mode == "ifu":
             result_models = ifu.detect_outliers(
@@ -34,6 +34,7 @@ def detect_outliers(
     kernel,
     fillval,
     make_output_path,
+    max_cores="1",
 ):
     """
     Flag outliers in slit-like spectroscopic data.
@@ -74,6 +75,10 @@ def detect_outliers(
     make_output_path : function
         The :py:func:`functools.partial` instance to pass to ``save_blot``. Must be
         specified if ``save_blot`` is `True`.
+    max_cores : str, optional
+        Number of processes used to resample groups and of threads used
+        to compute the median. Can be an integer, 'none', 'quarter',
+        'half', or 'all'. Default is '1'.
 
     Returns
     -------
@@ -116,6 +121,7 @@ def detect_outliers(
             save_intermediate_results=save_intermediate_results,
             make_output_path=make_output_path,
             return_error=True,
+            max_cores=max_cores,
         )
     else:
         median_data, median_wcs, median_err = median_without_resampling(
@@ -126,6 +132,7 @@ def detect_outliers(
             save_intermediate_results=save_intermediate_results,
             make_output_path=make_output_path,
             return_error=True,
+            max_cores=max_cores,
         )
 
     # Perform outlier detection using statistical comparisons between
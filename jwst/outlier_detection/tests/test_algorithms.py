@@ -1,6 +1,7 @@
 import numpy as np
 import pytest
 
+from jwst.outlier_detection import tso
 from jwst.outlier_detection.tso import moving_median_over_zeroth_axis
 
 
@@ -21,3 +22,30 @@ def test_rolling_median(w, expected_time_axis):
         np.array(expected_time_axis)[:, np.newaxis, np.newaxis] * spatial_axis[np.newaxis, :, :]
     )
     assert np.allclose(result, expected)
+
+
+@pytest.mark.parametrize("w", [2, 3, 6, 25])
+@pytest.mark.parametrize("dtype", [np.float32, np.float64, np.int32])
+def test_rolling_median_windows(monkeypatch, w, dtype):
+    """Test the rolling median against the median of each window, over several tiles."""
+    rng = np.random.default_rng(42)
+    arr = (rng.normal(size=(40, 6, 7)) * 10).astype(dtype)
+    arr[:, 0, 0] = 1  # repeated values
+    if dtype != np.int32:
+        arr[rng.random(arr.shape) < 0.02] = np.nan
+        arr[5:15, 1, 1] = np.inf
+
+    monkeypatch.setattr(tso, "TILE_ELEMENTS", 200)
+    result = moving_median_over_zeroth_axis(arr, w)
+    assert result.dtype == (np.float32 if dtype == np.float32 else np.float64)
+
+    hw = w // 2
+    expected = np.full(arr.shape, np.nan)
+    for start in range(arr.shape[0] - w + 1):
+        expected[start + hw] = np.median(arr[start : start + w], axis=0)
+    valid = slice(hw, arr.shape[0] - w + 1 + hw)
+    np.testing.assert_array_equal(result[valid], expected[valid])
+
+    # windows containing NaN have a NaN median
+    if dtype != np.int32:
+        assert np.isnan(result).any()
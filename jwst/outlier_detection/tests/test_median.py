@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from jwst.outlier_detection._median import TiledMedianComputer
+
+
+@pytest.fixture
+def stack():
+    rng = np.random.default_rng(42)
+    data = rng.normal(size=(2, 7, 23, 11)).astype(np.float32)
+    data[:, :, 5, 3] = np.nan
+    data[:, 2:4, 8, :] = np.nan
+    return data
+
+
+@pytest.mark.parametrize("in_memory", [True, False])
+@pytest.mark.parametrize("max_cores", ["1", "3", "all"])
+@pytest.mark.parametrize("buffer_size", [None, 1])
+def test_tiled_median(stack, in_memory, max_cores, buffer_size, tmp_path):
+    computer = TiledMedianComputer(
+        stack.shape[1:],
+        nlayers=2,
+        in_memory=in_memory,
+        buffer_size=buffer_size,
+        dtype=stack.dtype,
+        max_cores=max_cores,
+        tempdir=tmp_path,
+    )
+    for i in range(stack.shape[1]):
+        computer.append(stack[0, i], i)
+        computer.append(stack[1, i], i, layer=1)
+
+    with pytest.warns(RuntimeWarning, match="All-NaN"):
+        expected = np.nanmedian(stack, axis=1)
+    median_data, median_err = computer.evaluate()
+
+    assert median_data.dtype == stack.dtype
+    np.testing.assert_array_equal(median_data, expected[0])
+    np.testing.assert_array_equal(median_err, expected[1])
+    assert not list(tmp_path.iterdir())
+
+
+def test_tiled_median_bad_shape():
+    with pytest.raises(ValueError, match="three-dimensional"):
+        TiledMedianComputer((3, 4))
+
+    computer = TiledMedianComputer((3, 4, 5))
+    with pytest.raises(ValueError, match="does not match"):
+        computer.append(np.zeros((4, 4)), 0)
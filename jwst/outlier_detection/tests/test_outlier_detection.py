@@ -1,3 +1,5 @@
+import os
+
 import numpy as np
 import pytest
 from gwcs.wcs import WCS
@@ -107,6 +109,45 @@ def test_drizzle_and_median_with_resample(three_sci_as_asn, tmp_cwd):
         median_with_resampling(lib, resamp, 0.7, save_intermediate_results=True)
 
 
+@pytest.fixture()
+def two_cores(monkeypatch):
+    """Make at least two cores available, regardless of the host."""
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+
+
+def test_median_with_parallel_resample(three_sci_as_asn, tmp_cwd, two_cores):
+    """Test that resampling groups in parallel gives the same median"""
+    lib = ModelLibrary(three_sci_as_asn, on_disk=False)
+
+    median, _, median_err = median_with_resampling(
+        lib, helpers.make_resamp(lib), 0.7, return_error=True
+    )
+    median_parallel, _, median_err_parallel = median_with_resampling(
+        lib, helpers.make_resamp(lib), 0.7, return_error=True, max_cores="2"
+    )
+
+    assert_array_equal(median_parallel, median)
+    assert_array_equal(median_err_parallel, median_err)
+
+
+@pytest.mark.parametrize("on_disk", [False, True])
+def test_parallel_resample_many_to_many(three_sci_as_asn, tmp_cwd, two_cores, on_disk):
+    """Test that groups resampled in parallel are returned in order"""
+    lib = ModelLibrary(three_sci_as_asn, on_disk=on_disk)
+
+    serial = helpers.make_resamp(lib).resample_many_to_many()
+    parallel = helpers.make_resamp(lib).resample_many_to_many(max_cores="2")
+
+    assert len(parallel) == len(serial) == 3
+    with serial, parallel:
+        for model, model_parallel in zip(serial, parallel, strict=True):
+            assert model_parallel.meta.filename == model.meta.filename
+            assert_array_equal(model_parallel.data, model.data)
+            assert_array_equal(model_parallel.err, model.err)
+            serial.shelve(model, modify=False)
+            parallel.shelve(model_parallel, modify=False)
+
+
 @pytest.mark.parametrize("mode", [None, "unknown"])
 def test_guess_mode_assigned(caplog, mode):
     input_model = datamodels.ImageModel()
@@ -1,6 +1,7 @@
 import logging
 
 import numpy as np
+from scipy import ndimage
 from stcal.outlier_detection.utils import compute_weight_threshold
 
 from jwst import datamodels as dm
@@ -13,6 +14,9 @@ log = logging.getLogger(__name__)
 
 __all__ = ["detect_outliers"]
 
+# Number of values in the time series of a tile of pixels, for the rolling median
+TILE_ELEMENTS = 2**22
+
 
 def detect_outliers(
     input_model,
@@ -168,11 +172,16 @@ def moving_median_over_zeroth_axis(x: np.ndarray, w: int) -> np.ndarray:
     calculate the median of the values inside that window (across axis 0 only).
     The result at each step is stored in the center position of the window,
     producing an output array with the same shape as the input.
+    The median of a window containing NaN is NaN.
 
     Because the window cannot fully overlap the data at the beginning and end,
     those edge positions are filled with the nearest computed median value to
     avoid missing data.
 
+    The time series of the pixels are processed in tiles, each with a
+    running order statistic over the window, so that the cost grows
+    as ``log(w)`` rather than ``w`` per value.
+
     Parameters
     ----------
     x : ndarray
@@ -183,19 +192,68 @@ def moving_median_over_zeroth_axis(x: np.ndarray, w: int) -> np.ndarray:
     Returns
     -------
     ndarray
-        The rolling median of the input array. Same dimensions as input.
+        The rolling median of the input array. Same dimensions as input,
+        float32 for float32 input and float64 otherwise.
     """
     if w <= 1:
         raise ValueError("Rolling median window size must be greater than 1.")
-    out = np.full(x.shape, np.nan)
-    hw, odd_window = divmod(w, 2)
-    for start_index in range(x.shape[0] - w + 1):
-        end_index = start_index + w
-        np.median(x[start_index:end_index], axis=0, out=out[start_index + hw])
+    out = np.full(x.shape, np.nan, dtype=np.result_type(x.dtype, np.float32))
+    hw = w // 2
+    nwindows = x.shape[0] - w + 1
+    if nwindows > 0:
+        series = x.reshape(x.shape[0], -1)
+        medians = out.reshape(x.shape[0], -1)
+        tile_size = max(1, TILE_ELEMENTS // x.shape[0])
+        for start in range(0, series.shape[1], tile_size):
+            tile = slice(start, start + tile_size)
+            medians[hw : hw + nwindows, tile] = _moving_median_tile(series[:, tile], w, out.dtype).T
     # Fill in the edges with the nearest valid value
     out[:hw] = out[hw]
+    out[hw + nwindows :] = out[hw + nwindows - 1]
+    return out
+
+
+def _moving_median_tile(series, w, dtype):
+    """
+    Calculate the median of every full window of the time series of some pixels.
+
+    Parameters
+    ----------
+    series : ndarray
+        The time series of the pixels, with time on axis 0.
+    w : int
+        The window size.
+    dtype : numpy.dtype
+        The floating point type of the medians.
+
+    Returns
+    -------
+    ndarray
+        The medians, with pixels on axis 0 and windows on axis 1.
+    """
+    hw, odd_window = divmod(w, 2)
+    nwindows = series.shape[0] - w + 1
+
+    # Contiguous time series of each pixel, with NaN ordered last
+    values = np.array(series.T, dtype=dtype, order="C")
+    nan_mask = np.isnan(values)
+    values[nan_mask] = np.inf
+    nan_count = np.zeros((values.shape[0], values.shape[1] + 1), dtype=np.intp)
+    np.cumsum(nan_mask, axis=1, out=nan_count[:, 1:])
+    del nan_mask
+
+    # Filter the series of all pixels end to end: the full windows of each
+    # pixel start at hw, as the windows are centered as in ndimage, and
+    # never reach into the series of the neighboring pixels.
+    ranks = [hw] if odd_window else [hw - 1, hw]
+    filtered = []
+    for rank in ranks:
+        result = ndimage.rank_filter(values.ravel(), rank, size=w).reshape(values.shape)
+        filtered.append(result[:, hw : hw + nwindows])
+
     if odd_window:
-        out[-hw:] = out[-hw - 1]
+        medians = filtered[0]
     else:
-        out[-hw + 1 :] = out[-hw]
-    return out
+        medians = (filtered[0].astype(np.float64) + filtered[1]) / 2
+    medians[nan_count[:, w:] > nan_count[:, :nwindows]] = np.nan
+    return medians
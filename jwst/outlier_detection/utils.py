@@ -5,7 +5,7 @@ import logging
 from functools import partial
 
 import numpy as np
-from stcal.outlier_detection.median import MedianComputer, nanmedian3D
+from stcal.outlier_detection.median import nanmedian3D
 from stcal.outlier_detection.utils import (
     compute_weight_threshold,
     flag_crs,
@@ -17,6 +17,7 @@ from stdatamodels.jwst import datamodels
 
 from jwst.lib.pipe_utils import match_nans_and_flags
 from jwst.outlier_detection import _fileio
+from jwst.outlier_detection._median import TiledMedianComputer
 from jwst.resample.resample import input_jwst_model_to_dict
 
 log = logging.getLogger(__name__)
@@ -71,6 +72,7 @@ def median_without_resampling(
     make_output_path=None,
     buffer_size=None,
     return_error=False,
+    max_cores="1",
 ):
     """
     Compute a median image without resampling.
@@ -103,6 +105,9 @@ def median_without_resampling(
     return_error : bool, optional
         If `True`, an approximate median error is computed alongside the
         median science image.
+    max_cores : str, optional
+        Number of threads used to compute the median. Can be an integer,
+        'none', 'quarter', 'half', or 'all'.
 
     Returns
     -------
@@ -143,11 +148,14 @@ def median_without_resampling(
                 median_wcs = copy.deepcopy(drizzled_model.meta.wcs)
                 input_shape = (ngroups,) + drizzled_data.shape
                 dtype = drizzled_data.dtype
-                computer = MedianComputer(input_shape, in_memory, buffer_size, dtype)
-                if return_error:
-                    err_computer = MedianComputer(input_shape, in_memory, buffer_size, dtype)
-                else:
-                    err_computer = None
+                computer = TiledMedianComputer(
+                    input_shape,
+                    nlayers=2 if return_error else 1,
+                    in_memory=in_memory,
+                    buffer_size=buffer_size,
+                    dtype=dtype,
+                    max_cores=max_cores,
+                )
                 if save_intermediate_results:
                     # update median model's meta with meta from the first model:
                     median_model.update(drizzled_model)
@@ -158,17 +166,15 @@ def median_without_resampling(
             computer.append(drizzled_data, i)
             if return_error:
                 drizzled_err[weight < weight_threshold] = np.nan
-                err_computer.append(drizzled_err, i)
+                computer.append(drizzled_err, i, layer=1)
 
             input_models.shelve(drizzled_model, i, modify=False)
             del drizzled_model
 
-    # Perform median combination on set of drizzled mosaics
-    median_data = computer.evaluate()
-    if return_error:
-        median_err = err_computer.evaluate()
-    else:
-        median_err = None
+    # Perform median combination on set of drizzled mosaics,
+    # computing the median error in the same pass
+    median_data, *median_errs = computer.evaluate()
+    median_err = median_errs[0] if return_error else None
 
     if save_intermediate_results:
         # Save median model to fits
@@ -191,6 +197,7 @@ def median_with_resampling(
     make_output_path=None,
     buffer_size=None,
     return_error=False,
+    max_cores="1",
 ):
     """
     Compute a median image with resampling.
@@ -219,6 +226,10 @@ def median_with_resampling(
     return_error : bool, optional
         If `True`, an approximate median error is computed alongside the
         median science image.
+    max_cores : str, optional
+        Number of processes used to resample groups concurrently, and of
+        threads used to compute the median. Can be an integer,
+        'none', 'quarter', 'half', or 'all'.
 
     Returns
     -------
@@ -232,8 +243,7 @@ def median_with_resampling(
         returned.
     """
     in_memory = not input_models.on_disk
-    indices_by_group = list(input_models.group_indices.values())
-    ngroups = len(indices_by_group)
+    ngroups = len(input_models.group_indices)
     median_err = None
 
     eval_med_err = False
@@ -251,46 +261,51 @@ def median_with_resampling(
         # create an empty image model for the median data
         median_model = datamodels.ImageModel(None)
 
-    for i, indices in enumerate(indices_by_group):
-        drizzled_model = resamp.resample_group(indices)
-
+    # Groups may be resampled concurrently: add each to the median
+    # computer as soon as it is available.
+    computer = None
+    for i, drizzled_model in resamp.resample_groups(max_cores=max_cores):
         if save_intermediate_results:
             # write the drizzled model to file
             _fileio.save_drizzled(drizzled_model, make_output_path)
 
-        if i == 0:
+        if computer is None:
             median_wcs = resamp.output_wcs
             input_shape = (ngroups,) + drizzled_model.data.shape
             dtype = drizzled_model.data.dtype
-            computer = MedianComputer(input_shape, in_memory, buffer_size, dtype)
-            if eval_med_err:
-                err_computer = MedianComputer(input_shape, in_memory, buffer_size, dtype)
-            else:
-                err_computer = None
-            if save_intermediate_results:
-                # update median model's meta with meta from the first model:
-                median_model.update(drizzled_model)
-                median_model.meta.wcs = median_wcs
-                # Certain attributes that represent only one slit get copied over,
-                # but the median model isn't associated with any particular slit.
-                # Delete those.
-                if median_model.hasattr("source_xpos"):
-                    del median_model.source_xpos
-                if median_model.hasattr("source_ypos"):
-                    del median_model.source_ypos
+            computer = TiledMedianComputer(
+                input_shape,
+                nlayers=2 if eval_med_err else 1,
+                in_memory=in_memory,
+                buffer_size=buffer_size,
+                dtype=dtype,
+                max_cores=max_cores,
+            )
+        if save_intermediate_results and i == 0:
+            # update median model's meta with meta from the first model:
+            median_model.update(drizzled_model)
+            median_model.meta.wcs = median_wcs
+            # Certain attributes that represent only one slit get copied over,
+            # but the median model isn't associated with any particular slit.
+            # Delete those.
+            if median_model.hasattr("source_xpos"):
+                del median_model.source_xpos
+            if median_model.hasattr("source_ypos"):
+                del median_model.source_ypos
 
         weight_threshold = compute_weight_threshold(drizzled_model.wht, maskpt)
         drizzled_model.data[drizzled_model.wht < weight_threshold] = np.nan
         computer.append(drizzled_model.data, i)
         if eval_med_err:
             drizzled_model.err[drizzled_model.wht < weight_threshold] = np.nan
-            err_computer.append(drizzled_model.err, i)
+            computer.append(drizzled_model.err, i, layer=1)
         del drizzled_model
 
-    # Perform median combination on set of drizzled mosaics
-    median_data = computer.evaluate()
+    # Perform median combination on set of drizzled mosaics,
+    # computing the median error in the same pass
+    median_data, *median_errs = computer.evaluate()
     if eval_med_err:
-        median_err = err_computer.evaluate()
+        median_err = median_errs[0]
 
     if save_intermediate_results:
         # Save median model to fits
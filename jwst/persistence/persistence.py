@@ -45,6 +45,9 @@ class DataSet:
 
     persistence_dnu : bool
         When flagging PERSISTENCE, if `True`, then flag as DO_NOT_USE as well.
+
+    end_time : float or None
+        The epoch time of the last group processed.
     """
 
     def __init__(
@@ -66,6 +69,7 @@ class DataSet:
         self.persistence_time = persistence_time
         self.persistence_array = persistence_array
         self.persistence_dnu = persistence_dnu
+        self.end_time = None
 
     def do_all(self):
         """
@@ -98,7 +102,6 @@ class DataSet:
         epoch_time = mjd_to_epoch(self.output_obj.meta.exposure.start_time)
         integration_time = self.output_obj.meta.exposure.integration_time
         group_time = self.output_obj.meta.exposure.group_time
-        sat_array = np.zeros(shape=(nrows, ncols), dtype=np.uint32)
 
         for integ in range(nints):
             if self.output_obj.int_times is not None and len(self.output_obj.int_times) > integ:
@@ -109,17 +112,17 @@ class DataSet:
                 # Exposure start time is used if int_times is not available.
                 current_time = epoch_time + integ * integration_time
 
-            for group in range(ngroups):
-                current_time = current_time + group_time
-                if self.persistence_time is not None:
-                    self.process_persistence_flagging(current_time, sat_array, integ, group)
-            sat_array[:, :] = 0
+            # The time of each group, accumulated as group times are added.
+            group_times = np.cumsum(np.r_[current_time, np.full(ngroups, group_time)])[1:]
+            if self.persistence_time is not None:
+                self.process_persistence_flagging(group_times, integ)
+            self.end_time = group_times[-1]
 
         return self.output_obj, skipped
 
-    def process_persistence_flagging(self, current_time, sat_array, integ, group):
+    def process_persistence_flagging(self, group_times, integ):
         """
-        Flag groups that are within a persistence window.
+        Flag the groups of an integration that are within a persistence window.
 
         The structure of the persistence_array is as follows:
 
@@ -137,53 +140,69 @@ class DataSet:
         is determined to be the first group in a ramp to be saturated, in which case the
         end time of the window is current_time + persistence_time.
 
+        Only the pixels which have an open window, or are saturated or above
+        ``dn_threshold`` in any group of the integration, can be flagged.
+        These are found for all groups at once, and the groups are then
+        processed in turn for those pixels only.
+
         Parameters
         ----------
-        current_time : float
-            The epoch time of the current integration and group.
-
-        sat_array : ndarray
-            The saturation count for each pixel.
+        group_times : ndarray
+            The epoch time of each group of the integration.
 
         integ : int
             The current integration being processed.
-
-        group : int
-            The current group being processed.
         """
-        # Any persistence_array time earlier than current time gets set to zero. The
-        # persistence window has ended for that pixel because the current time is
-        # after the end of the persistence window.
-        self.persistence_array[self.persistence_array < current_time] = 0.0
-        window_end = current_time + self.persistence_time
-
-        # Calculate any first saturation points. Any group found to be the first
-        # saturated group in a ramp is the beginning of a persistence window.
-        gdq_plane = self.output_obj.groupdq[integ, group, :, :]
-        sat_loc = np.bitwise_and(gdq_plane, dqflags.group["SATURATED"])
-        sat_array[sat_loc > 0] += 1
-        self.persistence_array[sat_array == 1] = window_end
-
-        # Open a persistence window based on the dn_threshold.
+        gdq = self.output_obj.groupdq[integ]
+        saturated = dqflags.group["SATURATED"]
+
+        # Find the pixels which may be flagged in any group.
+        candidates = self.persistence_array > 0.0
+        candidates |= (np.bitwise_or.reduce(gdq, axis=0) & saturated) > 0
+        if self.dn_threshold is not None:
+            # NaN values are ignored by fmax, unless all values are NaN.
+            candidates |= np.fmax.reduce(self.output_obj.data[integ], axis=0) > self.dn_threshold
+        rows, cols = np.nonzero(candidates)
+        del candidates
+        if len(rows) == 0:
+            return
+
+        pers = self.persistence_array[rows, cols]
+        gdq_pix = gdq[:, rows, cols]
+        sat_count = np.cumsum((gdq_pix & saturated) > 0, axis=0)
         if self.dn_threshold is not None:
-            sci_plane = self.output_obj.data[integ, group, :, :]
-            set_window = np.full(self.persistence_array.shape, False, dtype=bool)
-            set_window[sci_plane > self.dn_threshold] = True
-            set_window[self.persistence_array > 0.0] = False
-            self.persistence_array[set_window] = window_end
-            del set_window
-
-        # This prevents 'backwards flagging'.
-        # Subtracting the persistence_time gives the beginning of the window.
-        # If the current time occurs before this time, then the current group is
-        #     outside the window and subtracting it will be a positive number.
-        # Reset window for pixels where backwards flagging situation arrives, as
-        #     this is an invalid state.
-        start_plane = self.persistence_array - window_end
-        start_plane[self.persistence_array == 0.0] = 0.0
-        if np.any(start_plane > 0.0):
-            log.info("Backwards flagging found. Resetting the window for those pixels")
-            self.persistence_array[start_plane > 0.0] = 0.0
+            above_threshold = self.output_obj.data[integ][:, rows, cols] > self.dn_threshold
+        in_window = np.zeros(gdq_pix.shape, dtype=bool)
+
+        for group, current_time in enumerate(group_times):
+            # Any persistence_array time earlier than current time gets set to zero. The
+            # persistence window has ended for that pixel because the current time is
+            # after the end of the persistence window.
+            pers[pers < current_time] = 0.0
+            window_end = current_time + self.persistence_time
+
+            # Any group found to be the first saturated group in a ramp is the
+            # beginning of a persistence window.
+            pers[sat_count[group] == 1] = window_end
+
+            # Open a persistence window based on the dn_threshold.
+            if self.dn_threshold is not None:
+                pers[above_threshold[group] & (pers == 0.0)] = window_end
+
+            # This prevents 'backwards flagging'.
+            # Subtracting the persistence_time gives the beginning of the window.
+            # If the current time occurs before this time, then the current group is
+            #     outside the window and subtracting it will be a positive number.
+            # Reset window for pixels where backwards flagging situation arrives, as
+            #     this is an invalid state.
+            backwards = pers > window_end
+            if np.any(backwards):
+                log.info("Backwards flagging found. Resetting the window for those pixels")
+                pers[backwards] = 0.0
+
+            in_window[group] = pers > 0.0
+
+        self.persistence_array[rows, cols] = pers
 
         # Set persistence flag for any group in persistence window
         if self.persistence_dnu:
@@ -191,9 +210,7 @@ class DataSet:
         else:
             flag = dqflags.group["PERSISTENCE"]
 
-        gdq_plane[self.persistence_array > 0.0] |= flag
-
-        self.output_obj.groupdq[integ, group, :, :] = gdq_plane
+        gdq[:, rows, cols] = np.where(in_window, gdq_pix | flag, gdq_pix)
 
 
 def mjd_to_epoch(mjd):
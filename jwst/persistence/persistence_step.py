@@ -25,6 +25,7 @@ class PersistenceStep(Step):
         persistence_time = integer(default=None) # Time, in seconds, to use for persistence window
         dn_threshold = float(default=None) # A threshold above which to flag persistence.
         persistence_array_file = string(default=None) # A path to an ASDF file containing a 2-D array of persistence times per pixel
+        persistence_store = string(default=None) # A path to an ASDF file of persistence windows, read before and updated after each exposure
         persistence_dnu = boolean(default=False) # If True the set the DO_NOT_USE flag with PERSISTENCE
         skip = boolean(default=True) # By default, skip the step.
     """  # noqa: E501
@@ -67,6 +68,8 @@ class PersistenceStep(Step):
         result.meta.cal_step.persistence = "COMPLETE"
         if pers_a.save_persistence is not None:
             self.write_persistence_array(result, pers_a.save_persistence)
+        if self.persistence_store is not None:
+            self.write_persistence_array(result, self.persistence_store, end_time=pers_a.end_time)
 
         return result
 
@@ -95,12 +98,16 @@ class PersistenceStep(Step):
         _, _, nrows, ncols = result.groupdq.shape
         if self.persistence_array_file is not None:
             self.get_persistence_array_from_file(result, nrows, ncols)
+        elif self.persistence_store is not None:
+            self.get_persistence_array_from_file(
+                result, nrows, ncols, filename=_asdf_filename(self.persistence_store)
+            )
         else:
             self.persistence_array = np.zeros(shape=(nrows, ncols), dtype=np.float64)
 
         return None
 
-    def write_persistence_array(self, result, filename):
+    def write_persistence_array(self, result, filename, end_time=None):
         """
         Write the persistence array to an ASDF file.
 
@@ -109,13 +116,14 @@ class PersistenceStep(Step):
         result : `~stdatamodels.jwst.datamodels.RampModel`
             The `~stdatamodels.jwst.datamodels.RampModel`
             on which to process the persistence flag.
+        filename : str
+            The path to the ASDF file. Entries for other detectors
+            in an existing file are preserved.
+        end_time : float or None, optional
+            The epoch time of the end of the exposure. If provided, it is
+            recorded such that exposures are only read in sequence.
         """
-        ext = str(Path(filename).suffix)
-        stem = Path(filename).stem
-        parent = Path(filename).parent
-        root = str(parent / stem)
-        if ext != ".asdf":
-            filename = f"{root}.asdf"
+        filename = _asdf_filename(filename)
 
         # Write persistence array to ASDF file
         # Only write out the non-zero rows and columns
@@ -138,40 +146,89 @@ class PersistenceStep(Step):
             "cols": cols,
             "vals": vals,
             "pers_time": self.persistence_time,
+            # The end of the last open window, such that expired entries
+            # are skipped without reading their arrays.
+            "expires": float(vals.max()) if len(vals) else 0.0,
         }
+        if end_time is not None:
+            tree[detector]["end_time"] = float(end_time)
 
         # Write out the persistence file
         asdf.dump(tree, filename)
 
-    def get_persistence_array_from_file(self, result, nrows, ncols):
+    def get_persistence_array_from_file(self, result, nrows, ncols, filename=None):
         """
         Get the persistence array from an ASDF file.
 
+        Windows which ended before the start of the exposure are ignored.
+
         Parameters
         ----------
+        result : `~stdatamodels.jwst.datamodels.RampModel`
+            The `~stdatamodels.jwst.datamodels.RampModel`
+            on which to process the persistence flag.
+
         nrows : int
             The number of rows in the `~stdatamodels.jwst.datamodels.RampModel` data.
 
         ncols : int
             The number of columns in the `~stdatamodels.jwst.datamodels.RampModel` data.
+
+        filename : str or None, optional
+            The path to the ASDF file. If None, ``persistence_array_file`` is used.
         """
+        if filename is None:
+            filename = self.persistence_array_file
         self.persistence_array = np.zeros(shape=(nrows, ncols), dtype=np.float64)
-        if not Path(self.persistence_array_file).exists():
-            log.info("Persistence array file does not exist: '{self.persistence_array_file}'")
+        if not Path(filename).exists():
+            log.info(f"Persistence array file does not exist: '{filename}'")
             log.info(".... Creating new persistence array.")
             return
-        with asdf.open(self.persistence_array_file) as pers_file:
+        start_time = persistence.mjd_to_epoch(result.meta.exposure.start_time)
+        with asdf.open(filename) as pers_file:
             detector = result.meta.instrument.detector
             if detector in pers_file:
-                rows = pers_file[detector]["rows"]
-                cols = pers_file[detector]["cols"]
-                vals = pers_file[detector]["vals"]
-                pers_time = pers_file[detector]["pers_time"]
+                entry = pers_file[detector]
+                pers_time = entry["pers_time"]
                 if pers_time != self.persistence_time:
                     msg = f"{pers_time} does not equal persistence_time :{self.persistence_time}"
                     log.info(msg)
                     return
-                self.persistence_array[rows, cols] = vals
+                if entry.get("end_time", -np.inf) > start_time:
+                    log.info(
+                        f"Persistence array for {detector} is from an exposure "
+                        f"({entry['filename']}) that ended after this one started."
+                    )
+                    log.info(".... Creating new persistence array.")
+                    return
+                if entry.get("expires", np.inf) < start_time:
+                    log.info(f"All persistence windows for {detector} have ended.")
+                    return
+                vals = np.asarray(entry["vals"])
+                active = vals >= start_time
+                rows = np.asarray(entry["rows"])[active]
+                cols = np.asarray(entry["cols"])[active]
+                self.persistence_array[rows, cols] = vals[active]
             else:
                 log.info(f"Detector {detector} not in persistence array file.")
                 log.info(".... Creating new persistence array.")
+
+
+def _asdf_filename(filename):
+    """
+    Ensure a file name has the ASDF extension.
+
+    Parameters
+    ----------
+    filename : str
+        The file name.
+
+    Returns
+    -------
+    str
+        The file name, with its extension replaced by ".asdf" if needed.
+    """
+    path = Path(filename)
+    if path.suffix != ".asdf":
+        return str(path.parent / path.stem) + ".asdf"
+    return filename
@@ -385,3 +385,53 @@ def test_step_persistence_fails(monkeypatch, create_sci_model):
     # Input is not modified
     assert result is not sci
     assert sci.meta.cal_step.persistence is None
+
+
+def test_persistence_store(create_sci_model, tmp_path, caplog):
+    """Test persistence windows are carried between sequential exposures by a store."""
+    nints, ngroups, nrows, ncols = 2, 7, 1, 2
+    store = str(tmp_path / "persistence_store.asdf")
+
+    # The first exposure saturates pixel (0, 1) at the end of its last integration
+    model = create_sci_model(nints=nints, ngroups=ngroups, nrows=nrows, ncols=ncols)
+    model.groupdq[1, 5:, 0, 1] |= dqflags.group["SATURATED"]
+    step = PersistenceStep(persistence_time=70, persistence_store=store)
+    res = step.run(model)
+    np.testing.assert_equal(res.groupdq[1, :, 0, 1], [0, 0, 0, 0, 0, 34, 34])
+
+    tree = asdf.load(store)
+    end_time = tree["NRCA1"]["end_time"]
+    assert tree["NRCA1"]["expires"] > end_time
+
+    # The window is still open at the start of the next exposure
+    model2 = create_sci_model(nints=nints, ngroups=ngroups, nrows=nrows, ncols=ncols)
+    model2.meta.exposure.start_time = persistence.epoch_to_mjd(end_time + 1.0)
+    step = PersistenceStep(persistence_time=70, persistence_store=store)
+    res2 = step.run(model2)
+    np.testing.assert_equal(res2.groupdq[0, :, 0, 0], [0, 0, 0, 0, 0, 0, 0])
+    np.testing.assert_equal(res2.groupdq[0, :, 0, 1], [32, 32, 0, 0, 0, 0, 0])
+    assert asdf.load(store)["NRCA1"]["expires"] == 0.0
+
+    # An exposure earlier than the stored one does not use the store
+    model3 = create_sci_model(nints=nints, ngroups=ngroups, nrows=nrows, ncols=ncols)
+    model3.meta.exposure.start_time = persistence.epoch_to_mjd(end_time - 100.0)
+    with caplog.at_level(logging.INFO):
+        PersistenceStep(persistence_time=70, persistence_store=store).run(model3)
+    assert "ended after this one started" in caplog.text
+
+
+def test_persistence_store_expired(create_sci_model, tmp_path):
+    """Test windows which ended before an exposure are not read from the store."""
+    nints, ngroups, nrows, ncols = 2, 7, 1, 2
+    store = str(tmp_path / "persistence_store.asdf")
+
+    model = create_sci_model(nints=nints, ngroups=ngroups, nrows=nrows, ncols=ncols)
+    model.groupdq[1, 5:, 0, 1] |= dqflags.group["SATURATED"]
+    PersistenceStep(persistence_time=70, persistence_store=store).run(model)
+    expires = asdf.load(store)["NRCA1"]["expires"]
+
+    step = PersistenceStep(persistence_time=70, persistence_store=store)
+    model2 = create_sci_model(nints=nints, ngroups=ngroups, nrows=nrows, ncols=ncols)
+    model2.meta.exposure.start_time = persistence.epoch_to_mjd(expires + 1.0)
+    step.process_persistence_options(model2)
+    assert not np.any(step.persistence_array)
@@ -32,6 +32,10 @@ class Image3Pipeline(Pipeline):
 
     spec = """
     in_memory = boolean(default=True)  # If False, preserve memory using temporary files at the expense of runtime
+    prefetch_bytes = integer(min=0, default=0)  # Size of the files to read ahead if in_memory is False
+    write_behind_bytes = integer(min=0, default=0)  # Size of the models to save in the background if in_memory is False
+    io_threads = integer(min=1, default=2)  # Threads reading ahead and saving in the background
+    metadata_index = string(default=None)  # File in which to save an index of the metadata of the input files, shared between runs
     """  # noqa: E501
 
     # Define alias to steps
@@ -121,7 +125,14 @@ class Image3Pipeline(Pipeline):
         if isinstance(input_data, ModelLibrary):
             return input_data
 
-        mlib_kwargs = {"asn_exptypes": ["science"], "on_disk": not self.in_memory}
+        mlib_kwargs = {
+            "asn_exptypes": ["science"],
+            "on_disk": not self.in_memory,
+            "prefetch_bytes": self.prefetch_bytes,
+            "write_behind_bytes": self.write_behind_bytes,
+            "io_threads": self.io_threads,
+            "metadata_index": self.metadata_index,
+        }
 
         if isinstance(input_data, str):
             ext = Path(input_data).suffix
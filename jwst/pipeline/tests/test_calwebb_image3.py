@@ -36,8 +36,15 @@ def make_mock_association(make_mock_cal_file):
     )
 
 
-@pytest.mark.parametrize("in_memory", [True, False])
-def test_run_image3_pipeline(make_mock_association, in_memory):
+@pytest.mark.parametrize(
+    "in_memory, io_options",
+    [
+        (True, {}),
+        (False, {}),
+        (False, {"prefetch_bytes": 2**30, "write_behind_bytes": 2**30, "io_threads": 1}),
+    ],
+)
+def test_run_image3_pipeline(make_mock_association, in_memory, io_options):
     """
     Two-product association passed in, run pipeline, skipping most steps
     """
@@ -55,6 +62,7 @@ def test_run_image3_pipeline(make_mock_association, in_memory):
                 "source_catalog": {"skip": True},
             },
             in_memory=in_memory,
+            **io_options,
         )
 
     _is_run_complete(LOGFILE)
@@ -1,8 +1,13 @@
 import logging
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
+import scipy.fft
 from astropy.stats import sigma_clipped_stats
 from scipy.ndimage import convolve1d
+from stcal.multiprocessing import compute_num_cores
 from stdatamodels.jwst.datamodels import dqflags
 
 log = logging.getLogger(__name__)
@@ -26,7 +31,14 @@ __all__ = [
 
 
 def correct_model(
-    output_model, irs2_model, scipix_n_default=16, refpix_r_default=4, pad=8, preserve_refpix=False
+    output_model,
+    irs2_model,
+    scipix_n_default=16,
+    refpix_r_default=4,
+    pad=8,
+    preserve_refpix=False,
+    maximum_cores="1",
+    fft_dtype="float64",
 ):
     """
     Correct an input NIRSpec IRS2 datamodel using reference pixels.
@@ -57,6 +69,15 @@ def correct_model(
         This is not used in the science pipeline, but is necessary to
         create new bias files for IRS2 mode.
 
+    maximum_cores : str
+        Number of threads used to process the four outputs concurrently
+        and to compute Fourier transforms.  Can be an integer, 'none',
+        'quarter', 'half', or 'all'.
+
+    fft_dtype : str or `~numpy.dtype`
+        Floating point precision of the Fourier filtering, 'float64'
+        or 'float32'.  See `subtract_reference`.
+
     Returns
     -------
     output_model : `~stdatamodels.jwst.datamodels.RampModel`
@@ -170,6 +191,11 @@ def correct_model(
     else:
         log.warning("DQ extension not found in reference file")
 
+    # The four outputs are corrected concurrently
+    nthreads = compute_num_cores(str(maximum_cores), 4, os.cpu_count() or 1)
+    if nthreads > 1:
+        log.info(f"Using {nthreads} threads for IRS2 reference subtraction")
+
     # Compute and apply the correction to one integration at a time
     for integ in range(n_int):
         log.info(f"Working on integration {integ + 1} out of {n_int}")
@@ -180,7 +206,16 @@ def correct_model(
         # below.  The last axis of output_model.data should be 2048.
         data0 = data[integ, :, :, :]
         data0 = subtract_reference(
-            data0, alpha, beta, irs2_mask, scipix_n, refpix_r, pad, preserve_refpix=preserve_refpix
+            data0,
+            alpha,
+            beta,
+            irs2_mask,
+            scipix_n,
+            refpix_r,
+            pad,
+            preserve_refpix=preserve_refpix,
+            nthreads=nthreads,
+            fft_dtype=fft_dtype,
         )
         if not preserve_refpix:
             data[integ, :, :, nx - ny :] = data0
@@ -692,8 +727,43 @@ def flag_bad_refpix(datamodel, n_sigma=3.0, flag_only=False, replace_only=False)
         pixeldq[mask_bad] |= dqflags.pixel["BAD_REF_PIXEL"] | dqflags.pixel["DO_NOT_USE"]
 
 
+def _real_filter(coeffs, n):
+    """
+    Get the half spectrum that filters real signals like a full spectrum.
+
+    Only the real part of the inverse transform of a filtered real signal
+    is kept, so the filter can be replaced by its Hermitian part, which
+    is determined by its first ``n // 2 + 1`` elements.
+
+    Parameters
+    ----------
+    coeffs : ndarray
+        Filter coefficients for the full spectrum, of length ``n`` along
+        the last axis.
+    n : int
+        Length of the signals.
+
+    Returns
+    -------
+    ndarray
+        Filter coefficients for the output of a real FFT, of length
+        ``n // 2 + 1`` along the last axis.
+    """
+    k = np.arange(n // 2 + 1)
+    return 0.5 * (coeffs[..., k] + np.conj(coeffs[..., -k % n]))
+
+
 def subtract_reference(
-    data0, alpha, beta, irs2_mask, scipix_n, refpix_r, pad, preserve_refpix=False
+    data0,
+    alpha,
+    beta,
+    irs2_mask,
+    scipix_n,
+    refpix_r,
+    pad,
+    preserve_refpix=False,
+    nthreads=1,
+    fft_dtype="float64",
 ):
     """
     Subtract reference output and pixels for the current integration.
@@ -736,6 +806,16 @@ def subtract_reference(
         If `True`, reference pixels will be preserved in the output.
         This is not used in the science pipeline, but is necessary to
         create new bias files for IRS2 mode.
+    nthreads : int
+        Number of threads.  The corrections for the four sectors are
+        computed concurrently, and Fourier transforms of several groups
+        are split among the threads.
+    fft_dtype : str or `~numpy.dtype`
+        Floating point precision of the Fourier filtering, 'float64' or
+        'float32'.  Single precision is faster and uses half the memory;
+        the Fourier transforms are then accurate to a few times 1e-7 of
+        the rms of the filtered signal, which is below the noise of the
+        corrected data.
 
     Returns
     -------
@@ -832,7 +912,20 @@ def subtract_reference(
 
     # Fill in bad pixels, gaps, and reference data locations in the normal
     # data, using Fourier filtering/interpolation
-    fill_bad_regions(data0, ngroups, ny, nx, row, scipix_n, refpix_r, pad, hnorm, hnorm1)
+    fill_bad_regions(
+        data0,
+        ngroups,
+        ny,
+        nx,
+        row,
+        scipix_n,
+        refpix_r,
+        pad,
+        hnorm,
+        hnorm1,
+        nthreads=nthreads,
+        fft_dtype=fft_dtype,
+    )
 
     # Setup various lists of indices that will be used in subsequent
     # sections for keeping/shuffling reference pixels in various arrays
@@ -877,89 +970,84 @@ def subtract_reference(
         temp_hs = temp_hs[:, ::-1]
         hs = temp_hs.flatten()
 
-    # Construct the reference data: this is done in a big loop over the
-    # four "sectors" of data in the image, corresponding to the amp regions.
+    # Construct the reference data: this is done for each of the four
+    # "sectors" of data in the image, corresponding to the amp regions.
     # Data from each sector is operated on independently and ultimately
-    # the corrections are subtracted from each sector independently.
+    # the corrections are subtracted from each sector independently, so
+    # the sectors are processed concurrently.
+    #
+    # At this point in the processing data0 has shape (5, ngroups, 2048, 712),
+    # assuming normal IRS2 readout settings.  The data are real, so real
+    # FFTs are used and the complex weights alpha and beta are reduced to
+    # their equivalent real-signal filters.  IDL and numpy differ in where
+    # they apply the normalization for the FFT; it cancels in the forward
+    # and inverse transforms, so it is not applied here.
     shape_d = data0.shape
-    for k in range(1, 5):
+    ntime = shape_d[2] * shape_d[3]
+    real_dtype = np.dtype(fft_dtype)
+    complex_dtype = np.result_type(real_dtype, np.complex64)
+    beta = _real_filter(beta, ntime).astype(complex_dtype)
+
+    # Note that where the IDL code uses alpha, we use beta, and vice versa.
+    refout0 = None
+    if alpha is not None:
+        alpha = _real_filter(alpha, ntime).astype(complex_dtype)
+        # IDL:  refout0 = reform(data0[*,*,*,0], sd[1] * sd[2], sd[3])
+        # IDL:  refout0 = fft(refout0, dim=1, /over)
+        # The reference output is the same for all sectors.
+        refout0 = data0[0].reshape((shape_d[1], ntime)).astype(real_dtype)
+        refout0 = scipy.fft.rfft(refout0, axis=1, workers=nthreads)
+
+    # Reusable work buffers, one per thread.  Elements not in ht stay zero.
+    buffers = queue.SimpleQueue()
+    for _ in range(min(nthreads, 4)):
+        buffers.put(np.zeros(shape_d[1:], dtype=real_dtype))
+
+    if not preserve_refpix:
+        hcorr = hnorm1
+    else:
+        hcorr = unpad
+
+    def correct_sector(k):
         log.debug(f"processing sector {k}")
+        r0k = buffers.get()
+        try:
+            # r0k contains a subset of the data from 1 sector of data0,
+            # with shape (ngroups, 2048, 712)
+            r0k[:, :, ht] = data0[k][:, :, hs]
+
+            # IDL:  r0 = reform(r0, sd[1] * sd[2], sd[3], 5, /over)
+            r0k_fft = scipy.fft.rfft(r0k.reshape((shape_d[1], ntime)), axis=1)
+        finally:
+            buffers.put(r0k)
 
-        # At this point in the processing data0 has shape (5, ngroups, 2048, 712),
-        # assuming normal IRS2 readout settings. r0k contains a subset of the
-        # data from 1 sector of data0, with shape (ngroups, 2048, 256)
-        r0k = np.zeros((shape_d[1], shape_d[2], shape_d[3]), dtype=np.float32)
-        temp = data0[k, :, :, hs].copy()
-        temp = np.transpose(temp, (1, 2, 0))
-        r0k[:, :, ht] = temp
-        del temp
-
-        # data0 has shape (5, ngroups, ny, row).  See the section above where
-        # d0 was created, then copied (moved) to data0.
-        # sd[1] = shape_d[3]   row (712)
-        # sd[2] = shape_d[2]   ny (2048)
-        # sd[3] = shape_d[1]   ngroups
-        # sd[4] = shape_d[0]   5
-        # s is used below, so for convenience, here are the values again:
-        # s[1] = shape[2] = nx
-        # s[2] = shape[1] = ny
-        # s[3] = shape[0] = ngroups
-
-        # IDL and numpy differ in where they apply the normalization for the
-        # FFT.  This really shouldn't matter.
-        normalization = float(shape_d[2] * shape_d[3])
-
-        # Set up refout if alpha was provided
-        refout0 = None
-        if alpha is not None:
-            # IDL:  refout0 = reform(data0[*,*,*,0], sd[1] * sd[2], sd[3])
-            refout0 = data0[0, :, :, :].reshape((shape_d[1], shape_d[2] * shape_d[3]))
-
-            # IDL:  refout0 = fft(refout0, dim=1, /over)
-            # Divide by the length of the axis to be consistent with IDL.
-            refout0 = np.fft.fft(refout0, axis=1) / normalization
-
-        # IDL:  r0 = reform(r0, sd[1] * sd[2], sd[3], 5, /over)
-        r0k = r0k.reshape((shape_d[1], shape_d[2] * shape_d[3]))
-        r0k = r0k.astype(np.complex64)
-        r0k_fft = np.fft.fft(r0k, axis=1) / normalization
-
-        # Note that where the IDL code uses alpha, we use beta, and vice versa.
         # IDL:  for k=0,3 do oBridge[k]->Execute,
         #           "for i=0, s3-1 do r0[*,i] *= alpha"
         r0k_fft *= beta[k - 1]
 
         # IDL:  for k=0,3 do oBridge[k]->Execute,
         #           "for i=0, s3-1 do r0[*,i] += beta * refout0[*,i]"
-        if alpha is not None:
-            r0k_fft += alpha[k - 1] * refout0
-        del refout0
+        if refout0 is not None:
+            for group in range(shape_d[1]):
+                r0k_fft[group] += alpha[k - 1] * refout0[group]
 
         # IDL:  for k=0,3 do oBridge[k]->Execute,
         #           "r0 = fft(r0, 1, dim=1, /overwrite)", /nowait
-        r0k = np.fft.ifft(r0k_fft, axis=1) * normalization
-        del r0k_fft
-
-        # sd[1] = shape_d[3]   row (712)
-        # sd[2] = shape_d[2]   ny (2048)
-        # sd[3] = shape_d[1]   ngroups
-        # sd[4] = shape_d[0]   5
         # IDL:  r0 = reform(r0, sd[1], sd[2], sd[3], 5, /over)
-        r0k = r0k.reshape(shape_d[1], shape_d[2], shape_d[3])
-        r0k = r0k.real
-        if not preserve_refpix:
-            r0k = r0k[:, :, hnorm1]
-        else:
-            r0k = r0k[:, :, unpad]
+        r0k = scipy.fft.irfft(r0k_fft, ntime, axis=1, overwrite_x=True)
+        del r0k_fft
+        r0k = r0k.reshape(shape_d[1:])
 
         # Subtract the correction from the data in this sector
-        if not preserve_refpix:
-            data0[k, :, :, hnorm1] -= np.transpose(r0k, (2, 0, 1))
-        else:
-            data0[k, :, :, unpad] -= np.transpose(r0k, (2, 0, 1))
-        del r0k
+        data0[k][:, :, hcorr] -= r0k[:, :, hcorr]
 
-    # End of loop over 4 sectors
+    if nthreads > 1:
+        with ThreadPoolExecutor(max_workers=nthreads) as executor:
+            # Consume the results to propagate any exceptions.
+            list(executor.map(correct_sector, range(1, 5)))
+    else:
+        for k in range(1, 5):
+            correct_sector(k)
 
     # Original data0 array has shape (5, ngroups, 2048, 712). Now that
     # correction has been applied, remove the interleaved reference pixels.
@@ -1011,10 +1099,15 @@ def subtract_reference(
     return data0
 
 
-def fft_interp_norm(dd0, mask0, row, hnorm, hnorm1, ny, ngroups, aa, n_iter_norm):
+def fft_interp_norm(
+    dd0, mask0, row, hnorm, hnorm1, ny, ngroups, aa, n_iter_norm, nthreads=1, fft_dtype="float64"
+):
     """
     Filter iteratively in FFT space of the normal pixels in each group.
 
+    Groups are filtered ``nthreads`` at a time, with the Fourier transforms
+    split among the threads.
+
     Parameters
     ----------
     dd0 : ndarray
@@ -1037,19 +1130,25 @@ def fft_interp_norm(dd0, mask0, row, hnorm, hnorm1, ny, ngroups, aa, n_iter_norm
         Filter to apply.
     n_iter_norm : int
         Number of filtering iterations.
+    nthreads : int, optional
+        Number of threads for the Fourier transforms.
+    fft_dtype : str or `~numpy.dtype`, optional
+        Floating point precision of the filtering.
     """
     mm = np.zeros((ny, row), dtype=np.int8)
     mm[:, hnorm1] = mask0[:, hnorm]
-    hm = mm != 0  # 2-D boolean mask
-    for j in range(ngroups):
-        dd = dd0[j, :, :].copy()  # make a copy, not a view
-        p = dd.flatten()
+    hm = (mm != 0).ravel()  # boolean mask
+    ntime = ny * row
+    aa = _real_filter(aa, ntime).astype(np.dtype(fft_dtype))
+    for j in range(0, ngroups, nthreads):
+        p = dd0[j : j + nthreads].reshape((-1, ntime)).astype(fft_dtype)
+        dd = p[:, hm]
         for _it in range(n_iter_norm):
-            pp = np.fft.fft(p)
+            pp = scipy.fft.rfft(p, axis=1, workers=nthreads)
             pp *= aa
-            p[:] = np.fft.ifft(pp).real
-            p[hm.ravel()] = dd[hm]
-        dd0[j, :, :] = p.reshape((ny, row))
+            p = scipy.fft.irfft(pp, ntime, axis=1, workers=nthreads, overwrite_x=True)
+            p[:, hm] = dd
+        dd0[j : j + nthreads] = p.reshape((-1, ny, row))
 
 
 def ols_line(x, y):
@@ -1174,7 +1273,20 @@ def replace_bad_pixels(data0, ngroups, ny, row):
         data0[kk, jj, :, :] += dat * (1.0 - mask)
 
 
-def fill_bad_regions(data0, ngroups, ny, nx, row, scipix_n, refpix_r, pad, hnorm, hnorm1):
+def fill_bad_regions(
+    data0,
+    ngroups,
+    ny,
+    nx,
+    row,
+    scipix_n,
+    refpix_r,
+    pad,
+    hnorm,
+    hnorm1,
+    nthreads=1,
+    fft_dtype="float64",
+):
     """
     Fill the bad regions in the data.
 
@@ -1209,6 +1321,10 @@ def fill_bad_regions(data0, ngroups, ny, nx, row, scipix_n, refpix_r, pad, hnorm
         Array of column indices for normal pixels.
     hnorm1 : ndarray
         Shifted index values for normal pixels.
+    nthreads : int, optional
+        Number of threads for the Fourier transforms.
+    fft_dtype : str or `~numpy.dtype`, optional
+        Floating point precision of the Fourier filtering.
     """
     # Parameters for the filter to be used:
     # length of apodization cosine filter
@@ -1258,6 +1374,8 @@ def fill_bad_regions(data0, ngroups, ny, nx, row, scipix_n, refpix_r, pad, hnorm
         ngroups,
         aa,
         n_iter_norm,
+        nthreads=nthreads,
+        fft_dtype=fft_dtype,
     )
 
     data0[0, :, :, :] = dd0.copy()
@@ -188,6 +188,9 @@ NIR_DETECTORS = [
 ]
 # fmt: on
 
+# Maximum size, in bytes, of a block of full frame groups processed together
+GROUP_BLOCK_SIZE = 256 << 20
+
 # Status returns
 REFPIX_OK = 0
 BAD_REFERENCE_PIXELS = 1
@@ -319,7 +322,9 @@ class Dataset:
         Parameters
         ----------
         data : ndarray
-            Array of pixels to be sigma-clipped
+            Array of pixels to be sigma-clipped.  Any leading dimensions
+            beyond those of ``dq`` index separate groups, for which the
+            clipped means are computed independently.
         dq : ndarray
             DQ array for data
         low : float or `None`, optional
@@ -329,8 +334,9 @@ class Dataset:
 
         Returns
         -------
-        mean : float
-            Clipped mean of data array
+        mean : float or ndarray or `None`
+            Clipped mean of data array, or an array of the clipped means of
+            each group if ``data`` has more dimensions than ``dq``.
         """
         if low is None:
             low = self.siglimit
@@ -346,6 +352,10 @@ class Dataset:
         if len(goodpixels[0]) == 0:
             return None
         #
+        # Clip all groups of a stack together
+        if data.ndim > dq.ndim:
+            return _clipped_mean_stack(data[..., *goodpixels], low, high)
+        #
         # scipy routine fails if the pixels all have exactly the same value
         if np.std(data[goodpixels], dtype=np.float64) != 0.0:
             clipped_ref, lowlim, uplim = stats.sigmaclip(data[goodpixels], low, high)
@@ -769,10 +779,10 @@ class NIRDataset(Dataset):
         # handle interleaved pixels if needed
         if self.is_irs2:
             odd_mask = self.irs2_odd_mask[colstart:colstop]
-            oddref = group[rowstart:rowstop, colstart:colstop][:, odd_mask]
+            oddref = group[..., rowstart:rowstop, colstart:colstop][..., odd_mask]
             odddq = self.pixeldq[rowstart:rowstop, colstart:colstop][:, odd_mask]
         else:
-            oddref = group[rowstart:rowstop, colstart:colstop:2]
+            oddref = group[..., rowstart:rowstop, colstart:colstop:2]
             odddq = self.pixeldq[rowstart:rowstop, colstart:colstop:2]
 
         return oddref, odddq
@@ -810,12 +820,12 @@ class NIRDataset(Dataset):
         # handle interleaved pixels if needed
         if self.is_irs2:
             even_mask = ~self.irs2_odd_mask[colstart:colstop]
-            evenref = group[rowstart:rowstop, colstart:colstop][:, even_mask]
+            evenref = group[..., rowstart:rowstop, colstart:colstop][..., even_mask]
             evendq = self.pixeldq[rowstart:rowstop, colstart:colstop][:, even_mask]
         else:
             # Even columns start on the second column
             colstart = colstart + 1
-            evenref = group[rowstart:rowstop, colstart:colstop:2]
+            evenref = group[..., rowstart:rowstop, colstart:colstop:2]
             evendq = self.pixeldq[rowstart:rowstop, colstart:colstop:2]
 
         return evenref, evendq
@@ -899,7 +909,7 @@ class NIRDataset(Dataset):
             return odd, even
         else:
             rowstart, rowstop, colstart, colstop = self.reference_sections[amplifier][top_or_bottom]
-            ref = group[rowstart:rowstop, colstart:colstop]
+            ref = group[..., rowstart:rowstop, colstart:colstop]
             dq = self.pixeldq[rowstart:rowstop, colstart:colstop]
             mean = self.sigma_clip(ref, dq)
             if mean is None:
@@ -916,14 +926,15 @@ class NIRDataset(Dataset):
         Parameters
         ----------
         group : ndarray
-            Group that is being processed.
+            Group that is being processed, or a stack of groups.
 
         Returns
         -------
         refpix : dict
             Dictionary containing the clipped mean of the reference pixels for
             each amplifier, odd and even columns (if selected, otherwise all columns)
-            and top and bottom.
+            and top and bottom.  For a stack of groups, each mean is an array
+            with one value per group.
         """
         refpix = {}
         for amplifier in self.amplifiers:
@@ -946,8 +957,9 @@ class NIRDataset(Dataset):
         Parameters
         ----------
         group : ndarray
-            Group that is being processed.  The parameter ``group`` is corrected
-            for the bias drift using the top and bottom reference pixels
+            Group that is being processed, or a stack of groups.  The parameter
+            ``group`` is corrected for the bias drift using the top and bottom
+            reference pixels
         refvalues : dict
             Dictionary of reference pixel clipped means
         """
@@ -968,25 +980,31 @@ class NIRDataset(Dataset):
                     f"Amplifier: {amplifier}, Odd ref: {oddrefsignal}, Even ref: {evenrefsignal}"
                 )
                 if oddrefsignal is not None and evenrefsignal is not None:
+                    # Broadcast the values for a stack of groups over each group
+                    oddrefsignal = np.expand_dims(oddrefsignal, (-2, -1))
+                    evenrefsignal = np.expand_dims(evenrefsignal, (-2, -1))
                     if not self.is_irs2:
                         oddslice = (
+                            Ellipsis,
                             slice(datarowstart, datarowstop, 1),
                             slice(datacolstart, datacolstop, 2),
                         )
                         evenslice = (
+                            Ellipsis,
                             slice(datarowstart, datarowstop, 1),
                             slice(datacolstart + 1, datacolstop, 2),
                         )
-                        group[oddslice] = group[oddslice] - oddrefsignal
-                        group[evenslice] = group[evenslice] - evenrefsignal
+                        group[oddslice] -= oddrefsignal
+                        group[evenslice] -= evenrefsignal
                     else:
                         dataslice = (
+                            Ellipsis,
                             slice(datarowstart, datarowstop, 1),
                             slice(datacolstart, datacolstop, 1),
                         )
                         odd_mask = self.irs2_odd_mask[datacolstart:datacolstop]
-                        group[dataslice][:, odd_mask] -= oddrefsignal
-                        group[dataslice][:, ~odd_mask] -= evenrefsignal
+                        group[dataslice][..., odd_mask] -= oddrefsignal
+                        group[dataslice][..., ~odd_mask] -= evenrefsignal
                 else:
                     pass
             else:
@@ -994,11 +1012,13 @@ class NIRDataset(Dataset):
                 refbottom = refvalues[amplifier]["bottom"]
                 refsignal = self.average_with_none(reftop, refbottom)
                 if refsignal is not None:
+                    refsignal = np.expand_dims(refsignal, (-2, -1))
                     dataslice = (
+                        Ellipsis,
                         slice(datarowstart, datarowstop, 1),
                         slice(datacolstart, datacolstop, 1),
                     )
-                    group[dataslice] = group[dataslice] - refsignal
+                    group[dataslice] -= refsignal
                 else:
                     pass
         return
@@ -1044,7 +1064,7 @@ class NIRDataset(Dataset):
         Parameters
         ----------
         data : ndarray
-            Input data array.
+            Input data array.  Rows are along the second to last axis.
         smoothing_length : int
             Smoothing length; should be odd, will be converted if not.
             Amount by which the input array is extended is
@@ -1057,16 +1077,16 @@ class NIRDataset(Dataset):
             Array that has been extended at the top and bottom by reflecting the
             first and last few rows.
         """
-        nrows, ncols = data.shape
+        nrows, ncols = data.shape[-2:]
         if smoothing_length % 2 == 0:
             log.info("Smoothing length must be odd, adding 1")
             smoothing_length = smoothing_length + 1
         newheight = nrows + smoothing_length - 1
-        reflected = np.zeros((newheight, ncols), dtype=data.dtype)
+        reflected = np.zeros((*data.shape[:-2], newheight, ncols), dtype=data.dtype)
         bufsize = smoothing_length // 2
-        reflected[bufsize : bufsize + nrows] = data[:]
-        reflected[:bufsize] = data[bufsize:0:-1]
-        reflected[-(bufsize):] = data[-2 : -(bufsize + 2) : -1]
+        reflected[..., bufsize : bufsize + nrows, :] = data
+        reflected[..., :bufsize, :] = data[..., bufsize:0:-1, :]
+        reflected[..., -(bufsize):, :] = data[..., -2 : -(bufsize + 2) : -1, :]
         return reflected
 
     def median_filter(self, data, dq, smoothing_length):
@@ -1079,7 +1099,7 @@ class NIRDataset(Dataset):
         Parameters
         ----------
         data : ndarray
-            Input 2-D science array.
+            Input 2-D science array, or a stack of 2-D arrays sharing the DQ array.
         dq : ndarray
             Input 2-D DQ array.
         smoothing_length : int
@@ -1088,23 +1108,35 @@ class NIRDataset(Dataset):
         Returns
         -------
         result : ndarray
-            1-D array that is a median filtered version of the input data.
+            1-D array that is a median filtered version of the input data,
+            or one such array per input array for a stack.
         """
         augmented_data = self.create_reflected(data, smoothing_length)
         augmented_dq = self.create_reflected(dq, smoothing_length)
-        nrows, ncols = data.shape
-        result = np.zeros(nrows)
-        for i in range(nrows):
-            rowstart = i
-            rowstop = rowstart + smoothing_length
-            goodpixels = np.where(
-                np.bitwise_and(augmented_dq[rowstart:rowstop], dqflags.pixel["DO_NOT_USE"]) == 0
-            )
-            if len(goodpixels[0]) == 0:
-                result[i] = np.nan
-            else:
-                window = augmented_data[rowstart:rowstop][goodpixels]
-                result[i] = np.median(window)
+        nrows = data.shape[-2]
+
+        # Boxes for all rows, with the pixels in each box along the last axis
+        windows = np.lib.stride_tricks.sliding_window_view(
+            augmented_data, smoothing_length, axis=-2
+        )[..., :nrows, :, :]
+        windows = windows.reshape(*windows.shape[:-2], -1)
+        good = np.lib.stride_tricks.sliding_window_view(
+            np.bitwise_and(augmented_dq, dqflags.pixel["DO_NOT_USE"]) == 0,
+            smoothing_length,
+            axis=0,
+        )[:nrows]
+        good = good.reshape(nrows, -1)
+
+        # Take medians over the rows with the same number of good pixels
+        # together; there are none to use in rows with no good pixels.
+        result = np.full((*data.shape[:-2], nrows), np.nan)
+        ngood = np.sum(good, axis=1)
+        for n in np.unique(ngood[ngood > 0]):
+            rows = np.flatnonzero(ngood == n)
+            pixels = np.nonzero(good[rows])[1].reshape(len(rows), n)
+            pixels = np.expand_dims(pixels, tuple(range(windows.ndim - 2)))
+            window = np.take_along_axis(windows[..., rows, :], pixels, axis=-1)
+            result[..., rows] = np.median(window, axis=-1)
         return result
 
     def calculate_side_ref_signal(self, group, colstart, colstop):
@@ -1117,7 +1149,7 @@ class NIRDataset(Dataset):
         Parameters
         ----------
         group : ndarray
-            Group that is being processed
+            Group that is being processed, or a stack of groups
         colstart : int
             Starting column
         colstop : int
@@ -1126,10 +1158,10 @@ class NIRDataset(Dataset):
         Returns
         -------
         ndarray
-            Median filtered version of the side reference pixels
+            Median filtered version of the side reference pixels, for each group
         """
         smoothing_length = self.side_smoothing_length
-        data = group[:, colstart : colstop + 1]
+        data = group[..., :, colstart : colstop + 1]
         dq = self.pixeldq[:, colstart : colstop + 1]
         return self.median_filter(data, dq, smoothing_length)
 
@@ -1149,12 +1181,11 @@ class NIRDataset(Dataset):
         Returns
         -------
         sidegroup : ndarray
-            2-D array of average reference pixel vector replicated horizontally
+            Average reference pixel vector as a column, to be replicated
+            horizontally by broadcasting
         """
         combined = self.combine_with_nans(left, right)
-        sidegroup = np.zeros((2048, 2048))
-        for column in range(2048):
-            sidegroup[:, column] = combined
+        sidegroup = combined[..., np.newaxis]
         return sidegroup
 
     def combine_with_nans(self, a, b):
@@ -1179,7 +1210,7 @@ class NIRDataset(Dataset):
         result : ndarray
             Combined array
         """
-        result = np.zeros(len(a), dtype=a.dtype)
+        result = np.zeros(a.shape, dtype=a.dtype)
 
         bothnan = np.where(np.isnan(a) & np.isnan(b))
         result[bothnan] = 0.0
@@ -1202,16 +1233,17 @@ class NIRDataset(Dataset):
         Parameters
         ----------
         group : ndarray
-            Group being processed
+            Group being processed.  It is corrected in place.
         sidegroup : ndarray
-            Side reference pixel signal replicated horizontally
+            Side reference pixel signal, broadcastable to the group shape
 
         Returns
         -------
         corrected_group : ndarray
             The group corrected for the side reference pixel signal
         """
-        corrected_group = group - self.side_gain * sidegroup
+        group -= self.side_gain * sidegroup
+        corrected_group = group
         return corrected_group
 
     def do_side_correction(self, group):
@@ -1221,7 +1253,7 @@ class NIRDataset(Dataset):
         Parameters
         ----------
         group : ndarray
-            Group being processed
+            Group being processed, or a stack of groups.  It is corrected in place.
 
         Returns
         -------
@@ -1245,7 +1277,9 @@ class NIRDataset(Dataset):
         #
         # Apply optimized convolution kernel
         if continue_apply_conv_kernel:
-            corrected_group = apply_conv_kernel(group, kernels, sigreject=self.sigreject)
+            for index in np.ndindex(group.shape[:-2]):
+                group[index] = apply_conv_kernel(group[index], kernels, sigreject=self.sigreject)
+            corrected_group = group
         else:
             # use running median
             left = self.calculate_side_ref_signal(group, 0, 3)
@@ -1272,30 +1306,32 @@ class NIRDataset(Dataset):
 
         Correct all amplifiers, NIR detectors.  The first read of each integration
         is NOT subtracted, as the signal is removed in the superbias subtraction step.
+
+        Groups are corrected together, in blocks of up to `GROUP_BLOCK_SIZE` bytes
+        of full frame data per integration.
         """
         #
         #  First transform pixeldq array to detector coordinates
         self.dms_to_detector_dq()
 
+        group_size = np.prod(self.full_shape) * self.input_model.data.dtype.itemsize
+        groups_per_block = max(1, int(GROUP_BLOCK_SIZE // group_size))
         for integration in range(self.nints):
-            for group in range(self.ngroups):
+            for first in range(0, self.ngroups, groups_per_block):
+                groups = slice(first, min(first + groups_per_block, self.ngroups))
                 #
                 # Get the reference values from the top and bottom reference
                 # pixels
                 #
-                self.dms_to_detector(integration, group)
-                thisgroup = self.group
-                refvalues = self.get_refvalues(thisgroup)
-                log.debug(f"Integration: {integration}, Group: {group}")
-                self.do_top_bottom_correction(thisgroup, refvalues)
+                stack = self.dms_to_detector_stack(integration, groups)
+                refvalues = self.get_refvalues(stack)
+                log.debug(f"Integration: {integration}, Groups: {groups.start}-{groups.stop - 1}")
+                self.do_top_bottom_correction(stack, refvalues)
                 if self.use_side_ref_pixels:
-                    corrected_group = self.do_side_correction(thisgroup)
-                    self.group = corrected_group
-                else:
-                    self.group = thisgroup
+                    stack = self.do_side_correction(stack)
                 #
                 #  Now transform back from detector to DMS coordinates.
-                self.detector_to_dms(integration, group)
+                self.detector_to_dms_stack(stack, integration, groups)
         return
 
     def do_subarray_corrections(self):
@@ -1551,6 +1587,54 @@ class NIRDataset(Dataset):
             self.pixeldq, self.fastaxis, self.slowaxis
         )
 
+    def dms_to_detector_stack(self, integration, groups):
+        """
+        Get a stack of groups in the detector frame.
+
+        Subarray data are embedded in full-sized arrays.  Otherwise, the
+        stack is a view of the input data, which are then corrected in place.
+
+        Parameters
+        ----------
+        integration : int
+            Integration number
+        groups : slice
+            Group numbers
+
+        Returns
+        -------
+        stack : ndarray
+            3-D array of groups in the detector frame
+        """
+        data = self.input_model.data[integration, groups]
+        if self.is_subarray and not self.is_multistripe:
+            stack = np.zeros((len(data), *self.full_shape), dtype=data.dtype)
+            stack[:, self.rowstart : self.rowstop, self.colstart : self.colstop] = data
+        else:
+            stack = data
+        return reffile_utils.science_detector_frame_transform(stack, self.fastaxis, self.slowaxis)
+
+    def detector_to_dms_stack(self, stack, integration, groups):
+        """
+        Store a stack of corrected groups from the detector frame in the input data.
+
+        Parameters
+        ----------
+        stack : ndarray
+            3-D array of groups in the detector frame
+        integration : int
+            Integration number
+        groups : slice
+            Group numbers
+        """
+        stack = reffile_utils.detector_science_frame_transform(stack, self.fastaxis, self.slowaxis)
+        if self.is_subarray and not self.is_multistripe:
+            self.input_model.data[integration, groups] = stack[
+                :, self.rowstart : self.rowstop, self.colstart : self.colstop
+            ]
+        elif not np.may_share_memory(stack, self.input_model.data):
+            self.input_model.data[integration, groups] = stack
+
 
 class MIRIDataset(Dataset):
     """
@@ -1877,6 +1961,40 @@ class MIRIDataset(Dataset):
         return
 
 
+def _clipped_mean_stack(data, low, high):
+    """
+    Compute sigma-clipped means along the last axis of an array.
+
+    Clipping is iterated as in `scipy.stats.sigmaclip`, independently for
+    each element of the leading dimensions.
+
+    Parameters
+    ----------
+    data : ndarray
+        Array of pixels to be sigma-clipped, with the pixels for each
+        mean along the last axis.
+    low : float
+        Lower clipping boundary, in standard deviations from the mean
+    high : float
+        Upper clipping boundary, in standard deviations from the mean
+
+    Returns
+    -------
+    mean : ndarray
+        Clipped means, with the shape of the leading dimensions of ``data``.
+    """
+    keep = np.ones(data.shape, dtype=bool)
+    nkeep = keep.sum(axis=-1)
+    while True:
+        mean = np.mean(data, axis=-1, dtype=np.float64, where=keep, keepdims=True)
+        std = np.std(data, axis=-1, dtype=np.float64, where=keep, keepdims=True)
+        keep &= (data >= mean - std * low) & (data <= mean + std * high)
+        nclipped = nkeep - keep.sum(axis=-1)
+        if not np.any(nclipped):
+            return mean[..., 0]
+        nkeep -= nclipped
+
+
 def create_dataset(
     input_model,
     odd_even_columns,
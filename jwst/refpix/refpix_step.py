@@ -27,11 +27,13 @@ class RefPixStep(Step):
         ovr_corr_mitigation_ftr = float(default=3.0) # Factor to avoid overcorrection of bad reference pixels for IRS2
         preserve_irs2_refpix = boolean(default=False) # Preserve reference pixels in output
         irs2_mean_subtraction = boolean(default=False) # Apply a mean offset subtraction before IRS2 correction
+        irs2_fft_precision = option("float64", "float32", default="float64") # Precision of the IRS2 Fourier filtering
         refpix_algorithm = option("median", "sirs", default="median") # NIR full-frame side pixel algorithm
         sigreject = float(default=4.0) # Number of sigmas to reject as outliers
         gaussmooth = float(default=1.0) # Width of Gaussian smoothing kernel to use as a low-pass filter
         halfwidth = integer(default=30) # Half-width of convolution kernel to build
         siglimit = float(default=3.0) # Sigma clipping limit for outlier rejection
+        maximum_cores = string(default='1') # Threads for IRS2 correction. Can be an integer, 'half', 'quarter', or 'all'
     """  # noqa: E501
 
     reference_file_types = ["refpix", "sirskernel"]
@@ -103,7 +105,11 @@ class RefPixStep(Step):
 
             # Apply the IRS2 correction scheme
             result = irs2_subtract_reference.correct_model(
-                result, irs2_model, preserve_refpix=self.preserve_irs2_refpix
+                result,
+                irs2_model,
+                preserve_refpix=self.preserve_irs2_refpix,
+                maximum_cores=self.maximum_cores,
+                fft_dtype=self.irs2_fft_precision,
             )
 
             if result.meta.cal_step.refpix != "SKIPPED":
@@ -906,6 +906,83 @@ def test_do_top_bottom_correction_no_even_odd(setup_cube):
         )
 
 
+@pytest.mark.parametrize("detector", ["NRCA1", "NRCB1", "NRS2"])
+@pytest.mark.parametrize("odd_even_columns", [True, False])
+def test_fullframe_corrections_group_blocks(setup_cube, monkeypatch, detector, odd_even_columns):
+    """Test that correcting blocks of groups matches correcting one group at a time."""
+    ngroups = 3
+    input_model = setup_cube("NIRCAM", detector, ngroups, 2048, 2048)
+    rng = np.random.default_rng(seed=42)
+    input_model.data[:] = rng.normal(100.0, 10.0, size=input_model.data.shape)
+    input_model.data[:, :, :, :4] += 5.0
+    input_model.data[:, :, 100:110, 2044:] = 1e4
+    input_model.pixeldq[:, :4] = dqflags.pixel["REFERENCE_PIXEL"]
+    input_model.pixeldq[:, -4:] = dqflags.pixel["REFERENCE_PIXEL"]
+    input_model.pixeldq[:4, :] = dqflags.pixel["REFERENCE_PIXEL"]
+    input_model.pixeldq[-4:, :] = dqflags.pixel["REFERENCE_PIXEL"]
+    input_model.pixeldq[100:110, 2044:] |= dqflags.pixel["DO_NOT_USE"]
+    input_model.pixeldq[:4, 300] |= dqflags.pixel["DO_NOT_USE"]
+    expected_model = input_model.copy()
+
+    # Blocks of two groups, the last one partial
+    group_size = 2048 * 2048 * input_model.data.dtype.itemsize
+    monkeypatch.setattr(reference_pixels, "GROUP_BLOCK_SIZE", 2 * group_size)
+    args = (odd_even_columns, True, 11, 1.0, conv_kernel_params, 3.0)
+    dataset = NIRDataset(input_model, *args)
+    dataset.do_fullframe_corrections()
+
+    expected = NIRDataset(expected_model, *args)
+    expected.dms_to_detector_dq()
+    for group in range(ngroups):
+        expected.dms_to_detector(0, group)
+        refvalues = expected.get_refvalues(expected.group)
+        expected.do_top_bottom_correction(expected.group, refvalues)
+        expected.group = expected.do_side_correction(expected.group)
+        expected.detector_to_dms(0, group)
+
+    np.testing.assert_allclose(input_model.data, expected_model.data, rtol=0, atol=1e-3)
+
+
+def test_median_filter_stack(setup_cube):
+    """Test that a stack of groups is median filtered like each group alone."""
+    input_model = setup_cube("NIRCAM", "NRCA1", 1, 2048, 2048)
+    dataset = NIRDataset(input_model, True, True, 11, 1.0, conv_kernel_params, 3.0)
+    rng = np.random.default_rng(seed=42)
+    data = rng.normal(size=(3, 2048, 4)).astype(np.float32)
+    dq = np.zeros((2048, 4), dtype=np.uint32)
+    dq[100:120, :] = dqflags.pixel["DO_NOT_USE"]
+    dq[500:505, 1:3] = dqflags.pixel["DO_NOT_USE"]
+
+    result = dataset.median_filter(data, dq, 11)
+    assert result.shape == (3, 2048)
+    for stacked, group in zip(result, data, strict=True):
+        np.testing.assert_allclose(stacked, dataset.median_filter(group, dq, 11))
+    # Rows with no good pixels within half the box are not filtered
+    assert np.all(np.isnan(result[:, 105:115]))
+    assert not np.any(np.isnan(np.delete(result, np.s_[105:115], axis=1)))
+
+
+def test_sigma_clip_stack(setup_cube):
+    """Test that the clipped means of a stack match those of each group."""
+    input_model = setup_cube("NIRCAM", "NRCA1", 1, 2048, 2048)
+    dataset = NIRDataset(input_model, True, True, 11, 1.0, conv_kernel_params, 3.0)
+    rng = np.random.default_rng(seed=42)
+    data = rng.normal(10.0, 1.0, size=(4, 4, 512)).astype(np.float32)
+    data[1, 2, 10:20] = 100.0
+    data[2] = 5.0
+    dq = np.zeros((4, 512), dtype=np.uint32)
+    dq[0, :50] = dqflags.pixel["DO_NOT_USE"]
+
+    means = dataset.sigma_clip(data, dq)
+    assert means.shape == (4,)
+    for mean, group in zip(means, data, strict=True):
+        np.testing.assert_allclose(mean, dataset.sigma_clip(group, dq), rtol=1e-6)
+    assert means[2] == 5.0
+
+    dq[:] = dqflags.pixel["DO_NOT_USE"]
+    assert dataset.sigma_clip(data, dq) is None
+
+
 def make_rampmodel(ngroups, ysize, xsize, instrument="MIRI", fill_value=None):
     """
     Make MIRI, NIRSpec, or NIRCam ramp model for testing.
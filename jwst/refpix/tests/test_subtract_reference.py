@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose, assert_array_equal
+
+from jwst.refpix.irs2_subtract_reference import (
+    _real_filter,
+    make_irs2_mask,
+    subtract_reference,
+)
+
+
+def test_real_filter():
+    """Test that real FFTs with the reduced filter match complex FFTs."""
+    rng = np.random.default_rng(seed=42)
+    for n in (64, 65):
+        data = rng.normal(size=(3, n))
+        coeffs = rng.normal(size=n) + 1j * rng.normal(size=n)
+
+        expected = np.fft.ifft(np.fft.fft(data, axis=1) * coeffs, axis=1).real
+        result = np.fft.irfft(np.fft.rfft(data, axis=1) * _real_filter(coeffs, n), n, axis=1)
+        assert_allclose(result, expected, atol=1e-12)
+
+
+@pytest.fixture(scope="module")
+def irs2_integration():
+    ngroups, ny, nx = 2, 2048, 3200
+    n = 712 * ny
+    rng = np.random.default_rng(seed=42)
+    alpha = 0.1 * (rng.normal(size=(4, n)) + 1j * rng.normal(size=(4, n)))
+    beta = 1.0 + 0.05 * (rng.normal(size=(4, n)) + 1j * rng.normal(size=(4, n)))
+    data = 1000.0 + 10.0 * rng.normal(size=(ngroups, ny, nx))
+    irs2_mask = make_irs2_mask(nx, ny, 16, 4)
+    return (
+        data.astype(np.float32),
+        alpha.astype(np.complex64),
+        beta.astype(np.complex64),
+        irs2_mask,
+    )
+
+
+@pytest.mark.parametrize("preserve_refpix", [False, True])
+def test_subtract_reference_options(irs2_integration, preserve_refpix):
+    """Test that threads and single precision give the same correction."""
+    data, alpha, beta, irs2_mask = irs2_integration
+    args = (alpha, beta, irs2_mask, 16, 4, 8)
+
+    expected = subtract_reference(data.copy(), *args, preserve_refpix=preserve_refpix)
+    if preserve_refpix:
+        assert expected.shape == data.shape
+    else:
+        assert expected.shape == (2, 2048, 2048)
+
+    result = subtract_reference(data.copy(), *args, preserve_refpix=preserve_refpix, nthreads=3)
+    assert_array_equal(result, expected)
+
+    result = subtract_reference(
+        data.copy(), *args, preserve_refpix=preserve_refpix, fft_dtype="float32"
+    )
+    assert result.dtype == np.float32
+    assert_allclose(result, expected, rtol=1e-6, atol=1e-4)
@@ -1,16 +1,23 @@
+import copy
+import functools
 import json
 import logging
+import multiprocessing as mp
+import os
 import re
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
 
 import numpy as np
 from astropy.modeling import CompoundModel
+from astropy.modeling.models import Shift
 from astropy.modeling.projections import Projection
 from astropy.wcs.utils import celestial_frame_to_wcs
 from gwcs.fitswcs import FITSImagingWCSTransform
 from stcal.alignment import combine_sregions
+from stcal.multiprocessing import compute_num_cores
 from stcal.resample import Resample
-from stcal.resample.utils import is_imaging_wcs
+from stcal.resample.utils import is_imaging_wcs, resample_range
 from stdatamodels.jwst import datamodels
 from stdatamodels.jwst.datamodels.dqflags import pixel
 
@@ -37,6 +44,14 @@ _SUPPORTED_CUSTOM_WCS_PARS = [
 
 log = logging.getLogger(__name__)
 
+# Number of inputs per plane of the context array
+_CTX_PLANE_BITS = 32
+
+# Spacing, in input pixels, of the grid used to find the part of each
+# input that overlaps a tile, and the margin added around that part
+_TILE_GRID_STEP = 16
+_TILE_CUTOUT_PAD = 2
+
 
 class ResampleImage(Resample):
     """
@@ -290,6 +305,7 @@ class ResampleImage(Resample):
         self.input_models = input_models
         self.output_jwst_model = None
         self._report_var = report_var
+        self._tile_origin = None
 
         self.output_dir = None
         self.output_filename = output
@@ -476,14 +492,39 @@ class ResampleImage(Resample):
         model : `~stdatamodels.jwst.datamodels.ImageModel`
             A JWST data model to be resampled.
         """
-        super().add_model(
-            self.input_model_to_dict(
-                model,
-                weight_type=self.weight_type,
-                enable_var=self._enable_var,
-                compute_err=self._compute_err,
-            )
+        super().add_model(self._model_to_dict(model))
+        self._accumulate_meta(model)
+
+    def _model_to_dict(self, model):
+        """
+        Convert a data model to the dictionary expected by `stcal.resample`.
+
+        Parameters
+        ----------
+        model : `~stdatamodels.jwst.datamodels.ImageModel`
+            A JWST data model to be resampled.
+
+        Returns
+        -------
+        dict
+            A dictionary of keywords and values expected by `stcal.resample`.
+        """
+        return self.input_model_to_dict(
+            model,
+            weight_type=self.weight_type,
+            enable_var=self._enable_var,
+            compute_err=self._compute_err,
         )
+
+    def _accumulate_meta(self, model):
+        """
+        Add the metadata of an input model to the output model.
+
+        Parameters
+        ----------
+        model : `~stdatamodels.jwst.datamodels.ImageModel`
+            A JWST data model being resampled.
+        """
         if self.output_jwst_model is None:
             self.output_jwst_model = self.create_output_jwst_model(ref_input_model=model)
         if self.blendheaders:
@@ -494,7 +535,16 @@ class ResampleImage(Resample):
         if self.blendheaders:
             self._blender.finalize_model(self.output_jwst_model)
         super().finalize()
+        self._finalize_output_jwst_model()
 
+    def finalize_time_info(self):
+        """Perform final computations for the total time, except for tiles of a mosaic."""
+        # Time information is only computed for the whole mosaic.
+        if self._tile_origin is None:
+            super().finalize_time_info()
+
+    def _finalize_output_jwst_model(self):
+        """Set output model values and metadata from the finalized resampling."""
         self.update_output_model(
             self.output_jwst_model,
             self.output_model,
@@ -503,7 +553,7 @@ class ResampleImage(Resample):
         if is_imaging_wcs(self.output_jwst_model.meta.wcs):
             # only for an imaging WCS:
             self.update_fits_wcsinfo(self.output_jwst_model)
-            output_sregion = self.combine_input_sregions()
+            output_sregion = self._input_sregion
             log.debug(f"Assigning output S_REGION: {output_sregion}")
             self.output_jwst_model.meta.wcsinfo.s_region = output_sregion
 
@@ -562,47 +612,156 @@ class ResampleImage(Resample):
             Resampled model with populated data, weights, error arrays and
             other attributes.
         """
-        if self.output_jwst_model is not None:
-            self.reset_arrays(n_input_models=len(indices))
+        output_model = self._resample_models(self._borrow_models(indices), len(indices))
+        copy_asn_info_from_library(self.input_models, output_model)
+        return output_model
 
-        output_model_filename = ""
+    def resample_groups(self, max_cores="1"):
+        """
+        Resample each group of input models separately.
 
-        log.info(f"{len(indices)} exposures to drizzle together")
-        first = True
+        Groups are resampled by a pool of worker processes when more than
+        one core is requested, and yielded as soon as they are complete,
+        in no particular order.
+
+        Parameters
+        ----------
+        max_cores : str, optional
+            Number of processes used to resample groups concurrently.
+            Can be an integer, 'none', 'quarter', 'half', or 'all'.
+
+        Yields
+        ------
+        index : int
+            Index of the group in ``input_models.group_indices``.
+        output_jwst_model : `~stdatamodels.jwst.datamodels.ImageModel`
+            Resampled model for the group.
+        """
+        indices_by_group = list(self.input_models.group_indices.values())
+        nprocs = compute_num_cores(str(max_cores), len(indices_by_group), os.cpu_count() or 1)
+        if nprocs <= 1:
+            for i, indices in enumerate(indices_by_group):
+                yield i, self.resample_group(indices)
+            return
+
+        log.info(f"Resampling {len(indices_by_group)} groups using {nprocs} processes")
+
+        # Each worker receives a copy of this object once, and then only
+        # the input models of each group.
+        resamp = self._worker_copy()
+
+        def tasks():
+            for i, indices in enumerate(indices_by_group):
+                log.info(f"{len(indices)} exposures to drizzle together")
+                # Models opened from files cannot be pickled: send copies
+                models = [model.copy() for model in self._borrow_models(indices)]
+                yield i, (models,)
+
+        results = _imap_processes(
+            _resample_group_worker,
+            tasks(),
+            nprocs,
+            initializer=_init_resample_worker,
+            initargs=(resamp,),
+        )
+        for i, output_model in results:
+            copy_asn_info_from_library(self.input_models, output_model)
+            yield i, output_model
+
+    def _worker_copy(self):
+        """
+        Copy this object to resample groups in worker processes.
+
+        The copy holds neither the input library nor the output arrays,
+        which the workers allocate again for each group. The combined
+        S_REGION of the inputs, which the workers cannot read from the
+        library, is computed beforehand.
+
+        Returns
+        -------
+        ResampleImage
+            The copy.
+        """
+        resamp = copy.copy(self)
+        if is_imaging_wcs(self.output_wcs):
+            resamp._input_sregion = self._input_sregion  # noqa: SLF001
+        resamp.input_models = None
+        resamp.output_jwst_model = None
+        for name in ["_output_model", "_driz", "_driz_error", "_variance_info", "_blender"]:
+            resamp.__dict__.pop(name, None)
+        return resamp
+
+    def _borrow_models(self, indices):
+        """
+        Borrow models from the input library, one at a time.
+
+        Parameters
+        ----------
+        indices : list
+            Indices of the models in ``input_models``.
+
+        Yields
+        ------
+        model : `~stdatamodels.jwst.datamodels.JwstDataModel`
+            The borrowed model, shelved again once the next model is requested.
+        """
         with self.input_models:
             for index in indices:
                 model = self.input_models.borrow(index)
                 model_modified = False
-                if self.output_jwst_model is None:
-                    # Determine output file type from input exposure filenames
-                    # Use this for defining the output filename
-                    indx = model.meta.filename.rfind(".")
-                    output_type = model.meta.filename[indx:]
-                    output_root = "_".join(
-                        model.meta.filename.replace(output_type, "").split("_")[:-1]
-                    )
-                    output_model_filename = f"{output_root}_{self.intermediate_suffix}{output_type}"
-
                 if isinstance(model, datamodels.SlitModel):
                     # must call this explicitly to populate area extension
                     # although the existence of this extension may not be
                     # necessary
                     model.area = model.area
                     model_modified = True
-
-                self.add_model(model)
-                if first:
-                    self.output_jwst_model.meta.bunit_data = model.meta.bunit_data
-                    first = False
+                yield model
                 self.input_models.shelve(model, index, modify=model_modified)
                 del model
 
+    def _resample_models(self, models, n_models):
+        """
+        Resample and coadd models into a new output model.
+
+        Parameters
+        ----------
+        models : iterable of `~stdatamodels.jwst.datamodels.JwstDataModel`
+            The models to resample together.
+        n_models : int
+            The number of models.
+
+        Returns
+        -------
+        output_jwst_model
+            Resampled model with populated data, weights, error arrays and
+            other attributes.
+        """
+        if self.output_jwst_model is not None:
+            self.reset_arrays(n_input_models=n_models)
+
+        output_model_filename = ""
+
+        log.info(f"{n_models} exposures to drizzle together")
+        first = True
+        for model in models:
+            if self.output_jwst_model is None:
+                # Determine output file type from input exposure filenames
+                # Use this for defining the output filename
+                indx = model.meta.filename.rfind(".")
+                output_type = model.meta.filename[indx:]
+                output_root = "_".join(model.meta.filename.replace(output_type, "").split("_")[:-1])
+                output_model_filename = f"{output_root}_{self.intermediate_suffix}{output_type}"
+
+            self.add_model(model)
+            if first:
+                self.output_jwst_model.meta.bunit_data = model.meta.bunit_data
+                first = False
+
         self.finalize()
-        copy_asn_info_from_library(self.input_models, self.output_jwst_model)
         self.output_jwst_model.meta.filename = output_model_filename
         return self.output_jwst_model
 
-    def resample_many_to_many(self, in_memory=True):
+    def resample_many_to_many(self, in_memory=True, max_cores="1"):
         """
         Resample many inputs to many outputs where outputs have a common frame.
 
@@ -621,17 +780,18 @@ class ResampleImage(Resample):
             files on disk and return a `~jwst.datamodels.library.ModelLibrary`
             with only the association info. See :ref:`On-Disk Mode <stpipe:library_on_disk>`
             for more details.
+        max_cores : str, optional
+            Number of processes used to resample groups concurrently.
+            Can be an integer, 'none', 'quarter', 'half', or 'all'.
 
         Returns
         -------
         `~jwst.datamodels.library.ModelLibrary`
             A library of resampled models.
         """
-        output_models = []
-
-        for _group_id, indices in self.input_models.group_indices.items():
-            output_model = self.resample_group(indices)
+        output_models = [None] * len(self.input_models.group_indices)
 
+        for i, output_model in self.resample_groups(max_cores=max_cores):
             if not in_memory:
                 # Write out model to disk, then return filename
                 output_name = output_model.meta.filename
@@ -639,9 +799,10 @@ class ResampleImage(Resample):
                     output_name = str(Path(self.output_dir) / output_name)
                 output_model.save(output_name)
                 log.info(f"Saved model in {output_name}")
-                output_models.append(output_name)
+                output_models[i] = output_name
             else:
-                output_models.append(output_model)
+                output_models[i] = output_model
+            del output_model
 
         if in_memory:
             # build ModelLibrary as a list of in-memory models
@@ -653,12 +814,25 @@ class ResampleImage(Resample):
             asn_dict = json.loads(asn.dump()[1])  # serializes the asn and converts to dict
             return ModelLibrary(asn_dict, on_disk=True)
 
-    def resample_many_to_one(self):
+    def resample_many_to_one(self, tile_size=None, max_cores="1"):
         """
         Resample and coadd many inputs to a single output.
 
         Used for stage 3 resampling.
 
+        Parameters
+        ----------
+        tile_size : int or None, optional
+            If provided, the output image is resampled in square tiles of
+            this size, in pixels, rather than all at once. Each tile is
+            resampled from only the parts of the inputs that overlap it,
+            such that intermediate arrays scale with the size of a tile
+            rather than that of the output image.
+        max_cores : str, optional
+            Number of processes used to resample tiles concurrently.
+            Can be an integer, 'none', 'quarter', 'half', or 'all'.
+            Has no effect if ``tile_size`` is `None`.
+
         Returns
         -------
         `~stdatamodels.jwst.datamodels.ImageModel`
@@ -666,17 +840,294 @@ class ResampleImage(Resample):
         """
         log.info("Resampling science and variance data")
 
-        with self.input_models:
-            for model in self.input_models:
-                self.add_model(model)
-                self.input_models.shelve(model)
+        if tile_size:
+            self._resample_tiles(tile_size, max_cores)
+        else:
+            with self.input_models:
+                for model in self.input_models:
+                    self.add_model(model)
+                    self.input_models.shelve(model)
+
+            self.finalize()
 
-        self.finalize()
         self.output_jwst_model.meta.filename = self.output_filename
         copy_asn_info_from_library(self.input_models, self.output_jwst_model)
 
         return self.output_jwst_model
 
+    def _resample_tiles(self, tile_size, max_cores="1"):
+        """
+        Resample and coadd all inputs into the output image, one tile at a time.
+
+        The metadata of all inputs are accumulated and their footprints
+        on the output image computed first. Each tile is then resampled
+        separately, from cutouts of the overlapping inputs only, and
+        written into the output arrays.
+
+        Parameters
+        ----------
+        tile_size : int
+            The size of the square tiles, in pixels.
+        max_cores : str, optional
+            Number of processes used to resample tiles concurrently.
+            Can be an integer, 'none', 'quarter', 'half', or 'all'.
+        """
+        ny, nx = self.output_array_shape
+        tiles = [
+            (y1, min(y1 + tile_size, ny), x1, min(x1 + tile_size, nx))
+            for y1 in range(0, ny, tile_size)
+            for x1 in range(0, nx, tile_size)
+        ]
+        # Each tile is resampled with a halo of pixels around it, such that
+        # inputs near its edges contribute to it as they would to the whole image.
+        halo = int(np.ceil(self._kernel_margin()))
+        padded_tiles = [
+            (max(y1 - halo, 0), min(y2 + halo, ny), max(x1 - halo, 0), min(x2 + halo, nx))
+            for y1, y2, x1, x2 in tiles
+        ]
+
+        footprints = []
+        grids = []
+        pixel_bytes = 0
+        with self.input_models:
+            for model in self.input_models:
+                model_dict = self._model_to_dict(model)
+                self.validate_input_model(model_dict)
+                self._n_res_models += 1
+                self._compute_pixel_scale_ratio(model_dict)
+                if (group_id := model_dict["group_id"]) not in self._group_ids:
+                    self.update_time(model_dict)
+                    self._group_ids.append(group_id)
+                self._accumulate_meta(model)
+                footprints.append(self._output_footprint(model_dict))
+                grids.append(self._output_grid(model_dict))
+                pixel_bytes = max(
+                    pixel_bytes,
+                    sum(v.itemsize for v in model_dict.values() if isinstance(v, np.ndarray)),
+                )
+                self.input_models.shelve(model, modify=False)
+                del model, model_dict
+
+        # Indices of the inputs overlapping each tile
+        tile_inputs = [
+            [
+                i
+                for i, (xmin, xmax, ymin, ymax) in enumerate(footprints)
+                if xmin < x2 and xmax >= x1 and ymin < y2 and ymax >= y1
+            ]
+            for y1, y2, x1, x2 in padded_tiles
+        ]
+
+        # The accumulators allocated for the whole output image are replaced
+        # by the output arrays, into which the resampled tiles are written.
+        outputs = {"data": self._driz.out_img, "wht": self._driz.out_wht}
+        if self._enable_ctx:
+            outputs["con"] = self._driz.out_ctx
+        if self._propagate_dq:
+            outputs["dq"] = np.zeros(self.output_array_shape, dtype=np.uint32)
+        del self._driz
+        if self._compute_err == "driz_err":
+            del self._driz_error
+        if self._enable_var:
+            del self._variance_info
+            for varname in self.variance_array_names:
+                outputs[varname] = np.full(
+                    self.output_array_shape, np.nan, dtype=self.output_array_types[varname]
+                )
+        if self._compute_err is not None:
+            outputs["err"] = np.full(self.output_array_shape, np.nan, dtype=np.float32)
+
+        # The tiles are copies of this object, without the library, blender,
+        # or output model, and with an output WCS shifted to the tile origin.
+        resamp = copy.copy(self)
+        resamp.input_models = None
+        resamp.output_jwst_model = None
+        if resamp.blendheaders:
+            resamp.blendheaders = False
+            del resamp._blender  # noqa: SLF001
+
+        def tile_tasks():
+            for i, (y1, y2, x1, x2) in enumerate(padded_tiles):
+                tile = copy.copy(resamp)
+                tile._tile_origin = (y1, x1)  # noqa: SLF001
+                tile._output_wcs = _tile_wcs(self.output_wcs, x1, y1, (y2 - y1, x2 - x1))  # noqa: SLF001
+                tile._output_array_shape = (y2 - y1, x2 - x1)  # noqa: SLF001
+                # Only the part of each input that overlaps the tile is
+                # sent, such that tasks scale with the size of a tile.
+                indices = []
+                model_dicts = []
+                for j, model in enumerate(self._borrow_models(tile_inputs[i])):
+                    model_dict = self._model_to_dict(model)
+                    cutout = _input_cutout(
+                        grids[tile_inputs[i][j]], padded_tiles[i], model_dict["data"].shape
+                    )
+                    if cutout is not None:
+                        indices.append(tile_inputs[i][j])
+                        model_dicts.append(_cutout_model_dict(model_dict, cutout))
+                    del model, model_dict
+                tile_inputs[i] = indices
+                yield i, (tile, model_dicts, len(model_dicts))
+
+        nprocs = compute_num_cores(str(max_cores), len(tiles), os.cpu_count() or 1)
+        log.info(
+            f"Resampling {len(tiles)} tiles of {tile_size} x {tile_size} pixels"
+            + (f" using {nprocs} processes" if nprocs > 1 else "")
+        )
+        if nprocs > 1:
+            # Bound the size of the cutouts waiting to be resampled to that of
+            # two tasks per process, each with as many inputs as a tile
+            # has on average, of the size of a tile on the inputs.
+            tile_pixels = (tile_size + 2 * halo) ** 2 / (self.pixel_scale_ratio or 1.0) ** 2
+            mean_inputs = max(np.mean([len(indices) for indices in tile_inputs]), 1.0)
+            max_bytes = int(2 * nprocs * mean_inputs * tile_pixels * pixel_bytes)
+            results = _imap_processes(
+                _resample_tile_worker, tile_tasks(), nprocs, max_bytes=max_bytes
+            )
+        else:
+            results = ((i, _resample_tile_worker(*args)) for i, args in tile_tasks())
+
+        for i, tile_arrays in results:
+            y1, y2, x1, x2 = tiles[i]
+            # The tile without its halo
+            interior = np.s_[
+                y1 - padded_tiles[i][0] : y2 - padded_tiles[i][0],
+                x1 - padded_tiles[i][2] : x2 - padded_tiles[i][2],
+            ]
+            for name, array in tile_arrays.items():
+                if array is None:
+                    # No input overlaps the tile
+                    continue
+                if name == "con":
+                    _merge_context(
+                        outputs["con"][:, y1:y2, x1:x2], array[:, *interior], tile_inputs[i]
+                    )
+                else:
+                    outputs[name][y1:y2, x1:x2] = array[interior]
+            del tile_arrays
+
+        self._output_model.update(outputs)
+        self._output_model["pointings"] = len(self.group_ids)
+        self.finalize_time_info()
+        self._finalized = True
+
+        if self.blendheaders:
+            self._blender.finalize_model(self.output_jwst_model)
+        self._finalize_output_jwst_model()
+
+    def _resample_tile(self, model_dicts, n_models):
+        """
+        Resample and coadd inputs into the output arrays of a tile.
+
+        Parameters
+        ----------
+        model_dicts : iterable of dict
+            The parts of the input models overlapping the tile, as
+            dictionaries expected by `stcal.resample`.
+        n_models : int
+            The number of inputs.
+
+        Returns
+        -------
+        dict
+            The finalized output arrays of the tile.
+        """
+        self._output_model = self.create_output_model()
+        self.reset_arrays(n_input_models=max(n_models, 1))
+        for model_dict in model_dicts:
+            Resample.add_model(self, model_dict)
+        Resample.finalize(self)
+
+        names = ["data", "wht", "con", "dq", "err", *self.variance_array_names]
+        return {name: self._output_model[name] for name in names if name in self._output_model}
+
+    def _kernel_margin(self):
+        """
+        Compute how far an input pixel may contribute beyond its center.
+
+        The half-widths of the kernels, in input pixels, are those used by
+        the drizzle library. They are converted to output pixels with the
+        pixel scale ratio, with 10% more to allow for the variation of the
+        scale across an input image, plus one pixel for the partially
+        covered output pixels at the edges of a kernel.
+
+        Returns
+        -------
+        float
+            The distance, in output pixels.
+        """
+        pscale_ratio = self.pixel_scale_ratio or 1.0
+        kernel = self.kernel.lower()
+        if kernel.startswith("lanczos"):
+            # The size of the lanczos kernels is their order; pixfrac is ignored
+            half_width = float(kernel.removeprefix("lanczos"))
+        elif kernel == "gaussian":
+            # 2.5 sigma of a gaussian with a FWHM of pixfrac, at least 1.2 pixels
+            half_width = max(2.5 * self.pixfrac / 2.3548, 1.2)
+        else:
+            # The corners of a square pixel reduced by pixfrac
+            half_width = np.sqrt(0.5) * self.pixfrac
+        return 1.1 * half_width / pscale_ratio + 1.0
+
+    def _output_footprint(self, model_dict):
+        """
+        Compute the bounding box of an input model on the output image.
+
+        Parameters
+        ----------
+        model_dict : dict
+            The input model, as a dictionary expected by `stcal.resample`.
+
+        Returns
+        -------
+        xmin, xmax, ymin, ymax : float
+            Bounds of the input model, in output pixel coordinates,
+            extended by the size of the drizzle kernel. If the bounds
+            cannot be determined, they cover the whole output image.
+        """
+        wcs = model_dict["wcs"]
+        xmin, xmax, ymin, ymax = resample_range(model_dict["data"].shape, wcs.bounding_box)
+        # Sample the edges densely enough to follow any distortion
+        x, y, *_ = _get_boundary_points(xmin, xmax, ymin, ymax, dx=32, dy=32)
+        world = wcs(x, y, with_bounding_box=False)
+        out_x, out_y = self.output_wcs.invert(*world, with_bounding_box=False)
+        if not (np.all(np.isfinite(out_x)) and np.all(np.isfinite(out_y))):
+            return -np.inf, np.inf, -np.inf, np.inf
+
+        margin = self._kernel_margin()
+        return (
+            np.min(out_x) - margin,
+            np.max(out_x) + margin,
+            np.min(out_y) - margin,
+            np.max(out_y) + margin,
+        )
+
+    def _output_grid(self, model_dict):
+        """
+        Map a coarse grid of pixels of an input model onto the output image.
+
+        Parameters
+        ----------
+        model_dict : dict
+            The input model, as a dictionary expected by `stcal.resample`.
+
+        Returns
+        -------
+        x, y : ndarray
+            The columns and rows of the input in the grid, spanning the
+            pixels within its bounding box.
+        out_x, out_y : ndarray
+            The output pixel coordinates of the grid points, of shape
+            ``(len(y), len(x))``.
+        """
+        xmin, xmax, ymin, ymax = resample_range(
+            model_dict["data"].shape, model_dict["wcs"].bounding_box
+        )
+        x = np.unique(np.append(np.arange(xmin, xmax + 1, _TILE_GRID_STEP), xmax))
+        y = np.unique(np.append(np.arange(ymin, ymax + 1, _TILE_GRID_STEP), ymax))
+        world = model_dict["wcs"](*np.meshgrid(x, y), with_bounding_box=False)
+        out_x, out_y = self.output_wcs.invert(*world, with_bounding_box=False)
+        return x, y, out_x, out_y
+
     @staticmethod
     def update_fits_wcsinfo(model):
         """
@@ -768,6 +1219,18 @@ class ResampleImage(Resample):
             if key in model.meta.wcsinfo.instance:
                 del model.meta.wcsinfo.instance[key]
 
+    @functools.cached_property
+    def _input_sregion(self):
+        """
+        Combined S_REGION of all input models, computed only once.
+
+        Returns
+        -------
+        str
+            The combined S_REGION.
+        """
+        return self.combine_input_sregions()
+
     def combine_input_sregions(self):
         """
         Combine the input model S_REGIONs into a single S_REGION.
@@ -945,3 +1408,283 @@ def copy_asn_info_from_library(library, output_model):
         output_model.meta.asn.pool_name = asn_pool
     if (asn_table_name := library.asn.get("table_name", None)) is not None:
         output_model.meta.asn.table_name = asn_table_name
+
+
+# The resampling object of a worker process, set by _init_resample_worker
+_worker_resamp = {}
+
+
+def _init_resample_worker(resamp):
+    """
+    Set the resampling object that a worker process resamples groups with.
+
+    Parameters
+    ----------
+    resamp : ResampleImage
+        The resampling object, from ``ResampleImage._worker_copy``.
+    """
+    _worker_resamp["resamp"] = resamp
+
+
+def _resample_group_worker(models):
+    """
+    Resample a group of models in a worker process.
+
+    Parameters
+    ----------
+    models : list of `~stdatamodels.jwst.datamodels.JwstDataModel`
+        The models to resample together.
+
+    Returns
+    -------
+    `~stdatamodels.jwst.datamodels.ImageModel`
+        The resampled model.
+    """
+    resamp = _worker_resamp["resamp"]
+    resamp.reset_arrays(n_input_models=len(models))
+    return resamp._resample_models(models, len(models))  # noqa: SLF001
+
+
+def _resample_tile_worker(tile, model_dicts, n_models):
+    """
+    Resample a tile of the output image, possibly in a worker process.
+
+    Parameters
+    ----------
+    tile : ResampleImage
+        The resampling object for the tile.
+    model_dicts : iterable of dict
+        The parts of the input models overlapping the tile, as
+        dictionaries expected by `stcal.resample`.
+    n_models : int
+        The number of inputs.
+
+    Returns
+    -------
+    dict
+        The finalized output arrays of the tile.
+    """
+    return tile._resample_tile(model_dicts, n_models)  # noqa: SLF001
+
+
+def _imap_processes(function, tasks, nprocs, initializer=None, initargs=(), max_bytes=None):
+    """
+    Apply a function in a pool of worker processes.
+
+    Parameters
+    ----------
+    function : callable
+        A module-level function.
+    tasks : iterator
+        An iterator over ``(key, args)`` pairs, with the positional
+        arguments of each call. Tasks are only produced while fewer than
+        two per process are pending, so that their inputs, such as models
+        from on-disk libraries, are not all loaded at once.
+    nprocs : int
+        The number of processes.
+    initializer : callable or None, optional
+        A module-level function called with ``initargs`` when each
+        process starts.
+    initargs : tuple, optional
+        The arguments of ``initializer``.
+    max_bytes : int or None, optional
+        If set, tasks are also only produced while the arrays in the
+        arguments of the pending ones total fewer bytes than this.
+        A task is always produced if none is pending.
+
+    Yields
+    ------
+    key : object
+        The key of the task.
+    result : object
+        The result of the call, as soon as it is complete.
+    """
+    ctx = mp.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=nprocs, mp_context=ctx, initializer=initializer, initargs=initargs
+    ) as executor:
+        pending = {}
+        pending_bytes = 0
+        while True:
+            while len(pending) < 2 * nprocs and (
+                max_bytes is None or not pending or pending_bytes < max_bytes
+            ):
+                task = next(tasks, None)
+                if task is None:
+                    break
+                key, args = task
+                nbytes = _nbytes(args)
+                pending[executor.submit(function, *args)] = key, nbytes
+                pending_bytes += nbytes
+                del task, args
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                key, nbytes = pending.pop(future)
+                pending_bytes -= nbytes
+                yield key, future.result()
+
+
+def _nbytes(obj):
+    """
+    Compute the size of the arrays in nested lists, tuples and dictionaries.
+
+    Parameters
+    ----------
+    obj : object
+        An array, or a list, tuple or dictionary of them.
+
+    Returns
+    -------
+    int
+        The total size of the arrays, in bytes.
+    """
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sum(_nbytes(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(_nbytes(item) for item in obj)
+    return 0
+
+
+def _input_cutout(grid, tile, shape):
+    """
+    Find the part of an input that contributes to a tile of the output image.
+
+    Parameters
+    ----------
+    grid : tuple
+        The coarse grid of the input mapped onto the output image,
+        from ``ResampleImage._output_grid``.
+    tile : tuple of int
+        The bounds ``(y1, y2, x1, x2)`` of the tile on the output image.
+    shape : tuple of int
+        The shape of the input.
+
+    Returns
+    -------
+    tuple of slice or None
+        The rows and columns of the input whose pixel centers fall on the
+        tile, with a margin of a few pixels, or `None` if there are none.
+    """
+    x, y, out_x, out_y = grid
+    y1, y2, x1, x2 = tile
+    if len(x) < 2 or len(y) < 2:
+        return np.s_[: shape[0], : shape[1]]
+
+    # The bounds of each cell of the grid on the output image, with one
+    # more pixel for the curvature of their edges. Cells with non-finite
+    # corners fail all comparisons below, and are thus kept.
+    cells_x = np.stack([out_x[:-1, :-1], out_x[:-1, 1:], out_x[1:, :-1], out_x[1:, 1:]])
+    cells_y = np.stack([out_y[:-1, :-1], out_y[:-1, 1:], out_y[1:, :-1], out_y[1:, 1:]])
+    outside = (
+        (cells_x.max(axis=0) < x1 - 1.5)
+        | (cells_x.min(axis=0) > x2 + 0.5)
+        | (cells_y.max(axis=0) < y1 - 1.5)
+        | (cells_y.min(axis=0) > y2 + 0.5)
+    )
+    rows = np.flatnonzero(~np.all(outside, axis=1))
+    cols = np.flatnonzero(~np.all(outside, axis=0))
+    if not rows.size:
+        return None
+
+    ymin = max(y[rows[0]] - _TILE_CUTOUT_PAD, 0)
+    ymax = min(y[rows[-1] + 1] + _TILE_CUTOUT_PAD, shape[0] - 1)
+    xmin = max(x[cols[0]] - _TILE_CUTOUT_PAD, 0)
+    xmax = min(x[cols[-1] + 1] + _TILE_CUTOUT_PAD, shape[1] - 1)
+    return np.s_[ymin : ymax + 1, xmin : xmax + 1]
+
+
+def _cutout_model_dict(model_dict, cutout):
+    """
+    Cut out part of an input model.
+
+    Parameters
+    ----------
+    model_dict : dict
+        The input model, as a dictionary expected by `stcal.resample`.
+    cutout : tuple of slice
+        The rows and columns of the input to cut out.
+
+    Returns
+    -------
+    dict
+        The part of the input, with copies of its arrays and metadata,
+        such that it does not reference the input, and a WCS shifted to
+        its origin.
+    """
+    ys, xs = cutout
+    shape = model_dict["data"].shape
+    cutout_dict = {
+        key: value[cutout].copy()
+        if isinstance(value, np.ndarray) and value.shape == shape
+        else value
+        for key, value in model_dict.items()
+    }
+    cutout_dict["wcs"] = _tile_wcs(
+        model_dict["wcs"], xs.start, ys.start, (ys.stop - ys.start, xs.stop - xs.start)
+    )
+    # The metadata node references the whole model
+    cutout_dict["wcsinfo"] = dict(model_dict["wcsinfo"].instance)
+    return cutout_dict
+
+
+def _tile_wcs(wcs, x0, y0, shape):
+    """
+    Make the WCS of a tile of an image.
+
+    Parameters
+    ----------
+    wcs : `~gwcs.wcs.WCS`
+        The WCS of the whole image.
+    x0, y0 : int
+        The origin of the tile in the image.
+    shape : tuple of int
+        The shape of the tile.
+
+    Returns
+    -------
+    `~gwcs.wcs.WCS`
+        The WCS of the tile, bounded by the tile and the bounding box
+        of the image, if any.
+    """
+    (xmin, xmax), (ymin, ymax) = (-0.5, shape[1] - 0.5), (-0.5, shape[0] - 0.5)
+    if wcs.bounding_box is not None:
+        ((bx1, bx2), (by1, by2)) = wcs.bounding_box
+        xmin, xmax = max(xmin, bx1 - x0), min(xmax, bx2 - x0)
+        ymin, ymax = max(ymin, by1 - y0), min(ymax, by2 - y0)
+    tile_wcs = copy.deepcopy(wcs)
+    if x0 or y0:
+        tile_wcs.insert_transform(tile_wcs.input_frame, Shift(x0) & Shift(y0), after=True)
+    tile_wcs.bounding_box = ((xmin, xmax), (ymin, ymax))
+    tile_wcs.array_shape = shape
+    return tile_wcs
+
+
+def _merge_context(context, tile_context, indices):
+    """
+    Merge the context of a tile into the context of the whole image.
+
+    Parameters
+    ----------
+    context : ndarray
+        The context array of the whole image, sliced to the tile,
+        updated in place.
+    tile_context : ndarray
+        The context array of the tile, where bit ``j`` corresponds to
+        the ``j``-th input resampled into the tile.
+    indices : list of int
+        The index of each input of the tile among all inputs.
+    """
+    if list(indices) == list(range(len(indices))):
+        context[: tile_context.shape[0]] = tile_context
+        return
+
+    context = context.view(np.uint32)
+    tile_context = tile_context.view(np.uint32)
+    for j, index in enumerate(indices):
+        bit = (tile_context[j // _CTX_PLANE_BITS] >> np.uint32(j % _CTX_PLANE_BITS)) & np.uint32(1)
+        context[index // _CTX_PLANE_BITS] |= bit << np.uint32(index % _CTX_PLANE_BITS)
@@ -39,12 +39,18 @@ class ResampleStep(Step):
         single = boolean(default=False)  # Resample each input to its own output grid
         blendheaders = boolean(default=True)  # Blend metadata from inputs into output
         in_memory = boolean(default=True)  # Keep images in memory
+        prefetch_bytes = integer(min=0, default=0)  # Size of the files to read ahead if in_memory is False
+        write_behind_bytes = integer(min=0, default=0)  # Size of the models to save in the background if in_memory is False
+        io_threads = integer(min=1, default=2)  # Threads reading ahead and saving in the background
+        metadata_index = string(default=None)  # File in which to save an index of the metadata of the input files, shared between runs
         enable_ctx = boolean(default=True)  # Compute and report the context array
         enable_err = boolean(default=True)  # Compute and report the err array
         report_var = boolean(default=True)  # Report the variance array
         propagate_dq = boolean(default=False)  # propagate DQ during resampling
         pixmap_stepsize = float(default=1.0)  # Interpolation step size for pixel map; interpolation is used for stepsize > 1
         pixmap_order = integer(default=1)  # Spline order for pixel mapping, must be 1 or 3
+        tile_size = integer(min=1, default=None)  # Resample the combined output in square tiles of this size
+        maximum_cores = string(default='1')  # Processes for single mode or tiles. Can be an integer, 'half', 'quarter', or 'all'
     """  # noqa: E501
 
     reference_file_types: list = []
@@ -78,6 +84,13 @@ class ResampleStep(Step):
         # leave it to the ModelLibrary call below to open them.
         input_model = self.prepare_output(input_data, open_models=False)
 
+        library_kwargs = {
+            "on_disk": not self.in_memory,
+            "prefetch_bytes": self.prefetch_bytes,
+            "write_behind_bytes": self.write_behind_bytes,
+            "io_threads": self.io_threads,
+            "metadata_index": self.metadata_index,
+        }
         if isinstance(input_model, ModelLibrary):
             # Input is already a library: leave it alone.
             input_models = input_model
@@ -85,11 +98,11 @@ class ResampleStep(Step):
             isinstance(input_model, str) and filetype.check(input_model) in ["fits", "asdf"]
         ):
             # Input is a single file: pass it to ModelLibrary in a list
-            input_models = ModelLibrary([input_model], on_disk=not self.in_memory)
+            input_models = ModelLibrary([input_model], **library_kwargs)
             self.blendheaders = False
         elif isinstance(input_model, (str, dict, list, ModelContainer)):
             # Input is an association or list of models/files
-            input_models = ModelLibrary(input_model, on_disk=not self.in_memory)
+            input_models = ModelLibrary(input_model, **library_kwargs)
         else:
             # Input is not recognized
             raise TypeError(f"Input {input_data} is not a 2D image.")
@@ -126,7 +139,9 @@ class ResampleStep(Step):
             resamp = resample.ResampleImage(
                 input_models, output=output, enable_var=False, compute_err="driz_err", **kwargs
             )
-            result = resamp.resample_many_to_many(in_memory=self.in_memory)
+            result = resamp.resample_many_to_many(
+                in_memory=self.in_memory, max_cores=self.maximum_cores
+            )
 
         else:
             if self.enable_err:
@@ -148,7 +163,9 @@ class ResampleStep(Step):
                 compute_err=compute_err,
                 **kwargs,
             )
-            result = resamp.resample_many_to_one()
+            result = resamp.resample_many_to_one(
+                tile_size=self.tile_size, max_cores=self.maximum_cores
+            )
 
         # The output is a new datamodel.
         # Clean up the input model(s) if they were opened here.
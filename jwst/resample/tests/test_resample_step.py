@@ -1,3 +1,4 @@
+import os
 import warnings
 from copy import deepcopy
 
@@ -19,7 +20,7 @@ from jwst.assign_wcs import AssignWcsStep
 from jwst.datamodels import ModelContainer, ModelLibrary
 from jwst.exp_to_source import multislit_to_container
 from jwst.extract_2d import Extract2dStep
-from jwst.resample import ResampleSpecStep, ResampleStep
+from jwst.resample import ResampleSpecStep, ResampleStep, resample
 from jwst.resample.resample import ResampleImage, input_jwst_model_to_dict
 from jwst.resample.resample_spec import ResampleSpec, compute_spectral_pixel_scale
 from jwst.resample.resample_step import GOOD_BITS
@@ -1896,3 +1897,111 @@ def test_combine_input_sregions(nircam_rate):
     expected_footprint = expected_footprint[np.argsort(expected_footprint[:, 0])]
     actual_footprint = actual_footprint[np.argsort(actual_footprint[:, 0])]
     assert_allclose(actual_footprint, expected_footprint, atol=1e-5, rtol=0)
+
+
+@pytest.mark.parametrize(
+    "tile_size, max_cores, kernel, pixfrac",
+    [
+        (64, "1", "square", 1.0),
+        (45, "2", "square", 1.0),
+        (45, "1", "gaussian", 3.0),
+        (45, "1", "lanczos3", 1.0),
+    ],
+)
+def test_resample_tiles(nircam_rate, monkeypatch, tile_size, max_cores, kernel, pixfrac):
+    """Ensure resampling in tiles gives the same result as resampling at once."""
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+    im = AssignWcsStep.call(nircam_rate, sip_approx=False)
+    _set_photom_kwd(im)
+    im.var_rnoise[:] = 1.0
+    im.var_poisson[:] = 1.0
+    im.var_flat[:] = 1.0
+    im.err[:] = np.sqrt(3.0)
+    im.data[:] = np.random.default_rng(7).normal(size=im.data.shape)
+    im.meta.filename = "foo.fits"
+    inputs = [im.copy() for _ in range(3)]
+    for i, model in enumerate(inputs):
+        # Shift the models relative to each other
+        model.meta.wcs = deepcopy(im.meta.wcs)
+        model.meta.wcs.insert_transform(
+            "detector", models.Shift(7.3 * i) & models.Shift(-4.1 * i), after=True
+        )
+        model.meta.group_id = str(i)
+
+    results = []
+    for kwargs in [{}, {"tile_size": tile_size, "max_cores": max_cores}]:
+        resamp = ResampleImage(
+            ModelLibrary([model.copy() for model in inputs]),
+            kernel=kernel,
+            pixfrac=pixfrac,
+            enable_var=True,
+            compute_err="from_var",
+            blendheaders=False,
+        )
+        results.append(resamp.resample_many_to_one(**kwargs))
+    expected, result = results
+
+    for name in ["data", "wht", "con", "err", "var_rnoise", "var_poisson", "var_flat"]:
+        np.testing.assert_array_equal(getattr(result, name), getattr(expected, name))
+    assert result.meta.resample.pointings == expected.meta.resample.pointings
+    assert result.meta.exposure.exposure_time == expected.meta.exposure.exposure_time
+    assert result.meta.wcsinfo.s_region == expected.meta.wcsinfo.s_region
+
+
+def test_resample_tiles_cutouts(nircam_rate, monkeypatch):
+    """Ensure each tile is resampled from cutouts of the inputs, of the size of a tile."""
+    im = AssignWcsStep.call(nircam_rate, sip_approx=False)
+    _set_photom_kwd(im)
+    im.var_rnoise[:] = 1.0
+    inputs = [im.copy() for _ in range(3)]
+    for i, model in enumerate(inputs):
+        model.meta.wcs = deepcopy(im.meta.wcs)
+        model.meta.wcs.insert_transform(
+            "detector", models.Shift(7.3 * i) & models.Shift(-4.1 * i), after=True
+        )
+        model.meta.group_id = str(i)
+
+    tasks = []
+    resample_tile_worker = resample._resample_tile_worker
+
+    def record_tile_worker(tile, model_dicts, n_models):
+        tasks.append(model_dicts)
+        return resample_tile_worker(tile, model_dicts, n_models)
+
+    monkeypatch.setattr(resample, "_resample_tile_worker", record_tile_worker)
+    tile_size = 48
+    resamp = ResampleImage(ModelLibrary(inputs), blendheaders=False)
+    resamp.resample_many_to_one(tile_size=tile_size)
+
+    assert len(tasks) == len(range(0, resamp.output_array_shape[0], tile_size)) * len(
+        range(0, resamp.output_array_shape[1], tile_size)
+    )
+    pixel_bytes = im.data.itemsize + im.dq.itemsize + im.var_rnoise.itemsize
+    for model_dicts in tasks:
+        for model_dict in model_dicts:
+            assert max(model_dict["data"].shape) <= 2 * tile_size
+            assert isinstance(model_dict["wcsinfo"], dict)
+        assert (
+            resample._nbytes(model_dicts) <= len(model_dicts) * (2 * tile_size) ** 2 * pixel_bytes
+        )
+    assert resample._nbytes(tasks[0]) < resample._nbytes([im.data, im.dq, im.var_rnoise]) * len(
+        tasks[0]
+    )
+
+
+def test_imap_processes_max_bytes():
+    """Ensure tasks are only produced while their pending arrays fit within the limit."""
+    produced = []
+
+    def tasks():
+        for i in range(4):
+            produced.append(i)
+            yield i, (np.full(1000, i, dtype=np.float64),)
+
+    results = {}
+    for key, result in resample._imap_processes(np.sum, tasks(), 2, max_bytes=8000):
+        # Each task holds 8000 bytes, such that only one is pending at once
+        assert len(produced) == len(results) + 1
+        results[key] = result
+
+    assert results == {i: 1000 * i for i in range(4)}
@@ -54,6 +54,10 @@ class SkyMatchStep(Step):
 
         # Memory management:
         in_memory = boolean(default=True) # If False, preserve memory using temporary files
+        prefetch_bytes = integer(min=0, default=0) # Size of the files to read ahead if in_memory is False
+        write_behind_bytes = integer(min=0, default=0) # Size of the models to save in the background if in_memory is False
+        io_threads = integer(min=1, default=2) # Threads reading ahead and saving in the background
+        metadata_index = string(default=None) # File in which to save an index of the metadata of the input files, shared between runs
     """  # noqa: E501
 
     reference_file_types: list = []
@@ -85,7 +89,14 @@ class SkyMatchStep(Step):
         if isinstance(output_models, ModelLibrary):
             library = output_models
         else:
-            library = ModelLibrary(output_models, on_disk=not self.in_memory)
+            library = ModelLibrary(
+                output_models,
+                on_disk=not self.in_memory,
+                prefetch_bytes=self.prefetch_bytes,
+                write_behind_bytes=self.write_behind_bytes,
+                io_threads=self.io_threads,
+                metadata_index=self.metadata_index,
+            )
 
         # Method: "user". Use user-provided sky values, and bypass skymatch() altogether.
         if self.skymethod == "user":
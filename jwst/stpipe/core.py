@@ -82,7 +82,9 @@ class JwstStep(_Step):
         elif not isinstance(dataset, Path):
             raise TypeError(f"Cannot get CRDS parameters for {dataset} of type {type(dataset)}")
 
-        # for associations, open as ModelLibrary, which supports lazy-loading
+        # for associations, open as ModelLibrary, which supports lazy-loading;
+        # for an association file, the metadata read here is shared with the
+        # libraries the steps open, so the member is not read again
         if is_asn or dataset.suffix.lower() == ".json":
             model = ModelLibrary(dataset, asn_n_members=1, asn_exptypes=["science"])
             return (model.get_crds_parameters(), crds_observatory)
@@ -3,6 +3,8 @@ import gwcs
 import numpy as np
 import pytest
 from astropy.modeling.models import Scale, Shift
+from numpy.testing import assert_array_equal
+from photutils.aperture import ApertureStats, CircularAnnulus, CircularAperture
 from stdatamodels.jwst import datamodels
 
 from jwst.lib import reffile_utils
@@ -398,6 +400,58 @@ def test_tso_phot_multiple_center_values():
     assert np.allclose(catalog["psf_flux"].value, 3.0)
 
 
+@pytest.mark.parametrize(
+    "aperture",
+    [
+        CircularAperture((XCENTER + 0.3, YCENTER - 0.2), r=RADIUS),
+        CircularAnnulus((XCENTER, YCENTER), r_in=RADIUS_INNER, r_out=RADIUS_OUTER),
+        CircularAperture((1.4, 98.7), r=RADIUS),
+        CircularAperture((-20.0, YCENTER), r=RADIUS),
+    ],
+)
+def test_aperture_stats(aperture):
+    datamodel = mock_nircam_image()
+    rng = np.random.default_rng(seed=42)
+    data = datamodel.data + rng.normal(size=datamodel.data.shape).astype(np.float32)
+    err = rng.uniform(0.5, 1.0, size=data.shape).astype(np.float32)
+
+    # Invalid values in some integrations
+    data[1, 50, 70:80] = np.nan
+    data[1, 99, 0:5] = np.inf
+    data[2] = np.nan
+    err[3, 48:52, 74:76] = np.nan
+
+    # The results match those of each integration on its own
+    index = np.array([4, 0, 1, 2, 3])
+    result = tp._aperture_stats(data, err, aperture, index)
+    for i, integ in enumerate(index):
+        stats = ApertureStats(data[integ], aperture, error=err[integ])
+        with np.errstate(invalid="ignore"):
+            expected = (stats.sum, stats.sum_err, stats.sum_aper_area.value)
+        assert_array_equal(result[0][i], expected[0])
+        assert_array_equal(result[1][i], expected[1])
+        assert_array_equal(result[2][i], expected[2])
+
+
+@pytest.mark.parametrize("fit_psf", [True, False])
+def test_fit_source_parallel(monkeypatch, fit_psf):
+    datamodel = mock_nircam_image(shape=(5, 100, 150))
+    mask = np.full(datamodel.data.shape, False)
+    yidx, xidx = np.mgrid[:100, :150]
+    source_mask = ((xidx - XCENTER) ** 2 + (yidx - YCENTER) ** 2) < RADIUS_INNER**2
+    box_size = int(RADIUS * 2 + 1)
+    args = (datamodel.data, mask, source_mask, XCENTER + 1, YCENTER, box_size)
+
+    expected = tp._fit_source(*args, fit_psf=fit_psf)
+
+    # Parallel fits are limited to the available cores
+    monkeypatch.setattr(tp.os, "cpu_count", lambda: 2)
+    result = tp._fit_source(*args, fit_psf=fit_psf, maximum_cores="all")
+    assert len(result) == len(expected)
+    for array, expected_array in zip(result, expected, strict=True):
+        assert_array_equal(array, expected_array)
+
+
 @pytest.mark.parametrize("fit_psf", [True, False])
 def test_fit_source_fail(monkeypatch, fit_psf):
     datamodel = mock_nircam_image()
@@ -1,4 +1,6 @@
 import logging
+import multiprocessing as mp
+import os
 from collections import OrderedDict
 
 import astropy.units as u
@@ -6,10 +8,11 @@ import numpy as np
 from astropy.stats import gaussian_fwhm_to_sigma
 from astropy.table import QTable
 from astropy.time import Time
-from photutils.aperture import ApertureStats, CircularAnnulus, CircularAperture
+from photutils.aperture import CircularAnnulus, CircularAperture
 from photutils.centroids import centroid_sources
 from photutils.psf import GaussianPRF, PSFPhotometry
 from photutils.utils import CutoutImage
+from stcal.multiprocessing import compute_num_cores
 from stdatamodels.jwst.datamodels import CubeModel
 
 __all__ = ["convert_data_units", "tso_aperture_photometry", "tso_source_centroid"]
@@ -119,22 +122,14 @@ def tso_aperture_photometry(
     xcenter = np.full(nimg, xcenter) if np.isscalar(xcenter) else xcenter
     ycenter = np.full(nimg, ycenter) if np.isscalar(ycenter) else ycenter
 
-    aperture_sum = []
-    aperture_sum_err = []
-    aperture_area = []
-    annulus_sum = []
-    annulus_sum_err = []
-    annulus_area = []
-
     if sub64p_wlp8:
         info = (
             "Photometry measured as the sum of all values in the "
             "subarray.  No background subtraction was performed."
         )
 
-        for i in np.arange(nimg):
-            aperture_sum.append(np.nansum(datamodel.data[i, :, :]))
-            aperture_sum_err.append(np.sqrt(np.nansum(datamodel.err[i, :, :] ** 2)))
+        aperture_sum = np.nansum(datamodel.data, axis=(1, 2))
+        aperture_sum_err = np.sqrt(np.nansum(datamodel.err**2, axis=(1, 2)))
     else:
         info = (
             f"Photometry measured in a circular aperture of r={radius} "
@@ -143,35 +138,30 @@ def tso_aperture_photometry(
             f"r_outer={radius_outer} pixels."
         )
 
-        for i in np.arange(nimg):
-            phot_aper = CircularAperture((xcenter[i], ycenter[i]), r=radius)
-            bkg_aper = CircularAnnulus(
-                (xcenter[i], ycenter[i]), r_in=radius_inner, r_out=radius_outer
-            )
+        aperture_sum = np.full(nimg, np.nan)
+        aperture_sum_err = np.full(nimg, np.nan)
+        aperture_area = np.full(nimg, np.nan)
+        annulus_sum = np.full(nimg, np.nan)
+        annulus_sum_err = np.full(nimg, np.nan)
+        annulus_area = np.full(nimg, np.nan)
 
-            aperstats = ApertureStats(
-                datamodel.data[i, :, :], phot_aper, error=datamodel.err[i, :, :]
+        # Measure all integrations with the same center together
+        centers, inverse = np.unique(
+            np.column_stack([xcenter, ycenter]), axis=0, return_inverse=True
+        )
+        groups = np.split(np.argsort(inverse, kind="stable"), np.cumsum(np.bincount(inverse))[:-1])
+        for (x, y), index in zip(centers, groups, strict=True):
+            phot_aper = CircularAperture((x, y), r=radius)
+            bkg_aper = CircularAnnulus((x, y), r_in=radius_inner, r_out=radius_outer)
+
+            # The area is that of the valid (unmasked) pixels in the aperture
+            (aperture_sum[index], aperture_sum_err[index], aperture_area[index]) = _aperture_stats(
+                datamodel.data, datamodel.err, phot_aper, index
             )
-
-            annstats = ApertureStats(
-                datamodel.data[i, :, :], bkg_aper, error=datamodel.err[i, :, :]
+            (annulus_sum[index], annulus_sum_err[index], annulus_area[index]) = _aperture_stats(
+                datamodel.data, datamodel.err, bkg_aper, index
             )
 
-            # sum_aper_area is the number of valid (unmasked) pixels in the aperture
-            aperture_sum.append(aperstats.sum)
-            aperture_sum_err.append(aperstats.sum_err)
-            aperture_area.append(aperstats.sum_aper_area.value)
-            annulus_sum.append(annstats.sum)
-            annulus_sum_err.append(annstats.sum_err)
-            annulus_area.append(annstats.sum_aper_area.value)
-
-    aperture_sum = np.array(aperture_sum)
-    aperture_sum_err = np.array(aperture_sum_err)
-    aperture_area = np.array(aperture_area)
-    annulus_sum = np.array(annulus_sum)
-    annulus_sum_err = np.array(annulus_sum_err)
-    annulus_area = np.array(annulus_area)
-
     # construct metadata for output table
     meta = OrderedDict()
     meta["instrument"] = datamodel.meta.instrument.name
@@ -251,6 +241,113 @@ def tso_aperture_photometry(
     return tbl
 
 
+def _aperture_stats(data, error, aperture, index, max_elements=2**22):
+    """
+    Measure the sum in an aperture for a set of integrations.
+
+    The results are those of `~photutils.aperture.ApertureStats` with the
+    "exact" method, but the aperture masks are computed once, and all
+    integrations without invalid pixels in the aperture are summed together.
+
+    Parameters
+    ----------
+    data : ndarray of float
+        3D data cube (nimage, ny, nx).
+    error : ndarray of float
+        Errors matching the input data.
+    aperture : `~photutils.aperture.PixelAperture`
+        The aperture.
+    index : ndarray of int
+        The integrations to measure.
+    max_elements : int, optional
+        The maximum number of pixel values to gather at once.
+
+    Returns
+    -------
+    aperture_sum, aperture_sum_err : ndarray
+        The sum of the valid data values in the aperture, and its error,
+        for each integration.
+    aperture_area : ndarray
+        The area of the valid pixels in the aperture, for each integration.
+    """
+    nimg = len(index)
+    aperture_sum = np.full(nimg, np.nan)
+    aperture_sum_err = np.full(nimg, np.nan)
+    aperture_area = np.full(nimg, np.nan)
+
+    aperture_mask = aperture.to_mask(method="exact")
+    slc_large, slc_small = aperture_mask.get_overlap_slices(data.shape[1:])
+    if slc_large is None:
+        # The aperture does not overlap the data
+        return aperture_sum, aperture_sum_err, aperture_area
+
+    weights = aperture_mask.data[slc_small]
+    center_weights = aperture.to_mask(method="center").data[slc_small]
+    pixels = np.flatnonzero(weights)
+    pixel_weights = weights.ravel()[pixels]
+    area = _aperture_area(weights, center_weights, np.zeros(weights.shape, dtype=bool))
+
+    data_cutout = data[(slice(None), *slc_large)]
+    error_cutout = error[(slice(None), *slc_large)]
+    step = max(1, max_elements // weights.size)
+    for start in range(0, nimg, step):
+        block = index[start : start + step]
+        values = data_cutout[block].reshape(len(block), -1)[:, pixels]
+        variance = error_cutout[block].reshape(len(block), -1)[:, pixels] ** 2
+
+        # Rows are contiguous, so that each is summed like the values
+        # of a single image
+        values = values.astype(np.float64, order="C")
+        invalid = ~np.isfinite(values)
+        values *= pixel_weights
+        variance = np.ascontiguousarray(variance * pixel_weights)
+        sums = np.sum(values, axis=1)
+        sum_errs = np.sqrt(np.sum(variance, axis=1))
+        areas = np.full(len(block), area)
+
+        # Integrations with invalid pixels in the aperture exclude them
+        for i in np.flatnonzero(invalid.any(axis=1)):
+            valid = ~invalid[i]
+            if valid.any():
+                sums[i] = np.sum(values[i, valid])
+                sum_errs[i] = np.sqrt(np.sum(variance[i, valid]))
+            else:
+                sums[i] = sum_errs[i] = np.nan
+            data_mask = np.zeros(weights.shape, dtype=bool)
+            data_mask.flat[pixels] = invalid[i]
+            areas[i] = _aperture_area(weights, center_weights, data_mask)
+
+        aperture_sum[start : start + step] = sums
+        aperture_sum_err[start : start + step] = sum_errs
+        aperture_area[start : start + step] = areas
+
+    return aperture_sum, aperture_sum_err, aperture_area
+
+
+def _aperture_area(weights, center_weights, data_mask):
+    """
+    Compute the area of the valid pixels in an aperture.
+
+    Parameters
+    ----------
+    weights : ndarray of float
+        The "exact" aperture mask weights.
+    center_weights : ndarray of float
+        The "center" aperture mask weights.
+    data_mask : ndarray of bool
+        The invalid pixels.
+
+    Returns
+    -------
+    float
+        The area, or NaN if no pixel centers in the aperture are valid.
+    """
+    if np.all((center_weights == 0) | data_mask):
+        return np.nan
+    mask = (weights == 0) | data_mask
+    return np.sum(np.where(mask, 0.0, weights * ~data_mask))
+
+
 def _get_int_times(datamodel):
     """
     Find mid times of each integration.
@@ -300,7 +397,9 @@ def _get_int_times(datamodel):
     return int_times_utc, int_times_bjd
 
 
-def _fit_source(data, mask, source_mask, xcenter, ycenter, box_size, fit_psf=False):
+def _fit_source(
+    data, mask, source_mask, xcenter, ycenter, box_size, fit_psf=False, maximum_cores="1"
+):
     """
     Fit the source in all integrations.
 
@@ -319,6 +418,9 @@ def _fit_source(data, mask, source_mask, xcenter, ycenter, box_size, fit_psf=Fal
     fit_psf : bool, optional
         If `True` and a centroid is successfully fit, the source will be fit
         with a Gaussian model and the PSF width and flux will be returned.
+    maximum_cores : str, optional
+        The number of processes to use to fit blocks of integrations in
+        parallel: an integer, 'quarter', 'half', or 'all'.
 
     Returns
     -------
@@ -331,8 +433,23 @@ def _fit_source(data, mask, source_mask, xcenter, ycenter, box_size, fit_psf=Fal
         respectively, one per integration, and an array of PSF fit flux,
         also one per integration.
     """
-    # Set up output arrays
     nimg = data.shape[0]
+    nprocs = compute_num_cores(str(maximum_cores), nimg, os.cpu_count() or 1)
+    if nprocs > 1:
+        # Integrations are fit independently, so blocks of them can be
+        # fit in separate processes.  Use a few blocks per process to
+        # balance the load.
+        log.debug(f"Fitting the source in {nimg} integrations with {nprocs} processes")
+        blocks = np.array_split(np.arange(nimg), min(nimg, 4 * nprocs))
+        args = [
+            (data[block], mask[block], source_mask, xcenter, ycenter, box_size, fit_psf)
+            for block in blocks
+        ]
+        with mp.get_context("spawn").Pool(nprocs) as pool:
+            results = pool.starmap(_fit_source, args)
+        return tuple(np.concatenate(arrays) for arrays in zip(*results, strict=True))
+
+    # Set up output arrays
     centroid_x = np.full(nimg, np.nan)
     centroid_y = np.full(nimg, np.nan)
     if fit_psf:
@@ -458,7 +575,13 @@ def _psf_fit_gaussian_prf(data, mask, fit_box_width, xcenter, ycenter):
 
 
 def tso_source_centroid(
-    datamodel, xcenter, ycenter, search_box_width=41, fit_box_width=11, source_radius=4.0
+    datamodel,
+    xcenter,
+    ycenter,
+    search_box_width=41,
+    fit_box_width=11,
+    source_radius=4.0,
+    maximum_cores="1",
 ):
     """
     Centroid the source and fit a Gaussian PSF to a subimage.
@@ -496,6 +619,10 @@ def tso_source_centroid(
     source_radius : float, optional
         Expected PSF source radius, used to mask the source for approximate
         background estimation.
+    maximum_cores : str, optional
+        The number of processes to use to fit the integrations in parallel:
+        an integer, 'quarter', 'half', or 'all'.  The default '1' does not
+        use multiprocessing.
 
     Returns
     -------
@@ -523,7 +650,13 @@ def tso_source_centroid(
 
     # Get initial centroids from planned position
     centroid_x, centroid_y = _fit_source(
-        datamodel.data, mask, source_mask, xcenter, ycenter, search_box_width
+        datamodel.data,
+        mask,
+        source_mask,
+        xcenter,
+        ycenter,
+        search_box_width,
+        maximum_cores=maximum_cores,
     )
 
     # Check if there were any valid fits
@@ -540,7 +673,14 @@ def tso_source_centroid(
     # and fit the PSF at the new centroid location.
     source_mask = ((xidx - xcenter) ** 2 + (yidx - ycenter) ** 2) < source_radius**2
     centroid_x, centroid_y, psf_width_x, psf_width_y, psf_flux = _fit_source(
-        datamodel.data, mask, source_mask, xcenter, ycenter, fit_box_width, fit_psf=True
+        datamodel.data,
+        mask,
+        source_mask,
+        xcenter,
+        ycenter,
+        fit_box_width,
+        fit_psf=True,
+        maximum_cores=maximum_cores,
     )
 
     return centroid_x, centroid_y, psf_width_x, psf_width_y, psf_flux
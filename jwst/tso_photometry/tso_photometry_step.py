@@ -33,6 +33,7 @@ class TSOPhotometryStep(Step):
         search_box_width = integer(default=41)  # Box width for initial source search; must be odd.
         fit_box_width = integer(default=11)  # Box width for centroid fit; must be odd.
         moving_centroid = boolean(default=False)  # Fit centroid values for each integration
+        maximum_cores = string(default='1')  # Cores for fitting the source in parallel. Can be an integer, 'half', 'quarter', or 'all'
     """  # noqa: E501
 
     reference_file_types = ["gain"]
@@ -108,6 +109,7 @@ class TSOPhotometryStep(Step):
                 search_box_width=self.search_box_width,
                 fit_box_width=self.fit_box_width,
                 source_radius=self.radius_inner,
+                maximum_cores=self.maximum_cores,
             )
 
             if np.all(np.isnan(centroid_x)) or np.all(np.isnan(centroid_y)):
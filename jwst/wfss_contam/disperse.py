@@ -1,11 +1,12 @@
+import functools
 import logging
 import multiprocessing as mp
 import warnings
 
 import numpy as np
-from astropy.modeling.mappings import Mapping
 from scipy.interpolate import interp1d
 
+from jwst.lib.grism_trace import detector_to_grism_transform, evaluate_trace, get_trace_table
 from jwst.lib.winclip import get_clipped_pixels
 from jwst.wfss_contam.sens1d import create_1d_sens
 
@@ -79,7 +80,7 @@ def _determine_native_wl_spacing(
     return lambdas
 
 
-def _disperse_onto_grism(x0_sky, y0_sky, sky_to_imgxy, imgxy_to_grismxy, lambdas, order):
+def _disperse_onto_grism(x0_sky, y0_sky, sky_to_imgxy, trace, lambdas, order):
     """
     Compute x/y positions in the grism image for the set of desired wavelengths.
 
@@ -91,8 +92,10 @@ def _disperse_onto_grism(x0_sky, y0_sky, sky_to_imgxy, imgxy_to_grismxy, lambdas
         Dec of the input pixel position in direct image and segmentation map
     sky_to_imgxy : astropy model
         Transform from sky to image coordinates
-    imgxy_to_grismxy : astropy model
-        Transform from image to grism coordinates
+    trace : callable
+        Function computing the grism x/y positions, of shape (n_lam, n_pixels),
+        from the image x/y positions and the wavelengths, such as a
+        `~jwst.lib.grism_trace.GrismTraceTable`
     lambdas : ndarray
         Wavelengths at which to compute dispersed pixel values
     order : int
@@ -108,15 +111,11 @@ def _disperse_onto_grism(x0_sky, y0_sky, sky_to_imgxy, imgxy_to_grismxy, lambdas
         Wavelengths corresponding to each dispersed pixel
     """
     # x/y in image frame of grism image is the same for all wavelengths
-    x0_sky = np.repeat(x0_sky[np.newaxis, :], len(lambdas), axis=0)
-    y0_sky = np.repeat(y0_sky[np.newaxis, :], len(lambdas), axis=0)
-
-    x0_xy, y0_xy, _, _ = sky_to_imgxy(x0_sky, y0_sky, lambdas, order)
-    del x0_sky, y0_sky
+    x0_xy, y0_xy, _, _ = sky_to_imgxy(x0_sky, y0_sky, lambdas[0], order)
 
     # Convert to x/y in grism frame.
-    lambdas = np.repeat(lambdas[:, np.newaxis], x0_xy.shape[1], axis=1)
-    x0s, y0s = imgxy_to_grismxy(x0_xy, y0_xy, lambdas, order)
+    x0s, y0s = trace(np.atleast_1d(x0_xy), np.atleast_1d(y0_xy), lambdas)
+    lambdas = np.repeat(lambdas[:, np.newaxis], x0s.shape[1], axis=1)
     # x0s, y0s now have shape (n_lam, n_pixels)
     return x0s, y0s, lambdas
 
@@ -292,6 +291,7 @@ def disperse(
     naxis,
     oversample_factor=2,
     basis_models=None,
+    trace_tolerance=None,
 ):
     """
     Compute the dispersed image pixel values from the direct image.
@@ -337,6 +337,11 @@ def disperse(
         Flux distributions to evaluate at each wavelength. Typically these will be single
         polynomial orders, e.g. [lambda x: x, lambda x: x^2], ...] the coefficients of which
         are linearly fit later.
+    trace_tolerance : float or None, optional
+        Maximum error, in pixels, of the dispersed positions interpolated from
+        a tabulated trace (see `~jwst.lib.grism_trace.GrismTraceTable`).
+        If `None` (the default), the grism WCS transform is evaluated exactly
+        for every pixel.
 
     Returns
     -------
@@ -357,13 +362,7 @@ def disperse(
 
     # Set up the transforms we need from the input WCS objects
     sky_to_imgxy = grism_wcs.get_transform("world", "detector")
-    imgxy_to_grismxy = grism_wcs.get_transform("detector", "grism_detector")
-
-    # We only need the x,y outputs of imgxy_to_grismxy
-    # Making the number of outputs dynamic handles legacy WCS objects that did not pass
-    # the x0, y0, and order through the transform unmodified like the current version does.
-    n_outputs = len(imgxy_to_grismxy.outputs)
-    imgxy_to_grismxy = imgxy_to_grismxy | Mapping((0, 1), n_inputs=n_outputs)
+    imgxy_to_grismxy = detector_to_grism_transform(grism_wcs)
 
     # Find RA/Dec of the input pixel position in direct image
     x0_sky, y0_sky = direct_image_wcs(x0, y0, with_bounding_box=False)
@@ -404,11 +403,18 @@ def disperse(
         fluxes = np.repeat(fluxes[0][np.newaxis, :], nlam, axis=0)
     source_ids_per_pixel = np.repeat(source_ids_per_pixel[np.newaxis, :], nlam, axis=0)
 
+    # The trace is interpolated from a table computed once per grism WCS and order,
+    # unless an exact evaluation of the transform is requested.
+    if trace_tolerance is None:
+        trace = functools.partial(evaluate_trace, imgxy_to_grismxy, order=order)
+    else:
+        trace = get_trace_table(grism_wcs, order, (wmin, wmax), naxis, tolerance=trace_tolerance)
+
     x0s, y0s, lambdas = _disperse_onto_grism(
         x0_sky,
         y0_sky,
         sky_to_imgxy,
-        imgxy_to_grismxy,
+        trace,
         lambdas,
         order,
     )
@@ -1,7 +1,14 @@
+import atexit
 import logging
 import multiprocessing as mp
+import pickle
+import threading
 import time
 import warnings
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
 
 import numpy as np
 from astropy.stats import SigmaClip
@@ -125,6 +132,7 @@ class Observation:
         max_pixels_per_chunk=5e4,
         oversample_factor=2,
         band_wavelengths=None,
+        trace_tolerance=None,
     ):
         """
         Initialize all data and metadata for a given observation.
@@ -151,6 +159,10 @@ class Observation:
         band_wavelengths : array-like of shape (N,), optional
             Central wavelengths (in microns) for each plane of a 3-D ``direct_image``.
             Required when ``direct_image`` is 3-D; ignored when ``direct_image`` is 2-D.
+        trace_tolerance : float or None, optional
+            Maximum error, in pixels, of the dispersed positions interpolated
+            from a tabulated grism trace. If None, the grism transforms are
+            evaluated exactly for every pixel.
         """
         if boundaries is None:
             boundaries = []
@@ -164,6 +176,7 @@ class Observation:
         self.max_cpu = max_cpu
         self.max_pixels_per_chunk = max_pixels_per_chunk
         self.oversample_factor = oversample_factor
+        self.trace_tolerance = trace_tolerance
 
         if direct_image.ndim == 2:
             # use placeholder value since disperse() is going to see a flat SED and ignore this
@@ -199,6 +212,101 @@ class Observation:
         # Initialize the simulated dispersed image
         self.simulated_image = np.zeros(self.dims, float)
 
+        # Inputs shared with worker processes for all orders, created on first use
+        self._shared_inputs = None
+
+    def _disperse_in_pool(
+        self, order, wmin, wmax, sens_waves, sens_response, selected_ids, basis_models
+    ):
+        """
+        Disperse the sources for a given spectral order in the pool of worker processes.
+
+        The inputs are passed to the workers through shared memory: the WCS objects
+        once for all orders, the pixels and sensitivity once per order.
+        Each chunk is then only described by its start and end indices.
+
+        Parameters
+        ----------
+        order : int
+            Spectral order to process
+        wmin : float
+            Minimum wavelength for dispersed spectra
+        wmax : float
+            Maximum wavelength for dispersed spectra
+        sens_waves : ndarray
+            Wavelength array from photom reference file
+        sens_response : ndarray
+            Response (flux calibration) array from photom reference file
+        selected_ids : list or None
+            List of source IDs to process. If None, all sources are processed.
+        basis_models : list of callables or None
+            Flux distributions to evaluate at each wavelength.
+
+        Yields
+        ------
+        dict or None
+            The output of `~jwst.wfss_contam.disperse.disperse` for each chunk, in order.
+        """
+        pixels, chunks = self._sorted_pixels(selected_ids, max_pixels=self.max_pixels_per_chunk)
+        log.info(
+            f"Using {self.max_cpu} CPU cores for multiprocessing "
+            f"{len(self.source_ids)} sources in {len(chunks)} chunks."
+        )
+        if self._shared_inputs is None:
+            self._shared_inputs = _SharedInputs(
+                objects={
+                    "band_wavelengths": self.band_wavelengths,
+                    "direct_image_wcs": self.direct_image_wcs,
+                    "grism_wcs": self.grism_wcs,
+                    "naxis": self.naxis,
+                    "oversample_factor": self.oversample_factor,
+                    "trace_tolerance": self.trace_tolerance,
+                }
+            )
+        order_inputs = _SharedInputs(
+            arrays=dict(zip(["xs", "ys", "fluxes", "source_ids"], pixels, strict=True)),
+            objects={
+                "order": order,
+                "wmin": wmin,
+                "wmax": wmax,
+                "sens_waves": sens_waves,
+                "sens_response": sens_response,
+                "basis_models": basis_models,
+            },
+        )
+        del pixels
+        tasks = [
+            (self._shared_inputs.descriptor, order_inputs.descriptor, start, end)
+            for start, end in chunks
+        ]
+        n_done = 0
+        try:
+            for attempt in range(2):
+                try:
+                    for result in _get_pool(self.max_cpu).map(_disperse_chunk, tasks[n_done:]):
+                        n_done += 1
+                        yield result
+                    break
+                except BrokenProcessPool as e:
+                    # A worker process died, e.g. killed for lack of memory:
+                    # retry the remaining chunks once in a new pool.
+                    _shutdown_pool()
+                    if attempt:
+                        raise
+                    log.warning(f"Restarting the pool of worker processes: {e}")
+        except Exception as e:
+            log.error(f"Error during parallel processing: {e}")
+            raise
+        finally:
+            order_inputs.close()
+
+    def close(self):
+        """Release the inputs shared with the worker processes, if any."""
+        if self._shared_inputs is not None:
+            self._shared_inputs.close()
+            self._shared_inputs = None
+            _release_worker_inputs()
+
     def _create_pixel_list(self):
         """Create flat lists of pixels to be dispersed."""
         self.ys, self.xs = np.nonzero(self.seg)
@@ -210,6 +318,59 @@ class Observation:
             # Shape (N, n_pixels), where N is the number of input direct image bands
             self.fluxes = self.dimage[:, self.ys, self.xs]
 
+    def _sorted_pixels(self, selected_ids=None, max_pixels=1e5):
+        """
+        Get the pixels of the selected sources, sorted by source ID, and split them in chunks.
+
+        Parameters
+        ----------
+        selected_ids : list, optional
+            List of source IDs to process. If None, all sources are processed.
+        max_pixels : int, optional
+            Maximum number of pixels per chunk.
+
+        Returns
+        -------
+        pixels : tuple of ndarray
+            The X and Y coordinates of the pixels in the direct image,
+            their fluxes, of shape (N, n_pixels), and their source IDs.
+        chunks : list of tuple
+            The start and end indices of each chunk of pixels.
+        """
+        source_ids = _select_ids(selected_ids, self.source_ids)
+
+        # Create a mask for selected sources
+        selected_mask = np.isin(self.source_ids_per_pixel, source_ids)
+
+        # Get pixels for selected sources
+        selected_xs = self.xs[selected_mask]
+        selected_ys = self.ys[selected_mask]
+        selected_fluxes = self.fluxes[:, selected_mask]
+        selected_source_ids = self.source_ids_per_pixel[selected_mask]
+
+        # Sort by source ID to keep sources mostly together
+        # This reduces the number of times we have to call build_dispersed_image_of_source
+        # within disperse()
+        sort_indices = np.argsort(selected_source_ids)
+        sorted_xs = selected_xs[sort_indices]
+        sorted_ys = selected_ys[sort_indices]
+        sorted_fluxes = selected_fluxes[:, sort_indices]
+        sorted_source_ids = selected_source_ids[sort_indices]
+
+        # Split into chunks of max_pixels
+        max_pixels = int(max_pixels)
+        total_pixels = len(sorted_xs)
+        n_chunks = int(np.ceil(total_pixels / max_pixels))
+
+        log.info(
+            f"Splitting {total_pixels} pixels from {len(source_ids)} sources into {n_chunks} chunks"
+        )
+
+        chunks = [
+            (i * max_pixels, min((i + 1) * max_pixels, total_pixels)) for i in range(n_chunks)
+        ]
+        return (sorted_xs, sorted_ys, sorted_fluxes, sorted_source_ids), chunks
+
     def chunk_sources(
         self,
         order,
@@ -253,40 +414,11 @@ class Observation:
             the arguments to disperse() for that group
             in the format that multiprocessing starmap expects.
         """
-        source_ids = _select_ids(selected_ids, self.source_ids)
-        max_pixels = int(max_pixels)
-
-        # Create a mask for selected sources
-        selected_mask = np.isin(self.source_ids_per_pixel, source_ids)
-
-        # Get pixels for selected sources
-        selected_xs = self.xs[selected_mask]
-        selected_ys = self.ys[selected_mask]
-        selected_fluxes = self.fluxes[:, selected_mask]
-        selected_source_ids = self.source_ids_per_pixel[selected_mask]
-
-        # Sort by source ID to keep sources mostly together
-        # This reduces the number of times we have to call build_dispersed_image_of_source
-        # within disperse()
-        sort_indices = np.argsort(selected_source_ids)
-        sorted_xs = selected_xs[sort_indices]
-        sorted_ys = selected_ys[sort_indices]
-        sorted_fluxes = selected_fluxes[:, sort_indices]
-        sorted_source_ids = selected_source_ids[sort_indices]
-
-        # Split into chunks of max_pixels
-        total_pixels = len(sorted_xs)
-        n_chunks = int(np.ceil(total_pixels / max_pixels))
-
-        log.info(
-            f"Splitting {total_pixels} pixels from {len(source_ids)} sources into {n_chunks} chunks"
-        )
+        pixels, chunks = self._sorted_pixels(selected_ids, max_pixels=max_pixels)
+        sorted_xs, sorted_ys, sorted_fluxes, sorted_source_ids = pixels
 
         disperse_args = []
-        for i in range(n_chunks):
-            start_idx = i * max_pixels
-            end_idx = min((i + 1) * max_pixels, total_pixels)
-
+        for start_idx, end_idx in chunks:
             chunk_xs = sorted_xs[start_idx:end_idx]
             chunk_ys = sorted_ys[start_idx:end_idx]
             chunk_fluxes = sorted_fluxes[:, start_idx:end_idx]
@@ -309,6 +441,7 @@ class Observation:
                     self.naxis,
                     self.oversample_factor,
                     basis_models,
+                    self.trace_tolerance,
                 ]
             )
 
@@ -341,41 +474,27 @@ class Observation:
             polynomial orders, e.g. [lambda x: x, lambda x: x^2], ...] the coefficients of which
             are linearly fit later. If None, no models are included in the output.
         """
-        # generate lists of input parameters for the disperse function
-        # for each chunk of sources
-        disperse_args = self.chunk_sources(
-            order,
-            wmin,
-            wmax,
-            sens_waves,
-            sens_response,
-            selected_ids=selected_ids,
-            max_pixels=self.max_pixels_per_chunk,
-            basis_models=basis_models,
-        )
         t0 = time.time()
         if self.max_cpu > 1:
-            # Use multiprocessing to disperse the sources
-            log.info(
-                f"Using {self.max_cpu} CPU cores for multiprocessing "
-                f"{len(self.source_ids)} sources in {len(disperse_args)} chunks."
+            all_res = self._disperse_in_pool(
+                order, wmin, wmax, sens_waves, sens_response, selected_ids, basis_models
             )
-            ctx = mp.get_context("spawn")
-            pool = ctx.Pool(self.max_cpu)
-            try:
-                all_res = pool.starmap(disperse, disperse_args)
-            except Exception as e:
-                log.error(f"Error during parallel processing: {e}")
-                raise
-            finally:
-                pool.close()
-                pool.join()
         else:
-            all_res = [disperse(*args) for args in disperse_args]
-        t1 = time.time()
-        log.info(f"Wall clock time for disperse_chunk order {order}: {(t1 - t0):.1f} sec")
+            # generate lists of input parameters for the disperse function
+            # for each chunk of sources
+            disperse_args = self.chunk_sources(
+                order,
+                wmin,
+                wmax,
+                sens_waves,
+                sens_response,
+                selected_ids=selected_ids,
+                max_pixels=self.max_pixels_per_chunk,
+                basis_models=basis_models,
+            )
+            all_res = (disperse(*args) for args in disperse_args)
 
-        # Combine results from all chunks, aggregating by source ID
+        # Combine results from all chunks as they are computed, aggregating by source ID
         source_results = {}
         for results in all_res:
             if results is None:
@@ -383,6 +502,9 @@ class Observation:
                 continue
             for sid in results:
                 _aggregate_by_source(results, sid, source_results)
+            del results
+        t1 = time.time()
+        log.info(f"Wall clock time for disperse_chunk order {order}: {(t1 - t0):.1f} sec")
 
         # Now add the combined results to the simulation
         for sid in source_results:
@@ -398,6 +520,251 @@ class Observation:
             self.simulated_slits.slits.append(slit)
 
 
+class _SharedInputs:
+    """
+    Read-only inputs of `~jwst.wfss_contam.disperse.disperse`, in shared memory.
+
+    Arrays are copied as is, and other objects pickled, into a single block of
+    shared memory, which worker processes attach to and unpickle only once
+    (see `_load_shared_inputs`). The block is released when closed, or when
+    this object is garbage-collected.
+
+    Parameters
+    ----------
+    arrays : dict, optional
+        Arrays to share, by name.
+    objects : dict, optional
+        Picklable objects to share, by name.
+    """
+
+    def __init__(self, arrays=None, objects=None):
+        arrays = {name: np.ascontiguousarray(array) for name, array in (arrays or {}).items()}
+        payload = pickle.dumps(objects or {}, protocol=pickle.HIGHEST_PROTOCOL)
+
+        specs = []
+        offset = 0
+        for name, array in arrays.items():
+            # Align arrays on cache lines
+            offset = -(-offset // 64) * 64
+            specs.append((name, array.dtype.str, array.shape, offset))
+            offset += array.nbytes
+        size = offset + len(payload)
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for (_, dtype, shape, array_offset), array in zip(specs, arrays.values(), strict=True):
+            np.ndarray(shape, dtype=dtype, buffer=self._shm.buf, offset=array_offset)[...] = array
+        self._shm.buf[offset:size] = payload
+
+        self.descriptor = (self._shm.name, tuple(specs), offset, len(payload))
+        self._finalizer = weakref.finalize(self, _release_shared_memory, self._shm)
+
+    def close(self):
+        """Release the shared memory."""
+        self._finalizer()
+
+
+def _release_shared_memory(shm):
+    """
+    Close and remove a block of shared memory.
+
+    Parameters
+    ----------
+    shm : `~multiprocessing.shared_memory.SharedMemory`
+        The block of shared memory.
+    """
+    shm.close()
+    shm.unlink()
+
+
+# Inputs loaded by a worker process, by name of their block of shared memory
+_worker_inputs = {}
+
+# Barrier of the worker processes, set by _init_worker
+_worker_barrier = {}
+
+
+def _init_worker(barrier):
+    """
+    Set the barrier that the worker processes wait on to release their inputs.
+
+    Parameters
+    ----------
+    barrier : `~multiprocessing.Barrier`
+        A barrier for all the worker processes of the pool.
+    """
+    _worker_barrier["barrier"] = barrier
+
+
+def _load_shared_inputs(descriptor):
+    """
+    Load inputs shared by `_SharedInputs`, in a worker process.
+
+    The inputs are cached, such that each block of shared memory is only
+    attached to and unpickled once per process.
+
+    Parameters
+    ----------
+    descriptor : tuple
+        The ``descriptor`` attribute of the `_SharedInputs`.
+
+    Returns
+    -------
+    dict
+        The shared arrays, read-only, and objects, by name.
+    """
+    name, specs, payload_offset, payload_size = descriptor
+    if name in _worker_inputs:
+        return _worker_inputs[name][1]
+
+    shm = shared_memory.SharedMemory(name=name)
+    with shm.buf[payload_offset : payload_offset + payload_size] as payload:
+        inputs = pickle.loads(payload)  # noqa: S301
+    for key, dtype, shape, offset in specs:
+        array = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+        array.flags.writeable = False
+        inputs[key] = array
+    _worker_inputs[name] = (shm, inputs)
+    return inputs
+
+
+def _close_worker_inputs(keep=()):
+    """
+    Close the inputs loaded by a worker process.
+
+    Parameters
+    ----------
+    keep : iterable of str, optional
+        The names of the blocks of shared memory to keep.
+    """
+    for name in [name for name in _worker_inputs if name not in keep]:
+        shm, inputs = _worker_inputs.pop(name)
+        inputs.clear()
+        del inputs
+        shm.close()
+
+
+def _clear_worker(timeout):
+    """
+    Close all inputs loaded by a worker process, then wait for the other processes.
+
+    Waiting on the barrier ensures that each process runs this once.
+
+    Parameters
+    ----------
+    timeout : float
+        The time to wait for the other processes, in seconds.
+    """
+    _close_worker_inputs()
+    _worker_barrier["barrier"].wait(timeout)
+
+
+def _disperse_chunk(task):
+    """
+    Disperse a chunk of pixels from inputs in shared memory, in a worker process.
+
+    Parameters
+    ----------
+    task : tuple
+        The descriptors of the inputs of the observation and of the order,
+        and the start and end indices of the chunk.
+
+    Returns
+    -------
+    dict or None
+        The output of `~jwst.wfss_contam.disperse.disperse`.
+    """
+    obs_descriptor, order_descriptor, start, end = task
+    # Inputs of previous orders and observations are released by their
+    # owner: close them to release their memory.
+    _close_worker_inputs(keep=(obs_descriptor[0], order_descriptor[0]))
+    obs_inputs = _load_shared_inputs(obs_descriptor)
+    order_inputs = _load_shared_inputs(order_descriptor)
+    return disperse(
+        order_inputs["xs"][start:end],
+        order_inputs["ys"][start:end],
+        # NaN fluxes may be replaced in place
+        np.array(order_inputs["fluxes"][:, start:end]),
+        obs_inputs["band_wavelengths"],
+        order_inputs["source_ids"][start:end],
+        order_inputs["order"],
+        order_inputs["wmin"],
+        order_inputs["wmax"],
+        order_inputs["sens_waves"],
+        order_inputs["sens_response"],
+        obs_inputs["direct_image_wcs"],
+        obs_inputs["grism_wcs"],
+        obs_inputs["naxis"],
+        obs_inputs["oversample_factor"],
+        order_inputs["basis_models"],
+        obs_inputs["trace_tolerance"],
+    )
+
+
+# Pool of worker processes, reused across orders and observations, and its size
+_pool = None
+_pool_size = 0
+
+# Time to wait for all worker processes to release their inputs, in seconds
+_CLEAR_TIMEOUT = 60.0
+
+
+def _get_pool(nprocs):
+    """
+    Get the pool of worker processes, started on first use.
+
+    Parameters
+    ----------
+    nprocs : int
+        The number of worker processes. If it differs from that of the
+        current pool, the pool is restarted.
+
+    Returns
+    -------
+    `~concurrent.futures.ProcessPoolExecutor`
+        The pool of worker processes.
+    """
+    global _pool, _pool_size
+    if _pool is not None and _pool_size != nprocs:
+        _shutdown_pool()
+    if _pool is None:
+        ctx = mp.get_context("spawn")
+        _pool = ProcessPoolExecutor(
+            max_workers=nprocs,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(ctx.Barrier(nprocs),),
+        )
+        _pool_size = nprocs
+    return _pool
+
+
+def _release_worker_inputs():
+    """
+    Close the inputs loaded by all worker processes, if the pool is started.
+
+    The pool is stopped if any process fails to do so.
+    """
+    if _pool is None:
+        return
+    try:
+        list(_pool.map(_clear_worker, [_CLEAR_TIMEOUT] * _pool_size))
+    except (BrokenProcessPool, threading.BrokenBarrierError) as e:
+        log.warning(f"Stopping the pool of worker processes: {e}")
+        _shutdown_pool()
+
+
+def _shutdown_pool():
+    """Stop the pool of worker processes, if started."""
+    global _pool, _pool_size
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+        _pool_size = 0
+
+
+atexit.register(_shutdown_pool)
+
+
 def _aggregate_by_source(results, sid, source_results):
     """
     Combine results from different chunks into a single image and bounds for each source ID.
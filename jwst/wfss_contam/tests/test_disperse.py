@@ -1,7 +1,16 @@
+import functools
+
 import numpy as np
-from numpy.testing import assert_allclose
+from numpy.testing import assert_allclose, assert_array_equal
 
-from jwst.wfss_contam.disperse import _build_dispersed_image_of_source, _replace_nans, disperse
+from jwst.lib.grism_trace import detector_to_grism_transform, evaluate_trace, get_trace_table
+from jwst.wfss_contam import disperse as disperse_module
+from jwst.wfss_contam.disperse import (
+    _build_dispersed_image_of_source,
+    _disperse_onto_grism,
+    _replace_nans,
+    disperse,
+)
 
 _SENS_WAVES = np.linspace(1.708, 2.28, 100)
 _WMIN, _WMAX = _SENS_WAVES[0], _SENS_WAVES[-1]
@@ -221,6 +230,118 @@ def test_flux_models_superposition(grism_wcs, direct_image_with_gradient):
     assert_allclose(combined, src_sum[_SOURCE_ID]["model_counts"][0], rtol=1e-10)
 
 
+def _full_image(output, naxis):
+    """Place a dispersed source image within the full grism image frame."""
+    image = np.zeros((naxis[1], naxis[0]))
+    minx, maxx, miny, maxy = output["bounds"]
+    image[miny : maxy + 1, minx : maxx + 1] = output["image"]
+    return image
+
+
+def test_disperse_trace_table_matches_exact(grism_wcs, direct_image_with_gradient):
+    """Test that dispersing with the tabulated trace matches the exact transform."""
+    tolerance = 0.01
+    table = get_trace_table(grism_wcs, 1, (_WMIN, _WMAX), _NAXIS, tolerance=tolerance)
+    assert table.is_accurate
+
+    xs = np.array([100.0, 200.0, 250.0, 20.0, 280.0])
+    ys = np.array([150.0, 200.0, 50.0, 480.0, 10.0])
+    direct_image_wcs = direct_image_with_gradient.meta.wcs
+
+    # The dispersed positions agree to within the tolerance
+    x0_sky, y0_sky = direct_image_wcs(xs + 0.5, ys + 0.5, with_bounding_box=False)
+    sky_to_imgxy = grism_wcs.get_transform("world", "detector")
+    exact_trace = functools.partial(evaluate_trace, detector_to_grism_transform(grism_wcs), order=1)
+    lambdas = np.linspace(_WMIN, _WMAX, 200)
+    exact_x, exact_y, _ = _disperse_onto_grism(
+        x0_sky, y0_sky, sky_to_imgxy, exact_trace, lambdas, 1
+    )
+    table_x, table_y, _ = _disperse_onto_grism(x0_sky, y0_sky, sky_to_imgxy, table, lambdas, 1)
+    assert_allclose(table_x, exact_x, rtol=0, atol=tolerance)
+    assert_allclose(table_y, exact_y, rtol=0, atol=tolerance)
+
+    # and so do the dispersed images, pixel by pixel. A shift of the dispersed
+    # positions by the tolerance moves at most that fraction of the flux
+    # of each wavelength element across each pixel edge.
+    source_ids = np.arange(1, len(xs) + 1)
+    outputs = []
+    for trace_tolerance in [None, tolerance]:
+        outputs.append(
+            disperse(
+                xs,
+                ys,
+                np.ones((1, len(xs))),
+                np.array([2.0]),
+                source_ids,
+                1,
+                _WMIN,
+                _WMAX,
+                _SENS_WAVES,
+                np.ones_like(_SENS_WAVES),
+                direct_image_wcs,
+                grism_wcs,
+                _NAXIS,
+                trace_tolerance=trace_tolerance,
+            )
+        )
+    exact, tabulated = outputs
+    assert exact.keys() == tabulated.keys()
+    for source_id in exact:
+        exact_image = _full_image(exact[source_id], _NAXIS)
+        assert_allclose(
+            _full_image(tabulated[source_id], _NAXIS),
+            exact_image,
+            rtol=0,
+            atol=2 * tolerance * exact_image.max(),
+        )
+
+
+def test_disperse_default_is_exact(grism_wcs, direct_image_with_gradient, monkeypatch):
+    """Test that dispersing by default evaluates the grism transforms for every pixel."""
+
+    def get_trace_table(*args, **kwargs):
+        raise AssertionError("The trace should not be tabulated by default")
+
+    positions = []
+
+    def disperse_onto_grism(*args):
+        positions.append(_disperse_onto_grism(*args))
+        return positions[-1]
+
+    monkeypatch.setattr(disperse_module, "get_trace_table", get_trace_table)
+    monkeypatch.setattr(disperse_module, "_disperse_onto_grism", disperse_onto_grism)
+
+    xs = np.array([100.0, 200.0, 250.0, 20.0, 280.0])
+    ys = np.array([150.0, 200.0, 50.0, 480.0, 10.0])
+    direct_image_wcs = direct_image_with_gradient.meta.wcs
+    disperse(
+        xs,
+        ys,
+        np.ones((1, len(xs))),
+        np.array([2.0]),
+        np.arange(1, len(xs) + 1),
+        1,
+        _WMIN,
+        _WMAX,
+        _SENS_WAVES,
+        np.ones_like(_SENS_WAVES),
+        direct_image_wcs,
+        grism_wcs,
+        _NAXIS,
+    )
+    x0s, y0s, lambdas = positions[0]
+
+    # The dispersed positions are those of the full transforms, at every wavelength
+    x0_sky, y0_sky = direct_image_wcs(xs + 0.5, ys + 0.5, with_bounding_box=False)
+    x0_sky = np.repeat(x0_sky[np.newaxis, :], len(lambdas), axis=0)
+    y0_sky = np.repeat(y0_sky[np.newaxis, :], len(lambdas), axis=0)
+    sky_to_imgxy = grism_wcs.get_transform("world", "detector")
+    x0_xy, y0_xy, _, _ = sky_to_imgxy(x0_sky, y0_sky, lambdas, 1)
+    expected_x, expected_y = detector_to_grism_transform(grism_wcs)(x0_xy, y0_xy, lambdas, 1)
+    assert_array_equal(x0s, expected_x)
+    assert_array_equal(y0s, expected_y)
+
+
 def test_build_dispersed_image_of_source_accumulates_duplicates():
     """Duplicate coordinates should sum their flux contributions."""
     img = _build_dispersed_image_of_source(
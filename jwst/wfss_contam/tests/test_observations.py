@@ -1,4 +1,6 @@
 import copy
+import os
+from concurrent.futures.process import BrokenProcessPool
 
 import numpy as np
 import pytest
@@ -6,6 +8,7 @@ import stdatamodels.jwst.datamodels as dm
 from astropy.stats import sigma_clipped_stats
 from numpy.testing import assert_allclose
 
+from jwst.wfss_contam import observations
 from jwst.wfss_contam.observations import (
     Observation,
     _aggregate_by_source,
@@ -124,6 +127,100 @@ def test_disperse_order(observation, segmentation_map, chunk_size):
     assert np.isclose(slit.data[5, 60], 0.09994397, rtol=0.005)
 
 
+def test_disperse_order_in_pool(observation, segmentation_map):
+    """Dispersing in the pool of worker processes gives the same result as serially."""
+    sens_waves = np.linspace(1.708, 2.28, 100)
+    wmin, wmax = np.min(sens_waves), np.max(sens_waves)
+    sens_resp = np.ones_like(sens_waves)
+    basis_models = [np.square]
+
+    all_ids = np.array(list(set(np.ravel(segmentation_map.data))))
+    source_ids = all_ids[50:60]
+
+    results = []
+    for max_cpu in [1, 2]:
+        obs = copy.deepcopy(observation)
+        obs.max_cpu = max_cpu
+        obs.max_pixels_per_chunk = 100
+        # The same inputs are shared for all orders
+        for order in [1, 2]:
+            obs.disperse_order(
+                order,
+                wmin,
+                wmax,
+                sens_waves,
+                sens_resp,
+                selected_ids=source_ids,
+                basis_models=basis_models,
+            )
+        results.append(obs)
+    serial, parallel = results
+
+    assert_allclose(parallel.simulated_image, serial.simulated_image, rtol=0, atol=0)
+    assert len(parallel.simulated_slits.slits) == len(serial.simulated_slits.slits)
+    for slit, expected in zip(
+        parallel.simulated_slits.slits, serial.simulated_slits.slits, strict=True
+    ):
+        assert slit.source_id == expected.source_id
+        assert slit.meta.wcsinfo.spectral_order == expected.meta.wcsinfo.spectral_order
+        assert_allclose(slit.data, expected.data, rtol=0, atol=0)
+        assert_allclose(slit.fluxmodel_1, expected.fluxmodel_1, rtol=0, atol=0)
+
+    # The shared inputs of the observation are released with it
+    shared_inputs = parallel._shared_inputs
+    assert shared_inputs is not None
+    shared_inputs.close()
+
+
+def test_disperse_order_in_broken_pool(observation, segmentation_map):
+    """Dispersing recovers from a worker process that died in the pool."""
+    sens_waves = np.linspace(1.708, 2.28, 100)
+    wmin, wmax = np.min(sens_waves), np.max(sens_waves)
+    sens_resp = np.ones_like(sens_waves)
+    all_ids = np.array(list(set(np.ravel(segmentation_map.data))))
+    source_ids = all_ids[50:60]
+
+    # Kill a worker process of the pool
+    pool = observations._get_pool(2)
+    assert isinstance(pool.submit(os._exit, 1).exception(), BrokenProcessPool)
+
+    results = []
+    for max_cpu in [1, 2]:
+        obs = copy.deepcopy(observation)
+        obs.max_cpu = max_cpu
+        obs.max_pixels_per_chunk = 100
+        obs.disperse_order(1, wmin, wmax, sens_waves, sens_resp, selected_ids=source_ids)
+        obs.close()
+        results.append(obs)
+    serial, parallel = results
+
+    assert observations._pool is not pool
+    assert_allclose(parallel.simulated_image, serial.simulated_image, rtol=0, atol=0)
+
+
+def _worker_input_names(descriptor):
+    """Load shared inputs, if any, and list those loaded by a worker process."""
+    if descriptor is not None:
+        observations._load_shared_inputs(descriptor)
+    return sorted(observations._worker_inputs)
+
+
+def test_release_worker_inputs():
+    """Inputs loaded by the worker processes are released by all of them."""
+    pool = observations._get_pool(2)
+    shared_inputs = observations._SharedInputs(arrays={"xs": np.arange(10)})
+    try:
+        names = list(pool.map(_worker_input_names, [shared_inputs.descriptor] * 4))
+        assert [shared_inputs.descriptor[0]] in names
+
+        observations._release_worker_inputs()
+        assert observations._pool is pool
+        assert list(pool.map(_worker_input_names, [None] * 4)) == [[]] * 4
+    finally:
+        shared_inputs.close()
+        observations._shutdown_pool()
+
+
 def test_aggregate_by_source():
     """Chunks for same source covering different spatial regions are combined correctly."""
     # chunk A: x=[0,1], y=[0,1] is put into results
@@ -591,6 +591,7 @@ def contam_corr(
     magnitude_limit=None,
     max_pixels_per_chunk=5e4,
     oversample_factor=2,
+    trace_tolerance=None,
     polyfit_degree=None,
     n_iterations=1,
     l2_alpha=0.1,
@@ -629,6 +630,10 @@ def contam_corr(
         Maximum number of pixels to disperse simultaneously.
     oversample_factor : int, optional
         Wavelength oversampling factor.
+    trace_tolerance : float or None, optional
+        Maximum error, in pixels, of the dispersed positions interpolated
+        from a tabulated grism trace. If None (the default), the grism
+        transforms are evaluated exactly for every pixel.
     polyfit_degree : int, optional
         Degree of polynomial fit to spectral shape. If None (the default), do not attempt
         polynomial fitting and just use the flat-spectrum simulated slit.
@@ -729,6 +734,7 @@ def contam_corr(
             max_pixels_per_chunk=max_pixels_per_chunk,
             oversample_factor=oversample_factor,
             band_wavelengths=band_wavelengths,
+            trace_tolerance=trace_tolerance,
         )
 
     no_sources = True
@@ -804,6 +810,7 @@ def contam_corr(
             selected_ids,
             basis_models=basis_models,
         )
+    obs.close()
 
     if no_sources:
         log.error(